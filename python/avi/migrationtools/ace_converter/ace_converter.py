@@ -14,6 +14,7 @@ from avi.migrationtools.ace_converter.ace_config_converter import\
 from avi.migrationtools.ace_converter.ace_utils import get_excel_dict
 from pkg_resources import resource_filename
 from avi.migrationtools.avi_converter import AviConverter
+from avi.migrationtools.progress import progress, PROGRESS_MODES
 from avi.migrationtools.ansible.ansible_config_converter import AviAnsibleConverter
 
 template_loc, template_name =\
@@ -73,7 +74,7 @@ class AceConvertor(AviConverter):
         parser = Parser(self.in_file)
         parsed_output = parser.parse_ace()
         # Configuration Conversion
-        print "configuration conversion started ..."
+        progress.message("configuration conversion started ...")
         cfgConvert = ConfigConverter(parsed_output,
                                      version=self.controller_version, enable_vs=self.enable_vs,
                                      input_folder_loc=self.input_folder_location,
@@ -107,7 +108,7 @@ class AceConvertor(AviConverter):
             if self.controller_ip:
                 self.upload_config_to_controller(converted_output)
             else:
-                print "Fatal: enter controller ip"
+                progress.message("Fatal: enter controller ip")
 
     def excel_sheet_writing(self):
         """ Excel Sheet Creation. """
@@ -157,8 +158,8 @@ class AceConvertor(AviConverter):
         # Add logger and print avi netscaler converter version
         LOG.info('AVI sdk version: %s Controller Version: %s'
                  % (sdk_version, self.controller_version))
-        print 'AVI sdk version: %s Controller Version: %s' \
-              % (sdk_version, self.controller_version)
+        progress.message('AVI sdk version: %s Controller Version: %s'
+                         % (sdk_version, self.controller_version))
 
 
 if __name__ == '__main__':
@@ -187,6 +188,7 @@ Optional:
 :param input_folder_location: Location of input key and cert files, if not use current run location
 :param output_loc: Path where the parsed data needs to be stored
 :param patch: To patch the configuration file
+:param progress: (bar, quiet, json) How progress is reported
 :param tenant: Tenant for which config need to be converted
 :param version: version of the controller
 :param vrf_name: Add vrf reference to pool and vs
@@ -242,6 +244,12 @@ Optional:
     parser.add_argument('--patch', help='Run config_patch please provide '
                                         'location of patch.yaml')
 
+    # progress reporting, quiet or json for CI runs
+    parser.add_argument('--progress', choices=PROGRESS_MODES, default='bar',
+                        help='Show progress and messages as bar, hide them '
+                             'or write them to stderr as json lines with '
+                             'phase timings')
+
     # enable vs
     parser.add_argument('-s', '--vs_state', choices=['enable', 'disable'],
                         help='state of VS created', default='disable')
@@ -293,8 +301,10 @@ Optional:
             os.makedirs(pargs.output_loc)
 
         # initiate logging
+        progress.configure(pargs.progress)
         ace_converter.init_logger_path()
         ace_converter.ace_converter()
+        progress.report_phase_timings()
 
         # print the totalrun time
         elapsed = time.time() - starttime
@@ -302,7 +312,7 @@ Optional:
             elapsed_time = str(elapsed)[:3] + " Seconds"
         else:
             elapsed_time = str(elapsed / 60)[:4] + " Minutes"
-        print "\n(Elapsed Time: " + elapsed_time + ")"
+        progress.message("\n(Elapsed Time: " + elapsed_time + ")")
 
     elif pargs.input_file is None:
         print "Fatal: Enter a input file"
@@ -1,17 +1,30 @@
 import os
+import re
 import sys
 import logging
 from pyparsing import Keyword, Word, OneOrMore, printables, Group, nums,\
-    alphas, ZeroOrMore, Optional, Combine, QuotedString, restOfLine
+    alphas, ZeroOrMore, Optional, Combine, QuotedString, restOfLine,\
+    MatchFirst, ParseException
 from itertools import cycle
 from avi.migrationtools.ace_converter.ace_utils import printProgressBar,\
     set_excel_dict
+from avi.migrationtools.progress import progress
 LOG = logging.getLogger(__name__)
-
-def create_ace_grammer():
-
-    """ This function creates grammer for ace configuration parsing.
-        :return grammer for parsing
+# Top level command starts at beginning of line, its sub commands are
+# indented
+COMMAND_START = re.compile(r'^\S', re.M)
+FIRST_WORD = re.compile(r'\S+')
+# Fraction of the file parsed between two updates of the progress bar
+PROGRESS_STEP = 0.01
+# Types of objects listed in the excel sheet
+TYPE_TO_LOG = ['logging', 'access-list', 'rserver', 'serverfarm',
+               'parameter-map', 'class-map', 'policy-map', 'sticky',
+               'probe', 'action-list', 'crypto']
+
+def create_command_grammers():
+
+    """ This function creates grammers of ace configuration commands.
+        :return list of tuple of first keyword and grammer of command
     """
 
     # Pyparsing grammer starts here :excitement :-O
@@ -459,409 +472,471 @@ def create_ace_grammer():
                              grammer_al_3 + grammer_al_4 + name) +
                        ZeroOrMore(grammer_al_1_1 | grammer_al_1_2))
 
-    # Overall Grammer
-    grammer = Group(grammer_1 | grammer_2 | grammer_3 | grammer_4 |
-                    grammer_5 | grammer_6 | grammer_7 | grammer_8 |
-                    grammer_9 | grammer_10 | grammer_11 | grammer_12 |
-                    grammer_ssl_comp | grammer_aaa | grammer_crypto_3  | grammer_crypto_10 | grammer_al)
-
-    print "Grammer created for ace config parser."
+    # Grammers with the first keyword of their command, in order of
+    # preference
+    grammers = [
+        ('logging', grammer_1), ('access-list', grammer_2),
+        ('probe', grammer_3), ('rserver', grammer_4),
+        ('parameter-map', grammer_5), ('sticky', grammer_6),
+        ('class-map', grammer_7), ('policy-map', grammer_8),
+        ('interface', grammer_9), ('ip', grammer_10),
+        ('snmp-server', grammer_11), ('serverfarm', grammer_12),
+        ('ssl-proxy', grammer_ssl_comp), ('aaa', grammer_aaa),
+        ('crypto', grammer_crypto_3), ('crypto', grammer_crypto_10),
+        ('action-list', grammer_al)]
+
+    progress.message("Grammer created for ace config parser.")
     LOG.info("Grammer created for ace config parser.")
-    return grammer
+    return grammers
 
 
-def parse_ace_grammer(grammer, data, file_size, out_dict, final_excel, total_parse_count):
-
-    """ This function parse grammer for ace converter convertes to intermediate parser output.
-        :return parsed intermediate output.
+def create_dispatch_grammers():
     """
-    
-    LOG.info("Started ace grammer parsing.")
-    final_dict = dict()
-    for match, start, end in grammer.scanString(data):
-        key = ''
-        extra_dict = {}
-
-        # printing progress bar
-        msg = ''
-        printProgressBar(end, file_size, msg, prefix='Progress', suffix='')
-
-        if match:
-            matched = match.asList()
-            command = data[start: end]
-            out_dict.append(matched)
-            if type(matched[0][0][0]) is list:
-                key = matched[0][0][0][0]
-                name_to_log = matched[0][0][0][1]
-            else:
-                key = matched[0][0][0]
-                name_to_log = matched[0][0][1]
-
-        LOG.info('Parsing happening for :{} ->  {}'.format(key, name_to_log))
-        # LOG.debug('Parsing value {}'.format(matched))
-
-        excel_dict = {
-            'name': '',
-            'type': '',
-            'command': '',
-            'converted': 'n',
-            'status': 'Not Supported',
-            'skipped': [],
-            'indirect': [],
-            'NA': [],
-            'Avi Object': ''
-        }
-
-        name_to_log = None
-        type_to_log = ['logging', 'access-list', 'rserver', 'serverfarm',
-                       'parameter-map', 'class-map', 'policy-map', 'sticky',
-                       'probe', 'action-list', 'crypto']
-
-        if key == 'logging':
-            matched = matched[0][0]
-            name_to_log = matched[1]
-            if len(matched) == 2:
-                extra_dict = {
-                    'log_type': matched[1]
-                }
-
-            elif len(matched) == 3:
-                extra_dict = {
-                    'log_type': matched[1],
-                    'value': matched[2]
-                }
+    This function defines that create grammer of the commands of every
+    first keyword, so a command is matched only against its own grammers
+    :return: dict of keyword to grammer
+    """
+    alternatives = dict()
+    for keyword, grammer in create_command_grammers():
+        alternatives.setdefault(keyword, []).append(grammer)
+    return dict((keyword, Group(MatchFirst(grammers)))
+                for keyword, grammers in alternatives.iteritems())
 
-            elif len(matched) == 4:
-                extra_dict = {
-                    'log_type': matched[1],
-                    'value': matched[2],
-                    'packet': matched[3]
-                }
-            LOG.info('parsing: Logging for value : {}'.format(name_to_log))
-            # LOG.debug('Logging value {}'.format(extra_dict))
 
-        if key == 'access-list':
-            matched = matched[0][0]
-            name_to_log = "{} line {}".format(matched[0][1], matched[0][4])
+def get_parsed_object(matched):
+    """
+    This function defines that convert match of the grammer of a command
+    into the intermediate parser output
+    :param matched: match of grammer as list
+    :return: tuple of command keyword, name of object and parsed object
+    """
+    extra_dict = {}
+    if type(matched[0][0][0]) is list:
+        key = matched[0][0][0][0]
+    else:
+        key = matched[0][0][0]
+    name_to_log = None
+
+    if key == 'logging':
+        matched = matched[0][0]
+        name_to_log = matched[1]
+        if len(matched) == 2:
             extra_dict = {
-                'type': matched[1],
-                matched[2]: matched[3],
-                'extend': matched[4],
-                'permit': matched[5],
-                'ip1': matched[7],
-                'ip2': matched[8],
-                'ip3': matched[9]
+                'log_type': matched[1]
             }
-            LOG.info('parsing: Access-list {}'.format(name_to_log))
-            # LOG.debug('Access-list value {}'.format(extra_dict))
 
-        if key == 'rserver':
-            matched = matched[0][0]
-            name_to_log = matched[0][2]
+        elif len(matched) == 3:
             extra_dict = {
-                matched[0][1]: matched[0][2],
-                'desc': []
+                'log_type': matched[1],
+                'value': matched[2]
             }
-            for match in matched[1:]:
-                temp_dict = dict()
-                if len(match) == 1:
-                    temp_dict = {
-                        'type': match[0]
-                    }
-                elif len(match) == 3:
-                    temp_dict = {
-                        'type': 'redirect',
-                        'code': match[2],
-                        'location': match[1]
-                    }
-                else:
-                    temp_dict = {
-                        match[0]: match[1]
-                    }
-                extra_dict['desc'].append(temp_dict)
 
-            LOG.info('parsing: rserver for value : {}'.format(name_to_log))
-            # LOG.debug('rserver value {}'.format(extra_dict))
-
-        if key == 'serverfarm':
-            matched = matched[0][0]
-            name_to_log = matched[0][2]
-            extra_dict = {
-                matched[0][1]: matched[0][2],   #getting serverfarm name
-                'desc': []
-            }
-            for match in matched[1:]:
-                temp_dict = dict()
-                if len(match) < 3:
-                    temp_dict = {
-                        match[0]: match[1]
-                    }
-                #Handled object such as ['rserver', 'ACMENPMOS01', '9217', 'inservice'] or #For Object such as ['rserver', 'ACMENPMOS02', 'inservice']. Taken care of port is present or not in input configuration file.
-                elif 'rserver' in match:
-                    if len(match) == 4:
-                        temp_dict = {
-                            match[0]: match[1],
-                            'port': match[2],       #if port no is present in configuration.
-                            'enabled': match[3]     #inservice keyword
-                        }
-                    else:
-                        temp_dict = {
-                            match[0]: match[1],
-                            'enabled': match[2]
-                        }
-                #Atleast 2 keys must be presents. i.e. rserver keyword and rserver name. If both present then only add that filed into serverfarm otherwise just ignore.
-                if len(temp_dict.keys()) > 1:
-                    extra_dict['desc'].append(temp_dict)
-
-
-
-            LOG.info('parsing: server farm for value : {}'.format(name_to_log))
-            # LOG.debug('serverfarm value {}'.format(extra_dict))
-
-        if key == 'parameter-map':
-            matched = matched[0][0]
-            name_to_log = matched[0][3]
+        elif len(matched) == 4:
             extra_dict = {
-                matched[0][1]: matched[0][2],
-                'conn_name': matched[0][3],
-                'desc': []
+                'log_type': matched[1],
+                'value': matched[2],
+                'packet': matched[3]
             }
-            for match in matched[1:]:
-                temp_dict = dict()
-                if len(match) == 2:
+        LOG.debug('parsing: Logging for value : {}'.format(name_to_log))
+        # LOG.debug('Logging value {}'.format(extra_dict))
+
+    if key == 'access-list':
+        matched = matched[0][0]
+        name_to_log = "{} line {}".format(matched[0][1], matched[0][4])
+        extra_dict = {
+            'type': matched[1],
+            matched[2]: matched[3],
+            'extend': matched[4],
+            'permit': matched[5],
+            'ip1': matched[7],
+            'ip2': matched[8],
+            'ip3': matched[9]
+        }
+        LOG.debug('parsing: Access-list {}'.format(name_to_log))
+        # LOG.debug('Access-list value {}'.format(extra_dict))
+
+    if key == 'rserver':
+        matched = matched[0][0]
+        name_to_log = matched[0][2]
+        extra_dict = {
+            matched[0][1]: matched[0][2],
+            'desc': []
+        }
+        for match in matched[1:]:
+            temp_dict = dict()
+            if len(match) == 1:
+                temp_dict = {
+                    'type': match[0]
+                }
+            elif len(match) == 3:
+                temp_dict = {
+                    'type': 'redirect',
+                    'code': match[2],
+                    'location': match[1]
+                }
+            else:
+                temp_dict = {
+                    match[0]: match[1]
+                }
+            extra_dict['desc'].append(temp_dict)
+
+        LOG.debug('parsing: rserver for value : {}'.format(name_to_log))
+        # LOG.debug('rserver value {}'.format(extra_dict))
+
+    if key == 'serverfarm':
+        matched = matched[0][0]
+        name_to_log = matched[0][2]
+        extra_dict = {
+            matched[0][1]: matched[0][2],   #getting serverfarm name
+            'desc': []
+        }
+        for match in matched[1:]:
+            temp_dict = dict()
+            if len(match) < 3:
+                temp_dict = {
+                    match[0]: match[1]
+                }
+            #Handled object such as ['rserver', 'ACMENPMOS01', '9217', 'inservice'] or #For Object such as ['rserver', 'ACMENPMOS02', 'inservice']. Taken care of port is present or not in input configuration file.
+            elif 'rserver' in match:
+                if len(match) == 4:
                     temp_dict = {
-                        match[0]: match[1]
+                        match[0]: match[1],
+                        'port': match[2],       #if port no is present in configuration.
+                        'enabled': match[3]     #inservice keyword
                     }
                 else:
                     temp_dict = {
                         match[0]: match[1],
-                        'allow': match[2]
+                        'enabled': match[2]
                     }
+            #Atleast 2 keys must be presents. i.e. rserver keyword and rserver name. If both present then only add that filed into serverfarm otherwise just ignore.
+            if len(temp_dict.keys()) > 1:
                 extra_dict['desc'].append(temp_dict)
 
-            LOG.info(
-                'parsing: parameter-map for value : {}'.format(name_to_log))
 
-        if key == 'class-map':
-            matched = matched[0][0]
-            name_to_log = matched[0][2]
-            extra_dict = {
-                matched[0][0]: matched[0][2],
-                'type': matched[0][1],
-                'desc': []
-            }
-            for match in matched[1:]:
-                temp_dict = dict()
-                if len(match) == 7:
-                    temp_dict = {
-                        match[1]: match[0],
-                        match[2]: match[3],
-                        match[4]: match[6]
-                    }
-                elif len(match) == 5:
-                    temp_dict = {
-                        match[1]: match[0],
-                        match[2]: match[3],
-                        "mask": match[4]
-                    }
-                elif len(match) == 6:
-                    temp_dict = {
-                        match[1]: match[0],
-                        match[2]: match[3],
-                        match[4]: match[5]
-                    }
-                extra_dict['desc'].append(temp_dict)
-            LOG.info('parsing: class-map for value : {}'.format(name_to_log))
-            # LOG.debug('class-map value {}'.format(extra_dict))
-
-        if key == 'policy-map':
-            matched = matched[0][0]
-            if len(matched[0]) == 5:
-                extra_dict = {
-                    matched[0][1]: matched[0][2],
-                    'match': matched[0][3],
-                    'name': matched[0][4],
-                    'desc': []
+
+        LOG.debug('parsing: server farm for value : {}'.format(name_to_log))
+        # LOG.debug('serverfarm value {}'.format(extra_dict))
+
+    if key == 'parameter-map':
+        matched = matched[0][0]
+        name_to_log = matched[0][3]
+        extra_dict = {
+            matched[0][1]: matched[0][2],
+            'conn_name': matched[0][3],
+            'desc': []
+        }
+        for match in matched[1:]:
+            temp_dict = dict()
+            if len(match) == 2:
+                temp_dict = {
+                    match[0]: match[1]
                 }
-                name_to_log = matched[0][4]
             else:
-                extra_dict = {
-                    matched[0][0]: matched[0][2],
-                    'match': matched[0][1],
-                    'desc': []
+                temp_dict = {
+                    match[0]: match[1],
+                    'allow': match[2]
                 }
-                name_to_log = matched[0][2]
-
-            for match in matched[1:]:
-                temp_dict = dict()
+            extra_dict['desc'].append(temp_dict)
+
+        LOG.debug(
+            'parsing: parameter-map for value : {}'.format(name_to_log))
+
+    if key == 'class-map':
+        matched = matched[0][0]
+        name_to_log = matched[0][2]
+        extra_dict = {
+            matched[0][0]: matched[0][2],
+            'type': matched[0][1],
+            'desc': []
+        }
+        for match in matched[1:]:
+            temp_dict = dict()
+            if len(match) == 7:
                 temp_dict = {
-                    match[0][0]: match[0][1],
-                    'class_desc': []
+                    match[1]: match[0],
+                    match[2]: match[3],
+                    match[4]: match[6]
                 }
-                for match1 in match[1:]:
-                    temp_dict_1 = dict()
-                    if len(match1) == 2:
-                        temp_dict_1 = {
-                            match1[0]: match1[1]
-                        }
-                    elif len(match1) == 3:
-                        temp_dict_1 = {
-                            match1[0]: match1[1],
-                            'type': match1[2]
-                        }
-                    temp_dict['class_desc'].append(temp_dict_1)
-                extra_dict['desc'].append(temp_dict)
-            LOG.info('parsing: policy-map for value : {}'.format(name_to_log))
-
-        if key == 'sticky':
-            matched = matched[0][0]
-            if len(matched[0]) == 6:
-                name_to_log = matched[0][5]
-                extra_dict = {
-                    matched[0][1]: matched[0][2],
-                    'name': matched[0][5],
-                    'desc': []
+            elif len(match) == 5:
+                temp_dict = {
+                    match[1]: match[0],
+                    match[2]: match[3],
+                    "mask": match[4]
                 }
-            if len(matched[0]) == 4:
-                name_to_log = matched[0][3]
-                extra_dict = {
-                    matched[0][1]: matched[0][1],
-                    'name': name_to_log,
-                    'desc': []
+            elif len(match) == 6:
+                temp_dict = {
+                    match[1]: match[0],
+                    match[2]: match[3],
+                    match[4]: match[5]
                 }
-            for match in matched[1:]:
-                temp_dict = dict()
-                if len(match) == 2:
-                    temp_dict = {
-                        match[0]: match[1]
-                    }
-                extra_dict['desc'].append(temp_dict)
-            LOG.info('parsing: sticky for value : {}'.format(name_to_log))
-            # LOG.debug('sticky value {}'.format(extra_dict))
+            extra_dict['desc'].append(temp_dict)
+        LOG.debug('parsing: class-map for value : {}'.format(name_to_log))
+        # LOG.debug('class-map value {}'.format(extra_dict))
 
-        if key == 'ssl-proxy':
-            matched = matched[0][0]
-            name_to_log = matched[0][2]
+    if key == 'policy-map':
+        matched = matched[0][0]
+        if len(matched[0]) == 5:
             extra_dict = {
-                'type': matched[0][1],
-                'name': name_to_log,
+                matched[0][1]: matched[0][2],
+                'match': matched[0][3],
+                'name': matched[0][4],
                 'desc': []
             }
-            for match in matched[1:]:
-                if len(match) == 2:
-                    temp_dict = {
-                        match[0]: match[1]
+            name_to_log = matched[0][4]
+        else:
+            extra_dict = {
+                matched[0][0]: matched[0][2],
+                'match': matched[0][1],
+                'desc': []
+            }
+            name_to_log = matched[0][2]
+
+        for match in matched[1:]:
+            temp_dict = dict()
+            temp_dict = {
+                match[0][0]: match[0][1],
+                'class_desc': []
+            }
+            for match1 in match[1:]:
+                temp_dict_1 = dict()
+                if len(match1) == 2:
+                    temp_dict_1 = {
+                        match1[0]: match1[1]
                     }
-                if len(match) == 3:
-                    temp_dict = {
-                        match[0]: match[1],
-                        'name': match[2]
+                elif len(match1) == 3:
+                    temp_dict_1 = {
+                        match1[0]: match1[1],
+                        'type': match1[2]
                     }
-                extra_dict['desc'].append(temp_dict)
-    # action-list type modify http test-ssl-rewrite
-    #   ssl url rewrite location ".*"
-    #   header rewrite request Host header-value "(.*)" replace "%1\/"
-        if key == 'action-list':
-            matched = matched[0][0]
-            name_to_log = matched[0][4]
+                temp_dict['class_desc'].append(temp_dict_1)
+            extra_dict['desc'].append(temp_dict)
+        LOG.debug('parsing: policy-map for value : {}'.format(name_to_log))
+
+    if key == 'sticky':
+        matched = matched[0][0]
+        if len(matched[0]) == 6:
+            name_to_log = matched[0][5]
             extra_dict = {
-                matched[0][0]: name_to_log,
                 matched[0][1]: matched[0][2],
-                matched[0][3]: matched[0][4],
+                'name': matched[0][5],
+                'desc': []
+            }
+        if len(matched[0]) == 4:
+            name_to_log = matched[0][3]
+            extra_dict = {
+                matched[0][1]: matched[0][1],
+                'name': name_to_log,
                 'desc': []
             }
-            for match in matched[1:]:
-                if len(match) == 5:
+        for match in matched[1:]:
+            temp_dict = dict()
+            if len(match) == 2:
+                temp_dict = {
+                    match[0]: match[1]
+                }
+            extra_dict['desc'].append(temp_dict)
+        LOG.debug('parsing: sticky for value : {}'.format(name_to_log))
+        # LOG.debug('sticky value {}'.format(extra_dict))
+
+    if key == 'ssl-proxy':
+        matched = matched[0][0]
+        name_to_log = matched[0][2]
+        extra_dict = {
+            'type': matched[0][1],
+            'name': name_to_log,
+            'desc': []
+        }
+        for match in matched[1:]:
+            if len(match) == 2:
+                temp_dict = {
+                    match[0]: match[1]
+                }
+            if len(match) == 3:
+                temp_dict = {
+                    match[0]: match[1],
+                    'name': match[2]
+                }
+            extra_dict['desc'].append(temp_dict)
+    # action-list type modify http test-ssl-rewrite
+    #   ssl url rewrite location ".*"
+    #   header rewrite request Host header-value "(.*)" replace "%1\/"
+    if key == 'action-list':
+        matched = matched[0][0]
+        name_to_log = matched[0][4]
+        extra_dict = {
+            matched[0][0]: name_to_log,
+            matched[0][1]: matched[0][2],
+            matched[0][3]: matched[0][4],
+            'desc': []
+        }
+        for match in matched[1:]:
+            if len(match) == 5:
+                temp_dict = {
+                    match[0]: match[1],
+                    match[2]: match[3],
+                    "to": match[4]
+                }
+            if len(match) == 8:
+                temp_dict = {
+                    match[0]: match[1],
+                    match[2]: match[3],
+                    match[4]: match[5],
+                    match[6]: match[7],
+                }
+            extra_dict['desc'].append(temp_dict)
+        LOG.debug('parsing: action-list for value : {}'.format(name_to_log))
+
+    if key == 'probe':
+        matched = matched[0][0]
+        name_to_log = matched[0][2]
+        extra_dict = {
+            'type': matched[0][1],
+            'name': matched[0][2],
+        }
+        for match in matched[1:]:
+            temp_dict = dict()
+            if len(match) == 2:
+                temp_dict = {
+                    match[0]: match[1]
+                }
+            if len(match) == 4:
+                if 'status' in match:
                     temp_dict = {
-                        match[0]: match[1],
-                        match[2]: match[3],
-                        "to": match[4]
+                        'status': match[2],
+                        'status1': match[3]
                     }
-                if len(match) == 8:
+                elif 'header' in match:
                     temp_dict = {
-                        match[0]: match[1],
-                        match[2]: match[3],
-                        match[4]: match[5],
-                        match[6]: match[7],
+                        'host': match[1],
+                        'header-value': match[3]
                     }
-                extra_dict['desc'].append(temp_dict)
-            LOG.info('parsing: action-list for value : {}'.format(name_to_log))
+            if len(match) == 3:
+                if 'regex' in match:
+                    temp_dict = {
+                        'regex': 'yes'
+                    }
+            if len(match) == 5:
+                temp_dict = {
+                    match[1]: match[2],
+                    match[3]: match[4]
+                }
+            extra_dict.update(temp_dict)
+        LOG.debug('parsing: probe for value : {}'.format(name_to_log))
 
-        if key == 'probe':
-            matched = matched[0][0]
-            name_to_log = matched[0][2]
+    if key == 'crypto':
+        matched = matched[0][0]
+        name_to_log = matched[0][2]
+        if matched[0][1] == 'chaingroup':
             extra_dict = {
-                'type': matched[0][1],
-                'name': matched[0][2],
+                'cert': [],
+                matched[0][1]: matched[0][2],
             }
-            for match in matched[1:]:
-                temp_dict = dict()
-                if len(match) == 2:
-                    temp_dict = {
-                        match[0]: match[1]
-                    }
-                if len(match) == 4:
-                    if 'status' in match:
-                        temp_dict = {
-                            'status': match[2],
-                            'status1': match[3]
-                        }
-                    elif 'header' in match:
-                        temp_dict = {
-                            'host': match[1],
-                            'header-value': match[3]
-                        }
-                if len(match) == 3:
-                    if 'regex' in match:
-                        temp_dict = {
-                            'regex': 'yes'
-                        }
-                if len(match) == 5:
-                    temp_dict = {
-                        match[1]: match[2],
-                        match[3]: match[4]
-                    }
-                extra_dict.update(temp_dict)
-            LOG.info('parsing: probe for value : {}'.format(name_to_log))
 
-        if key == 'crypto':
-            matched = matched[0][0]
-            name_to_log = matched[0][2]
-            if matched[0][1] == 'chaingroup':
-                extra_dict = {
-                    'cert': [],
-                    matched[0][1]: matched[0][2],
+        for match in matched[0:]:
+            temp_dict = dict()
+            if 'cert' in match:
+                extra_dict['cert'].append(match[1]) #getting chaingroup certs
+            elif 'csr-params' in match:
+                temp_dict = {
+                    match[1]: match[2]  #getting CSR params such as country, state, organization name.
+                }
+            else:
+                temp_dict = {
+                    match[0]: match[1]
                 }
+            extra_dict.update(temp_dict)
+        LOG.debug('parsing: crypto for value : {}'.format(name_to_log))
+    return key, name_to_log, extra_dict
 
-            for match in matched[0:]:
-                temp_dict = dict()
-                if 'cert' in match:
-                    extra_dict['cert'].append(match[1]) #getting chaingroup certs
-                elif 'csr-params' in match:
-                    temp_dict = {
-                        match[1]: match[2]  #getting CSR params such as country, state, organization name.
-                    }
-                else:
-                    temp_dict = {
-                        match[0]: match[1]
-                    }
-                extra_dict.update(temp_dict)
-            LOG.info('parsing: crypto for value : {}'.format(name_to_log))
 
-        # updating excel sheet
-        if key in type_to_log and name_to_log:
-            excel_dict['name'] = name_to_log
-            excel_dict['type'] = key
-            final_excel.append(excel_dict)
+def add_parsed_object(matched, final_dict, final_excel):
+    """
+    This function defines that add parsed object of the match to the parser
+    output and to the excel sheet
+    :param matched: match of grammer as list
+    :param final_dict: parser output, dict of command keyword to objects
+    :param final_excel: list of excel sheet rows
+    :return: None
+    """
+    key, name_to_log, extra_dict = get_parsed_object(matched)
 
-        if key not in final_dict.keys():
-            final_dict.update({key: [extra_dict]})
-        else:
-            final_dict[key].append(extra_dict)
+    # updating excel sheet
+    if key in TYPE_TO_LOG and name_to_log:
+        excel_dict = {
+            'name': name_to_log,
+            'type': key,
+            'command': '',
+            'converted': 'n',
+            'status': 'Not Supported',
+            'skipped': [],
+            'indirect': [],
+            'NA': [],
+            'Avi Object': ''
+        }
+        final_excel.append(excel_dict)
+
+    if key not in final_dict:
+        final_dict[key] = [extra_dict]
+    else:
+        final_dict[key].append(extra_dict)
+
+
+def split_commands(data):
+    """
+    This function defines that split configuration into top level commands
+    along with their indented sub commands in one pass
+    :param data: configuration text
+    :return: generator of tuple of start and end of every command
+    """
+    previous = None
+    for match in COMMAND_START.finditer(data):
+        if previous is not None:
+            yield previous, match.start()
+        previous = match.start()
+    if previous is not None:
+        yield previous, len(data)
+
+
+def parse_ace_commands(grammers, data, file_size, out_dict, final_excel):
+    """
+    This function defines that parse every top level command with the
+    grammer of its first keyword, commands of other keywords are skipped
+    without being parsed. Progress bar is updated once per PROGRESS_STEP of
+    the file.
+    :param grammers: dict of keyword to grammer of command
+    :param data: configuration text
+    :param file_size: size of configuration
+    :param out_dict: list of matches
+    :param final_excel: list of excel sheet rows
+    :return: parsed intermediate output
+    """
+    LOG.info("Started ace command parsing.")
+    final_dict = dict()
+    msg = ''
+    step = max(int(file_size * PROGRESS_STEP), 1)
+    next_progress = step
+    for start, end in split_commands(data):
+        if next_progress <= end < file_size:
+            printProgressBar(end, file_size, msg, prefix='Progress',
+                             suffix='')
+            next_progress = end + step
+        grammer = grammers.get(FIRST_WORD.match(data, start).group())
+        if grammer is None:
+            continue
+        try:
+            match = grammer.parseString(data[start:end])
+        except ParseException as e:
+            LOG.debug('Skipped unsupported command: {}'.format(e.line))
+            continue
+        matched = match.asList()
+        out_dict.append(matched)
+        add_parsed_object(matched, final_dict, final_excel)
 
     set_excel_dict(final_excel)
     printProgressBar(file_size, file_size, msg,
                      prefix='Progress', suffix='')
+    LOG.info("Parsed {} ace objects.".format(len(out_dict)))
     return final_dict
 
 
@@ -875,7 +950,6 @@ class Parser():
 
     def parse_ace(self):
         out_dict = []
-        total_parse_count = 0
         final_excel = []
 
         with open(self.file_name, 'r') as input_config:
@@ -883,7 +957,9 @@ class Parser():
             input_config.seek(0, 2)
             file_size = input_config.tell()
 
-        overall_grammer = create_ace_grammer()
-        parsed_ace_config = parse_ace_grammer(overall_grammer, input_data, file_size, out_dict, final_excel, total_parse_count)
+        grammers = create_dispatch_grammers()
+        parsed_ace_config = parse_ace_commands(grammers, input_data,
+                                               file_size, out_dict,
+                                               final_excel)
         return parsed_ace_config
 
@@ -2,6 +2,7 @@
 
 import sys
 import os
+from avi.migrationtools.progress import progress
 
 excel_dict = list()
 
@@ -26,7 +27,8 @@ def set_excel_dict(excel):
 def printProgressBar(iteration, total, msg, prefix='', suffix='', decimals=1,
                      length=100, fill='#'):
     """
-    Call in a loop to create terminal progress bar
+    Call in a loop to create terminal progress bar, updates are throttled
+    by the shared progress reporter
     @params:
         iteration   - Required  : current iteration (Int)
         total       - Required  : total iterations (Int)
@@ -36,14 +38,9 @@ def printProgressBar(iteration, total, msg, prefix='', suffix='', decimals=1,
         length      - Optional  : character length of bar (Int)
         fill        - Optional  : bar fill character (Str)
     """
-    percent = ("{0:." + str(decimals) + "f}").\
-                             format(100 * (iteration / float(total)))
-    filledLength = int(length * iteration // total)
-    bar = fill * filledLength + '-' * (length - filledLength)
-    if (iteration < total):
-        print '\r%s |%s| %s%% %s' % (prefix, bar, percent, suffix),
-    else:
-        print '\r%s |%s| %s%% %s' % (prefix, bar, percent, suffix)
+    printed = progress.update(iteration, total, msg, prefix, suffix,
+                              decimals, length, fill)
+    if printed and iteration >= total:
         print 'completed'
         print '\n'
 
@@ -4,6 +4,7 @@ import logging
 from avi.migrationtools.ace_converter.ace_constants import\
     DEFAULT_FAILED_CHECKS, DEFAULT_INTERVAL, DEFAULT_TIMEOUT
 from avi.migrationtools.ace_converter.ace_utils import update_excel, get_loc
+from avi.migrationtools.cert_inventory import cert_inventory
 
 # logging init
 LOG = logging.getLogger(__name__)
@@ -36,14 +37,7 @@ class SSLConverter(object):
         if '/Common/' in file_path:
             file_path = file_path.replace('/Common/', '')
         try:
-            with open(file_path, "r") as file_obj:
-                file_str = file_obj.read()
-                file_str = file_str.decode("utf-8")
-        except UnicodeDecodeError:
-            try:
-                file_str = file_str.decode('latin-1')
-            except:
-                LOG.error("Error to read file %s" % file_path, exc_info=True)
+            file_str = cert_inventory.get(file_path).text
         except:
             LOG.error("Error to read file %s" % file_path, exc_info=True)
         return file_str
@@ -72,7 +66,12 @@ class SSLConverter(object):
 
     def ssl_key_and_cert(self):
         key_list = list()
-        for ssl in self.parsed.get('ssl-proxy', ''):
+        ssl_proxies = self.parsed.get('ssl-proxy', '')
+        if ssl_proxies:
+            # Analyse keys and certificates of input folder once
+            cert_inventory.clear()
+            cert_inventory.scan(self.in_path)
+        for ssl in ssl_proxies:
             key = None
             cert = None
             name = ssl['name']
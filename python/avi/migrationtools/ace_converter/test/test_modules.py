@@ -1,7 +1,9 @@
 import mock
 import json
 import os
+import tempfile
 import unittest2
+from avi.migrationtools.ace_converter import ace_parser
 from avi.migrationtools.ace_converter.pool_converter import PoolConverter
 from avi.migrationtools.avi_migration_utils import MigrationUtil
 from avi.migrationtools.ace_converter.monitor_converter import MonitorConverter
@@ -23,6 +25,82 @@ server_name = "test_server"
 health_moniter_name = "test_monitor"
 persistance_moniter_name = "test_persistance"
 port = "test_port"
+ace_config = """\
+logging enable
+logging timestamp
+logging trap 5
+logging host 10.1.1.1 udp/514
+
+access-list FROM_INSIDE line 11 extended permit ip 10.0.0.0 255.255.255.0 any
+
+probe http prb_HTTP-1234
+  port 1234
+  interval 10
+  receive 5
+  expect status 200 200
+  request method get url /test/ping
+probe icmp prb_ICMP
+  interval 5
+
+rserver host rs_Test123
+  description TEST DESC
+  ip address 10.2.2.2
+  inservice
+rserver host rs_Test124
+  ip address 10.2.2.3
+  inservice
+
+parameter-map type connection ALLOW_TEST
+  tcp-options selective-ack allow
+  set timeout inactivity 9999
+
+serverfarm host sf_TEST
+  predictor leastconns slowstart 30
+  rserver rs_Test123 80
+    inservice
+  rserver rs_Test124
+    inservice
+
+class-map match-any VIP_TEST
+  2 match virtual-address 10.3.3.3 tcp eq 80
+class-map match-all URL_TEST
+  2 match http url .*
+
+policy-map type loadbalance first-match LB_TEST
+  class class-default
+    serverfarm sf_TEST
+    sticky-serverfarm TEST
+policy-map multi-match POLICY_TEST
+  class VIP_TEST
+    loadbalance vip inservice
+    loadbalance policy LB_TEST
+
+sticky http-cookie TEST TEST_COOKIE
+  timeout 1000
+  replicate sticky
+  serverfarm sf_TEST
+
+ssl-proxy service SSL_CLIENT
+  key KEY12.PEM
+  cert CERT12.PEM
+
+crypto chaingroup TEST_GROUP
+  cert root.crt
+  cert issuing.crt
+
+action-list type modify http test-ssl-rewrite
+  ssl url rewrite location ".*"
+
+interface vlan 1011
+  ip address 10.4.4.4 255.255.255.0
+  no shutdown
+
+ip route 0.0.0.0 0.0.0.0 10.4.4.1
+snmp-server enable traps slb k7server
+aaa accounting default group TAC_PLUS
+hostname ace1
+boot system image:c4710ace-mz.A5_3_1.bin
+"""
 
 class TestModulesAce(unittest2.TestCase):
 
@@ -174,3 +252,120 @@ class TestModulesAce(unittest2.TestCase):
     def test_vsConverter_False(self):
         self.assertEquals(
             self.vs_empty.virtual_service_conversion('{}'), ([], [], []))
+
+    """Parser"""
+
+    def test_parse_commands(self):
+        expected = {'aaa': [{}],
+                    'access-list': [{'extend': 'extended',
+                                     'ip1': '10.0.0.0',
+                                     'ip2': '255.255.255.0',
+                                     'ip3': 'any',
+                                     'line': '11',
+                                     'permit': 'permit',
+                                     'type': 'FROM_INSIDE'}],
+                    'action-list': [{'action-list': 'test-ssl-rewrite',
+                                     'desc': [{'rewrite': 'location',
+                                               'ssl': 'url',
+                                               'to': '".*"'}],
+                                     'http': 'test-ssl-rewrite',
+                                     'type': 'modify'}],
+                    'class-map': [{'class-map': 'VIP_TEST',
+                                   'desc': [{'match': '2',
+                                             'tcp': '80',
+                                             'virtual-address': '10.3.3.3'}],
+                                   'type': 'match-any'},
+                                  {'class-map': 'URL_TEST',
+                                   'desc': [{'http': 'url', 'mask': '.*', 'match': '2'}],
+                                   'type': 'match-all'}],
+                    'crypto': [{'cert': ['root.crt', 'issuing.crt'],
+                                'chaingroup': 'TEST_GROUP',
+                                'crypto': 'chaingroup'}],
+                    'interface': [{}],
+                    'ip': [{}],
+                    'logging': [{'log_type': 'enable'},
+                                {'log_type': 'timestamp'},
+                                {'log_type': 'trap', 'value': '5'},
+                                {'log_type': 'host',
+                                 'packet': 'udp/514',
+                                 'value': '10.1.1.1'}],
+                    'parameter-map': [{'conn_name': 'ALLOW_TEST',
+                                       'desc': [{'allow': 'allow',
+                                                 'tcp-options': 'selective-ack'},
+                                                {'allow': 'inactivity', 'set': 'timeout'}],
+                                       'type': 'connection'}],
+                    'policy-map': [{'desc': [{'class': 'class-default',
+                                              'class_desc': [{'serverfarm': 'sf_TEST'},
+                                                             {'sticky-serverfarm': 'TEST'}]}],
+                                    'match': 'first-match',
+                                    'name': 'LB_TEST',
+                                    'type': 'loadbalance'},
+                                   {'desc': [{'class': 'VIP_TEST',
+                                              'class_desc': [{'loadbalance': 'vip',
+                                                              'type': 'inservice'},
+                                                             {'loadbalance': 'policy',
+                                                              'type': 'LB_TEST'}]}],
+                                    'match': 'multi-match',
+                                    'policy-map': 'POLICY_TEST'}],
+                    'probe': [{'interval': '10',
+                               'method': 'get',
+                               'name': 'prb_HTTP-1234',
+                               'port': '1234',
+                               'receive': '5',
+                               'status': '200',
+                               'status1': '200',
+                               'type': 'http',
+                               'url': '/test/ping'},
+                              {'interval': '5', 'name': 'prb_ICMP', 'type': 'icmp'}],
+                    'rserver': [{'desc': [{'description': ' TEST DESC'},
+                                          {'ip address': '10.2.2.2'},
+                                          {'type': 'inservice'}],
+                                 'host': 'rs_Test123'},
+                                {'desc': [{'ip address': '10.2.2.3'},
+                                          {'type': 'inservice'}],
+                                 'host': 'rs_Test124'}],
+                    'serverfarm': [{'desc': [{'enabled': 'inservice',
+                                              'port': '80',
+                                              'rserver': 'rs_Test123'},
+                                             {'enabled': 'inservice',
+                                              'rserver': 'rs_Test124'}],
+                                    'host': 'sf_TEST'}],
+                    'snmp-server': [{}],
+                    'ssl-proxy': [{'desc': [{'key': 'KEY12.PEM'}, {'cert': 'CERT12.PEM'}],
+                                   'name': 'SSL_CLIENT',
+                                   'type': 'service'}],
+                    'sticky': [{'desc': [{'timeout': '1000'},
+                                         {'replicate': 'sticky'},
+                                         {'serverfarm': 'sf_TEST'}],
+                                'http-cookie': 'http-cookie',
+                                'name': 'TEST_COOKIE'}]}
+        parsed, parsed_excel = [], []
+        self.assertEqual(ace_parser.parse_ace_commands(
+            ace_parser.create_dispatch_grammers(), ace_config,
+            len(ace_config), parsed, parsed_excel), expected)
+        self.assertEqual(len(parsed), 23)
+        self.assertEqual(len(parsed_excel), 18)
+        with tempfile.NamedTemporaryFile(suffix='.cfg') as config_file:
+            config_file.write(ace_config)
+            config_file.flush()
+            result = ace_parser.Parser(config_file.name).parse_ace()
+        self.assertEqual(result, expected)
+
+    def test_parser_splits_top_level_commands(self):
+        """Sub commands of a command never consume the next command"""
+        config = ("sticky http-cookie TEST TEST_COOKIE\n"
+                  "  serverfarm sf_TEST\n"
+                  "serverfarm host sf_TEST\n"
+                  "  rserver rs_Test123 80\n"
+                  "    inservice\n"
+                  "hostname ace1\n")
+        with tempfile.NamedTemporaryFile(suffix='.cfg') as config_file:
+            config_file.write(config)
+            config_file.flush()
+            result = ace_parser.Parser(config_file.name).parse_ace()
+        self.assertEqual(result['sticky'][0]['desc'],
+                         [{'serverfarm': 'sf_TEST'}])
+        self.assertEqual(result['serverfarm'], [
+            {'host': 'sf_TEST', 'desc': [{'rserver': 'rs_Test123',
+                                          'port': '80',
+                                          'enabled': 'inservice'}]}])
@@ -7,16 +7,19 @@ Created on September 15, 2016
 
 import json
 import logging
+import multiprocessing
 import yaml
 import argparse
 import re
 import requests
 import os
 import urlparse
+from collections import OrderedDict
 from urllib import urlencode
 from copy import deepcopy
 from avi.migrationtools.avi_orphan_object import \
     filter_for_vs, get_vs_ref, get_name_and_entity, PATH_KEY_MAP
+from avi.migrationtools.ref_graph import RefGraph, get_tenant_name
 from avi.migrationtools.ansible.ansible_constant import \
     (USERNAME, PASSWORD, HTTP_TYPE, SSL_TYPE,  DNS_TYPE, L4_TYPE,
      APPLICATION_PROFILE_REF, ENABLE_F5, DISABLE_F5, ENABLE_AVI, DISABLE_AVI,
@@ -30,11 +33,56 @@ from avi.migrationtools.ansible.ansible_constant import \
      ANSIBLE_STR)
 from avi.migrationtools.avi_migration_utils import MigrationUtil
 from avi.migrationtools.ansible.ansible_traffic_generation import TrafficGen
+from avi.migrationtools.ansible.playbook_writer import PlaybookWriter
+from avi.migrationtools.progress import progress
 
 DEFAULT_SKIP_TYPES = DEFAULT_SKIP_TYPES
 LOG = logging.getLogger(__name__)
 # Added util object
 mg_util = MigrationUtil()
+# Folder of output directory having the task lists of playbook shards
+SHARD_DIR = 'ansible_shards'
+# Converter and objects in use, used by worker processes writing shards
+shard_worker_args = None
+# Number of converted references remembered by the converter, objects of an
+# export refer to the same few thousand objects over and over
+REF_CACHE_SIZE = 65536
+
+
+def init_shard_worker(converter, inuse_list):
+    """
+    This function defines that set the converter used by the worker process
+    :param converter: AviAnsibleConverter object
+    :param inuse_list: list of objects referred by virtual services
+    :return: None
+    """
+    global shard_worker_args
+    shard_worker_args = (converter, inuse_list)
+
+
+def write_shard(shard):
+    """
+    This function defines that write task lists of shard in the worker
+    process
+    :param shard: tuple of shard name and list of object type and index
+    :return: number of tasks of shard
+    """
+    converter, inuse_list = shard_worker_args
+    return converter.write_shard(shard, inuse_list)
+
+
+def copy_value(value):
+    """
+    This function defines that copy lists and dicts of value, leaving the
+    strings and numbers shared
+    :param value: value of field
+    :return: copy of value
+    """
+    if type(value) == dict:
+        return dict((k, copy_value(v)) for k, v in value.iteritems())
+    if type(value) == list:
+        return [copy_value(item) for item in value]
+    return value
 
 
 class AviAnsibleConverter(object):
@@ -46,7 +94,8 @@ class AviAnsibleConverter(object):
         '/api/[A-z]+/\?[A-z_\-]+\=[A-z_\-]+\&[A-z_\-]+\=.*')
 
     def __init__(self, avi_cfg, outdir, prefix, not_in_use, skip_types=None,
-                 filter_types=None, ns_vs_name_dict=None, test_vip=None):
+                 filter_types=None, ns_vs_name_dict=None, test_vip=None,
+                 shard=False, workers=1):
         self.outdir = outdir
         self.avi_cfg = avi_cfg
         self.api_version = avi_cfg['META']['version']['Version']
@@ -57,6 +106,11 @@ class AviAnsibleConverter(object):
         self.ns_vs_name_dict = ns_vs_name_dict
         # for test vip
         self.test_vip = test_vip
+        # Split playbooks by tenant and virtual service, written by workers
+        self.shard = shard
+        self.workers = workers
+        # LRU cache of reference to converted reference and cloud reference
+        self.ref_cache = OrderedDict()
         if skip_types is None:
             skip_types = DEFAULT_SKIP_TYPES
         self.skip_types = (skip_types if type(skip_types) == list
@@ -75,15 +129,15 @@ class AviAnsibleConverter(object):
         with open(self.ansible_rest_file_path, 'r') as f:
             self.default_meta_order = yaml.load(f)
 
-    def transform_ref(self, x, obj):
+    def convert_ref(self, x):
         """
-        :param obj:
-        :param x:
-        :return:
+        This function defines that convert reference into the relative
+        reference having only the name of object
+        :param x: reference
+        :return: tuple of relative reference and cloud reference given by
+                 the reference or None
         """
-        # converts ref into the relative reference
-        if not (isinstance(x, basestring) or isinstance(x, unicode)):
-            return x
+        cloud_ref = None
         if x == '/api/tenant/admin':
             x = '/api/tenant/admin#admin'
         # Added REGEX
@@ -98,7 +152,7 @@ class AviAnsibleConverter(object):
                 k, v = p.split('=')
                 # if url is /api/cloud/?tenant=admin&name='Default-Cloud'
                 if k.strip() == 'cloud' or 'cloud'in ref_parts[0]:
-                    obj['cloud_ref'] = '/api/cloud?name=%s' % v
+                    cloud_ref = '/api/cloud?name=%s' % v
                 # Added value of keyname
                 if k.strip() == 'name':
                     x = '%s?name=%s' % (ref_parts[0], v)
@@ -109,6 +163,37 @@ class AviAnsibleConverter(object):
         # query.pop('cloud', None)
         u = u._replace(query=urlencode(query, True))
         x = urlparse.urlunparse(u)
+        return x, cloud_ref
+
+    def get_converted_ref(self, x):
+        """
+        This function defines that return converted reference from the LRU
+        cache, converting it on a miss
+        :param x: reference
+        :return: tuple of relative reference and cloud reference or None
+        """
+        cache = self.ref_cache
+        try:
+            result = cache.pop(x)
+        except KeyError:
+            result = self.convert_ref(x)
+            if len(cache) >= REF_CACHE_SIZE:
+                cache.popitem(last=False)
+        cache[x] = result
+        return result
+
+    def transform_ref(self, x, obj):
+        """
+        :param obj:
+        :param x:
+        :return:
+        """
+        # converts ref into the relative reference
+        if not (isinstance(x, basestring) or isinstance(x, unicode)):
+            return x
+        x, cloud_ref = self.get_converted_ref(x)
+        if cloud_ref is not None:
+            obj['cloud_ref'] = cloud_ref
         return x
 
     def transform_obj_refs(self, obj):
@@ -138,6 +223,37 @@ class AviAnsibleConverter(object):
                     self.transform_obj_refs(item)
         return obj
 
+    def copy_obj_refs(self, obj, skip_fields=()):
+        """
+        This function defines that return copy of object with references
+        transformed, same as transform_obj_refs of a deepcopy of object but
+        done in a single pass which creates only the new dicts and lists
+        :param obj: Avi object or nested dict
+        :param skip_fields: fields of object left out of the copy
+        :return: copy of object
+        """
+        task = dict()
+        for k, v in obj.iteritems():
+            if k in skip_fields:
+                continue
+            if type(v) == dict:
+                task[k] = self.copy_obj_refs(v)
+            elif type(v) == list:
+                items = [self.copy_obj_refs(item) if type(item) == dict
+                         else copy_value(item) for item in v]
+                if k.endswith('_ref') or k.endswith('_refs'):
+                    new_list = [self.transform_ref(item, task) for item in v
+                                if isinstance(item, basestring)]
+                    if new_list:
+                        items = new_list
+                task[k] = items
+            elif (k.endswith('_ref') or k.endswith('_refs')) and \
+                    isinstance(v, basestring):
+                task[k] = self.transform_ref(v, task)
+            else:
+                task[k] = v
+        return task
+
     def update_tenant(self, obj):
         """
         updates the tenant field in the task. This is then picked up by
@@ -158,19 +274,29 @@ class AviAnsibleConverter(object):
         Returns
             Ansible dict
         """
+        for task in self.get_ansible_tasks(obj_type, objs, inuse_list):
+            ansible_dict[TASKS].append(task)
+        return ansible_dict
 
+    def get_ansible_tasks(self, obj_type, objs, inuse_list):
+        """
+        This function defines that generate ansible task of every object of
+        type one at a time
+        :param obj_type: type of object
+        :param objs: list of objects
+        :param inuse_list: list of objects referred by virtual services
+        :return: generator of tasks
+        """
         # get the reference dict
         vs_ref_dict = get_vs_ref()
 
+        skip_fields = set(self.skip_fields)
         for obj in objs:
-            task = deepcopy(obj)
             # Added tag for checking object ref.
             used_tag = 'in_use'
-            if isinstance(task, str):
+            if isinstance(obj, str):
                 continue
-            for skip_field in self.skip_fields:
-                task.pop(skip_field, None)
-            self.transform_obj_refs(task)
+            task = self.copy_obj_refs(obj, skip_fields)
             task.update(common_task_args)
             self.update_tenant(task)
             task_name = ("Create or Update %s: %s" % (obj_type, obj['name'])
@@ -220,13 +346,32 @@ class AviAnsibleConverter(object):
             # eliminate nonetype in vs_ref_tags
             if vs_ref_tags:
                 tags.extend(vs_ref_tags)
-            ansible_dict[TASKS].append(
-                {
-                    task_id: task,
-                    NAME: task_name,
-                    TAGS: tags
-                })
-        return ansible_dict
+            yield {
+                task_id: task,
+                NAME: task_name,
+                TAGS: tags
+            }
+
+    def get_delete_task(self, task, first=False):
+        """
+        This function defines that return task deleting the object created
+        by the task, task is not changed
+        :param task: task creating an object
+        :param first: True for the first task of create playbook
+        :return: delete task or None for system default objects
+        """
+        delete_task = dict(task)
+        for k, v in task.iteritems():
+            if k == 'name' or k == 'tags' or k == 'register':
+                continue
+            if v.get('system_default'):
+                return None
+            v = dict(v)
+            if first:
+                v['api_context'] = "{{avi_api_context | default(omit)}}"
+            v['state'] = 'absent'
+            delete_task[k] = v
+        return delete_task
 
     def get_f5_attributes(self, vs_dict):
         """
@@ -340,7 +485,7 @@ class AviAnsibleConverter(object):
         # Added variable to check progress.
         total_size = len(self.avi_cfg['VirtualService'])
         progressbar_count = 0
-        print "Conversion Started For Ansible Generate Traffic..."
+        progress.message("Conversion Started For Ansible Generate Traffic...")
         trafic_obj = TrafficGen.get_instance(instace_type, self.prefix,
                                              ns_vs_name_dict=self.ns_vs_name_dict)
         for vs in self.avi_cfg['VirtualService']:
@@ -394,6 +539,248 @@ class AviAnsibleConverter(object):
             mg_util.print_progress_bar(progressbar_count, total_size, msg,
                                        prefix='Progress', suffix='')
 
+    def write_object_playbooks(self, create_path, delete_path):
+        """
+        This function defines that write playbooks creating and deleting
+        the objects
+        :param create_path: path of create playbook
+        :param delete_path: path of delete playbook
+        :return: None
+        """
+        # Get the reference object list for not_in_use tag.
+        inuse_list = []
+        if not self.not_in_use:
+            inuse_list = filter_for_vs(self.avi_cfg)
+        play = dict((k, v) for k, v in ansible_dict.iteritems() if k != TASKS)
+        total_size = len(self.default_meta_order['avi_resource_types'])
+        progressbar_count = 0
+        # have a temp dict for accessing lowercase keys
+        avi_cfg_temp = {k.lower(): v for k, v in self.avi_cfg.items()}
+        progress.message("Conversion Started For Ansible Create Object...")
+        # Create and delete playbooks are written in a single pass, delete
+        # playbook has the tasks in reverse order
+        with PlaybookWriter(create_path, play, ANSIBLE_STR) as create_writer, \
+                PlaybookWriter(delete_path, play, ANSIBLE_STR,
+                               reverse=True) as delete_writer:
+            for obj_type in self.default_meta_order['avi_resource_types']:
+                progressbar_count += 1
+                # Added call to check progress.
+                msg = "Ansible Create Object..."
+                mg_util.print_progress_bar(progressbar_count, total_size, msg,
+                                           prefix='Progress', suffix='')
+                if self.filter_types and obj_type not in self.filter_types:
+                    continue
+                if obj_type not in avi_cfg_temp or \
+                        obj_type in self.skip_types:
+                    continue
+                for task in self.get_ansible_tasks(
+                        obj_type, avi_cfg_temp[obj_type], inuse_list):
+                    delete_task = self.get_delete_task(
+                        task, first=not create_writer.task_count)
+                    create_writer.add_task(task)
+                    if delete_task:
+                        delete_writer.add_task(delete_task)
+
+    def get_shards(self, avi_cfg_temp, in_use):
+        """
+        This function defines that split the objects into shards. Objects
+        referred only by one virtual service of same tenant are placed in
+        the shard of that virtual service, other objects in the common shard
+        of their tenant, or in the final shard of their tenant if they refer
+        to objects of a virtual service shard.
+        :param avi_cfg_temp: avi config with lowercase object types
+        :param in_use: set of name-type-tenant of objects in use
+        :return: list of phases, list of shards run in parallel, having
+                 shard name and list of object type and index
+        """
+        vs_ref_dict = get_vs_ref()
+        ref_graph = RefGraph(self.avi_cfg)
+        shard_of = dict()
+        shard_names = dict()
+        # Ids of objects placed in virtual service shards
+        private = set()
+        common = []
+        used_names = set()
+
+        def get_shard_name(tenant, kind):
+            key = (tenant, kind)
+            if key not in shard_names:
+                base = '%s/%s' % (re.sub(r'[^\w.-]+', '_', tenant),
+                                  re.sub(r'[^\w.-]+', '_', kind))
+                name = base
+                index = 1
+                # Names of different virtual services may sanitize to same
+                while name in used_names:
+                    index += 1
+                    name = '%s-%s' % (base, index)
+                used_names.add(name)
+                shard_names[key] = name
+            return shard_names[key]
+
+        for obj_type in self.default_meta_order['avi_resource_types']:
+            if self.filter_types and obj_type not in self.filter_types:
+                continue
+            if obj_type not in avi_cfg_temp or obj_type in self.skip_types:
+                continue
+            for index, obj in enumerate(avi_cfg_temp[obj_type]):
+                if isinstance(obj, str):
+                    continue
+                tenant = get_tenant_name(obj) or 'admin'
+                ref_key = '%s$$%s$$%s' % (obj['name'], obj_type.lower(),
+                                          get_tenant_name(obj))
+                vs_names = vs_ref_dict.get(ref_key, [])
+                if obj_type == 'virtualservice' and not vs_names:
+                    vs_names = [obj['name']]
+                elif obj_type == 'virtualservice' or obj_type == 'tenant':
+                    vs_names = []
+                full_name = '%s-%s-%s' % (obj['name'],
+                                          PATH_KEY_MAP.get(obj_type, ''),
+                                          get_tenant_name(obj))
+                if len(vs_names) == 1 and (obj_type == 'virtualservice' or
+                                           full_name in in_use):
+                    name = get_shard_name(tenant, 'vs-%s' % vs_names[0])
+                    private.add(id(obj))
+                    shard_of.setdefault(name, []).append((obj_type, index))
+                else:
+                    common.append((tenant, obj_type, index, obj))
+        phases = [[], [], [], []]
+        for name in shard_of:
+            phases[2].append(name)
+        for tenant, obj_type, index, obj in common:
+            if any(id(target) in private
+                   for target in ref_graph.get_closure(obj)):
+                name = get_shard_name(tenant, 'final')
+                phase = 3
+            else:
+                name = get_shard_name(tenant, 'common')
+                phase = 0 if tenant == 'admin' else 1
+            if name not in shard_of:
+                shard_of[name] = []
+                phases[phase].append(name)
+            shard_of[name].append((obj_type, index))
+        return [[(name, shard_of[name]) for name in sorted(phase)]
+                for phase in phases if phase]
+
+    def write_shard(self, shard, inuse_list):
+        """
+        This function defines that write the lists of tasks creating and
+        deleting the objects of shard
+        :param shard: tuple of shard name and list of object type and index
+        :param inuse_list: list of objects referred by virtual services
+        :return: number of tasks of shard
+        """
+        name, objs = shard
+        path = os.path.join(self.outdir, SHARD_DIR, name)
+        with PlaybookWriter(path + '.yml', None, ANSIBLE_STR) as create_writer, \
+                PlaybookWriter(path + '_delete.yml', None, ANSIBLE_STR,
+                               reverse=True) as delete_writer:
+            for obj_type, index in objs:
+                for task in self.get_ansible_tasks(
+                        obj_type, [self.avi_cfg_temp[obj_type][index]],
+                        inuse_list):
+                    create_writer.add_task(task)
+                    delete_task = self.get_delete_task(task)
+                    if delete_task:
+                        delete_writer.add_task(delete_task)
+        return create_writer.task_count
+
+    def write_shard_index(self, path, phases, suffix=''):
+        """
+        This function defines that write playbook running the shards, shards
+        of a phase are run in parallel with free strategy on a host per
+        shard, phases are run one after other
+        :param path: path of playbook
+        :param phases: list of phases, list of shards run in parallel
+        :param suffix: suffix of task list file of shards
+        :return: None
+        """
+        play = dict((k, v) for k, v in ansible_dict.iteritems() if k != TASKS)
+        shard_hosts = []
+        plays = []
+        for number, phase in enumerate(phases, 1):
+            group = 'avi_shards_%s' % number
+            for name, objs in phase:
+                shard_hosts.append({
+                    'name': 'avi_shard_%s' % (len(shard_hosts) + 1),
+                    'group': group,
+                    'tasks': '%s/%s%s.yml' % (SHARD_DIR, name, suffix)
+                })
+            shard_play = dict(play)
+            shard_play.update({
+                'hosts': group,
+                'strategy': 'free',
+                'gather_facts': False,
+                TASKS: [{'include_tasks': '{{ shard_tasks }}'}]
+            })
+            plays.append(shard_play)
+        plays.insert(0, {
+            'connection': 'local',
+            'hosts': 'localhost',
+            'gather_facts': False,
+            TASKS: [{
+                NAME: 'Add a host for every shard',
+                'add_host': {
+                    'name': '{{ item.name }}',
+                    'groups': '{{ item.group }}',
+                    'ansible_connection': 'local',
+                    'shard_tasks': '{{ item.tasks }}'
+                },
+                'with_items': shard_hosts
+            }]
+        })
+        with open(path, "w") as outf:
+            outf.write(ANSIBLE_STR)
+            outf.write('---\n')
+            yaml.safe_dump(plays, outf, default_flow_style=False, indent=2)
+
+    def write_sharded_playbooks(self, create_path, delete_path):
+        """
+        This function defines that write the tasks split by tenant and
+        virtual service into shards, in parallel worker processes, and the
+        create and delete playbooks running the shards
+        :param create_path: path of create playbook
+        :param delete_path: path of delete playbook
+        :return: None
+        """
+        in_use = filter_for_vs(self.avi_cfg)
+        inuse_list = [] if self.not_in_use else in_use
+        # have a temp dict for accessing lowercase keys
+        self.avi_cfg_temp = {k.lower(): v for k, v in self.avi_cfg.items()}
+        phases = self.get_shards(self.avi_cfg_temp, in_use)
+        shards = [shard for phase in phases for shard in phase]
+        for tenant_dir in set(name.split('/')[0] for name, objs in shards):
+            shard_dir = os.path.join(self.outdir, SHARD_DIR, tenant_dir)
+            if not os.path.exists(shard_dir):
+                os.makedirs(shard_dir)
+        total_size = len(shards)
+        progress.message("Conversion Started For Ansible Create Object...")
+        msg = "Ansible Create Object..."
+        if self.workers > 1 and len(shards) > 1:
+            # Workers are forked with the config, only objects indexes are
+            # sent to them
+            pool = multiprocessing.Pool(self.workers, init_shard_worker,
+                                        (self, inuse_list))
+            try:
+                results = pool.imap_unordered(write_shard, shards)
+                for progressbar_count, task_count in enumerate(results, 1):
+                    mg_util.print_progress_bar(progressbar_count, total_size,
+                                               msg, prefix='Progress',
+                                               suffix='')
+                pool.close()
+                pool.join()
+            finally:
+                pool.terminate()
+        else:
+            for progressbar_count, shard in enumerate(shards, 1):
+                self.write_shard(shard, inuse_list)
+                mg_util.print_progress_bar(progressbar_count, total_size, msg,
+                                           prefix='Progress', suffix='')
+        self.write_shard_index(create_path, phases)
+        self.write_shard_index(delete_path, list(reversed(phases)),
+                               '_delete')
+        LOG.info('Wrote %s ansible shards in %s phases' % (
+            len(shards), len(phases)))
+
     def write_ansible_playbook(self, f5server=None, f5user=None,
                                f5password=None, instance_type=None):
         """
@@ -409,67 +796,23 @@ class AviAnsibleConverter(object):
                                      % self.outdir
         ansible_delete_object_path = '%s/avi_config_delete_object.yml'\
                                      % self.outdir
-        # Get the reference object list for not_in_use tag.
-        inuse_list = []
-        if not self.not_in_use:
-            inuse_list = filter_for_vs(self.avi_cfg)
-        ad = deepcopy(ansible_dict)
-        generate_traffic_dict = deepcopy(ansible_dict)
-        total_size = len(self.default_meta_order['avi_resource_types'])
-        progressbar_count = 0
-        print "Conversion Started For Ansible Create Object..."
-        for obj_type in self.default_meta_order['avi_resource_types']:
-            progressbar_count += 1
-            # Added call to check progress.
-            msg = "Ansible Create Object..."
-            mg_util.print_progress_bar(progressbar_count, total_size, msg,
-                                       prefix='Progress', suffix='')
-            if self.filter_types and obj_type not in self.filter_types:
-                continue
-            # have a temp dict for accessing lowercase keys
-            avi_cfg_temp = {k.lower(): v for k, v in self.avi_cfg.items()}
-
-            if obj_type not in avi_cfg_temp or obj_type in self.skip_types:
-                continue
-            self.build_ansible_objects(obj_type, avi_cfg_temp[obj_type], ad,
-                                       inuse_list)
+        play = dict((k, v) for k, v in ansible_dict.iteritems() if k != TASKS)
+        if self.shard:
+            self.write_sharded_playbooks(ansible_create_object_path,
+                                         ansible_delete_object_path)
+        else:
+            self.write_object_playbooks(ansible_create_object_path,
+                                        ansible_delete_object_path)
         # if f5 username, password and server present then only generate
         #  playbook for traffic.
         if f5server and f5user and f5password and instance_type:
-            self.generate_traffic(generate_traffic_dict, f5server, f5user,
-                                  f5password, instance_type)
             # Generate traffic file separately
-            with open(ansible_traffic_path, "w+") as outf:
-                outf.write(ANSIBLE_STR)
-                outf.write('---\n')
-                yaml.safe_dump(
-                    [generate_traffic_dict], outf,
-                    default_flow_style=False, indent=2
-                )
-        with open(ansible_create_object_path, "w") as outf:
-            outf.write(ANSIBLE_STR)
-            outf.write('---\n')
-            yaml.safe_dump([ad], outf, default_flow_style=False, indent=2)
-
-        # Added support to generate ansible delete object playbook
-        if len(ad['tasks']):
-            for k, v in ad['tasks'][0].iteritems():
-                    if isinstance(v, dict):
-                        v['api_context'] = "{{avi_api_context | default(omit)}}"
-        tasks = [task for task in reversed(ad['tasks'])]
-        for task in tasks:
-            for k, v in task.iteritems():
-                if k == 'name' or k == 'tags' or k =='register':
-                    continue
-                if v.get('system_default'):
-                    tasks.remove(task)
-                    continue
-                v['state'] = 'absent'
-        ad['tasks'] = tasks
-        with open(ansible_delete_object_path, "w") as outf:
-            outf.write('# Auto-generated from Avi Configuration\n')
-            outf.write('---\n')
-            yaml.safe_dump([ad], outf, default_flow_style=False, indent=2)
+            with PlaybookWriter(ansible_traffic_path, play,
+                                ANSIBLE_STR) as traffic_writer:
+                generate_traffic_dict = dict(play)
+                generate_traffic_dict[TASKS] = traffic_writer
+                self.generate_traffic(generate_traffic_dict, f5server, f5user,
+                                      f5password, instance_type)
 
 
 HELP_STR = HELP_STR
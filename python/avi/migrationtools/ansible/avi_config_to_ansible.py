@@ -12,6 +12,7 @@ import re
 import urlparse
 from copy import deepcopy
 from urllib import urlencode
+from avi.migrationtools.ansible.playbook_writer import PlaybookWriter
 
 DEFAULT_SKIP_TYPES = [
     'SystemConfiguration', 'Network', 'debugcontroller', 'VIMgrVMRuntime',
@@ -263,6 +264,18 @@ class AviAnsibleConverter(object):
         Returns
             Ansible dict
         """
+        for task in self.get_ansible_tasks(obj_type, objs):
+            ansible_dict['tasks'].append(task)
+        return ansible_dict
+
+    def get_ansible_tasks(self, obj_type, objs):
+        """
+        generates per object ansible task one at a time
+        :param obj_type type of object
+        :param iterable list of objects
+        Returns
+            generator of tasks
+        """
         for obj in objs:
             task = deepcopy(obj)
             self.purge_fields(obj_type, task)
@@ -278,8 +291,25 @@ class AviAnsibleConverter(object):
                 "Create or Update %s: %s" % (obj_type, obj['name'])
                 if 'name' in obj else obj_type)
             task_id = 'avi_%s' % obj_type.lower()
-            ansible_dict['tasks'].append({'name': task_name, task_id: task})
-        return ansible_dict
+            yield {'name': task_name, task_id: task}
+
+    def get_delete_task(self, task):
+        """
+        returns task deleting the object created by the task, task is not
+        changed
+        :param task: task creating an object
+        Returns
+            delete task
+        """
+        delete_task = dict(task)
+        for k, v in task.iteritems():
+            if k == 'name':
+                continue
+            v = dict(v)
+            v['state'] = 'absent'
+            v['api_version'] = self.avi_cfg['META']['version']['Version']
+            delete_task[k] = v
+        return delete_task
 
     def build_yaml_objects(self, obj_type, objs, ansible_dict):
         """
@@ -309,33 +339,28 @@ class AviAnsibleConverter(object):
         return ansible_dict
 
     def write_ansible_playbook(self):
-        ad = deepcopy(self.ansible_dict)
+        play = dict((k, v) for k, v in self.ansible_dict.iteritems()
+                    if k != 'tasks')
         meta = self.avi_cfg['META']
         if 'order' not in meta:
             meta['order'] = self.default_meta_order
-        for obj_type in meta['order']:
-            if self.filter_types and obj_type not in self.filter_types:
-                continue
-            if obj_type not in self.avi_cfg or obj_type in self.skip_types:
-                continue
-            self.build_ansible_objects(obj_type, self.avi_cfg[obj_type], ad)
-        with open('%s/avi_config.yml' % self.outdir, "w") as outf:
-            outf.write('# Auto-generated from Avi Configuration\n')
-            outf.write('---\n')
-            yaml.safe_dump([ad], outf, default_flow_style=False, indent=2)
-
-        tasks = [task for task in reversed(ad['tasks'])]
-        for task in tasks:
-            for k, v in task.iteritems():
-                if k == 'name':
+        comment = '# Auto-generated from Avi Configuration\n'
+        # Create and delete playbooks are written in a single pass, delete
+        # playbook has the tasks in reverse order
+        with PlaybookWriter('%s/avi_config.yml' % self.outdir, play,
+                            comment) as create_writer, \
+                PlaybookWriter('%s/avi_config_delete.yml' % self.outdir,
+                               play, comment, reverse=True) as delete_writer:
+            for obj_type in meta['order']:
+                if self.filter_types and obj_type not in self.filter_types:
                     continue
-                v['state'] = 'absent'
-                v['api_version'] = meta['version']['Version']
-        ad['tasks'] = tasks
-        with open('%s/avi_config_delete.yml' % self.outdir, "w") as outf:
-            outf.write('# Auto-generated from Avi Configuration\n')
-            outf.write('---\n')
-            yaml.safe_dump([ad], outf, default_flow_style=False, indent=2)
+                if obj_type not in self.avi_cfg or \
+                        obj_type in self.skip_types:
+                    continue
+                for task in self.get_ansible_tasks(obj_type,
+                                                   self.avi_cfg[obj_type]):
+                    create_writer.add_task(task)
+                    delete_writer.add_task(self.get_delete_task(task))
 
     def write_yaml(self):
         ad = deepcopy(self.ansible_avi_config)
@@ -0,0 +1,148 @@
+import logging
+import tempfile
+import yaml
+
+try:
+    from yaml import CSafeDumper as SafeDumper
+except ImportError:
+    from yaml import SafeDumper
+
+LOG = logging.getLogger(__name__)
+# Key of play holding the list of tasks
+TASKS = 'tasks'
+# Indentation of tasks in the list of tasks of the play
+TASK_INDENT = '  '
+# Line width used by yaml.safe_dump
+LINE_WIDTH = 80
+
+
+def dump_fragment(data, indent=''):
+    """
+    This function defines that dump data in block style, like
+    yaml.safe_dump, with every line indented so that it can be placed in the
+    middle of a document
+    :param data: data to dump
+    :param indent: indentation to add to every line
+    :return: yaml text
+    """
+    text = yaml.dump(data, Dumper=SafeDumper, default_flow_style=False,
+                     indent=2, width=LINE_WIDTH - len(indent))
+    if not indent:
+        return text
+    return ''.join(indent + line if line.strip() else line
+                   for line in text.splitlines(True))
+
+
+class PlaybookWriter(object):
+    """
+    Writes an ansible playbook of a single play one task at a time, so the
+    tasks never have to be held in memory together. Output is semantically
+    equivalent to yaml.safe_dump of the play, it loads to the same data but
+    the C dumper, when available, may quote or wrap scalars differently from
+    the pure python dumper. Without a play, a bare list of tasks is
+    written which can be included by other playbooks. With reverse, tasks
+    are spooled to a temporary file and written in reverse order when
+    writer is closed.
+    """
+
+    def __init__(self, path, play, comment, reverse=False):
+        """
+        :param path: path of playbook
+        :param play: play attributes other than the tasks, None to write
+                     only the list of tasks
+        :param comment: comment written at top of playbook
+        :param reverse: True to write the tasks in reverse order
+        """
+        self.path = path
+        self.reverse = reverse
+        self.task_count = 0
+        # Offset and length of every task in spool file
+        self.spooled = []
+        self.spool = tempfile.TemporaryFile() if reverse else None
+        self.stream = open(path, 'w')
+        self.stream.write(comment)
+        self.stream.write('---\n')
+        self.play = play
+        self.prefix = '- '
+        if play is None:
+            self.indent = ''
+            self.keys_after = []
+            return
+        self.indent = TASK_INDENT
+        keys = sorted(set(play) | set([TASKS]))
+        self.keys_after = keys[keys.index(TASKS) + 1:]
+        for key in keys[:keys.index(TASKS)]:
+            self.write_attribute(self.prefix, key)
+            self.prefix = TASK_INDENT
+
+    def write_attribute(self, prefix, key):
+        """
+        This function defines that write attribute of play
+        :param prefix: prefix of first line
+        :param key: attribute name
+        :return: None
+        """
+        text = dump_fragment({key: self.play[key]}, TASK_INDENT)
+        self.stream.write(prefix + text[len(TASK_INDENT):])
+
+    def write_tasks_key(self):
+        """
+        This function defines that write the key of list of tasks of play
+        :return: None
+        """
+        if self.play is not None:
+            self.stream.write('%s%s:\n' % (self.prefix, TASKS))
+
+    def add_task(self, task):
+        """
+        This function defines that write task to playbook, or to spool file
+        when tasks are written in reverse order
+        :param task: task dict
+        :return: None
+        """
+        text = dump_fragment([task], self.indent)
+        if not self.task_count and not self.reverse:
+            self.write_tasks_key()
+        self.task_count += 1
+        if self.reverse:
+            self.spooled.append((self.spool.tell(), len(text)))
+            self.spool.write(text)
+        else:
+            self.stream.write(text)
+
+    # Writer can be given in place of the list of tasks of a play
+    append = add_task
+
+    def close(self):
+        """
+        This function defines that write spooled tasks and remaining play
+        attributes and close the playbook
+        :return: None
+        """
+        if self.stream is None:
+            return
+        if not self.task_count:
+            # Empty list of tasks is dumped in flow style
+            if self.play is None:
+                self.stream.write('[]\n')
+            else:
+                self.stream.write('%s%s: []\n' % (self.prefix, TASKS))
+        elif self.reverse:
+            self.write_tasks_key()
+            for offset, length in reversed(self.spooled):
+                self.spool.seek(offset)
+                self.stream.write(self.spool.read(length))
+            self.spooled = []
+        if self.spool is not None:
+            self.spool.close()
+        for key in self.keys_after:
+            self.write_attribute(TASK_INDENT, key)
+        self.stream.close()
+        self.stream = None
+        LOG.debug('Wrote %s tasks to %s' % (self.task_count, self.path))
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
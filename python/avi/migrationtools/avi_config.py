@@ -0,0 +1,448 @@
+import logging
+from collections import defaultdict
+
+LOG = logging.getLogger(__name__)
+# Keys which are not compared when checking objects for duplicates
+FINGERPRINT_IGNORE_KEYS = ('name', 'description', 'url', 'uuid', 'dup_of')
+
+
+class AviObjectList(list):
+    """
+    List of Avi objects of one type with a hash index on object name, so
+    objects are looked up by name, tenant and cloud in constant time instead
+    of scanning the whole list.
+    A second index on the object fingerprint finds duplicate objects for
+    merging with a single dict lookup, and key indexes on keys computed by
+    a key function, e.g. VIP address and port of virtual services, find the
+    objects having any of the given keys.
+    The indexes follow append, extend, insert, remove and pop. Any other
+    change to the list rebuilds the indexes on next lookup. Objects renamed
+    in place instead of through rename, or changed in place to have other
+    keys, are found by a scan of the list when the lookup finds nothing in
+    the index, which rebuilds the index.
+    Objects may be changed in place after they are added, so objects added
+    to the list or handed out by index, name or duplicate lookup are
+    fingerprinted again on next duplicate lookup. Objects changed in place
+    through iteration, slices or a reference kept from before they were
+    added have to be passed to touch.
+    """
+
+    def __init__(self, objects=()):
+        super(AviObjectList, self).__init__(objects)
+        self.name_index = None
+        self.fingerprint_index = None
+        # Fingerprint of every indexed object by object id
+        self.fingerprints = None
+        # Objects which may have been changed since fingerprint lookup
+        self.touched = []
+        self.key_indexes = dict()
+
+    def __reduce__(self):
+        # Copies and pickles are plain lists of objects, index is rebuilt
+        return self.__class__, (list(self),)
+
+    def build_index(self):
+        """
+        This function defines that create the name index of objects
+        :return: None
+        """
+        self.name_index = defaultdict(list)
+        for obj in self:
+            self.name_index[obj.get('name')].append(obj)
+
+    def build_fingerprint_index(self):
+        """
+        This function defines that create the fingerprint index of objects
+        :return: None
+        """
+        self.fingerprint_index = defaultdict(list)
+        self.fingerprints = dict()
+        self.touched = []
+        for obj in self:
+            fingerprint = get_fingerprint(obj)
+            self.fingerprint_index[fingerprint].append(obj)
+            self.fingerprints[id(obj)] = fingerprint
+
+    def touch(self, obj):
+        """
+        This function defines that mark object as possibly changed so its
+        fingerprint is checked on next duplicate lookup
+        :param obj: object from this list
+        :return: None
+        """
+        if self.fingerprint_index is None:
+            return
+        if len(self.touched) >= len(self):
+            # Checking all touched objects costs more than reindexing
+            self.invalidate_fingerprint_index()
+        else:
+            self.touched.append(obj)
+
+    def verify_fingerprint_index(self):
+        """
+        This function defines that check fingerprints of touched objects and
+        rebuild the fingerprint index if any of them is changed
+        :return: None
+        """
+        if self.fingerprint_index is None:
+            self.build_fingerprint_index()
+            return
+        touched, self.touched = self.touched, []
+        for obj in touched:
+            if self.fingerprints.get(id(obj)) != get_fingerprint(obj):
+                self.build_fingerprint_index()
+                return
+
+    def build_key_index(self, key_func):
+        """
+        This function defines that create index of object positions by keys
+        returned by key function
+        :param key_func: function returning list of keys of object
+        :return: key index
+        """
+        key_index = defaultdict(list)
+        for pos, obj in enumerate(self):
+            for key in set(key_func(obj)):
+                key_index[key].append(pos)
+        self.key_indexes[key_func] = key_index
+        return key_index
+
+    def invalidate_index(self):
+        self.name_index = None
+        self.fingerprint_index = None
+        self.fingerprints = None
+        self.touched = []
+        self.key_indexes = dict()
+
+    def invalidate_fingerprint_index(self):
+        self.fingerprint_index = None
+        self.fingerprints = None
+        self.touched = []
+
+    def __getitem__(self, index):
+        obj = super(AviObjectList, self).__getitem__(index)
+        if not isinstance(index, slice):
+            self.touch(obj)
+        return obj
+
+    def append(self, obj):
+        super(AviObjectList, self).append(obj)
+        if self.name_index is not None:
+            self.name_index[obj.get('name')].append(obj)
+        if self.fingerprint_index is not None:
+            fingerprint = get_fingerprint(obj)
+            self.fingerprint_index[fingerprint].append(obj)
+            self.fingerprints[id(obj)] = fingerprint
+            # Caller keeps the object and may change it
+            self.touch(obj)
+        for key_func, key_index in self.key_indexes.iteritems():
+            for key in set(key_func(obj)):
+                key_index[key].append(len(self) - 1)
+
+    def extend(self, objects):
+        for obj in objects:
+            self.append(obj)
+
+    def __iadd__(self, objects):
+        self.extend(objects)
+        return self
+
+    def insert(self, index, obj):
+        super(AviObjectList, self).insert(index, obj)
+        self.invalidate_index()
+
+    def remove(self, obj):
+        super(AviObjectList, self).remove(obj)
+        if self.name_index is not None:
+            self.name_index[obj.get('name')].remove(obj)
+        self.invalidate_fingerprint_index()
+        self.key_indexes = dict()
+
+    def pop(self, *args):
+        obj = super(AviObjectList, self).pop(*args)
+        self.invalidate_index()
+        return obj
+
+    def __setitem__(self, index, obj):
+        super(AviObjectList, self).__setitem__(index, obj)
+        self.invalidate_index()
+
+    def __delitem__(self, index):
+        super(AviObjectList, self).__delitem__(index)
+        self.invalidate_index()
+
+    def __setslice__(self, start, end, objects):
+        super(AviObjectList, self).__setslice__(start, end, objects)
+        self.invalidate_index()
+
+    def __delslice__(self, start, end):
+        super(AviObjectList, self).__delslice__(start, end)
+        self.invalidate_index()
+
+    def sort(self, *args, **kwargs):
+        super(AviObjectList, self).sort(*args, **kwargs)
+        self.invalidate_index()
+
+    def reverse(self):
+        super(AviObjectList, self).reverse()
+        self.invalidate_index()
+
+    def rename(self, obj, name):
+        """
+        This function defines that rename object of this list and update
+        the index
+        :param obj: object from this list
+        :param name: new name of object
+        :return: None
+        """
+        obj['name'] = name
+        self.invalidate_index()
+
+    def get_by_name(self, name, tenant_ref=None, cloud_ref=None):
+        """
+        This function defines that return objects with given name
+        :param name: name of object
+        :param tenant_ref: tenant ref of object if objects of only this
+        tenant are required
+        :param cloud_ref: cloud ref of object if objects of only this cloud
+        are required
+        :return: list of objects in list order
+        """
+        if self.name_index is None:
+            self.build_index()
+        objects = [obj for obj in self.name_index.get(name, [])
+                   if obj.get('name') == name and
+                   (tenant_ref is None or
+                    obj.get('tenant_ref') == tenant_ref) and
+                   (cloud_ref is None or obj.get('cloud_ref') == cloud_ref)]
+        if not objects:
+            # Object may be renamed in place without rename
+            objects = get_objects_by_name(list(self), name, tenant_ref,
+                                          cloud_ref)
+            if objects:
+                self.build_index()
+        for obj in objects:
+            self.touch(obj)
+        return objects
+
+    def get_by_keys(self, key_func, keys):
+        """
+        This function defines that return objects having any of given keys
+        :param key_func: function returning list of keys of object
+        :param keys: list of keys to look up
+        :return: list of objects in list order
+        """
+        key_index = self.key_indexes.get(key_func)
+        if key_index is None:
+            key_index = self.build_key_index(key_func)
+        keys = set(keys)
+        positions = sorted(set(pos for key in keys
+                               for pos in key_index.get(key, [])))
+        # Keys of object may be changed after indexing
+        objects = [self[pos] for pos in positions
+                   if keys.intersection(key_func(list.__getitem__(self, pos)))]
+        if not objects:
+            # Object may be changed in place to have one of the keys
+            objects = get_objects_by_keys(list(self), key_func, keys)
+            if objects:
+                self.build_key_index(key_func)
+        return objects
+
+    def get_duplicate(self, src_obj):
+        """
+        This function defines that return first object of the list which is
+        duplicate of given object
+        :param src_obj: object to find duplicate for
+        :return: duplicate object if available else None
+        """
+        fingerprint = get_fingerprint(src_obj)
+        self.verify_fingerprint_index()
+        candidates = self.fingerprint_index.get(fingerprint, [])
+        if any(get_fingerprint(obj) != fingerprint for obj in candidates):
+            # Objects were modified after indexing hence reindex
+            self.build_fingerprint_index()
+            candidates = self.fingerprint_index.get(fingerprint, [])
+        if not candidates:
+            return None
+        # Caller may change the duplicate
+        self.touch(candidates[0])
+        return candidates[0]
+
+
+class AviConfig(dict):
+    """
+    Avi configuration dict of object type to list of objects, where every
+    list is an AviObjectList. It serializes to JSON as a plain dict.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super(AviConfig, self).__init__()
+        self.update(*args, **kwargs)
+
+    def __reduce__(self):
+        return self.__class__, (dict(self),)
+
+    def __setitem__(self, obj_type, objects):
+        if isinstance(objects, list) and \
+                not isinstance(objects, AviObjectList):
+            objects = AviObjectList(objects)
+        super(AviConfig, self).__setitem__(obj_type, objects)
+
+    def update(self, *args, **kwargs):
+        for obj_type, objects in dict(*args, **kwargs).iteritems():
+            self[obj_type] = objects
+
+    def setdefault(self, obj_type, objects=None):
+        if obj_type not in self:
+            self[obj_type] = objects
+        return self[obj_type]
+
+    def get_by_name(self, obj_type, name, tenant_ref=None, cloud_ref=None):
+        """
+        This function defines that return objects of a type with given name
+        :param obj_type: Avi object type
+        :param name: name of object
+        :param tenant_ref: tenant ref of object
+        :param cloud_ref: cloud ref of object
+        :return: list of objects
+        """
+        return get_objects_by_name(self.get(obj_type, []), name,
+                                   tenant_ref, cloud_ref)
+
+
+def get_objects_by_name(objects, name, tenant_ref=None, cloud_ref=None):
+    """
+    This function defines that return objects with given name from indexed
+    or plain list of objects
+    :param objects: list of Avi objects
+    :param name: name of object
+    :param tenant_ref: tenant ref of object
+    :param cloud_ref: cloud ref of object
+    :return: list of objects in list order
+    """
+    if isinstance(objects, AviObjectList):
+        return objects.get_by_name(name, tenant_ref, cloud_ref)
+    return [obj for obj in objects if obj.get('name') == name and
+            (tenant_ref is None or obj.get('tenant_ref') == tenant_ref) and
+            (cloud_ref is None or obj.get('cloud_ref') == cloud_ref)]
+
+
+def freeze(value):
+    """
+    This function defines that convert json value to hashable value which
+    compares equal for equal values
+    :param value: json value
+    :return: hashable value
+    """
+    if isinstance(value, dict):
+        return frozenset((key, freeze(val)) for key, val in value.iteritems())
+    if isinstance(value, list):
+        return tuple(freeze(val) for val in value)
+    return value
+
+
+def get_fingerprint(obj, ignore_keys=FINGERPRINT_IGNORE_KEYS):
+    """
+    This function defines that return fingerprint of object which is same
+    for objects that differ only in ignored keys
+    :param obj: Avi object
+    :param ignore_keys: keys left out from fingerprint
+    :return: hashable fingerprint
+    """
+    return frozenset((key, freeze(val)) for key, val in obj.iteritems()
+                     if key not in ignore_keys)
+
+
+def get_duplicate_object(objects, src_obj):
+    """
+    This function defines that return first object which is duplicate of
+    given object from indexed or plain list of objects
+    :param objects: list of Avi objects
+    :param src_obj: object to find duplicate for
+    :return: duplicate object if available else None
+    """
+    if isinstance(objects, AviObjectList):
+        return objects.get_duplicate(src_obj)
+    fingerprint = get_fingerprint(src_obj)
+    for obj in objects:
+        if get_fingerprint(obj) == fingerprint:
+            return obj
+    return None
+
+
+def get_objects_by_keys(objects, key_func, keys):
+    """
+    This function defines that return objects having any of given keys
+    from indexed or plain list of objects
+    :param objects: list of Avi objects
+    :param key_func: function returning list of keys of object
+    :param keys: list of keys to look up
+    :return: list of objects in list order
+    """
+    if isinstance(objects, AviObjectList):
+        return objects.get_by_keys(key_func, keys)
+    keys = set(keys)
+    return [obj for obj in objects if keys.intersection(key_func(obj))]
+
+
+def get_vip_address(vs):
+    """
+    This function defines that return VIP address of virtual service
+    :param vs: virtual service object
+    :return: ip address of vip
+    """
+    if vs.get('vip'):
+        return vs['vip'][0]['ip_address']['addr']
+    return vs.get('ip_address', {}).get('addr')
+
+
+def get_vip_keys(vs):
+    """
+    This function defines that return VIP address key of virtual service
+    :param vs: virtual service object
+    :return: list of keys
+    """
+    return [get_vip_address(vs)]
+
+
+def get_vip_port_keys(vs):
+    """
+    This function defines that return VIP address and port keys of all
+    services of virtual service, port is None for port range services
+    :param vs: virtual service object
+    :return: list of keys
+    """
+    address = get_vip_address(vs)
+    return [(address, None) if service.get('port_range_end') else
+            (address, int(service['port'])) for service in vs['services']]
+
+
+def get_vip_first_port_keys(vs):
+    """
+    This function defines that return VIP address and port key of first
+    service of virtual service
+    :param vs: virtual service object
+    :return: list of keys
+    """
+    if not vs.get('services'):
+        return []
+    return [(get_vip_address(vs), vs['services'][0]['port'])]
+
+
+def get_pool_ref_keys(vs):
+    """
+    This function defines that return pool reference key of virtual service
+    :param vs: virtual service object
+    :return: list of keys
+    """
+    return [vs.get('pool_ref')]
+
+
+def get_pool_group_ref_keys(vs):
+    """
+    This function defines that return pool group reference key of virtual
+    service
+    :param vs: virtual service object
+    :return: list of keys
+    """
+    return [vs.get('pool_group_ref')]
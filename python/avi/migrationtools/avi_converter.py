@@ -2,6 +2,7 @@ from pkg_resources import parse_version
 from avi.migrationtools.config_patch import ConfigPatch
 from avi.migrationtools.vs_filter import filter_for_vs
 from avi.migrationtools import avi_rest_lib
+from avi.migrationtools.progress import progress
 import yaml
 import json
 import logging
@@ -72,8 +73,7 @@ class AviConverter(object):
         :return: None
         """
         report_path = output_dir + os.path.sep + report_name
-        print "Converted Output Location: %s" % \
-              (report_path)
+        progress.message("Converted Output Location: %s" % report_path)
         with open(report_path, "w") as text_file:
             json.dump(avi_config, text_file, indent=4)
         LOG.info('written avi config file ' +
@@ -81,7 +81,7 @@ class AviConverter(object):
 
     def init_logger_path(self):
         LOG.setLevel(logging.DEBUG)
-        print "Log File Location: %s" % self.output_file_path
+        progress.message("Log File Location: %s" % self.output_file_path)
         formatter = '[%(asctime)s] %(levelname)s [%(funcName)s:%(lineno)d] %(message)s'
         logging.basicConfig(filename=os.path.join(self.output_file_path, 'converter.log'),
                             level=logging.DEBUG, format=formatter)
@@ -8,15 +8,12 @@ import json
 import re
 import random
 import csv
-import pexpect
 import yaml
 import string
 import avi.migrationtools.f5_converter.converter_constants as conv_const
 import avi.migrationtools.netscaler_converter.ns_constants as ns_constants
 from pkg_resources import parse_version
-from socket import gethostname
-from OpenSSL import crypto
-from datetime import datetime
+from collections import defaultdict
 from xlsxwriter import Workbook
 from openpyxl import load_workbook
 from avi.migrationtools.netscaler_converter.ns_constants \
@@ -27,7 +24,11 @@ from avi.migrationtools.netscaler_converter.ns_constants \
             OBJECT_TYPE_HTTP_POLICY_SET, STATUS_LIST, COMPLEXITY_ADVANCED,
             COMPLEXITY_BASIC, OBJECT_TYPE_APPLICATION_PERSISTENCE_PROFILE,
             OBJECT_TYPE_APPLICATION_PROFILE)
-from avi.migrationtools.vs_filter import path_key_map, get_name_and_entity
+from avi.migrationtools.ref_graph import PATH_KEY_MAP, RefGraph, \
+    get_name_and_entity
+from avi.migrationtools.cert_inventory import cert_inventory, dummy_certs
+from avi.migrationtools.progress import progress
+from avi.migrationtools.avi_config import AviObjectList, get_duplicate_object
 import networkx as nx
 
 LOG = logging.getLogger(__name__)
@@ -62,24 +63,12 @@ class MigrationUtil(object):
 
 
     def create_self_signed_cert(self):
-        # create a key pair
-        key = crypto.PKey()
-        key.generate_key(crypto.TYPE_RSA, 2048)
-
-        # create a self-signed cert
-        cert = crypto.X509()
-        cert.get_subject().C = "US"
-        cert.get_subject().O = "Avi Networks"
-        cert.get_subject().CN = gethostname()
-        cert.set_serial_number(1000)
-        cert.gmtime_adj_notBefore(0)
-        cert.gmtime_adj_notAfter(10 * 365 * 24 * 60 * 60)
-        cert.set_issuer(cert.get_subject())
-        cert.set_pubkey(key)
-        cert.sign(key, 'sha256')
-        cert = crypto.dump_certificate(crypto.FILETYPE_PEM, cert)
-        key = crypto.dump_privatekey(crypto.FILETYPE_PEM, key)
-        return key, cert
+        """
+        This function defines that return key and self signed certificate
+        for dummy objects from the shared provider
+        :return: key and certificate in PEM format
+        """
+        return dummy_certs.get()
 
     def is_certificate_key_protected(self, key_file):
         """
@@ -88,15 +77,30 @@ class MigrationUtil(object):
         :return: Return True if key is passphrase protected else return False
         """
         try:
-            child = pexpect.spawn(
-                'openssl rsa -in %s -check -noout' % key_file)
-            # Expect for enter pass phrase if key is protected else it will raise
-            # an exception
-            child.expect('Enter pass phrase for')
-            update_count('warning')
+            # Key is loaded in-process, only a protected key asks for the
+            # pass phrase
+            if cert_inventory.get(key_file).key_protected:
+                update_count('warning')
+                return True
+        except Exception:
+            LOG.debug('Failed to analyse key %s' % key_file, exc_info=True)
+        return False
+
+    def is_key_cert_matching(self, key_file, cert_file):
+        """
+        This functions defines that whether key belongs to the certificate
+        :param key_file: Path of key file
+        :param cert_file: Path of certificate file
+        :return: Return False if key does not match certificate else True
+        """
+        try:
+            return cert_inventory.is_key_cert_match(
+                cert_inventory.get(key_file),
+                cert_inventory.get(cert_file)) is not False
+        except Exception:
+            LOG.debug('Failed to match key %s with certificate %s' % (
+                key_file, cert_file), exc_info=True)
             return True
-        except Exception as e:
-            return False
 
     def update_vs_complexity_level(self, vs_csv_row, virtual_service):
         """
@@ -117,6 +121,110 @@ class MigrationUtil(object):
         else:
             vs_csv_row['Complexity Level'] = conv_const.COMPLEXITY_BASIC
 
+    def get_pivot_counts(self, row_list, pivot_keys):
+        """
+        This function defines that count the status rows per pivot key values
+        in a single pass over the rows
+        :param row_list: list of status rows
+        :param pivot_keys: list of row keys to group the rows by
+        :return: sorted list of tuple of key values and count of rows
+        """
+        counts = defaultdict(int)
+        for row in row_list:
+            key = tuple(row.get(pivot_key) for pivot_key in pivot_keys)
+            # Rows without value for any of the keys are not counted
+            if None in key:
+                continue
+            counts[key] += 1
+        return sorted(counts.items())
+
+    def get_report_value(self, value):
+        """
+        This function defines that convert cell value to unicode for csv and
+        parquet reports
+        :param value: value of status row
+        :return: unicode value or None
+        """
+        if value is None or isinstance(value, unicode):
+            return value
+        if isinstance(value, str):
+            return value.decode('utf-8', 'replace')
+        return unicode(value)
+
+    def write_status_report(self, report_path, fieldnames, row_list,
+                            pivot_keys, report_format=None, progress=None):
+        """
+        This function defines that write status sheet and pivot sheet in xlsx
+        report in a single streaming pass and optionally the status rows in
+        csv and parquet files next to it
+        :param report_path: path of xlsx report
+        :param fieldnames: list of columns of status sheet
+        :param row_list: list of status rows
+        :param pivot_keys: list of columns to group rows by in pivot sheet
+        :param report_format: list of additional formats from csv and parquet
+        :param progress: function to call after each row is written
+        :return: None
+        """
+        # Columns of rows missing in header are written after the header
+        # columns so that no value of the rows is lost
+        known_keys = set(fieldnames)
+        extra_keys = []
+        for row_data in row_list:
+            for key in row_data:
+                if key not in known_keys:
+                    known_keys.add(key)
+                    extra_keys.append(key)
+        if extra_keys:
+            LOG.warning('Columns %s of status rows not in report header, '
+                        'written as extra columns' % ', '.join(extra_keys))
+            fieldnames = fieldnames + extra_keys
+        # Rows are flushed to disk as they are written to keep memory usage
+        # constant for large reports
+        status_wb = Workbook(report_path, {'constant_memory': True})
+        header_format = status_wb.add_format(
+            {'bold': True, 'border': 1, 'align': 'center', 'valign': 'top'})
+        status_ws = status_wb.add_worksheet("Status Sheet")
+        # Lock the first row of xls report.
+        status_ws.freeze_panes(1, 0)
+        status_ws.write_row(0, 0, fieldnames)
+        for row, row_data in enumerate(row_list, 1):
+            status_ws.write_row(
+                row, 0, [row_data.get(key) for key in fieldnames])
+            if progress:
+                progress()
+        pivot_ws = status_wb.add_worksheet("Pivot Sheet")
+        pivot_ws.write_row(0, 0, pivot_keys + ['len'], header_format)
+        prev_key = ()
+        for row, (key, count) in enumerate(
+                self.get_pivot_counts(row_list, pivot_keys), 1):
+            for col, value in enumerate(key):
+                # Write group value only in its first row as in merged cells
+                if key[:col + 1] != prev_key[:col + 1]:
+                    pivot_ws.write(row, col, value, header_format)
+            pivot_ws.write(row, len(key), count)
+            prev_key = key
+        status_wb.close()
+        report_base = os.path.splitext(report_path)[0]
+        if report_format and 'csv' in report_format:
+            with open(report_base + '.csv', 'wb') as csv_file:
+                writer = csv.writer(csv_file)
+                writer.writerow(fieldnames)
+                for row_data in row_list:
+                    writer.writerow([
+                        (self.get_report_value(row_data.get(key)) or
+                         '').encode('utf-8') for key in fieldnames])
+        if report_format and 'parquet' in report_format:
+            report_df = pandas.DataFrame(
+                [[self.get_report_value(row_data.get(key)) for key in
+                  fieldnames] for row_data in row_list], columns=fieldnames)
+            try:
+                report_df.to_parquet(report_base + '.parquet')
+            except ImportError:
+                LOG.warning('Parquet report skipped as pyarrow or '
+                            'fastparquet package is not installed')
+                progress.message("Parquet report skipped, install pyarrow or "
+                                 "fastparquet package to generate it")
+
     def remove_dup_key(self, obj_list):
         for obj in obj_list:
             obj.pop('dup_of', None)
@@ -125,42 +233,35 @@ class MigrationUtil(object):
                              ent_type, prefix, syslist):
         """
         Checks for duplicate objects except name and description values
+        using the fingerprint index of the object lists
         :param src_obj: Object to be checked for duplicate
         :param obj_list: List of oll objects to search in
         :return: Name of object for which given object is duplicate of
         """
         if not syslist:
             syslist = []
-        src_cp = copy.deepcopy(src_obj)
-        src_cp.pop("name")
-        src_cp.pop("description", [])
-        for obj in syslist:
-            ob_cp = copy.deepcopy(obj)
-            ob_cp.pop("name")
-            ob_cp.pop("description", [])
-            ob_cp.pop('url', [])
-            ob_cp.pop('uuid', [])
-            if cmp(src_cp, ob_cp) == 0:
-                return obj["name"], src_obj['name']
-        for tmp_obj in obj_list:
-            tmp_cp = copy.deepcopy(tmp_obj)
-            tmp_cp.pop("name")
-            tmp_cp.pop("description", [])
-            dup_lst = tmp_cp.pop("dup_of", [tmp_obj["name"]])
-            if cmp(src_cp, tmp_cp) == 0:
-                dup_lst.append(src_obj["name"])
-                tmp_obj["dup_of"] = dup_lst
-                old_name = tmp_obj['name']
-                if tmp_obj["name"] in merge_object_mapping[obj_type].keys():
-                    merge_object_mapping[obj_type]['no'] += 1
-                    no = merge_object_mapping[obj_type]['no']
-                    mid_name = ent_type and ('Merged-%s-%s-%s-%s' % (ent_type,
-                               obj_type, ran_str, str(no))) or (
-                               'Merged-%s-%s-%s' % (obj_type, ran_str, str(no)))
-                    new_name = '%s-%s' %(prefix, mid_name) if prefix else \
-                                mid_name
+        sys_obj = get_duplicate_object(syslist, src_obj)
+        if sys_obj is not None:
+            return sys_obj["name"], src_obj['name']
+        tmp_obj = get_duplicate_object(obj_list, src_obj)
+        if tmp_obj is not None:
+            dup_lst = list(tmp_obj.get("dup_of", [tmp_obj["name"]]))
+            dup_lst.append(src_obj["name"])
+            tmp_obj["dup_of"] = dup_lst
+            old_name = tmp_obj['name']
+            if tmp_obj["name"] in merge_object_mapping[obj_type]:
+                merge_object_mapping[obj_type]['no'] += 1
+                no = merge_object_mapping[obj_type]['no']
+                mid_name = ent_type and ('Merged-%s-%s-%s-%s' % (ent_type,
+                           obj_type, ran_str, str(no))) or (
+                           'Merged-%s-%s-%s' % (obj_type, ran_str, str(no)))
+                new_name = '%s-%s' %(prefix, mid_name) if prefix else \
+                            mid_name
+                if isinstance(obj_list, AviObjectList):
+                    obj_list.rename(tmp_obj, new_name)
+                else:
                     tmp_obj["name"] = new_name
-                return tmp_obj["name"], old_name
+            return tmp_obj["name"], old_name
         return None, None
 
     def upload_file(self, file_path):
@@ -177,16 +278,8 @@ class MigrationUtil(object):
         if '/Common/' in file_path:
             file_path = file_path.replace('/Common/', '')
         try:
-            with open(file_path, "r") as file_obj:
-                file_str = file_obj.read()
-                file_str = file_str.decode("utf-8")
-        except UnicodeDecodeError:
-            try:
-                file_str = file_str.decode('latin-1')
-            except:
-                update_count('error')
-                LOG.error("[UnicodeDecode] Error to read file %s" % file_path,
-                          exc_info=True)
+            # Files are read once and decoded as utf-8 or latin-1
+            file_str = cert_inventory.get(file_path).text
         except IOError:
             update_count('warning')
             LOG.warn("Error to read file %s" % file_path, exc_info=True)
@@ -248,7 +341,8 @@ class MigrationUtil(object):
     def print_progress_bar(self, iteration, total, msg, prefix='', suffix='',
                            decimals=1, length=50, fill='#'):
         """
-        Call in a loop to create terminal progress bar
+        Call in a loop to create terminal progress bar, updates are throttled
+        by the shared progress reporter
         @params:
             iteration   - Required  : current iteration (Int)
             total       - Required  : total iterations (Int)
@@ -259,14 +353,8 @@ class MigrationUtil(object):
             length      - Optional  : character length of bar (Int)
             fill        - Optional  : bar fill character (Str)
         """
-        percent = ("{0:." + str(decimals) + "f}"). \
-            format(100 * (iteration / float(total)))
-        filledLength = int(length * iteration // total)
-        bar = fill * filledLength + '-' * (length - filledLength)
-        if (iteration < total):
-            print '\r%s |%s| %s%% %s' % (prefix, bar, percent, suffix),
-        else:
-            print '\r%s |%s| %s%% %s' % (prefix, bar, percent, suffix)
+        progress.update(iteration, total, msg, prefix, suffix, decimals,
+                        length, fill)
 
     def validate_value(self, entity_names, prop_name, value, limit_data, obj,
                        valname):
@@ -462,13 +550,11 @@ class MigrationUtil(object):
                         dictval[k] = val
 
     def check_certificate_expiry(self, input_dir, cert_file_name):
-        cert_date = crypto.load_certificate(crypto.FILETYPE_PEM,
-                                       file(input_dir + os.path.sep
-                                            + cert_file_name).read())
-        expiry_date = datetime.strptime(cert_date.get_notAfter(),
-                                        "%Y%m%d%H%M%SZ")
-        present_date = datetime.now()
-        if expiry_date < present_date:
+        cert_path = input_dir + os.path.sep + cert_file_name
+        info = cert_inventory.get(cert_path)
+        if info.cert_error:
+            raise info.cert_error
+        if info.is_expired():
             LOG.warning("Certificate %s is expired creating self "
                         "signed cert." % cert_file_name)
             return False
@@ -481,97 +567,69 @@ class MigrationUtil(object):
         :param avi_config: full configuration
         :return: graph
         """
+        ref_graph = RefGraph(avi_config)
         avi_graph = nx.DiGraph()
         avi_graph.add_node('AVI', type='Tree')
+        # Objects shared by virtual services are walked only once
+        visited = set()
         for vs in avi_config['VirtualService']:
             name = vs['name']
             avi_graph.add_node(name, type='VS')
             avi_graph.add_edge('AVI', name)
-            self.find_and_add_ne(vs, avi_config, avi_graph, name, depth=0)
+            self.find_and_add_ne(vs, ref_graph, avi_graph, visited)
         return avi_graph
 
-    def find_and_add_ne(self, obj_dict, avi_config, avi_graph, vsname, depth):
+    def add_graph_node(self, avi_graph, vsname, name, node_type):
         """
-        Method to iterate in one object find references and add those to output
+        This function defines that add node with edge from its referrer,
+        type of node already present is suffixed with new type
+        :param avi_graph: avi graph
+        :param vsname: name of referrer node
+        :param name: name of node
+        :param node_type: type of node
+        :return: None
+        """
+        if avi_graph.has_node(name):
+            node_type = '{}-{}'.format(avi_graph.nodes[name]['type'],
+                                       node_type)
+        avi_graph.add_node(name, type=node_type)
+        avi_graph.add_edge(vsname, name)
+
+    def find_and_add_ne(self, obj_dict, ref_graph, avi_graph, visited=None):
+        """
+        Method to find references of one object and of the objects referred
+        by it and add those to output
         :param obj_dict: Object to be iterated over
-        :param avi_config: Full config
+        :param ref_graph: reference graph of full config
         :param avi_graph: avi graph
-        :param vsname: name of object
-        :param depth: Recursion depth to determine level in the vs reference
-                      tree
-        """
-        for key in obj_dict:
-            if (key.endswith('ref') and key not in ['cloud_ref', 'tenant_ref'])\
-                    or key == 'ssl_profile_name':
-                if not obj_dict[key]:
-                    continue
-                entity, name = get_name_and_entity(obj_dict[key])
-                self.search_ne(entity, name, avi_graph, avi_config, depth,
-                               vsname)
-            elif key.endswith('refs'):
-                for ref in obj_dict[key]:
-                    entity, name = get_name_and_entity(ref)
-                    self.search_ne(entity, name, avi_graph, avi_config, depth,
-                                   vsname)
-            elif isinstance(obj_dict[key], dict):
-                self.find_and_add_ne(obj_dict[key], avi_config, avi_graph,
-                                     vsname, depth)
-            elif obj_dict[key] and isinstance(obj_dict[key], list) \
-                    and isinstance(obj_dict[key][0], dict):
-                for member in obj_dict[key]:
-                    self.find_and_add_ne(member, avi_config, avi_graph, vsname,
-                                         depth)
-            elif key == 'hostname':
-                sername = obj_dict[key]
-                if avi_graph.has_node(sername):
-                    node_type = [n[1]['type'] for n in list(
-                                 avi_graph.nodes().data()) if n[0] == sername]
-                    node_type = '{}-{}'.format(node_type[0], 'Server')
-                    avi_graph.add_node(sername, type=node_type)
-                    avi_graph.add_edge(vsname, sername)
-                else:
-                    avi_graph.add_node(sername, type='Server')
-                    avi_graph.add_edge(vsname, sername)
-            elif key == 'name' and depth == 1 and '-rule-' in obj_dict[key]:
-                rule_name = obj_dict[key]
-                if avi_graph.has_node(rule_name):
-                    node_type = [n[1]['type'] for n in list(
-                                 avi_graph.nodes().data()) if n[0] == rule_name]
-                    node_type = '{}-{}'.format(node_type[0], 'Rule')
-                    avi_graph.add_node(rule_name, type=node_type)
-                    avi_graph.add_edge(vsname, rule_name)
-                else:
-                    avi_graph.add_node(rule_name, type='Rule')
-                    avi_graph.add_edge(vsname, rule_name)
+        :param visited: ids of objects already added to graph
+        """
+        for depth, owner, key, value, parent, found_obj in ref_graph.walk(
+                obj_dict, visited=visited):
+            if key == 'hostname':
+                self.add_graph_node(avi_graph, owner['name'], value, 'Server')
+            elif key == 'name':
+                if depth == 1 and '-rule-' in value:
+                    self.add_graph_node(avi_graph, owner['name'], value,
+                                        'Rule')
+            elif value:
+                entity, name = get_name_and_entity(value)
+                self.search_ne(entity, name, found_obj, avi_graph,
+                               owner['name'])
         return
 
-    def search_ne(self, entity, name, avi_graph, avi_config, depth, vsname):
+    def search_ne(self, entity, name, found_obj, avi_graph, vsname):
         """
-        Method to search referenced object
+        Method to add node of referenced object
         :param entity: object type
         :param name: object name
+        :param found_obj: referenced object from reference graph
         :param avi_graph: avi graph
-        :param avi_config: full config
-        :param depth: Recursion depth to determine level in the vs reference
-                      tree
-        :param vsname: name of VS
+        :param vsname: name of referrer
         """
 
-        avi_conf_key = path_key_map[entity]
-        found_obj_list = avi_config.get(avi_conf_key)
-        found_obj = [obj for obj in found_obj_list if obj['name'] == name] if \
-            found_obj_list else []
         if found_obj:
-            found_obj = found_obj[0]
-            if avi_graph.has_node(name):
-                nod_type = [node[1]['type'] for node in list(
-                            avi_graph.nodes().data()) if node[0] == name]
-                nod_type = '{}-{}'.format(nod_type[0], path_key_map[entity])
-                avi_graph.add_node(name, type=nod_type)
-                avi_graph.add_edge(vsname, name)
-            else:
-                avi_graph.add_node(name, type=path_key_map[entity])
-                avi_graph.add_edge(vsname, name)
+            self.add_graph_node(avi_graph, vsname, name, PATH_KEY_MAP[entity])
         elif entity in ['applicationprofile', 'networkprofile', 'healthmonitor',
                         'sslkeyandcertificate', 'sslprofile',
                         'applicationpersistenceprofile']:
@@ -581,10 +639,5 @@ class MigrationUtil(object):
             print 'ERROR: Reference not found for %s with name %s' % (
                 entity, name)
             exit()
-        depth += 1
-        new_name = found_obj.get('name')
-        if new_name:
-            self.find_and_add_ne(found_obj, avi_config, avi_graph, new_name,
-                                 depth)
 
 
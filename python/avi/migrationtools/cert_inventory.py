@@ -0,0 +1,301 @@
+import hashlib
+import logging
+import multiprocessing
+import os
+from collections import deque
+from datetime import datetime
+from multiprocessing.pool import ThreadPool
+from socket import gethostname
+from OpenSSL import crypto, SSL
+
+LOG = logging.getLogger(__name__)
+# Files larger than this are not read while scanning the input folder, keys
+# and certificates are a few KB while configuration files may be huge
+MAX_SCAN_SIZE = 1024 * 1024
+PEM_MARKER = '-----BEGIN '
+CERT_MARKER = '-----BEGIN CERTIFICATE-----'
+
+
+class CertInfo(object):
+    """
+    Analysis of a key or certificate file, shared by all files having the
+    same content
+    """
+
+    def __init__(self, content):
+        self.text = decode_text(content)
+        # True if file has a passphrase protected private key
+        self.key_protected = False
+        # Expiry of first certificate in file, None if there is none
+        self.not_after = None
+        # Error of loading the first certificate in file
+        self.cert_error = None
+        # Number of certificates in file, more than one for a chain
+        self.cert_count = content.count(CERT_MARKER)
+        self.key = None
+        self.cert = None
+        if PEM_MARKER not in content:
+            self.cert_error = crypto.Error('No PEM data in file')
+            return
+        self.analyse_key(content)
+        self.analyse_cert(content)
+
+    def analyse_key(self, content):
+        """
+        This function defines that load private key of file, without a
+        passphrase, to find whether it is protected
+        :param content: file content
+        :return: None
+        """
+        asked = []
+
+        def passphrase_callback(*args):
+            asked.append(True)
+            return ''
+        try:
+            self.key = crypto.load_privatekey(crypto.FILETYPE_PEM, content,
+                                              passphrase_callback)
+        except Exception:
+            self.key_protected = bool(asked)
+
+    def analyse_cert(self, content):
+        """
+        This function defines that load first certificate of file and its
+        expiry date
+        :param content: file content
+        :return: None
+        """
+        try:
+            self.cert = crypto.load_certificate(crypto.FILETYPE_PEM, content)
+            self.not_after = datetime.strptime(self.cert.get_notAfter(),
+                                               "%Y%m%d%H%M%SZ")
+        except Exception as e:
+            self.cert = None
+            self.cert_error = e
+
+    def is_expired(self):
+        """
+        This function defines that whether certificate is expired
+        :return: True if certificate expiry is before now
+        """
+        return self.not_after is not None and self.not_after < datetime.now()
+
+
+def decode_text(content):
+    """
+    This function defines that decode file content as utf-8 and on failure
+    as latin-1
+    :param content: file content
+    :return: unicode string
+    """
+    try:
+        return content.decode('utf-8')
+    except UnicodeDecodeError:
+        return content.decode('latin-1')
+
+
+class CertInventory(object):
+    """
+    Analysis of key and certificate files done in-process with pyOpenSSL.
+    Files are analysed once per content, keyed by the sha1 of the content,
+    and the input folder can be scanned up front in a thread pool so the
+    converters only look up the results. Results of a path are reused
+    while its size and modification time are same.
+    """
+
+    def __init__(self):
+        self.infos = dict()
+        self.paths = dict()
+        self.matches = dict()
+
+    def clear(self):
+        """
+        This function defines that drop the analysis of all files, called at
+        start of every conversion so files of earlier runs are not kept
+        :return: None
+        """
+        self.infos.clear()
+        self.paths.clear()
+        self.matches.clear()
+
+    def get(self, file_path):
+        """
+        This function defines that return analysis of file
+        :param file_path: path of file
+        :return: CertInfo
+        :raises IOError: if file is not readable
+        """
+        with open(file_path, 'rb') as file_obj:
+            stat = os.fstat(file_obj.fileno())
+            file_key = (stat.st_size, stat.st_mtime)
+            cached = self.paths.get(file_path)
+            if cached and cached[0] == file_key:
+                return self.infos[cached[1]]
+            content = file_obj.read()
+        digest = hashlib.sha1(content).hexdigest()
+        info = self.infos.get(digest)
+        if info is None:
+            info = CertInfo(content)
+            self.infos[digest] = info
+        self.paths[file_path] = (file_key, digest)
+        return info
+
+    def scan_file(self, file_path):
+        """
+        This function defines that analyse file while scanning input folder,
+        unreadable files are left to be reported by the converters
+        :param file_path: path of file
+        :return: None
+        """
+        try:
+            self.get(file_path)
+        except IOError:
+            LOG.debug('Skipped unreadable file %s' % file_path)
+
+    def scan(self, input_dir, workers=1):
+        """
+        This function defines that analyse all key and certificate files
+        in input folder in a thread pool
+        :param input_dir: input folder location
+        :param workers: number of threads
+        :return: None
+        """
+        if not input_dir or not os.path.isdir(input_dir):
+            return
+        file_paths = []
+        for file_name in sorted(os.listdir(input_dir)):
+            file_path = os.path.join(input_dir, file_name)
+            if os.path.isfile(file_path) and \
+                    os.path.getsize(file_path) <= MAX_SCAN_SIZE:
+                file_paths.append(file_path)
+        LOG.debug('Analysing %s files of %s' % (len(file_paths), input_dir))
+        if workers > 1 and len(file_paths) > 1:
+            pool = ThreadPool(workers)
+            try:
+                pool.map(self.scan_file, file_paths)
+            finally:
+                pool.close()
+                pool.join()
+        else:
+            for file_path in file_paths:
+                self.scan_file(file_path)
+
+    def is_key_cert_match(self, key_info, cert_info):
+        """
+        This function defines that whether private key belongs to the
+        certificate
+        :param key_info: CertInfo of key file
+        :param cert_info: CertInfo of certificate file
+        :return: True if key matches, None if key or cert is not loaded
+        """
+        if key_info.key is None or cert_info.cert is None:
+            return None
+        pair = (id(key_info), id(cert_info))
+        if pair not in self.matches:
+            context = SSL.Context(SSL.SSLv23_METHOD)
+            context.use_privatekey(key_info.key)
+            context.use_certificate(cert_info.cert)
+            try:
+                context.check_privatekey()
+                self.matches[pair] = True
+            except SSL.Error:
+                self.matches[pair] = False
+        return self.matches[pair]
+
+
+def generate_key():
+    """
+    This function defines that generate a 2048 bit RSA key
+    :return: key in PEM format
+    """
+    key = crypto.PKey()
+    key.generate_key(crypto.TYPE_RSA, 2048)
+    return crypto.dump_privatekey(crypto.FILETYPE_PEM, key)
+
+
+def sign_self_signed_cert(key_pem):
+    """
+    This function defines that create self signed certificate of key,
+    signing with an existing key is fast unlike generating the key
+    :param key_pem: key in PEM format
+    :return: certificate in PEM format
+    """
+    key = crypto.load_privatekey(crypto.FILETYPE_PEM, key_pem)
+    cert = crypto.X509()
+    cert.get_subject().C = "US"
+    cert.get_subject().O = "Avi Networks"
+    cert.get_subject().CN = gethostname()
+    cert.set_serial_number(1000)
+    cert.gmtime_adj_notBefore(0)
+    cert.gmtime_adj_notAfter(10 * 365 * 24 * 60 * 60)
+    cert.set_issuer(cert.get_subject())
+    cert.set_pubkey(key)
+    cert.sign(key, 'sha256')
+    return crypto.dump_certificate(crypto.FILETYPE_PEM, cert)
+
+
+class DummyCertProvider(object):
+    """
+    Provides self signed key and certificate for objects whose key or
+    certificate is missing, expired or passphrase protected. By default one
+    key pair is generated per run and reused by all the dummy objects. With
+    unique keys every object gets its own key, generated ahead in a pool of
+    background processes when more than one worker is configured.
+    """
+
+    def __init__(self):
+        self.unique = False
+        self.workers = 1
+        self.shared_pair = None
+        self.pool = None
+        self.pending = deque()
+
+    def configure(self, unique=False, workers=1):
+        """
+        This function defines that set the mode of the provider for a run
+        :param unique: True to generate a key for every dummy object
+        :param workers: number of processes generating keys ahead
+        :return: None
+        """
+        self.close()
+        self.unique = unique
+        self.workers = workers or 1
+        self.shared_pair = None
+
+    def get(self):
+        """
+        This function defines that return key and self signed certificate
+        :return: key and certificate in PEM format
+        """
+        if not self.unique:
+            if self.shared_pair is None:
+                key = generate_key()
+                self.shared_pair = key, sign_self_signed_cert(key)
+            return self.shared_pair
+        if self.workers > 1:
+            if self.pool is None:
+                self.pool = multiprocessing.Pool(self.workers)
+            # Keep every worker busy with next keys while one is consumed
+            while len(self.pending) < 2 * self.workers:
+                self.pending.append(self.pool.apply_async(generate_key))
+            key = self.pending.popleft().get()
+        else:
+            key = generate_key()
+        return key, sign_self_signed_cert(key)
+
+    def close(self):
+        """
+        This function defines that stop the processes generating keys
+        :return: None
+        """
+        if self.pool is not None:
+            self.pool.terminate()
+            self.pool.join()
+            self.pool = None
+        self.pending.clear()
+
+
+# Inventory shared by the converters of all object types
+cert_inventory = CertInventory()
+# Dummy key and certificate provider shared by the converters
+dummy_certs = DummyCertProvider()
@@ -25,12 +25,184 @@ import traceback
 import yaml
 import re
 import collections
+from collections import defaultdict
 from copy import deepcopy
 from avi.migrationtools.avi_migration_utils import MigrationUtil
+from avi.migrationtools.progress import progress
 
 log = logging.getLogger(__name__)
 
 
+def is_ref_key(key):
+    """
+    Returns whether the field of object holds a reference or references
+    :param key: field name
+    :return: True for reference fields
+    """
+    return key.endswith('ref') or key.endswith('_refs')
+
+
+def iter_ref_dicts(obj):
+    """
+    Returns the dicts in object and in its nested dicts and lists other than
+    the values of reference fields, walked iteratively.
+    :param obj: dict or list
+    :return: generator of dicts
+    """
+    visited = set()
+    stack = [obj]
+    while stack:
+        obj = stack.pop()
+        if isinstance(obj, dict):
+            if id(obj) in visited:
+                continue
+            visited.add(id(obj))
+            yield obj
+            values = [v for k, v in obj.iteritems() if not is_ref_key(k)]
+        elif isinstance(obj, list):
+            values = obj
+        else:
+            continue
+        stack.extend(value for value in reversed(values)
+                     if isinstance(value, (dict, list)))
+
+
+def replace_ref(obj, key, old_ref, new_ref):
+    """
+    Replaces the old reference in the reference field of object. Reference
+    lists keep their order and do not get duplicate references.
+    :param obj: dictionary having the reference field
+    :param key: reference field name
+    :param old_ref: old reference
+    :param new_ref: new reference
+    :return: True if the field had the old reference else False
+    """
+    value = obj.get(key)
+    if isinstance(value, list):
+        if old_ref not in value:
+            return False
+        new_refs = []
+        for ref in value:
+            ref = new_ref if ref == old_ref else ref
+            if ref not in new_refs:
+                new_refs.append(ref)
+        obj[key] = new_refs
+    elif value == old_ref:
+        obj[key] = new_ref
+    else:
+        return False
+    log.debug('refs changed %s to %s', old_ref, new_ref)
+    return True
+
+
+class ReferenceIndex(object):
+    """
+    Inverted index from reference string to the fields having it, built by
+    a single traversal of the configuration. A rename rewrites only the
+    fields referring to the renamed object instead of walking the full
+    configuration for every old reference form. The fields indexed are the
+    ones the full walk of update_obj_refs visits.
+    Fields are checked before rewriting, so entries made stale by patches
+    are skipped, and objects changed by a patch have to be added again.
+    """
+    def __init__(self, avi_cfg):
+        """
+        :param avi_cfg: Avi config dictionary
+        """
+        self.avi_cfg = avi_cfg
+        self.locations = defaultdict(list)
+        # ids of the objects of the configuration, their nested objects are
+        # not moved by tenant rename
+        self.top_level = set()
+        for obj_list in avi_cfg.itervalues():
+            if isinstance(obj_list, list):
+                self.top_level.update(id(obj) for obj in obj_list)
+                self.add_object(obj_list)
+
+    def add_location(self, ref, obj, key):
+        """
+        Adds reference field of object to the index
+        :param ref: reference string
+        :param obj: dictionary having the reference field
+        :param key: reference field name
+        :return: None
+        """
+        self.locations[ref].append((obj, key))
+
+    def add_object(self, obj):
+        """
+        Adds all reference fields of the object and its nested objects,
+        values of reference fields are not walked into
+        :param obj: Object dictionary or list
+        :return: None
+        """
+        for obj_dict in iter_ref_dicts(obj):
+            for k, v in obj_dict.iteritems():
+                if is_ref_key(k):
+                    refs = v if isinstance(v, list) else [v]
+                    for ref in refs:
+                        if isinstance(ref, basestring):
+                            self.add_location(ref, obj_dict, k)
+
+    def rename(self, old_ref, new_ref):
+        """
+        Updates all the fields referring to the old reference
+        :param old_ref: old reference
+        :param new_ref: new reference
+        :return: number of updated fields
+        """
+        count = 0
+        for obj, key in self.locations.pop(old_ref, []):
+            if replace_ref(obj, key, old_ref, new_ref):
+                self.add_location(new_ref, obj, key)
+                count += 1
+        return count
+
+    def rename_tenant(self, old_tenant, new_tenant):
+        """
+        Moves every object of the configuration to the new tenant and
+        renames the tenant in its reference fields. Only the fields holding
+        a tenant reference or a reference to the old tenant are visited,
+        fields of nested objects are not changed.
+        :param old_tenant: old tenant name
+        :param new_tenant: new tenant name
+        :return: None
+        """
+        tenant_ref = '/api/tenant/?name=%s' % new_tenant
+        old_param = 'tenant=%s' % old_tenant
+        new_param = 'tenant=%s' % new_tenant
+        fields = []
+        visited = set()
+        for ref in self.locations.keys():
+            if old_param not in ref and not ref.startswith('/api/tenant/'):
+                continue
+            for obj, key in self.locations[ref]:
+                if id(obj) in self.top_level and \
+                        (id(obj), key) not in visited:
+                    visited.add((id(obj), key))
+                    fields.append((obj, key))
+        for obj, key in fields:
+            value = obj.get(key)
+            if key == 'tenant_ref':
+                new_value = tenant_ref
+            elif not value:
+                continue
+            elif isinstance(value, list):
+                new_value = [ref.replace(old_param, new_param)
+                             for ref in value]
+            else:
+                new_value = value.replace(old_param, new_param)
+            if new_value == value:
+                continue
+            obj[key] = new_value
+            old_refs = value if isinstance(value, list) else [value]
+            new_refs = new_value if isinstance(new_value, list) \
+                else [new_value]
+            for ref in new_refs:
+                if ref not in old_refs:
+                    self.add_location(ref, obj, key)
+
+
 class ConfigPatch(object):
     """
     This class implements patching of configuration object that are either
@@ -44,6 +216,18 @@ class ConfigPatch(object):
         log.debug('input patch %s', patches)
         self.avi_cfg = avi_cfg
         self.patches = patches
+        self.ref_index = None
+
+    def get_ref_index(self, avi_cfg):
+        """
+        Returns reference index of the configuration, it is built only once
+        for all the patches applied to the configuration.
+        :param avi_cfg: Avi configuration dictionary
+        :return: ReferenceIndex
+        """
+        if self.ref_index is None or self.ref_index.avi_cfg is not avi_cfg:
+            self.ref_index = ReferenceIndex(avi_cfg)
+        return self.ref_index
 
     def param_value_in_ref(self, avi_ref, param_name):
         """
@@ -71,71 +255,35 @@ class ConfigPatch(object):
         object as well.
         :return: None
         """
-        if isinstance(obj, dict):
-            for k, v in obj.iteritems():
-                if k.endswith('ref') or k.endswith('_refs'):
-                    if isinstance(v, list):
-                        if old_ref in v:
-                            # need to remove and add the item.
-                            log.debug('refs changed %s to %s', old_ref, new_ref)
-                            new_refs = set(v)
-                            new_refs.pop(old_ref)
-                            new_refs.add(new_ref)
-                            obj[k] = list(new_refs)
-                    elif v == old_ref:
-                        log.debug('refs changed %s to %s', v, new_ref)
-                        obj[k] = new_ref
-                elif isinstance(v, dict):
-                    self.update_obj_refs(
-                        old_obj_type, old_ref, new_ref, v)
-                elif isinstance(v, list):
-                    for elem in v:
-                        self.update_obj_refs(
-                            old_obj_type, old_ref, new_ref, elem)
-        elif isinstance(obj, list):
-            for elem in obj:
-                self.update_references(old_ref, new_ref, elem)
-        else:
-            # ignores the object.
-            pass
+        for obj_dict in iter_ref_dicts(obj):
+            for k in obj_dict.keys():
+                if is_ref_key(k):
+                    replace_ref(obj_dict, k, old_ref, new_ref)
 
     def update_references(self, obj_type, old_ref, new_ref, avi_cfg):
         """
-        Iterates over every object type and updates the references to the
-        old reference.
+        Updates the references to the old reference in every object using
+        the reference index.
         :param obj_type: object type for the original object.
         :param old_ref: old reference of the object.
         :param new_ref: new reference of the object.
         :param avi_cfg: Full Avi configuration dictionary.
         :return: None
         """
-        for _, obj_list in avi_cfg.iteritems():
-            for obj in obj_list:
-                self.update_obj_refs(
-                    obj_type, old_ref, new_ref, obj)
+        self.get_ref_index(avi_cfg).rename(old_ref, new_ref)
 
     def update_tenant_references(self, avi_config, old_tenant, new_tenant):
-        for obj_type in avi_config.keys():
-            if obj_type == 'META':
-                avi_config[obj_type]['use_tenant'] = new_tenant
-                continue
-            for obj in avi_config[obj_type]:
-                for key in obj:
-                    if key == 'tenant_ref':
-                        obj[key] = '/api/tenant/?name=%s' % new_tenant
-                    if key.endswith('ref') and not key == 'tenant_ref':
-                        if not obj[key]:
-                            continue
-                        obj[key] = obj[key].replace(
-                            'tenant=%s' % old_tenant, 'tenant=%s' % new_tenant)
-                    elif key.endswith('refs'):
-                        new_refs = []
-                        for ref in obj[key]:
-                            new_refs.append(ref.replace(
-                                'tenant=%s' % old_tenant,
-                                'tenant=%s' % new_tenant))
-                        obj[key] = new_refs
-        return
+        """
+        Moves every object to the new tenant and updates the tenant of its
+        references using the reference index, which is kept up to date.
+        :param avi_config: Full Avi configuration dictionary.
+        :param old_tenant: old tenant name
+        :param new_tenant: new tenant name
+        :return: None
+        """
+        if 'META' in avi_config:
+            avi_config['META']['use_tenant'] = new_tenant
+        self.get_ref_index(avi_config).rename_tenant(old_tenant, new_tenant)
 
     def apply_obj_patch(self, obj_type, obj, patch_data, avi_cfg):
         """
@@ -179,6 +327,8 @@ class ConfigPatch(object):
             log.debug('patching %s:%s with patch %s',
                       obj_type, obj.get('name', ''), patch_data)
             self.deep_update(obj, patch_data['patch'])
+            # patch can add references which are not yet in the index
+            self.get_ref_index(avi_cfg).add_object(obj)
             if 'name' in obj:
                 new_obj_name = obj['name']
         if (('name' in patch_data['patch']) and old_obj_refs and
@@ -231,18 +381,15 @@ class ConfigPatch(object):
             log.warn('Could not apply patch %s: %s as no matching obj found',
                      obj_type, patch_data)
             return new_cfg
+        rexp = None
+        if 'match_name' in patch_data:
+            rexp = re.compile('^%s$' % patch_data['match_name'])
+        elif 'match_name_regex' in patch_data:
+            rexp = re.compile(patch_data['match_name_regex'])
         for obj in cfg_objs:
             obj_name = obj['name']
-            rexp = None
             list_match = False
-            regex_pattern = '.*'
-            if 'match_name' in patch_data:
-                regex_pattern = '^%s$' % patch_data['match_name']
-                rexp = re.compile(regex_pattern)
-            elif 'match_name_regex' in patch_data:
-                regex_pattern = patch_data['match_name_regex']
-                rexp = re.compile(regex_pattern)
-            elif 'match_name_in_list' in patch_data:
+            if 'match_name_in_list' in patch_data and not rexp:
                 list_match = obj_name in patch_data['match_name_in_list']
 
             if (rexp and rexp.match(obj_name)) or list_match:
@@ -263,9 +410,11 @@ class ConfigPatch(object):
         # Creating util object for calling progressbar.
         mg_util = MigrationUtil()
         new_cfg = deepcopy(self.avi_cfg)
+        # references of all objects are indexed once for all the patches
+        self.ref_index = ReferenceIndex(new_cfg)
         total_size = len(self.patches)
         progressbar_count = 0
-        print "Conversion For Patching of objects started..."
+        progress.message("Conversion For Patching of objects started...")
         for obj_type, obj_patches in self.patches.iteritems():
             progressbar_count += 1
             # for each object that is being patched need to iterate
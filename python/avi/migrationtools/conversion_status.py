@@ -0,0 +1,124 @@
+import logging
+from collections import defaultdict
+
+LOG = logging.getLogger(__name__)
+
+
+class ConversionStatusStore(list):
+    """
+    List of conversion status rows which are written to the xlsx report.
+    Every appended row is indexed by line number, object type, status and
+    object name, so the report generation looks up rows in constant time
+    instead of scanning the complete list for each config object.
+    Rows are plain dicts and can be updated in place except the status,
+    which has to be changed through set_status to keep the index correct.
+    """
+
+    def __init__(self, type_key, name_key, line_key=None, rows=None):
+        super(ConversionStatusStore, self).__init__()
+        self.type_key = type_key
+        self.name_key = name_key
+        self.line_key = line_key
+        self.reset_index()
+        if rows:
+            self.extend(rows)
+
+    def reset_index(self):
+        """
+        This function defines that create empty indexes for the rows
+        :return: None
+        """
+        self.position = dict()
+        self.line_index = defaultdict(list)
+        self.type_index = defaultdict(list)
+        self.name_index = defaultdict(list)
+        self.status_index = defaultdict(set)
+
+    def append(self, row):
+        """
+        This function defines that add the status row and index it
+        :param row: status row dict
+        :return: None
+        """
+        pos = len(self)
+        super(ConversionStatusStore, self).append(row)
+        self.position[id(row)] = pos
+        if self.line_key:
+            self.line_index[row.get(self.line_key)].append(pos)
+        self.type_index[row.get(self.type_key)].append(pos)
+        self.name_index[row.get(self.name_key)].append(pos)
+        self.status_index[row.get('Status')].add(pos)
+
+    def extend(self, rows):
+        for row in rows:
+            self.append(row)
+
+    def clear(self):
+        """
+        This function defines that remove all the rows and indexes
+        :return: None
+        """
+        del self[:]
+        self.reset_index()
+
+    def set_status(self, row, status):
+        """
+        This function defines that update status of row and status index
+        :param row: status row dict from this store
+        :param status: new conversion status
+        :return: None
+        """
+        pos = self.position[id(row)]
+        self.status_index[row.get('Status')].discard(pos)
+        row['Status'] = status
+        self.status_index[status].add(pos)
+
+    def get_by_line(self, line_no):
+        """
+        This function defines that return the rows of a config line
+        :param line_no: line number of command in input config
+        :return: list of rows in insertion order
+        """
+        return [self[pos] for pos in self.line_index.get(line_no, [])]
+
+    def count_status(self, status):
+        """
+        This function defines that return count of rows with given status
+        :param status: conversion status
+        :return: count of rows
+        """
+        return len(self.status_index.get(status, ()))
+
+    def get_rows(self, obj_types=None, statuses=None, name=None,
+                 exclude_types=None):
+        """
+        This function defines that return the rows matching all given filters
+        using the smallest index as starting point
+        :param obj_types: list of object types of row
+        :param statuses: list of conversion status of row
+        :param name: object name of row
+        :param exclude_types: list of object types to leave out
+        :return: list of rows in insertion order
+        """
+        if name is not None:
+            positions = self.name_index.get(name, [])
+        elif obj_types is not None:
+            positions = [pos for obj_type in set(obj_types)
+                         for pos in self.type_index.get(obj_type, [])]
+        elif statuses is not None:
+            positions = [pos for status in set(statuses)
+                         for pos in self.status_index.get(status, ())]
+        else:
+            positions = xrange(len(self))
+        rows = []
+        for pos in sorted(positions):
+            row = self[pos]
+            if obj_types is not None and row.get(self.type_key) not in \
+                    obj_types:
+                continue
+            if statuses is not None and row.get('Status') not in statuses:
+                continue
+            if exclude_types and row.get(self.type_key) in exclude_types:
+                continue
+            rows.append(row)
+        return rows
@@ -0,0 +1,149 @@
+import copy
+import logging
+
+LOG = logging.getLogger(__name__)
+
+
+def intern_config(config):
+    """
+    This function defines that return parsed F5 config with interned keys
+    and string values. Parser allocates a new string for every key and value
+    token, with interning the same property name or value repeated over
+    thousands of objects is kept in memory once, and pickled once by the
+    parse cache. Parser interns the tokens of every match as it is parsed.
+    :param config: tokens of parser, parsed F5 config dict or nested value
+    of them
+    :return: config of same structure and values
+    """
+    if isinstance(config, dict):
+        return dict((intern_value(key), intern_config(value))
+                    for key, value in config.iteritems())
+    elif isinstance(config, list):
+        return [intern_config(value) for value in config]
+    return intern_value(config)
+
+
+def intern_value(value):
+    """
+    This function defines that return interned string for byte strings,
+    other values are returned as they are
+    :param value: key or value of parsed config
+    :return: interned value
+    """
+    if type(value) == str:
+        return intern(value)
+    return value
+
+
+class CopyOnWriteDict(dict):
+    """
+    Copy of an F5 object sharing its nested dicts and lists with the source
+    object. A nested value is deep copied only when it is read through this
+    dict, so changes made through it never reach the source, and values
+    which are never read are never copied. Used in place of deepcopy of
+    parent objects while resolving defaults-from inheritance.
+    CPython copies a dict argument of dict(), dict.update() and ** through
+    its own fast path, which skips the accessors of this class. dict(merged)
+    or other.update(merged) therefore returns the nested values still shared
+    with the parent, use merged.copy() or copy.deepcopy(merged) for a copy
+    whose nested values can be changed.
+    """
+
+    def __init__(self, source):
+        super(CopyOnWriteDict, self).__init__(source)
+        # Keys whose values are still shared with the source
+        self.shared = set(key for key, value in dict.iteritems(self)
+                          if isinstance(value, (dict, list)))
+
+    def own(self, key):
+        """
+        This function defines that replace the shared value of key with a
+        private copy
+        :param key: key of value
+        :return: None
+        """
+        if key in self.shared:
+            self.shared.discard(key)
+            dict.__setitem__(self, key,
+                             copy.deepcopy(dict.__getitem__(self, key)))
+
+    def own_all(self):
+        """
+        This function defines that replace all shared values with private
+        copies
+        :return: None
+        """
+        for key in list(self.shared):
+            self.own(key)
+
+    def __getitem__(self, key):
+        self.own(key)
+        return dict.__getitem__(self, key)
+
+    def __setitem__(self, key, value):
+        self.shared.discard(key)
+        dict.__setitem__(self, key, value)
+
+    def __delitem__(self, key):
+        self.shared.discard(key)
+        dict.__delitem__(self, key)
+
+    def __reduce__(self):
+        self.own_all()
+        return self.__class__, (dict(self),)
+
+    def get(self, key, default=None):
+        self.own(key)
+        return dict.get(self, key, default)
+
+    def setdefault(self, key, default=None):
+        self.own(key)
+        return dict.setdefault(self, key, default)
+
+    def pop(self, key, *default):
+        self.own(key)
+        return dict.pop(self, key, *default)
+
+    def popitem(self):
+        self.own_all()
+        return dict.popitem(self)
+
+    def update(self, *args, **kwargs):
+        new_values = dict(*args, **kwargs)
+        self.shared.difference_update(new_values)
+        dict.update(self, new_values)
+
+    def copy(self):
+        self.own_all()
+        return dict.copy(self)
+
+    def items(self):
+        self.own_all()
+        return dict.items(self)
+
+    def iteritems(self):
+        self.own_all()
+        return dict.iteritems(self)
+
+    def values(self):
+        self.own_all()
+        return dict.values(self)
+
+    def itervalues(self):
+        self.own_all()
+        return dict.itervalues(self)
+
+
+def merge_with_parent(parent, child):
+    """
+    This function defines that return object having attributes of parent
+    object overridden by the attributes of child object, parent object is
+    not changed. Merged object is a CopyOnWriteDict, see it for copying the
+    merged object.
+    :param parent: parent F5 object resolved with its own parents
+    :param child: F5 object referring parent in defaults-from
+    :return: merged object
+    """
+    merged = CopyOnWriteDict(parent)
+    merged.update(child)
+    return merged
@@ -1,19 +1,21 @@
 import copy
 import logging
 import os
-import pandas
 import ast
 import re
 import random
 import avi.migrationtools.f5_converter.converter_constants as conv_const
 
-from xlsxwriter import Workbook
-from openpyxl import load_workbook
 from pkg_resources import parse_version
 from avi.migrationtools.avi_migration_utils import MigrationUtil, tenants
+from avi.migrationtools.conversion_status import ConversionStatusStore
+from avi.migrationtools.avi_config import get_objects_by_name, \
+    get_objects_by_keys, get_vip_keys, get_vip_port_keys, \
+    get_pool_ref_keys, get_pool_group_ref_keys
+from avi.migrationtools.progress import progress
 
 LOG = logging.getLogger(__name__)
-csv_writer_dict_list = []
+csv_writer_dict_list = ConversionStatusStore('F5 type', 'F5 ID')
 
 # Added variable for checking progress and get overall object.
 ppcount = 0
@@ -22,6 +24,11 @@ global fully_migrated
 fully_migrated = 0
 used_pool_groups = {}
 used_pool = {}
+# Parsed 'Avi Object' of csv rows and name indexes of csv row lists used
+# while adding the skipped settings per VS, reset for every report.
+csv_avi_objects = {}
+csv_object_lists = {}
+csv_object_indexes = {}
 
 class F5Util(MigrationUtil):
 
@@ -149,15 +156,14 @@ class F5Util(MigrationUtil):
         csv_writer_dict_list.append(row)
 
     def add_complete_conv_status(self, output_dir, avi_config, report_name,
-                                 vs_level_status):
+                                 vs_level_status, report_format=None):
 
         global csv_writer_dict_list
         global ptotal_count
         for status in conv_const.STATUS_LIST:
-            status_list = [row for row in csv_writer_dict_list if
-                           row['Status'] == status]
-            print '%s: %s' % (status, len(status_list))
-        print "Writing Excel Sheet For Converted Configuration..."
+            progress.message('%s: %s' % (
+                status, csv_writer_dict_list.count_status(status)))
+        progress.message("Writing Excel Sheet For Converted Configuration...")
         ptotal_count = ptotal_count + len(csv_writer_dict_list)
         if vs_level_status:
             self.vs_per_skipped_setting_for_references(avi_config)
@@ -166,7 +172,7 @@ class F5Util(MigrationUtil):
             # Update the complexity level of VS as Basic or Advanced
             self.vs_complexity_level()
         self.write_status_report_and_pivot_table_in_xlsx(
-            output_dir, report_name, vs_level_status)
+            output_dir, report_name, vs_level_status, report_format)
 
     def get_port_by_protocol(self, protocol):
         """
@@ -557,17 +563,6 @@ class F5Util(MigrationUtil):
             ip_addr = ".".join(map(str, (
                 random.randint(0, 255) for _ in range(4))))
         port = parts[1] if len(parts) == 2 else conv_const.DEFAULT_PORT
-        # Get the list of vs which shared the same vip
-        if parse_version(controller_version) >= parse_version('17.1'):
-            vs_dup_ips = \
-                [vs for vs in avi_config['VirtualService'] if
-                 vs['vip'][0]['ip_address']['addr'] ==
-                 ip_addr]
-        else:
-            vs_dup_ips = \
-                [vs for vs in avi_config['VirtualService'] if
-                 vs['ip_address']['addr'] == ip_addr]
-
         if port == 'any':
             port = '0'
         if isinstance(port, str) and (not port.isdigit()):
@@ -577,6 +572,10 @@ class F5Util(MigrationUtil):
             LOG.debug("Skipped:Port not supported %s" % str(parts[1]))
             return None, None, None, None
         if int(port) > 0:
+            # Only vs on same vip with same port or a port range can overlap
+            vs_dup_ips = get_objects_by_keys(
+                avi_config['VirtualService'], get_vip_port_keys,
+                [(ip_addr, int(port)), (ip_addr, None)])
             for vs in vs_dup_ips:
                 service_updated = self.update_service(port, vs, enable_ssl)
                 if service_updated == 'duplicate_ip_port':
@@ -586,6 +585,9 @@ class F5Util(MigrationUtil):
                     break
             services_obj = [{'port': port, 'enable_ssl': enable_ssl}]
         else:
+            # Get the list of vs which shared the same vip
+            vs_dup_ips = get_objects_by_keys(avi_config['VirtualService'],
+                                             get_vip_keys, [ip_addr])
             if {service.get('port_range_end') for vs in vs_dup_ips for
                service in vs['services']}:
                 LOG.debug('Skipped: Duplicate IP-Port for vs %s', vs_name)
@@ -654,10 +656,9 @@ class F5Util(MigrationUtil):
         :return: new pool object
         """
         new_pool = None
-        for pool in avi_pool_list:
-            if pool["name"] == pool_name:
-                new_pool = copy.deepcopy(pool)
-                break
+        pools = get_objects_by_name(avi_pool_list, pool_name)
+        if pools:
+            new_pool = copy.deepcopy(pools[0])
         if new_pool:
             if pool_name in used_pool:
                 used_pool[pool_name] += 1
@@ -678,13 +679,15 @@ class F5Util(MigrationUtil):
             return pool_ref
 
     def remove_https_mon_from_pool(self, avi_config, pool_ref, tenant, sysdict):
-        pool = [p for p in avi_config['Pool'] if p['name'] == pool_ref]
+        pool = get_objects_by_name(avi_config['Pool'], pool_ref)
         if pool:
             hm_refs = pool[0].get('health_monitor_refs', [])
             for hm_ref in hm_refs:
-                hm = [h for h in (sysdict['HealthMonitor'] + avi_config[
-                    'HealthMonitor']) if
-                      self.get_object_ref(
+                hm_name = self.get_name(hm_ref)
+                hm = [h for h in (
+                    get_objects_by_name(sysdict['HealthMonitor'], hm_name) +
+                    get_objects_by_name(avi_config['HealthMonitor'], hm_name))
+                      if self.get_object_ref(
                           h['name'], 'healthmonitor', tenant=tenant) == hm_ref]
                 if hm and hm[0]['type'] == 'HEALTH_MONITOR_HTTPS':
                     pool[0]['health_monitor_refs'].remove(hm_ref)
@@ -695,13 +698,15 @@ class F5Util(MigrationUtil):
                         % (hm_ref, pool_ref))
 
     def remove_http_mon_from_pool(self, avi_config, pool_ref, tenant, sysdict):
-        pool = [p for p in avi_config['Pool'] if p['name'] == pool_ref]
+        pool = get_objects_by_name(avi_config['Pool'], pool_ref)
         if pool:
             hm_refs = pool[0].get('health_monitor_refs', [])
             for hm_ref in hm_refs:
-                hm = [h for h in (sysdict['HealthMonitor'] + avi_config[
-                    'HealthMonitor']) if
-                      self.get_object_ref(
+                hm_name = self.get_name(hm_ref)
+                hm = [h for h in (
+                    get_objects_by_name(sysdict['HealthMonitor'], hm_name) +
+                    get_objects_by_name(avi_config['HealthMonitor'], hm_name))
+                      if self.get_object_ref(
                           h['name'], 'healthmonitor', tenant=tenant) == hm_ref]
 
                 if hm and hm[0]['type'] == 'HEALTH_MONITOR_HTTP':
@@ -713,8 +718,11 @@ class F5Util(MigrationUtil):
 
     def remove_https_mon_from_pool_group(self, avi_config, poolgroup_ref,
                                          tenant, sysdict):
-        poolgroup = [p for p in avi_config['PoolGroup'] if self.get_object_ref(
-            p['name'], 'poolgroup', tenant=tenant) == poolgroup_ref]
+        poolgroup = [p for p in get_objects_by_name(
+            avi_config['PoolGroup'], self.get_name(poolgroup_ref))
+                     if self.get_object_ref(
+                         p['name'], 'poolgroup', tenant=tenant) ==
+                     poolgroup_ref]
         if poolgroup:
             pool_members = [p['pool_ref'] for p in poolgroup[0]['members']]
             for pool_ref in pool_members:
@@ -724,8 +732,11 @@ class F5Util(MigrationUtil):
 
     def remove_http_mon_from_pool_group(self, avi_config, poolgroup_ref, tenant,
                                         sysdict):
-        poolgroup = [p for p in avi_config['PoolGroup'] if self.get_object_ref(
-            p['name'], 'poolgroup', tenant=tenant) == poolgroup_ref]
+        poolgroup = [p for p in get_objects_by_name(
+            avi_config['PoolGroup'], self.get_name(poolgroup_ref))
+                     if self.get_object_ref(
+                         p['name'], 'poolgroup', tenant=tenant) ==
+                     poolgroup_ref]
         if poolgroup:
             pool_members = [p['pool_ref'] for p in poolgroup[0]['members']]
             for pool_ref in pool_members:
@@ -743,15 +754,14 @@ class F5Util(MigrationUtil):
         :param pool_ssl_profiles: ssl profiles to be added to pool
         :param tenant: tenant name
         """
-        for pool in avi_pool_list:
-            if pool_ref == pool["name"]:
-                if pool_ssl_profiles["profile"]:
-                    pool["ssl_profile_ref"] = pool_ssl_profiles["profile"]
-                if pool_ssl_profiles["pki"]:
-                    pool["pki_profile_ref"] = pool_ssl_profiles["pki"]
-                if pool_ssl_profiles["cert"]:
-                    pool["ssl_key_and_certificate_ref"] = pool_ssl_profiles[
-                        "cert"]
+        for pool in get_objects_by_name(avi_pool_list, pool_ref):
+            if pool_ssl_profiles["profile"]:
+                pool["ssl_profile_ref"] = pool_ssl_profiles["profile"]
+            if pool_ssl_profiles["pki"]:
+                pool["pki_profile_ref"] = pool_ssl_profiles["pki"]
+            if pool_ssl_profiles["cert"]:
+                pool["ssl_key_and_certificate_ref"] = pool_ssl_profiles[
+                    "cert"]
 
     def add_ssl_to_pool_group(self, avi_config, pool_group_ref, ssl_pool,
                               tenant_ref):
@@ -763,8 +773,8 @@ class F5Util(MigrationUtil):
         :param tenant_ref:
         :return:
         """
-        pool_group = [obj for obj in avi_config['PoolGroup']
-                      if obj['name'] == pool_group_ref]
+        pool_group = get_objects_by_name(avi_config['PoolGroup'],
+                                         pool_group_ref)
         if pool_group:
             pool_group = pool_group[0]
             for member in pool_group['members']:
@@ -792,7 +802,7 @@ class F5Util(MigrationUtil):
         """
         pool_updated = True
         persist_type = None
-        pool_obj = [pool for pool in avi_pool_list if pool["name"] == pool_ref]
+        pool_obj = get_objects_by_name(avi_pool_list, pool_ref)
         if not pool_obj:
             LOG.error("Pool %s not found to add profile %s" %
                       (pool_ref, persist_profile))
@@ -837,8 +847,7 @@ class F5Util(MigrationUtil):
             app_prof_type):
         pool_group_updated = True
         persist_type = None
-        pool_group = [obj for obj in avi_config['PoolGroup']
-                      if obj['name'] == pool_ref]
+        pool_group = get_objects_by_name(avi_config['PoolGroup'], pool_ref)
         if pool_group:
             pool_group = pool_group[0]
             for member in pool_group['members']:
@@ -858,7 +867,7 @@ class F5Util(MigrationUtil):
         :param avi_pool_list: List of all converted pools
         :param pool_ref: Name of the pool for which config is to be added
         """
-        pool_obj = [pool for pool in avi_pool_list if pool["name"] == pool_ref]
+        pool_obj = get_objects_by_name(avi_pool_list, pool_ref)
         if pool_obj:
             pool_obj = pool_obj[0]
             fail_action = {
@@ -1028,15 +1037,15 @@ class F5Util(MigrationUtil):
     def update_pool_for_service_port(self, pool_list, pool_name, hm_list,
                                      sys_hm_list):
         rem_hm = []
-        pool = [obj for obj in pool_list if obj['name'] == pool_name]
+        pool = get_objects_by_name(pool_list, pool_name)
         if pool:
             pool[0]['use_service_port'] = True
             # Checking monitor ports if use_service_port is true
             if pool[0].get('health_monitor_refs'):
                 for hm in pool[0]['health_monitor_refs']:
                     hm_name = self.get_name(hm)
-                    hm_ob = [ob for ob in (hm_list + sys_hm_list) if
-                             ob['name'] == hm_name]
+                    hm_ob = (get_objects_by_name(hm_list, hm_name) +
+                             get_objects_by_name(sys_hm_list, hm_name))
                     if hm_ob and (not hm_ob[0].get('monitor_port')):
                         rem_hm.append(hm)
                         LOG.debug("Removing monitor reference of %s from pool"
@@ -1049,8 +1058,8 @@ class F5Util(MigrationUtil):
                         ['health_monitor_refs'] if h_monitor not in rem_hm]
 
                     rem_hm = [self.get_name(hmonitor) for hmonitor in rem_hm]
-                    csv_row = [cl for cl in csv_writer_dict_list if cl[
-                               'F5 type'] == 'pool' and self.get_tenant_ref(
+                    csv_row = [cl for cl in csv_writer_dict_list.get_rows(
+                               obj_types=['pool']) if self.get_tenant_ref(
                         cl['F5 ID'])[1] == pool_name]
                     if csv_row:
                         if csv_row[0]['Skipped settings'] in ('[]', ''):
@@ -1069,7 +1078,8 @@ class F5Util(MigrationUtil):
                             else:
                                 init_val.append({'monitor': rem_hm})
                                 csv_row[0]['Skipped settings'] = str(init_val)
-                        csv_row[0]['Status'] = conv_const.STATUS_PARTIAL
+                        csv_writer_dict_list.set_status(
+                            csv_row[0], conv_const.STATUS_PARTIAL)
                         csv_row[0]['Avi Object'] = str({'pools': pool})
 
     def rreplace(self, s, old, new, occurrence):
@@ -1106,44 +1116,37 @@ class F5Util(MigrationUtil):
             ref = prefix + '-' + ref
         # Search the pool or pool group with name in avi config for the same
         # tenant as VS
-        pool_obj = [pool for pool in avi_config['Pool'] if pool['name'] == ref
-                    and pool['tenant_ref'] == self.get_object_ref(tenant,
-                    'tenant')]
+        pool_obj = get_objects_by_name(
+            avi_config['Pool'], ref,
+            tenant_ref=self.get_object_ref(tenant, 'tenant'))
         pool_per_ref = pool_obj[0].get(
             'application_persistence_profile_ref') if pool_obj else None
         pool_per_name = self.get_name(pool_per_ref) if pool_per_ref else None
-        pool_per_types = [obj['persistence_type'] for obj in (avi_config[
-                          'ApplicationPersistenceProfile'] + sysdict[
-                          'ApplicationPersistenceProfile']) if obj['name'] ==
-                          pool_per_name] if pool_per_name else []
+        pool_per_types = [obj['persistence_type'] for obj in (
+                          get_objects_by_name(avi_config[
+                              'ApplicationPersistenceProfile'],
+                              pool_per_name) + get_objects_by_name(sysdict[
+                              'ApplicationPersistenceProfile'],
+                              pool_per_name))] if pool_per_name else []
         pool_per_type = pool_per_types[0] if pool_per_types else None
         if not pool_obj:
-            pool_group_obj = [pool for pool in avi_config['PoolGroup']
-                              if pool['name'] == ref and
-                              pool['tenant_ref'] == self.get_object_ref(
-                    tenant, 'tenant')]
+            pool_group_obj = get_objects_by_name(
+                avi_config['PoolGroup'], ref,
+                tenant_ref=self.get_object_ref(tenant, 'tenant'))
         if pool_group_obj:
             is_pool_group = True
-        if p_tenant:
-            shared_vs = [obj for obj in avi_config['VirtualService']
-                         if obj.get("pool_ref", "") == self.get_object_ref(
-                    ref, 'pool', tenant=p_tenant, cloud_name=cloud_name)]
-            if not shared_vs:
-                shared_vs = [obj for obj in avi_config['VirtualService']
-                             if obj.get("pool_group_ref", "") ==
-                             self.get_object_ref(
-                                 ref, 'poolgroup', tenant=p_tenant,
-                                 cloud_name=cloud_name)]
-        else:
-            shared_vs = [obj for obj in avi_config['VirtualService']
-                         if obj.get("pool_ref", "") == self.get_object_ref(
-                    ref, 'pool', tenant=tenant, cloud_name=cloud_name)]
-            if not shared_vs:
-                shared_vs = [obj for obj in avi_config['VirtualService']
-                             if obj.get("pool_group_ref", "") ==
-                             self.get_object_ref(
-                                 ref, 'poolgroup', tenant=tenant,
-                                 cloud_name=cloud_name)]
+        # Look up VS referring the pool or pool group through the index
+        # as this is done for every VS
+        vs_tenant = p_tenant if p_tenant else tenant
+        shared_vs = get_objects_by_keys(
+            avi_config['VirtualService'], get_pool_ref_keys,
+            [self.get_object_ref(ref, 'pool', tenant=vs_tenant,
+                                 cloud_name=cloud_name)])
+        if not shared_vs:
+            shared_vs = get_objects_by_keys(
+                avi_config['VirtualService'], get_pool_group_ref_keys,
+                [self.get_object_ref(ref, 'poolgroup', tenant=vs_tenant,
+                                     cloud_name=cloud_name)])
         if not tenant == p_tenant:
             if is_pool_group:
                 ref = self.clone_pool_group(ref, vs_name, avi_config, True,
@@ -1160,18 +1163,20 @@ class F5Util(MigrationUtil):
                 shared_apptype = None
                 if shared_appref:
                     shared_appname = self.get_name(shared_appref)
-                    shared_appobjs = [ob for ob in (avi_config[
-                                      'ApplicationProfile'] + sysdict[
-                                      'ApplicationProfile']) if ob['name'] ==
-                                      shared_appname]
+                    shared_appobjs = (
+                        get_objects_by_name(avi_config['ApplicationProfile'],
+                                            shared_appname) +
+                        get_objects_by_name(sysdict['ApplicationProfile'],
+                                            shared_appname))
                     shared_appobj = shared_appobjs[0] if shared_appobjs else {}
                     shared_apptype = shared_appobj['type'] if shared_appobj \
                         else None
                 app_prof_name = self.get_name(app_prof_ref)
-                app_prof_objs = [appob for appob in (avi_config[
-                                 'ApplicationProfile'] + sysdict[
-                                 'ApplicationProfile']) if appob['name'] ==
-                                 app_prof_name]
+                app_prof_objs = (
+                    get_objects_by_name(avi_config['ApplicationProfile'],
+                                        app_prof_name) +
+                    get_objects_by_name(sysdict['ApplicationProfile'],
+                                        app_prof_name))
                 app_prof_obj = app_prof_objs[0] if app_prof_objs else {}
                 app_prof_type = app_prof_obj['type'] if app_prof_obj else None
                 if self.is_pool_clone_criteria(
@@ -1219,10 +1224,10 @@ class F5Util(MigrationUtil):
         """
         pg_ref = None
         new_pool_group = None
-        for pool_group in avi_config['PoolGroup']:
-            if pool_group["name"] == pool_group_name:
-                new_pool_group = copy.deepcopy(pool_group)
-                break
+        pool_groups = get_objects_by_name(avi_config['PoolGroup'],
+                                          pool_group_name)
+        if pool_groups:
+            new_pool_group = copy.deepcopy(pool_groups[0])
         if new_pool_group:
             if pool_group_name in used_pool_groups:
                 used_pool_groups[pool_group_name] += 1
@@ -1252,17 +1257,17 @@ class F5Util(MigrationUtil):
                 })
 
     def write_status_report_and_pivot_table_in_xlsx(
-            self, output_dir, report_name, vs_level_status):
+            self, output_dir, report_name, vs_level_status,
+            report_format=None):
         """
         This function defines that add status sheet and pivot table sheet in
         xlsx format
         :param output_dir: Path of output directory
         :param report_name: filename to write report
         :param vs_level_status: Flag to include VS wise detailed status or not
+        :param report_format: List of additional report formats
         :return: None
         """
-        global ppcount
-        global ptotal_count
         # List of fieldnames for headers
         if vs_level_status:
             fieldnames = ['F5 type', 'F5 SubType', 'F5 ID', 'Status',
@@ -1278,45 +1283,20 @@ class F5Util(MigrationUtil):
                           'User Ignored', 'Skipped for defaults',
                           'Complexity Level', 'Avi Object']
 
-        # xlsx workbook
         report_path = output_dir + os.path.sep + "%s-ConversionStatus.xlsx" % \
                                                  report_name
-        status_wb = Workbook(report_path)
-        # xlsx worksheet
-        status_ws = status_wb.add_worksheet("Status Sheet")
-        # Lock the first row of xls report.
-        status_ws.freeze_panes(1, 0)
-        first_row = 0
-        for header in fieldnames:
-            col = fieldnames.index(header)
-            status_ws.write(first_row, col, header)
-        row = 1
-        for row_data in csv_writer_dict_list:
+
+        def update_progress():
+            global ppcount
             ppcount += 1
-            for _key, _value in row_data.items():
-                col = fieldnames.index(_key)
-                status_ws.write(row, col, _value)
             # Added call for progress function.
             msg = "excel sheet conversion started..."
             self.print_progress_bar(ppcount, ptotal_count, msg,
                                     prefix='Progress', suffix='')
-            row += 1
-        status_wb.close()
-        # create dataframe for row list
-        df = pandas.DataFrame(csv_writer_dict_list, columns=fieldnames)
-        # create pivot table using pandas
-        pivot_table = \
-            pandas.pivot_table(df, index=["Status", "F5 type", "F5 SubType"],
-                               values=[], aggfunc=[len], fill_value=0)
-        # create dataframe for pivot table using pandas
-        pivot_df = pandas.DataFrame(pivot_table)
-        master_book = \
-            load_workbook(report_path)
-        master_writer = pandas.ExcelWriter(report_path, engine='openpyxl')
-        master_writer.book = master_book
-        # Add pivot table in Pivot sheet
-        pivot_df.to_excel(master_writer, 'Pivot Sheet')
-        master_writer.save()
+        self.write_status_report(
+            report_path, fieldnames, csv_writer_dict_list,
+            ['Status', 'F5 type', 'F5 SubType'], report_format,
+            update_progress)
 
     def format_string_to_json(self, avi_string):
         """
@@ -1330,19 +1310,82 @@ class F5Util(MigrationUtil):
 
     def get_csv_object_list(self, csv_writer_dict_list, command_list):
         """
-        This method is used for getting csv object
+        This method is used for getting csv object. The list is reused until
+        clear_csv_object_cache is called, so its rows are parsed only once.
         :param csv_writer_dict_list: CSV row of object from xlsx report
         :param command_list: List of netscaler commands
         :return: List of CSV rows
         """
 
-        csv_object = [row for row in csv_writer_dict_list if
-                      row['Status'] in [conv_const.STATUS_PARTIAL,
-                                        conv_const.STATUS_SUCCESSFUL] and
-                      '->' not in row['Avi Object'] and
-                      row['F5 type'] in command_list]
+        key = (id(csv_writer_dict_list), tuple(command_list))
+        if key in csv_object_lists:
+            return csv_object_lists[key]
+        csv_object = [row for row in csv_writer_dict_list.get_rows(
+                      obj_types=command_list,
+                      statuses=[conv_const.STATUS_PARTIAL,
+                                conv_const.STATUS_SUCCESSFUL])
+                      if '->' not in row['Avi Object']]
+        csv_object_lists[key] = csv_object
         return csv_object
 
+    def get_csv_avi_objects(self, csv_object):
+        """
+        This function defines that return the avi objects of csv row. The
+        'Avi Object' string of a row is parsed only once per report.
+        :param csv_object: CSV row of object from xlsx report
+        :return: parsed avi object of row
+        """
+
+        cached = csv_avi_objects.get(id(csv_object))
+        if cached is None or cached[0] is not csv_object:
+            cached = (csv_object,
+                      self.format_string_to_json(csv_object['Avi Object']))
+            csv_avi_objects[id(csv_object)] = cached
+        return cached[1]
+
+    def get_csv_object_index(self, csv_objects, field_key=None):
+        """
+        This function defines that return index of avi object name to the
+        first csv row having that object. Index is built once per csv row
+        list and field key.
+        :param csv_objects: CSV row of object from xlsx report
+        :param field_key: Key from avi json which is specific for object type
+        :return: dict of avi object name to csv row
+        """
+
+        key = (id(csv_objects), field_key)
+        cached = csv_object_indexes.get(key)
+        if cached is not None and cached[0] is csv_objects:
+            return cached[1]
+        index = {}
+        for csv_object in csv_objects:
+            avi_objects = self.get_csv_avi_objects(csv_object)
+            if field_key == 'pools':
+                # Pool rows have the pools in 'pools' of avi object dict
+                names = [pool['name'] for pool in avi_objects['pools']] if \
+                    isinstance(avi_objects, dict) and 'pools' in avi_objects \
+                    else []
+            else:
+                if isinstance(avi_objects, dict):
+                    avi_objects = [avi_objects]
+                if not avi_objects:
+                    avi_objects = []
+                names = []
+                for avi_object_json in avi_objects:
+                    if not isinstance(avi_object_json, dict):
+                        continue
+                    if field_key:
+                        field = avi_object_json.get(field_key)
+                        if isinstance(field, dict) and \
+                                'Duplicate' not in field:
+                            names.append(field.get('name'))
+                    elif avi_object_json.get('name'):
+                        names.append(avi_object_json['name'])
+            for name in names:
+                index.setdefault(name, csv_object)
+        csv_object_indexes[key] = (csv_objects, index)
+        return index
+
     def get_and_update_csv_row(self, csv_object, vs_ref):
         """
         This function defines that update csv row.
@@ -1373,27 +1416,10 @@ class F5Util(MigrationUtil):
         :return: Return skipped attribute list
         """
 
-        for csv_object in csv_objects:
-            avi_objects = self.format_string_to_json(csv_object['Avi Object'])
-            if isinstance(avi_objects, dict):
-                avi_objects = [avi_objects]
-            if not avi_objects:
-                avi_objects = []
-            for avi_object_json in avi_objects:
-                object_found = False
-                if field_key:
-                    if field_key in avi_object_json and 'Duplicate' not in \
-                            avi_object_json[field_key] and (
-                            avi_object_json[field_key]['name'] ==
-                            name_of_object):
-                        object_found = True
-                else:
-                    if avi_object_json.get('name') and \
-                                    avi_object_json['name'] == name_of_object:
-                        object_found = True
-
-                if object_found:
-                    return self.get_and_update_csv_row(csv_object, vs_ref)
+        csv_object = self.get_csv_object_index(
+            csv_objects, field_key).get(name_of_object)
+        if csv_object:
+            return self.get_and_update_csv_row(csv_object, vs_ref)
 
     def get_ssl_profile_skipped(self, profile_csv_list, ssl_profile_ref,
                                 vs_ref):
@@ -1483,13 +1509,10 @@ class F5Util(MigrationUtil):
         :return: Skipped list of csv row
         """
 
-        for csv_object in csv_objects:
-            avi_object = self.format_string_to_json(csv_object['Avi Object'])
-            if 'pools' in avi_object:
-                pool_object = [pool for pool in avi_object['pools']
-                               if pool['name'] == pool_name]
-                if pool_object:
-                    return self.get_and_update_csv_row(csv_object, vs_ref)
+        csv_object = self.get_csv_object_index(
+            csv_objects, field_key='pools').get(pool_name)
+        if csv_object:
+            return self.get_and_update_csv_row(csv_object, vs_ref)
 
     def get_pool_skipped_list(self, avi_config, pool_group_name, csv_pool_rows,
                               csv_writer_dict_list, vs_ref, profile_csv_list):
@@ -1504,10 +1527,8 @@ class F5Util(MigrationUtil):
         :return:
         """
 
-        pool_group_objects = [pool_group_object for pool_group_object in
-                              avi_config['PoolGroup'] if
-                              pool_group_object['name']
-                              == pool_group_name]
+        pool_group_objects = get_objects_by_name(avi_config['PoolGroup'],
+                                                 pool_group_name)
         pool_members = pool_group_objects[0]['members']
         skipped_setting = {
             'pools': []
@@ -1526,10 +1547,9 @@ class F5Util(MigrationUtil):
         :return:
         """
         # Get the VS object list which is having status successful and partial.
-        vs_csv_objects = [row for row in csv_writer_dict_list
-                          if row['Status'] in [conv_const.STATUS_PARTIAL,
-                                               conv_const.STATUS_SUCCESSFUL]
-                          and row['F5 type'] == 'virtual']
+        vs_csv_objects = csv_writer_dict_list.get_rows(
+            obj_types=['virtual'], statuses=[conv_const.STATUS_PARTIAL,
+                                             conv_const.STATUS_SUCCESSFUL])
         for vs_csv_object in vs_csv_objects:
             virtual_service = self.format_string_to_json(
                 vs_csv_object['Avi Object'])
@@ -1548,11 +1568,11 @@ class F5Util(MigrationUtil):
         global ptotal_count
         global ppcount
         fully_migrated = 0
+        self.clear_csv_object_cache()
         # Get the VS object list which is having status successful and partial.
-        vs_csv_objects = [row for row in csv_writer_dict_list
-                          if row['Status'] in [conv_const.STATUS_PARTIAL,
-                                               conv_const.STATUS_SUCCESSFUL]
-                          and row['F5 type'] == 'virtual']
+        vs_csv_objects = csv_writer_dict_list.get_rows(
+            obj_types=['virtual'], statuses=[conv_const.STATUS_PARTIAL,
+                                             conv_const.STATUS_SUCCESSFUL])
         # Get the list of csv rows which has profile as F5 Type
         profile_csv_list = self.get_csv_object_list(
             csv_writer_dict_list, ['profile'])
@@ -1633,15 +1653,15 @@ class F5Util(MigrationUtil):
                     # Get the http policy name
                     pool_csv_rows = \
                         self.get_csv_object_list(csv_writer_dict_list, ['pool'])
-                    for each_http_policy in avi_config['HTTPPolicySet']:
-                        if each_http_policy['name'] == policy_set_name:
-                            for http_req in each_http_policy[
-                              'http_request_policy']['rules']:
-                                if http_req.get('switching_action', {}):
-                                    self.get_skip_pools_policy(
-                                        policy_set_name, http_req,
-                                        avi_config, pool_csv_rows, vs_ref,
-                                        profile_csv_list, skipped_setting)
+                    for each_http_policy in get_objects_by_name(
+                            avi_config['HTTPPolicySet'], policy_set_name):
+                        for http_req in each_http_policy[
+                          'http_request_policy']['rules']:
+                            if http_req.get('switching_action', {}):
+                                self.get_skip_pools_policy(
+                                    policy_set_name, http_req,
+                                    avi_config, pool_csv_rows, vs_ref,
+                                    profile_csv_list, skipped_setting)
 
             # # Get the skipped list for application_profile_ref.
             if 'application_profile_ref' in virtual_service and 'admin:System' \
@@ -1680,17 +1700,27 @@ class F5Util(MigrationUtil):
             msg = "excel sheet conversion started..."
             self.print_progress_bar(ppcount, ptotal_count, msg,
                                     prefix='Progress', suffix='')
-        csv_objects = [row for row in csv_writer_dict_list
-                       if row['Status'] in [
-                           conv_const.STATUS_PARTIAL,
-                           conv_const.STATUS_SUCCESSFUL]
-                       and row['F5 type'] != 'virtual']
+        csv_objects = csv_writer_dict_list.get_rows(
+            statuses=[conv_const.STATUS_PARTIAL, conv_const.STATUS_SUCCESSFUL],
+            exclude_types=['virtual'])
 
         # Update the vs reference not in used if objects are not attached to
         # VS directly or indirectly
         for row in csv_objects:
             if 'VS Reference' not in row or row['VS Reference'] == '':
                 row['VS Reference'] = conv_const.STATUS_NOT_IN_USE
+        self.clear_csv_object_cache()
+
+    def clear_csv_object_cache(self):
+        """
+        This function defines that clear the parsed avi objects and csv row
+        lists cached while adding the skipped settings per VS
+        :return: None
+        """
+
+        csv_avi_objects.clear()
+        csv_object_lists.clear()
+        csv_object_indexes.clear()
 
     def create_update_vsvip(self, vip, vsvip_config, tenant_ref, cloud_ref,
                             prefix, vrf_ref):
@@ -1710,8 +1740,8 @@ class F5Util(MigrationUtil):
         if prefix:
             name = '%s-%s' % (prefix, name)
         # Get the exsting vsvip object list if present
-        vsvip = [vip_obj for vip_obj in vsvip_config if vip_obj['name'] == name
-                 and vip_obj.get('vrf_context_ref') == vrf_ref]
+        vsvip = [vip_obj for vip_obj in get_objects_by_name(vsvip_config, name)
+                 if vip_obj.get('vrf_context_ref') == vrf_ref]
         if vsvip:
             diff_ten = [vips for vips in vsvip if vips['tenant_ref'] !=
                         tenant_ref]
@@ -1928,8 +1958,7 @@ class F5Util(MigrationUtil):
         :param avi_config: avi config json
         :return:
         """
-        pg_obj = [poolgrp for poolgrp in avi_config['PoolGroup'] if
-                  poolgrp['name'] == pool_ref]
+        pg_obj = get_objects_by_name(avi_config['PoolGroup'], pool_ref)
         if pg_obj:
             for member in pg_obj[0]['members']:
                 poolname = self.get_name(member.get('pool_ref'))
@@ -1943,8 +1972,7 @@ class F5Util(MigrationUtil):
         :param avi_config: avi config json
         :return:
         """
-        pool_obj = [pool for pool in avi_config['Pool'] if pool['name'] ==
-                    pool_ref]
+        pool_obj = get_objects_by_name(avi_config['Pool'], pool_ref)
         if pool_obj and not pool_obj[0].get('vrf_ref'):
             pool_obj[0]['vrf_ref'] = vrf_ref
             LOG.debug("Added vrf ref to the pool %s", pool_ref)
@@ -2008,8 +2036,7 @@ class F5Util(MigrationUtil):
         """
         pool_skipped_setting = {}
         skipped_list = self.get_pool_skipped(pool_csv_rows, pool_name, vs_ref)
-        pool_object = [pool for pool in avi_config["Pool"]
-                       if pool['name'] == pool_name]
+        pool_object = get_objects_by_name(avi_config["Pool"], pool_name)
         if skipped_list:
             pool_skipped_setting['pool_name'] = pool_name
             pool_skipped_setting['pool_skipped_list'] = skipped_list
@@ -2102,8 +2129,7 @@ class F5Util(MigrationUtil):
         :param avi_config: avi config json
         :return:
         """
-        pg_obj = [poolgrp for poolgrp in avi_config['PoolGroup'] if
-                  poolgrp['name'] == pool_ref]
+        pg_obj = get_objects_by_name(avi_config['PoolGroup'], pool_ref)
         if pg_obj:
             for member in pg_obj[0]['members']:
                 poolname = self.get_name(member.get('pool_ref'))
@@ -2116,8 +2142,7 @@ class F5Util(MigrationUtil):
         :param avi_config: avi config json
         :return:
         """
-        pool_obj = [pool for pool in avi_config['Pool'] if pool['name'] ==
-                    pool_ref]
+        pool_obj = get_objects_by_name(avi_config['Pool'], pool_ref)
         if pool_obj and pool_obj[0].get('vrf_ref'):
             pool_obj[0].pop('vrf_ref')
             LOG.debug("Removed vrf ref from the pool %s", pool_ref)
@@ -2168,10 +2193,9 @@ class F5Util(MigrationUtil):
         """
         global csv_writer_dict_list
         avi_graph = self.make_graph(avi_config)
-        csv_dict_sub = [row for row in csv_writer_dict_list if row[
-                        'F5 type'] != 'virtual' and row['Status'] in
-                        (conv_const.STATUS_PARTIAL,
-                         conv_const.STATUS_SUCCESSFUL)]
+        csv_dict_sub = csv_writer_dict_list.get_rows(
+            statuses=[conv_const.STATUS_PARTIAL, conv_const.STATUS_SUCCESSFUL],
+            exclude_types=['virtual'])
         for dict_row in csv_dict_sub:
             obj = dict_row['Avi Object']
             vs = []
@@ -2232,10 +2256,8 @@ class F5Util(MigrationUtil):
                 nodelist = [node]
                 self.get_predecessor(nodelist, avi_graph, vs, tmplist)
         elif len(predecessor):
-            node_obj = [nod for nod in list(avi_graph.nodes().data()) if
-                        nod[0] == predecessor[0]]
-            if node_obj and (node_obj[0][1]['type'] == 'VS' or 'VS' in node_obj[
-              0][1]['type']):
+            node_type = avi_graph.nodes[predecessor[0]]['type']
+            if node_type == 'VS' or 'VS' in node_type:
                 LOG.debug("Predecessor %s found", predecessor[0])
                 vs.extend(predecessor)
             else:
@@ -2272,8 +2294,8 @@ class F5Util(MigrationUtil):
                 ds_config['tenant_ref'] = self.get_object_ref(tenant, 'tenant')
                 if prefix:
                     ds_config['name'] = '%s-%s' % (prefix, ds_config['name'])
-                existing_ds = [obj for obj in avi_config['VSDataScriptSet']
-                               if obj['name'] == ds_config['name']]
+                existing_ds = get_objects_by_name(
+                    avi_config['VSDataScriptSet'], ds_config['name'])
                 if not existing_ds:
                     avi_config['VSDataScriptSet'].append(ds_config)
                 vs_ds.append(ds_config['name'])
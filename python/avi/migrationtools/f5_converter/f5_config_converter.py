@@ -15,6 +15,8 @@ from avi.migrationtools.f5_converter import conversion_util
 from avi.migrationtools.f5_converter.conversion_util import F5Util
 from avi.migrationtools.f5_converter.policy_converter import PolicyConfigConv
 from avi.migrationtools.avi_migration_utils import update_count
+from avi.migrationtools.avi_config import AviConfig
+from avi.migrationtools.progress import progress
 
 LOG = logging.getLogger(__name__)
 csv_writer = None
@@ -37,7 +39,8 @@ def convert(f5_config, output_dir, vs_state, input_dir, version,
             object_merge_check, controller_version, report_name, prefix,
             con_snatpool, user_ignore, profile_path, tenant='admin',
             cloud_name='Default-Cloud', keypassphrase=None,
-            vs_level_status=False, vrf=None, segroup=None, rule_config=None):
+            vs_level_status=False, vrf=None, segroup=None, rule_config=None,
+            report_format=None):
     """
     Converts f5 config to avi config pops the config lists for conversion of
     each type from f5 config and remaining marked as skipped in the
@@ -60,11 +63,12 @@ def convert(f5_config, output_dir, vs_state, input_dir, version,
     :param vs_level_status: flag to add cloumn of vs reference.
     :param vrf vrf ref object
     :param segroup segroup ref
+    :param report_format: additional formats of conversion status report
     :return: Converted avi objects
     """
 
-    avi_config_dict = {}
-    sys_dict = {}
+    avi_config_dict = AviConfig()
+    sys_dict = AviConfig()
     try:
         # load the yaml file attribute in f5_attributes.
         f5_attributes = conv_const.init(version)
@@ -161,7 +165,8 @@ def convert(f5_config, output_dir, vs_state, input_dir, version,
 
     # Add f5 converter status report in xslx report
     conv_utils.add_complete_conv_status(
-        output_dir, avi_config_dict, report_name, vs_level_status)
+        output_dir, avi_config_dict, report_name, vs_level_status,
+        report_format)
     for key in avi_config_dict:
         if key != 'META':
             if key == 'VirtualService':
@@ -169,14 +174,15 @@ def convert(f5_config, output_dir, vs_state, input_dir, version,
                     LOG.info('Total Objects of %s : %s (%s full conversions)'
                              % (key, len(avi_config_dict[key]),
                                 conversion_util.fully_migrated))
-                    print 'Total Objects of %s : %s (%s full conversions)' \
-                          % (key, len(avi_config_dict[key]),
-                             conversion_util.fully_migrated)
+                    progress.message(
+                        'Total Objects of %s : %s (%s full conversions)'
+                        % (key, len(avi_config_dict[key]),
+                           conversion_util.fully_migrated))
                 else:
                     LOG.info('Total Objects of %s : %s'
                              % (key, len(avi_config_dict[key])))
-                    print 'Total Objects of %s : %s' \
-                          % (key, len(avi_config_dict[key]))
+                    progress.message('Total Objects of %s : %s'
+                                     % (key, len(avi_config_dict[key])))
 
                 continue
             # Added code to print merged count.
@@ -187,7 +193,7 @@ def convert(f5_config, output_dir, vs_state, input_dir, version,
                     (key, len(avi_config_dict[key]), abs(mergedfile),
                      ssl_count['count'])
                 LOG.info(profile_merged_message)
-                print profile_merged_message
+                progress.message(profile_merged_message)
                 continue
             elif object_merge_check and key == 'ApplicationProfile':
                 mergedfile = len(avi_config_dict[key]) - \
@@ -197,7 +203,7 @@ def convert(f5_config, output_dir, vs_state, input_dir, version,
                     (key, len(avi_config_dict[key]), abs(mergedfile),
                      profile_conv.app_count)
                 LOG.info(profile_merged_message)
-                print profile_merged_message
+                progress.message(profile_merged_message)
                 continue
             elif object_merge_check and key == 'NetworkProfile':
                 mergedfile = len(avi_config_dict[key]) - \
@@ -207,7 +213,7 @@ def convert(f5_config, output_dir, vs_state, input_dir, version,
                     (key, len(avi_config_dict[key]), abs(mergedfile),
                      profile_conv.net_count)
                 LOG.info(profile_merged_message)
-                print profile_merged_message
+                progress.message(profile_merged_message)
                 continue
             elif object_merge_check and key == 'HealthMonitor':
                 mergedmon = len(avi_config_dict[key]) - mon_conv.mon_count
@@ -216,7 +222,7 @@ def convert(f5_config, output_dir, vs_state, input_dir, version,
                     (key, len(avi_config_dict[key]), abs(mergedmon),
                      mon_conv.mon_count)
                 LOG.info(monitor_merged_message)
-                print monitor_merged_message
+                progress.message(monitor_merged_message)
                 continue
             elif object_merge_check and key == 'PKIProfile':
                 mergedfile = len(avi_config_dict[key]) - \
@@ -226,7 +232,7 @@ def convert(f5_config, output_dir, vs_state, input_dir, version,
                     (key, len(avi_config_dict[key]), abs(mergedfile),
                      profile_conv.pki_count)
                 LOG.info(profile_merged_message)
-                print profile_merged_message
+                progress.message(profile_merged_message)
                 continue
             elif object_merge_check and key == 'ApplicationPersistenceProfile':
                 mergedfile = len(avi_config_dict[key]) - \
@@ -236,7 +242,7 @@ def convert(f5_config, output_dir, vs_state, input_dir, version,
                     (key, len(avi_config_dict[key]), abs(mergedfile),
                      persist_conv.app_per_count)
                 LOG.info(profile_merged_message)
-                print profile_merged_message
+                progress.message(profile_merged_message)
                 continue
             elif object_merge_check and key == 'SSLKeyAndCertificate':
                 mergedfile = len(avi_config_dict[key]) - \
@@ -246,10 +252,10 @@ def convert(f5_config, output_dir, vs_state, input_dir, version,
                     (key, len(avi_config_dict[key]), abs(mergedfile),
                      profile_conv.certkey_count)
                 LOG.info(certkey_merged_message)
-                print certkey_merged_message
+                progress.message(certkey_merged_message)
                 continue
             LOG.info('Total Objects of %s : %s' % (key, len(
                 avi_config_dict[key])))
-            print 'Total Objects of %s : %s' % (key, len(
-                avi_config_dict[key]))
+            progress.message('Total Objects of %s : %s' % (key, len(
+                avi_config_dict[key])))
     return avi_config_dict
@@ -15,6 +15,10 @@ from avi.migrationtools.f5_converter import (f5_config_converter,
                                              f5_parser, scp_util)
 from avi.migrationtools import avi_rest_lib
 from avi.migrationtools.avi_converter import AviConverter
+from avi.migrationtools.parse_cache import IncrementalCache
+from avi.migrationtools.cert_inventory import cert_inventory, dummy_certs
+from avi.migrationtools.ref_graph import clear_ref_cache
+from avi.migrationtools.progress import progress, PROGRESS_MODES
 from avi.migrationtools.ansible.ansible_config_converter import AviAnsibleConverter
 from pkg_resources import parse_version
 from avi.migrationtools.avi_orphan_object import wipe_out_not_in_use
@@ -63,6 +67,7 @@ class F5Converter(AviConverter):
         self.ansible_skip_types = args.ansible_skip_types
         # Create ansible object playbook based on filter types.
         self.ansible_filter_types = args.ansible_filter_types
+        self.ansible_shards = args.ansible_shards
         # Tag to create ansible playbook.
         self.create_ansible = args.ansible
         # Prefix for objects
@@ -82,6 +87,19 @@ class F5Converter(AviConverter):
         # Support for vrf ref and segroup ref
         self.vrf = args.vrf
         self.segroup = args.segroup
+        # Reuse parsed configuration from previous runs
+        self.use_parse_cache = args.parse_cache
+        self.parse_cache = None
+        # Additional formats of conversion status report
+        self.report_format = args.report_format
+        # Number of concurrent downloads and certificate workers
+        self.workers = args.workers
+        # Intern parsed configuration to reduce memory
+        self.compact_config = args.compact_config
+        # Generate a key for every dummy certificate
+        self.unique_dummy_certs = args.unique_dummy_certs
+        # Mode of progress reporting, bar, quiet or json
+        self.progress_mode = args.progress
 
         # Created f5 util object.
         self.conversion_util = F5Util()
@@ -96,8 +114,8 @@ class F5Converter(AviConverter):
         # Add logger and print avi netscaler converter version
         LOG.info('AVI sdk version: %s Controller Version: %s'
                  % (sdk_version, self.controller_version))
-        print 'AVI sdk version: %s Controller Version: %s' \
-              % (sdk_version, self.controller_version)
+        progress.message('AVI sdk version: %s Controller Version: %s'
+                         % (sdk_version, self.controller_version))
 
     def upload_config_to_controller(self, avi_config):
         """
@@ -112,7 +130,10 @@ class F5Converter(AviConverter):
     def convert(self):
         if not os.path.exists(self.output_file_path):
             os.mkdir(self.output_file_path)
+        progress.configure(self.progress_mode)
         self.init_logger_path()
+        # References parsed by earlier conversions are not kept
+        clear_ref_cache()
         output_dir = os.path.normpath(self.output_file_path)
         input_dir = os.path.normpath(self.input_folder_location)
         is_download_from_host = False
@@ -126,6 +147,8 @@ class F5Converter(AviConverter):
             if not os.path.exists(output_dir):
                 os.makedirs(output_dir)
             is_download_from_host = True
+        if self.use_parse_cache:
+            self.parse_cache = IncrementalCache(output_dir, 'f5_converter')
         user_ignore = {}
         # Read the attributes for user ignore val
         if self.ignore_config:
@@ -143,10 +166,10 @@ class F5Converter(AviConverter):
         source_file = None
         if is_download_from_host:
             LOG.debug("Copying files from host")
-            print "Copying Files from Host..."
+            progress.message("Copying Files from Host...")
             scp_util.get_files_from_f5(input_dir, self.f5_host_ip,
                                        self.f5_ssh_user, self.f5_ssh_password,
-                                       None, self.f5_ssh_port)
+                                       None, self.f5_ssh_port, self.workers)
             LOG.debug("Copied input files")
             source_file = open(input_dir + os.path.sep + "bigip.conf", "r")
             files = os.listdir(input_dir)
@@ -156,14 +179,14 @@ class F5Converter(AviConverter):
         elif self.bigip_config_file:
             source_file = open(self.bigip_config_file, "r")
         if not source_file:
-            print 'Not found F5 configuration file'
+            progress.message('Not found F5 configuration file')
             return
         source_str = source_file.read()
         total_size = source_file.tell()
         LOG.debug('Parsing config file:' + source_file.name)
-        print "Parsing Input Configuration..."
-        f5_config_dict, not_supported_list = f5_parser.parse_config(
-            source_str, total_size, self.f5_config_version)
+        progress.message("Parsing Input Configuration...")
+        f5_config_dict, not_supported_list = self.parse_config(
+            source_str, total_size)
         LOG.debug('Config file %s parsed successfully' % source_file.name)
         avi_config_dict = None
         LOG.debug('Parsing defaults files')
@@ -179,9 +202,9 @@ class F5Converter(AviConverter):
                     total_size = p_source_file.tell()
                 LOG.debug('Parsing partition config file:' +
                           p_source_file.name)
-                print "Parsing Partitions Configuration..."
-                partition_dict, not_supported_list = f5_parser.parse_config(
-                    p_src_str, total_size, self.f5_config_version)
+                progress.message("Parsing Partitions Configuration...")
+                partition_dict, not_supported_list = self.parse_config(
+                    p_src_str, total_size)
                 LOG.debug(
                     'Config file %s parsed successfully' % p_source_file.name)
                 # TO get all not supported configuration.
@@ -190,6 +213,8 @@ class F5Converter(AviConverter):
                 self.dict_merge(partition_conf, partition_dict)
             self.dict_merge(partition_conf, f5_config_dict)
             f5_config_dict = partition_conf
+        if self.parse_cache:
+            self.parse_cache.save()
         # Added not supported parse config to file
         merged_not_supported_list = (not_supported_list +
                                      not_supported_list_partition)
@@ -202,16 +227,25 @@ class F5Converter(AviConverter):
                                                 conv_const.STATUS_NOT_SUPPORTED)
         LOG.debug('Defaults files parsed successfully')
         LOG.debug('Conversion started')
+        # Analyse keys and certificates of input folder once before conversion
+        cert_inventory.clear()
+        cert_inventory.scan(input_dir, self.workers)
         self.dict_merge(f5_defaults_dict, f5_config_dict)
         f5_config_dict = f5_defaults_dict
         report_name = os.path.splitext(os.path.basename(source_file.name))[0]
-        avi_config_dict = f5_config_converter.convert(
-            f5_config_dict, output_dir, self.vs_state, input_dir,
-            self.f5_config_version, self.object_merge_check,
-            self.controller_version, report_name, self.prefix,
-            self.con_snatpool, user_ignore, self.profile_path,
-            self.tenant, self.cloud_name, self.f5_passphrase_file,
-            self.vs_level_status, self.vrf, self.segroup, rule_mappings)
+        dummy_certs.configure(self.unique_dummy_certs, self.workers)
+        try:
+            avi_config_dict = f5_config_converter.convert(
+                f5_config_dict, output_dir, self.vs_state, input_dir,
+                self.f5_config_version, self.object_merge_check,
+                self.controller_version, report_name, self.prefix,
+                self.con_snatpool, user_ignore, self.profile_path,
+                self.tenant, self.cloud_name, self.f5_passphrase_file,
+                self.vs_level_status, self.vrf, self.segroup, rule_mappings,
+                self.report_format)
+        finally:
+            # Key generation pool is stopped even if conversion fails
+            dummy_certs.close()
 
         avi_config_dict["META"] = self.meta(self.tenant,
                                             self.controller_version)
@@ -226,13 +260,15 @@ class F5Converter(AviConverter):
         if self.create_ansible:
             avi_traffic = AviAnsibleConverter(
                 avi_config, output_dir, self.prefix, self.not_in_use,
-                test_vip=self.test_vip, skip_types=self.ansible_skip_types)
+                test_vip=self.test_vip, skip_types=self.ansible_skip_types,
+                shard=self.ansible_shards, workers=self.workers)
             avi_traffic.write_ansible_playbook(
                 self.f5_host_ip, self.f5_ssh_user, self.f5_ssh_password, 'f5')
         if self.option == 'auto-upload':
             self.upload_config_to_controller(avi_config)
-        print "Total Warning: ", get_count('warning')
-        print "Total Errors: ", get_count('error')
+        progress.report_phase_timings()
+        progress.message("Total Warning: %s" % get_count('warning'))
+        progress.message("Total Errors: %s" % get_count('error'))
 
     def get_default_config(self, is_download, path):
         """
@@ -243,7 +279,7 @@ class F5Converter(AviConverter):
         """
         f5_defaults_dict = {}
         if is_download:
-            print "Copying Files from Host..."
+            progress.message("Copying Files from Host...")
             with open(path + os.path.sep + "profile_base.conf", "r") as \
                     profile:
                 profile_base = profile.read()
@@ -257,10 +293,10 @@ class F5Converter(AviConverter):
                             'default monitor base file : %s'
                             % (profile.name, monitor.name))
                 return f5_defaults_dict
-            profile_dict, not_supported_list = f5_parser.parse_config(
-                profile_base, total_size, self.f5_config_version)
-            monitor_dict, not_supported_list = f5_parser.parse_config(
-                monitor_base, total_size_mnt, self.f5_config_version)
+            profile_dict, not_supported_list = self.parse_config(
+                profile_base, total_size)
+            monitor_dict, not_supported_list = self.parse_config(
+                monitor_base, total_size_mnt)
             if int(self.f5_config_version) == 10:
                 default_mon = monitor_dict.get("monitor", {})
                 root_mon = monitor_dict["monitorroot"]
@@ -286,11 +322,33 @@ class F5Converter(AviConverter):
                     LOG.warning(
                         'Skipped default file : %s' % defaults_file.name)
                     return f5_defaults_dict
-                f5_defaults_dict, not_supported_list = f5_parser.parse_config(
-                    defaults_file.read(), defaults_file.tell(),
-                    self.f5_config_version)
+                f5_defaults_dict, not_supported_list = self.parse_config(
+                    defaults_file.read(), defaults_file.tell())
         return f5_defaults_dict
 
+    def parse_config(self, source_str, total_size):
+        """
+        This method parse the f5 config text, using the parse cache if
+        enabled. Only the top level blocks changed since previous run are
+        parsed again.
+        :param source_str: input file text as string.
+        :param total_size: total size of input string
+        :return: result_dict, not_supported_list
+        """
+        if self.parse_cache:
+            # Matches are cached instead of the parsed dict, so the dict is
+            # built in same order as without cache and output is same
+            block_cache = self.parse_cache.get_section(
+                'f5_parser', [f5_parser.__file__], self.f5_config_version)
+            result_dict, not_supported_list = f5_parser.parse_config(
+                source_str, total_size, self.f5_config_version, block_cache,
+                self.compact_config)
+        else:
+            result_dict, not_supported_list = f5_parser.parse_config(
+                source_str, total_size, self.f5_config_version,
+                compact=self.compact_config)
+        return result_dict, not_supported_list
+
     def dict_merge(self, dct, merge_dct):
         """
         This method merge the two dicts into one.
@@ -391,6 +449,12 @@ if __name__ == "__main__":
     Usecase: To generate the ansible playbook for the avi configuration
     which can be used for upload to controller
 
+    Example to use ansible shards option:
+        f5_converter.py -f bigip.conf --ansible --ansible_shards --workers 4
+    Usecase: To split the ansible playbook of a large configuration into
+     task lists per tenant and virtual service, run in parallel by the
+     playbook. Parallelism of the run is limited by the ansible forks.
+
     Example to add the prefix to avi object name:
         f5_converter.py -f bigip.conf --prefix abc
     Usecase: When two configuration is to be uploaded to same controller then
@@ -426,6 +490,40 @@ if __name__ == "__main__":
         f5_converter.py -f bigip.conf --vs_level_status
     Usecase: To get the vs level status for the avi objects in excel sheet
     
+    Example to use parse cache option:
+        f5_converter.py -f bigip.conf --parse_cache
+    Usecase: To reuse the parsed configuration of an earlier run on the same
+     input files while trying out different conversion options, on changed
+     input files only the changed top level blocks are parsed again.
+
+    Example to use report format option:
+        f5_converter.py -f bigip.conf --report_format csv parquet
+    Usecase: To get the conversion status in csv and parquet files along with
+     the excel sheet for loading large reports in other tools.
+
+    Example to use workers option:
+        f5_converter.py -f bigip.conf --workers 8
+    Usecase: To download files from host, scan certificates and generate
+     dummy certificates of a large configuration in parallel, output is same
+     as with a single worker.
+
+    Example to use compact config option:
+        f5_converter.py -f bigip.conf --compact_config
+    Usecase: To reduce the memory used by the parsed configuration of a very
+     large bigip.conf, output is same as without the option.
+
+    Example to use unique dummy certs option:
+        f5_converter.py -f bigip.conf --unique_dummy_certs --workers 4
+    Usecase: To generate a separate key for every dummy certificate, keys
+     are generated ahead in worker processes. Without the option one key
+     pair is shared by all dummy certificates of the run.
+
+    Example to use progress option:
+        f5_converter.py -f bigip.conf --progress json
+    Usecase: To write progress, messages and time taken by every phase as
+     json lines to stderr in CI runs, quiet hides them. Updates are
+     throttled in all modes.
+
     Example to use segroup flag
         f5_converter.py -f ns.conf --segroup segroup_name
     UseCase: To add / Change segroup reference of vs
@@ -456,6 +554,12 @@ if __name__ == "__main__":
                              'VirtualService, Pool will do ansible conversion '
                              'only for Virtualservice and Pool objects',
                         default=[])
+    parser.add_argument('--ansible_shards',
+                        help='Flag to split ansible playbook into task lists '
+                             'per tenant and virtual service, written by '
+                             '--workers processes, run in parallel by the '
+                             'create and delete playbooks',
+                        action='store_true')
     # Added args for baseline profile json file
     parser.add_argument('--baseline_profile', help='asolute path for json '
                         'file containing baseline profiles')
@@ -463,6 +567,10 @@ if __name__ == "__main__":
                         help='controller ip for auto upload')
     parser.add_argument('--cloud_name', help='cloud name for auto upload',
                         default='Default-Cloud')
+    parser.add_argument('--compact_config',
+                        help='Flag to intern keys and values of parsed '
+                             'configuration to reduce memory usage',
+                        action='store_true')
     parser.add_argument('--controller_version',
                         help='Target Avi controller version', default='17.2.1')
     # Added snatpool conversion option
@@ -508,6 +616,10 @@ if __name__ == "__main__":
     parser.add_argument('-p', '--password',
                         help='controller password for auto upload',
                         default='avi123')
+    parser.add_argument('--parse_cache',
+                        help='Flag to cache parsed input configuration in '
+                             'output folder and reuse it on next run',
+                        action='store_true')
     parser.add_argument('--partition_config',
                         help='comma separated partition config files')
     # Added command line args to execute config_patch file with related avi
@@ -516,6 +628,14 @@ if __name__ == "__main__":
                                         'location of patch.yaml')
     # Added prefix for objects
     parser.add_argument('--prefix', help='Prefix for objects')
+    parser.add_argument('--progress', choices=PROGRESS_MODES, default='bar',
+                        help='Show progress and messages as bar, hide them '
+                             'or write them to stderr as json lines with '
+                             'phase timings')
+    parser.add_argument('--report_format', nargs='+',
+                        choices=['csv', 'parquet'],
+                        help='Additional formats of conversion status report '
+                             'to write along with excel sheet')
     parser.add_argument('-r', '--rule_config',
                         help='iRule mapping yml file path')
     parser.add_argument('--skip_default_file',
@@ -533,6 +653,10 @@ if __name__ == "__main__":
                         'It will replace the original vip '
                         'Note: The actual ip will vary from input to output'
                         'use it with caution ')
+    parser.add_argument('--unique_dummy_certs',
+                        help='Flag to generate a separate key for every '
+                             'dummy certificate instead of sharing one',
+                        action='store_true')
     parser.add_argument('-u', '--user',
                         help='controller username for auto upload',
                         default='admin')
@@ -550,6 +674,10 @@ if __name__ == "__main__":
     parser.add_argument('--vs_level_status', action='store_true',
                         help='Add columns of vs reference and overall skipped '
                              'settings in status excel sheet')
+    parser.add_argument('--workers', type=int, default=1,
+                        help='Number of files downloaded concurrently from '
+                             'host and of workers scanning and generating '
+                             'certificates and writing ansible shards')
 
     
 
@@ -1,9 +1,18 @@
 from pyparsing import *
 import logging
+import re
 import sys
 from avi.migrationtools.f5_converter.conversion_util import F5Util
+from avi.migrationtools.f5_converter.compact_config import intern_config
 
 LOG = logging.getLogger(__name__)
+# Escaped chars, quoted strings, comments, braces and starts of lines which
+# may start a top level entity
+BLOCK_TOKEN_RE = re.compile(
+    r'\\.|"(?:[^"\\\n]|\\.)*"|(?<![^\s{}])#[^\n]*|[{}]|^(?=[A-Za-z])',
+    re.MULTILINE)
+# Text between entities which is skipped while parsing a run of entities
+IGNORABLE_RE = re.compile(r'(?:[ \t\r\n]|#[^\n]*)*\Z')
 # Creating f5 object for util library.
 conversion_util = F5Util()
 
@@ -125,11 +134,16 @@ def generate_grammar_v10():
     return data_set
 
 
-def parse_config(source_str, total_size, version=11):
+def parse_config(source_str, total_size, version=11, block_cache=None,
+                 compact=False):
     """
     :param source_str: input file text as string.
     :param total_size: total size of input string
     :param version: version for f5 instance
+    :param block_cache: CacheSection with matches of top level blocks parsed
+    in previous runs, whole text is parsed if None
+    :param compact: flag to intern the tokens of every match as it is
+    parsed, so a key or value repeated in the config is held once
     :return: result_dict, not_supported_list
     """
     grammar = get_grammar_by_version(version)
@@ -139,8 +153,15 @@ def parse_config(source_str, total_size, version=11):
     last_end = 0
     source_str = source_str.replace("\t", "    ")
     source_str = source_str.replace("user-defined ", "user-defined_")
-    for tokens, start, end in grammar.scanString(source_str):
-        result = result+tokens.asList()
+    if block_cache is None:
+        matches = ((tokens.asList(), start, end) for tokens, start, end
+                   in grammar.scanString(source_str))
+    else:
+        matches = scan_blocks(grammar, source_str, block_cache)
+    for tokens, start, end in matches:
+        if compact:
+            tokens = intern_config(tokens)
+        result.extend(tokens)
         if last_end != 0:
             if start - 3 > last_end:
                 skipped_info = {"start": last_end, "end": start,
@@ -180,6 +201,65 @@ def parse_config(source_str, total_size, version=11):
     return result_dict, not_supported_list
 
 
+def split_blocks(source_str):
+    """
+    This function defines that return offsets of top level blocks of config
+    text. A block starts at a line starting with a letter after the braces
+    of previous block are closed, braces in quoted strings and comments are
+    not counted.
+    :param source_str: input file text as string.
+    :return: list of start offsets of blocks
+    """
+    starts = [0]
+    depth = 0
+    closed = False
+    for match in BLOCK_TOKEN_RE.finditer(source_str):
+        token = match.group()
+        if token == '{':
+            depth += 1
+        elif token == '}':
+            depth -= 1
+            closed = depth == 0
+        elif not token and closed:
+            starts.append(match.start())
+            closed = False
+    return starts
+
+
+def scan_blocks(grammar, source_str, block_cache):
+    """
+    This function defines that scan config text block by block, reusing the
+    matches of blocks which are not changed since previous run. Matches of
+    adjacent blocks which are separated only by whitespace and comments are
+    joined, hence the matches are same as of scanning the whole text.
+    :param grammar: grammar of config
+    :param source_str: input file text as string.
+    :param block_cache: CacheSection with matches of blocks
+    :return: list of tokens, start offset and end offset of matches
+    """
+    starts = split_blocks(source_str)
+    matches = []
+    for start, end in zip(starts, starts[1:] + [len(source_str)]):
+        block = source_str[start:end]
+        key = block_cache.get_key(block)
+        if key in block_cache:
+            block_matches = block_cache.get(key)
+        else:
+            block_matches = [(tokens.asList(), m_start, m_end) for
+                             tokens, m_start, m_end in grammar.scanString(block)]
+            block_cache.put(key, block_matches)
+        for tokens, m_start, m_end in block_matches:
+            m_start += start
+            m_end += start
+            if matches and IGNORABLE_RE.match(
+                    source_str, matches[-1][2], m_start):
+                matches[-1][0].extend(tokens)
+                matches[-1][2] = m_end
+            else:
+                matches.append([list(tokens), m_start, m_end])
+    return matches
+
+
 def get_grammar_by_version(version):
     grammar = None
     if int(version) == 10:
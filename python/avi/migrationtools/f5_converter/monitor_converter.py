@@ -5,7 +5,9 @@ import avi.migrationtools.f5_converter.converter_constants as conv_const
 from pkg_resources import parse_version
 from avi.migrationtools.f5_converter.profile_converter import ssl_count
 from avi.migrationtools.f5_converter.conversion_util import F5Util
+from avi.migrationtools.f5_converter.compact_config import merge_with_parent
 from avi.migrationtools.avi_migration_utils import update_count
+from avi.migrationtools.progress import progress
 
 LOG = logging.getLogger(__name__)
 # Creating f5 object for util library.
@@ -192,7 +194,7 @@ class MonitorConfigConv(object):
         :return:
         """
         LOG.debug("Converting health monitors")
-        print "Converting Monitors..."
+        progress.message("Converting Monitors...")
         converted_objs = []
         m_user_ignore = user_ignore.get('monitor', {})
         monitor_config = f5_config.pop("monitor", {})
@@ -465,9 +467,7 @@ class MonitorConfigConvV11(MonitorConfigConv):
             parent_monitor = monitor_config.get(key, None)
             if parent_monitor:
                 parent_monitor = self.get_defaults(monitor_config, key)
-                copy_p_mon = copy.deepcopy(parent_monitor)
-                copy_p_mon.update(f5_monitor)
-                f5_monitor = copy_p_mon
+                f5_monitor = merge_with_parent(parent_monitor, f5_monitor)
         return f5_monitor
 
     def get_name_type(self, f5_monitor, key):
@@ -853,9 +853,7 @@ class MonitorConfigConvV10(MonitorConfigConv):
             parent_monitor = monitor_config.get(parent_name, None)
             if parent_monitor:
                 parent_monitor = self.get_defaults(monitor_config, parent_name)
-                parent_monitor = copy.deepcopy(parent_monitor)
-                parent_monitor.update(f5_monitor)
-                f5_monitor = parent_monitor
+                f5_monitor = merge_with_parent(parent_monitor, f5_monitor)
         else:
             f5_monitor["type"] = key
         return f5_monitor
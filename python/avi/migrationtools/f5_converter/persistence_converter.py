@@ -4,6 +4,7 @@ import avi.migrationtools.f5_converter.converter_constants as conv_const
 from avi.migrationtools.f5_converter.profile_converter import ProfileConfigConv
 from avi.migrationtools.f5_converter.conversion_util import F5Util
 from avi.migrationtools.avi_migration_utils import update_count
+from avi.migrationtools.progress import progress
 LOG = logging.getLogger(__name__)
 # Creating f5 object for util library.
 conv_utils = F5Util()
@@ -69,7 +70,7 @@ class PersistenceConfigConv(object):
         # Added variable to get total object count.
         progressbar_count = 0
         total_size = len(f5_persistence_dict.keys())
-        print "Converting Persistence Profiles..."
+        progress.message("Converting Persistence Profiles...")
         for key in f5_persistence_dict.keys():
             progressbar_count += 1
             persist_mode = None
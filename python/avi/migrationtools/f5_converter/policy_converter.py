@@ -2,6 +2,7 @@ import logging
 import avi.migrationtools.f5_converter.converter_constants as final
 from avi.migrationtools.f5_converter.conversion_util import F5Util
 from avi.migrationtools.avi_migration_utils import update_count
+from avi.migrationtools.avi_config import get_objects_by_name
 
 LOG = logging.getLogger(__name__)
 
@@ -862,8 +863,8 @@ class PolicyConfigConv(object):
                                                                       'pool'])
                         if self.prefix:
                             poolname = '%s-%s' % (self.prefix, poolname)
-                        poolobj = [obj for obj in avi_config['Pool'] if
-                                   poolname == obj['name'] and
+                        poolobj = [obj for obj in get_objects_by_name(
+                                   avi_config['Pool'], poolname) if
                                    conv_utils.get_name(obj[
                                    'tenant_ref']) == p_tenant]
                         if poolobj:
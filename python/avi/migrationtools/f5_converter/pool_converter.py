@@ -4,6 +4,7 @@ import re
 import avi.migrationtools.f5_converter.converter_constants as conv_const
 from avi.migrationtools.f5_converter.conversion_util import F5Util
 from avi.migrationtools.avi_migration_utils import update_count
+from avi.migrationtools.progress import progress
 LOG = logging.getLogger(__name__)
 # Creating f5 object for util library.
 conv_utils = F5Util()
@@ -61,7 +62,7 @@ class PoolConfigConv(object):
         total_size = len(pool_config.keys())
         # Added variable to get total object count.
         progressbar_count = 0
-        print "Converting Pools..."
+        progress.message("Converting Pools...")
         for pool_name in pool_config.keys():
             progressbar_count += 1
             LOG.debug("Converting Pool: %s" % pool_name)
@@ -1,10 +1,11 @@
-import copy
 import logging
 import os
 import yaml
 import avi.migrationtools.f5_converter.converter_constants as final
 from avi.migrationtools.f5_converter.conversion_util import F5Util
+from avi.migrationtools.f5_converter.compact_config import merge_with_parent
 from avi.migrationtools.avi_migration_utils import update_count
+from avi.migrationtools.progress import progress
 
 LOG = logging.getLogger(__name__)
 ssl_count = {'count': 0}
@@ -72,7 +73,7 @@ class ProfileConfigConv(object):
         if not persistence:
             f5_config['persistence'] = {}
         avi_config['UnsupportedProfiles'] = []
-        print "\nConverting Profiles ..."
+        progress.message("\nConverting Profiles ...")
         # Added variable to get total object count.
         progressbar_count = 0
         total_size = len(profile_config.keys())
@@ -147,9 +148,7 @@ class ProfileConfigConv(object):
             if parent_profile:
                 parent_profile = self.update_with_default_profile(
                     profile_type, parent_profile, profile_config, parent_name)
-                parent_profile = copy.deepcopy(parent_profile)
-                parent_profile.update(profile)
-                profile = parent_profile
+                profile = merge_with_parent(parent_profile, profile)
         return profile
 
     def update_key_cert_obj(self, name, key_file_name, cert_file_name,
@@ -207,6 +206,10 @@ class ProfileConfigConv(object):
             if not conv_utils.check_certificate_expiry(input_dir,
                                                     cert_file_name):
                 cert, key = None, None
+            elif not is_key_protected and not conv_utils.is_key_cert_matching(
+                    folder_path + key_file_name, folder_path + cert_file_name):
+                LOG.warning('Key %s does not match certificate %s' % (
+                    key_file_name, cert_file_name))
 
         key_passphrase = None
         # Get the key passphrase for key_file
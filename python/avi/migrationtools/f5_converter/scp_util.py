@@ -7,7 +7,8 @@ from avi.migrationtools.scp_util import SCPUtil
 LOG = logging.getLogger(__name__)
 
 
-def get_files_from_f5(local_path, host, username, pw=None, key=None, port=22):
+def get_files_from_f5(local_path, host, username, pw=None, key=None, port=22,
+                      workers=1):
     """
 
     :param local_path: relative path to file
@@ -15,36 +16,39 @@ def get_files_from_f5(local_path, host, username, pw=None, key=None, port=22):
     :param username: username for instance
     :param pw: password for instance
     :param key: keyfile.
+    :param workers: number of files downloaded concurrently
     :return:
     """
     local_path = local_path + os.path.sep
-    scp = SCPUtil(host, username, pw, key, port)
-    scp.get_all_files('/config/ssl/ssl.crl/', local_path)
-    scp.get_all_files('/config/ssl/ssl.crt/', local_path)
-    scp.get_all_files('/config/ssl/ssl.csr/', local_path)
-    scp.get_all_files('/config/ssl/ssl.key/', local_path)
-    scp.get_all_files('/config/monitors/', local_path)
+    scp = SCPUtil(host, username, pw, key, port, workers)
+    # Files are listed first and downloaded together over several channels
+    files = []
+    files.extend(scp.list_files('/config/ssl/ssl.crl/', local_path))
+    files.extend(scp.list_files('/config/ssl/ssl.crt/', local_path))
+    files.extend(scp.list_files('/config/ssl/ssl.csr/', local_path))
+    files.extend(scp.list_files('/config/ssl/ssl.key/', local_path))
+    files.extend(scp.list_files('/config/monitors/', local_path))
     # Added support to get cert and key for V13.
     try:
-        scp.get_all_partition_certkey('/config/filestore/files_d/', local_path)
+        files.extend(scp.list_partition_certkey('/config/filestore/files_d/',
+                                                local_path))
     except:
         pass
-    scp.get('/config/bigip.conf', local_path + 'bigip.conf')
+    files.extend(scp.list_file('/config/bigip.conf', local_path + 'bigip.conf'))
+    for remote_file, file_name in [
+            ('/config/profile_base.conf', 'profile_base.conf'),
+            ('/usr/share/monitors/base_monitors.conf', 'base_monitors.conf'),
+            ('/config/bigip_gtm.conf', 'bigip_gtm.conf')]:
+        try:
+            files.extend(scp.list_file(remote_file, local_path + file_name))
+        except:
+            pass
     try:
-        scp.get('/config/profile_base.conf', local_path + 'profile_base.conf')
-    except:
-        pass
-    try:
-        scp.get('/usr/share/monitors/base_monitors.conf', local_path +
-                'base_monitors.conf')
-    except:
-        pass
-    try:
-        scp.get('/config/bigip_gtm.conf', local_path + 'bigip_gtm.conf')
-    except:
-        pass
-    try:
-        scp.get_all_partition_config('/config/partitions/', local_path)
+        files.extend(scp.list_partition_config('/config/partitions/',
+                                               local_path))
     except:
         pass
+    failed = scp.download(files)
     scp.close()
+    if '/config/bigip.conf' in failed:
+        raise IOError('Failed to download /config/bigip.conf')
@@ -58,3 +58,129 @@ class Test(unittest.TestCase):
         assert patched_pool
         assert not patched_pool[0]['servers']
 
+
+    def testReferenceIndex(self):
+        ref = '/api/%s/?tenant=%s&name=%s'
+        pool_ref = ref + '&cloud=Default-Cloud'
+        acfg = {
+            'META': {'use_tenant': 'admin'},
+            'Pool': [
+                {'name': 'p1', 'tenant_ref': '/api/tenant/?name=admin',
+                 'health_monitor_refs': [ref % ('healthmonitor', 'admin', 'h1'),
+                                         ref % ('healthmonitor', 'admin', 'h2')]},
+                {'name': 'p2', 'tenant_ref': '/api/tenant/?name=t1'}],
+            'HealthMonitor': [
+                {'name': 'h1', 'tenant_ref': '/api/tenant/?name=admin'},
+                {'name': 'h2', 'tenant_ref': '/api/tenant/?name=admin'}],
+            'PoolGroup': [
+                {'name': 'pg1', 'tenant_ref': '/api/tenant/?name=admin',
+                 'members': [{'pool_ref': pool_ref % ('pool', 'admin', 'p1')},
+                             {'pool_ref': pool_ref % ('pool', 't1', 'p2')}]}]}
+        patches = {
+            'HealthMonitor': [{'match_name': 'h1', 'patch': {'name': 'h2'}}],
+            'Pool': [{'match_name': 'p1', 'patch': {'name': 'p3'}},
+                     {'match_name': 'p3', 'patch': {'name': 'p4'}}]}
+        cp = ConfigPatch(acfg, patches)
+        patched_cfg = cp.patch()
+        pools = patched_cfg['Pool']
+        assert pools[0]['health_monitor_refs'] == [
+            ref % ('healthmonitor', 'admin', 'h2')]
+        assert patched_cfg['PoolGroup'][0]['members'] == [
+            {'pool_ref': pool_ref % ('pool', 'admin', 'p4')},
+            {'pool_ref': pool_ref % ('pool', 't1', 'p2')}]
+        patches = {'Tenant': [{'match_name': 't1', 'patch': {'name': 't2'}}]}
+        cp = ConfigPatch(patched_cfg, patches)
+        patched_cfg = cp.patch()
+        assert patched_cfg['Pool'][1]['tenant_ref'] == '/api/tenant/?name=t2'
+        # Tenant rename moves every object to the new tenant and renames
+        # tenant of top level references only
+        assert patched_cfg['PoolGroup'][0]['members'] == [
+            {'pool_ref': pool_ref % ('pool', 'admin', 'p4')},
+            {'pool_ref': pool_ref % ('pool', 't1', 'p2')}]
+        assert patched_cfg['PoolGroup'][0]['tenant_ref'] == \
+            '/api/tenant/?name=t2'
+        assert patched_cfg['META']['use_tenant'] == 't2'
+
+    def testReferenceIndexSameAsRescan(self):
+        patch_sets = [
+            self.patches,
+            {'ApplicationProfile': [
+                {'match_name': 'applicationprofile-1',
+                 'patch': {'name': 'app-1'}}],
+             'AnalyticsProfile': [
+                 {'match_name': 'ap1', 'patch': {'name': 'ap2'}},
+                 {'match_name': 'ap2', 'patch': {'name': 'ap3'}}],
+             'VrfContext': [{'match_name': 'global',
+                             'patch': {'name': 'global-vrf'}}]},
+            {'ActionGroupConfig': [
+                {'match_name_regex': 'System-Alert-Level-.*',
+                 'patch': {'name': 'alert-level'}}],
+             'ServerAutoScalePolicy': [
+                 {'match_name_in_list': ['asp-pg1', 'asp-pg3'],
+                  'patch': {'name': 'asp-pg'}}],
+             'ServiceEngineGroup': [
+                 {'match_name': 'Default-Group', 'delete_old': True,
+                  'patch': {'name': 'se-group'}}]},
+            {'Tenant': [{'match_name': 'admin', 'patch': {'name': 't2'}}],
+             'Pool': [{'match_name': 'p1', 'patch': {'name': 'p2'}}]},
+            {'Tenant': [{'match_name': 'admin', 'patch': {'name': 't2'}},
+                        {'match_name': 't2', 'patch': {'name': 't3'}}]}]
+        for patches in patch_sets:
+            expected = RescanConfigPatch(self.acfg, patches).patch()
+            patched_cfg = ConfigPatch(self.acfg, patches).patch()
+            assert json.dumps(patched_cfg, sort_keys=True) == \
+                json.dumps(expected, sort_keys=True)
+
+
+class RescanConfigPatch(ConfigPatch):
+    """
+    Config patch updating references and tenant references by walking the
+    full configuration for every old reference as before the reference index
+    """
+    def update_obj_refs(self, old_obj_type, old_ref, new_ref, obj):
+        if isinstance(obj, dict):
+            for k, v in obj.iteritems():
+                if k.endswith('ref') or k.endswith('_refs'):
+                    if isinstance(v, list):
+                        if old_ref in v:
+                            new_refs = set(v)
+                            new_refs.pop(old_ref)
+                            new_refs.add(new_ref)
+                            obj[k] = list(new_refs)
+                    elif v == old_ref:
+                        obj[k] = new_ref
+                elif isinstance(v, dict):
+                    self.update_obj_refs(
+                        old_obj_type, old_ref, new_ref, v)
+                elif isinstance(v, list):
+                    for elem in v:
+                        self.update_obj_refs(
+                            old_obj_type, old_ref, new_ref, elem)
+
+    def update_references(self, obj_type, old_ref, new_ref, avi_cfg):
+        for _, obj_list in avi_cfg.iteritems():
+            for obj in obj_list:
+                self.update_obj_refs(
+                    obj_type, old_ref, new_ref, obj)
+
+    def update_tenant_references(self, avi_config, old_tenant, new_tenant):
+        for obj_type in avi_config.keys():
+            if obj_type == 'META':
+                avi_config[obj_type]['use_tenant'] = new_tenant
+                continue
+            for obj in avi_config[obj_type]:
+                for key in obj:
+                    if key == 'tenant_ref':
+                        obj[key] = '/api/tenant/?name=%s' % new_tenant
+                    if key.endswith('ref') and not key == 'tenant_ref':
+                        if not obj[key]:
+                            continue
+                        obj[key] = obj[key].replace(
+                            'tenant=%s' % old_tenant, 'tenant=%s' % new_tenant)
+                    elif key.endswith('refs'):
+                        new_refs = []
+                        for ref in obj[key]:
+                            new_refs.append(ref.replace(
+                                'tenant=%s' % old_tenant,
+                                'tenant=%s' % new_tenant))
+                        obj[key] = new_refs
@@ -2,15 +2,30 @@
 This testsuite contains the initial test cases for testing the
 f5 converter tool along with its options / parameters
 """
+import copy
 import json
 import logging
 import os
+import re
+import shutil
 import subprocess
 import sys
+import threading
+import time
+import paramiko
 import pytest
 import yaml
-from avi.migrationtools.avi_migration_utils import get_count, set_update_count
+from OpenSSL import crypto
+from avi.migrationtools.avi_migration_utils import get_count, \
+    set_update_count, MigrationUtil
+from avi.migrationtools.cert_inventory import cert_inventory, dummy_certs, \
+    generate_key
+from avi.migrationtools.f5_converter import f5_parser
+from avi.migrationtools.f5_converter.compact_config import intern_config, \
+    merge_with_parent
 from avi.migrationtools.f5_converter.f5_converter import F5Converter
+from avi.migrationtools.parse_cache import IncrementalCache
+from avi.migrationtools.scp_util import SCPUtil
 from avi.migrationtools.test.common.excel_reader \
     import percentage_success, output_sanitization, output_vs_level_status
 from avi.migrationtools.test.common.test_clean_reboot \
@@ -119,7 +134,10 @@ def f5_conv(
         ansible_skip_types=None, ansible_filter_types=None, ansible=None,
         prefix=None, convertsnat=None, not_in_use=None, baseline_profile=None,
         f5_passphrase_file=None, vs_level_status=False, test_vip=None,
-        vrf=None, segroup=None, rule_config=None):
+        vrf=None, segroup=None, rule_config=None, parse_cache=False,
+        report_format=None, workers=1,
+        compact_config=False, unique_dummy_certs=False,
+        ansible_shards=False, progress='bar'):
 
     args = Namespace(bigip_config_file=bigip_config_file,
                      skip_default_file=skip_default_file,
@@ -141,20 +159,170 @@ def f5_conv(
                      not_in_use=not_in_use, baseline_profile=baseline_profile,
                      f5_passphrase_file=f5_passphrase_file,
                      vs_level_status=vs_level_status, test_vip=test_vip,
-                     vrf=vrf, segroup=segroup, rule_config=rule_config)
+                     vrf=vrf, segroup=segroup, rule_config=rule_config,
+                     parse_cache=parse_cache, report_format=report_format,
+                     workers=workers,
+                     compact_config=compact_config,
+                     unique_dummy_certs=unique_dummy_certs,
+                     ansible_shards=ansible_shards, progress=progress)
 
     f5_converter = F5Converter(args)
     avi_config = f5_converter.convert()
     return avi_config
 
 
+class LocalSFTP(object):
+    """
+    SFTP client serving local files, counts the files it sends
+    """
+    sent = []
+
+    def listdir_attr(self, path):
+        return [paramiko.SFTPAttributes.from_stat(
+            os.stat(os.path.join(path, name)), name)
+            for name in sorted(os.listdir(path))]
+
+    def stat(self, path):
+        if not os.path.exists(path):
+            raise IOError('No such file: %s' % path)
+        return paramiko.SFTPAttributes.from_stat(os.stat(path))
+
+    def get(self, remote_path, local_path):
+        self.sent.append(remote_path)
+        shutil.copyfile(remote_path, local_path)
+
+    def close(self):
+        pass
+
+
+class LocalSCPUtil(SCPUtil):
+    """
+    SCPUtil whose channels are local SFTP clients
+    """
+
+    def __init__(self, workers):
+        self.sftp = LocalSFTP()
+        self.sftp_open = True
+        self.workers = workers
+        self.local = threading.local()
+        self.channels = []
+        self.channels_lock = threading.Lock()
+
+    def open_channel(self):
+        return LocalSFTP()
+
+
+def get_string_ids(config):
+    """
+    Returns dict of every string key and value of parsed config to the ids
+    of its string objects
+    """
+    string_ids = {}
+    values = [config]
+    while values:
+        value = values.pop()
+        if isinstance(value, dict):
+            values.extend(value.keys())
+            values.extend(value.values())
+        elif isinstance(value, list):
+            values.extend(value)
+        elif isinstance(value, str):
+            string_ids.setdefault(value, set()).add(id(value))
+    return string_ids
+
+
+def get_config_size(*configs):
+    """
+    Returns bytes held by the distinct objects of parsed configs, an object
+    shared within or between the configs is counted once
+    """
+    seen = set()
+    size = 0
+    values = list(configs)
+    while values:
+        value = values.pop()
+        if id(value) in seen:
+            continue
+        seen.add(id(value))
+        size += sys.getsizeof(value)
+        if isinstance(value, dict):
+            # dict.iteritems does not copy shared values of CopyOnWriteDict
+            for key, item in dict.iteritems(value):
+                values.extend([key, item])
+        elif isinstance(value, (list, set)):
+            values.extend(value)
+    return size
+
+
+class FakeF5Object(object):
+    """
+    Object of fake f5 REST session, attributes are given as arguments
+    """
+
+    def __init__(self, **kwargs):
+        self.__dict__.update(kwargs)
+
+
+class FakeF5Client(object):
+    """
+    Fake f5 version 11 REST session which records the pools loaded and
+    fails to load the virtual servers named in failing
+    """
+
+    def __init__(self, vs_count, pool_count, failing=()):
+        self.pool_loads = []
+        self.failing = failing
+        virtuals = [FakeF5Object(
+            name='vs%s' % index, partition='Common',
+            destination='/Common/10.0.0.%s:80' % index,
+            pool='/Common/pool%s' % (index % pool_count), enabled=True,
+            sourceAddressTranslation={'type': 'none'})
+            for index in range(vs_count)]
+        self.tm = FakeF5Object(ltm=FakeF5Object(
+            virtuals=FakeF5Object(
+                get_collection=lambda: virtuals,
+                virtual=FakeF5Object(load=self.load_virtual)),
+            pools=FakeF5Object(pool=FakeF5Object(load=self.load_pool))))
+
+    def load_pool(self, partition, name):
+        self.pool_loads.append(name)
+        member = FakeF5Object(name='%s-member' % name, address='10.1.1.1',
+                              state='up')
+        return FakeF5Object(monitor='/Common/http ', members_s=FakeF5Object(
+            get_collection=lambda: [member]))
+
+    def load_virtual(self, partition, name):
+        if name in self.failing:
+            raise IOError('Failed to load %s' % name)
+        stats = {u'clientside.maxConns': {u'value': int(name[2:])}}
+        return FakeF5Object(
+            profiles_s=FakeF5Object(get_collection=lambda: [
+                FakeF5Object(name='http')]),
+            policies_s=FakeF5Object(get_collection=lambda: []),
+            stats=FakeF5Object(load=lambda: FakeF5Object(entries=stats)))
+
+
+def get_f5_inventory_v11(client, workers):
+    """
+    Returns f5 version 11 inventory using the fake REST session
+    """
+    pytest.importorskip('bigsuds')
+    pytest.importorskip('f5.bigip')
+    from avi.migrationtools.f5_discovery import F5InventoryConvV11
+    f5_inventory = F5InventoryConvV11.__new__(F5InventoryConvV11)
+    f5_inventory.f5_client = client
+    f5_inventory.workers = workers
+    f5_inventory.virtual_objs = {}
+    return f5_inventory
+
+
 class TestF5Converter:
 
     @pytest.fixture
     def cleanup(self):
         import avi.migrationtools.f5_converter.conversion_util as conv
         import shutil
-        conv.csv_writer_dict_list = list()
+        conv.csv_writer_dict_list.clear()
         if os.path.exists(output_file):
             for each_file in os.listdir(output_file):
                 file_path = os.path.join(output_file, each_file)
@@ -968,6 +1136,392 @@ class TestF5Converter:
         )
         assert output_vs_level_status(self.excel_path)
 
+    @pytest.mark.travis
+    def test_vs_skipped_rows_parsed_once(self):
+        from avi.migrationtools.conversion_status import \
+            ConversionStatusStore
+        from avi.migrationtools.f5_converter.conversion_util import F5Util
+
+        class CountingF5Util(F5Util):
+            parsed = 0
+
+            def format_string_to_json(self, avi_string):
+                CountingF5Util.parsed += 1
+                return super(CountingF5Util, self).format_string_to_json(
+                    avi_string)
+
+        store = ConversionStatusStore('F5 type', 'F5 ID')
+        for i in range(5):
+            store.append({
+                'F5 type': 'profile', 'F5 ID': '/Common/p%s' % i,
+                'Status': 'SUCCESSFUL', 'Skipped settings': "['opt%s']" % i,
+                'Avi Object': str({'ssl_profile': {'name': 'p%s' % i}})})
+        store.append({
+            'F5 type': 'profile', 'F5 ID': '/Common/p5', 'Status': 'PARTIAL',
+            'Skipped settings': "['dup']",
+            'Avi Object': str({'ssl_profile': 'Duplicate of p0'})})
+        util = CountingF5Util()
+        util.clear_csv_object_cache()
+        try:
+            rows = util.get_csv_object_list(store, ['profile'])
+            for vs_ref in ('vs1', 'vs2'):
+                for i in range(5):
+                    assert util.get_csv_skipped_list(
+                        util.get_csv_object_list(store, ['profile']),
+                        'p%s' % i, vs_ref, field_key='ssl_profile') == \
+                        ["'opt%s'" % i]
+            assert util.get_csv_skipped_list(
+                rows, 'missing', 'vs1', field_key='ssl_profile') is None
+            # Every row is parsed once for all the VS lookups
+            assert CountingF5Util.parsed == len(store)
+            assert store[0]['VS Reference'] == 'vs1,vs2'
+            assert 'VS Reference' not in store[5]
+        finally:
+            util.clear_csv_object_cache()
+
+    @pytest.mark.travis
+    def test_parse_cache_on_v11(self, cleanup):
+        cache_dir = os.path.join(output_file, 'parse_cache')
+        f5_conv(bigip_config_file=setup.get('config_file_name_v11'),
+                f5_config_version=setup.get('file_version_v11'),
+                controller_version=setup.get('controller_version_v17'),
+                output_file_path=setup.get('output_file_path'),
+                parse_cache=True)
+        # Blocks of bigip config and defaults config file are kept together
+        cache_files = sorted(os.listdir(cache_dir))
+        assert cache_files == ['f5_converter.pickle']
+        file = "%s/%s" % (output_file, "bigip_v11-Output.json")
+        with open(file) as json_file:
+            first_output = json.load(json_file)
+        f5_conv(bigip_config_file=setup.get('config_file_name_v11'),
+                f5_config_version=setup.get('file_version_v11'),
+                controller_version=setup.get('controller_version_v17'),
+                output_file_path=setup.get('output_file_path'),
+                parse_cache=True)
+        assert sorted(os.listdir(cache_dir)) == cache_files
+        with open(file) as json_file:
+            second_output = json.load(json_file)
+        assert sorted(vs['name'] for vs in first_output['VirtualService']) \
+            == sorted(vs['name'] for vs in second_output['VirtualService'])
+
+    @pytest.mark.travis
+    def test_parse_cache_blocks_on_v11(self, cleanup):
+        # Parsing block by block gives same result as parsing whole text
+        for config_file, version in [(input_file_v10, '10'),
+                                     (input_file_v11, '11')]:
+            with open(config_file) as stream:
+                source_str = stream.read()
+            block_cache = IncrementalCache(output_file, 'test').get_section(
+                'f5_parser', [f5_parser.__file__], version)
+            assert f5_parser.parse_config(
+                source_str, len(source_str), version, block_cache) == \
+                f5_parser.parse_config(source_str, len(source_str), version)
+
+    @pytest.mark.travis
+    def test_parse_cache_changed_input_on_v11(self, tmpdir):
+        with open(input_file_v11) as stream:
+            source_str = stream.read()
+        config_file = str(tmpdir.join('bigip_v11.conf'))
+        cached_dir = str(tmpdir.mkdir('cached'))
+        full_dir = str(tmpdir.mkdir('full'))
+
+        def run_converter(output_dir, *options):
+            # Converter keeps state in modules across runs, so each run is
+            # done in its own process with same seed for the random names
+            subprocess.check_call(
+                [sys.executable, '-c',
+                 'import random, runpy; random.seed(0); runpy.run_module('
+                 '"avi.migrationtools.f5_converter.f5_converter", '
+                 'run_name="__main__", alter_sys=True)',
+                 '-f', config_file, '-o', output_dir,
+                 '--controller_version',
+                 setup.get('controller_version_v17'),
+                 '--progress', 'quiet'] + list(options))
+            with open(os.path.join(output_dir, 'bigip_v11-Output.json')) \
+                    as json_file:
+                return json_file.read()
+
+        with open(config_file, 'w') as stream:
+            stream.write(source_str)
+        run_converter(cached_dir, '--parse_cache')
+        with open(config_file, 'w') as stream:
+            stream.write(source_str.replace(
+                'load-balancing-mode predictive-node',
+                'load-balancing-mode round-robin', 1))
+        # Rerun on changed input reuses the blocks which are not changed and
+        # gives same output as full run, except the generated dummy keys
+        cached_output = run_converter(cached_dir, '--parse_cache')
+        full_output = run_converter(full_dir)
+        dummy_cert = re.compile(r'"(certificate|key)": "-----BEGIN [^"]*"')
+        assert dummy_cert.sub('', cached_output) == \
+            dummy_cert.sub('', full_output)
+
+    @pytest.mark.travis
+    def test_parse_cache_reparses_changed_block(self, tmpdir):
+        with open(input_file_v11) as stream:
+            source_str = stream.read()
+        cache = IncrementalCache(str(tmpdir), 'test')
+        f5_config = f5_parser.parse_config(
+            source_str, len(source_str), '11',
+            cache.get_section('f5_parser', [f5_parser.__file__], '11'))[0]
+        cache.save()
+        pool_name = '/Common/F5-Pool-001'
+        changed_str = source_str.replace(
+            'load-balancing-mode predictive-node',
+            'load-balancing-mode round-robin', 1)
+        cache = IncrementalCache(str(tmpdir), 'test')
+        block_cache = cache.get_section('f5_parser', [f5_parser.__file__],
+                                        '11')
+        changed_config = f5_parser.parse_config(
+            changed_str, len(changed_str), '11', block_cache)[0]
+        # Only the changed block is parsed, matches of the rest are reused
+        assert len(block_cache.current) - block_cache.reused == 1
+        assert changed_config == f5_parser.parse_config(
+            changed_str, len(changed_str), '11')[0]
+        assert changed_config['pool'][pool_name]['load-balancing-mode'] == \
+            'round-robin'
+        changed_config['pool'][pool_name]['load-balancing-mode'] = \
+            'predictive-node'
+        assert changed_config == f5_config
+
+    @pytest.mark.travis
+    def test_compact_config_on_v11(self, cleanup):
+        with open(input_file_v11) as stream:
+            source_str = stream.read()
+        f5_config = f5_parser.parse_config(source_str, len(source_str))[0]
+        compact = f5_parser.parse_config(source_str, len(source_str),
+                                         compact=True)[0]
+        assert compact == f5_config
+        # Equal keys and values are the same string object only in compact
+        # config
+        assert any(len(ids) > 1 for ids in
+                   get_string_ids(f5_config).itervalues())
+        assert all(len(ids) == 1 for ids in
+                   get_string_ids(compact).itervalues())
+        assert intern_config(f5_config) == f5_config
+        parent = {'timeout': '5', 'recv': {'status': ['200']}}
+        merged = merge_with_parent(parent, {'timeout': '10'})
+        merged['recv']['status'].append('301')
+        assert merged == {'timeout': '10', 'recv': {'status': ['200', '301']}}
+        assert parent == {'timeout': '5', 'recv': {'status': ['200']}}
+        file = "%s/%s" % (output_file, "bigip_v11-Output.json")
+        f5_conv(bigip_config_file=setup.get('config_file_name_v11'),
+                f5_config_version=setup.get('file_version_v11'),
+                controller_version=setup.get('controller_version_v17'),
+                output_file_path=setup.get('output_file_path'))
+        with open(file) as json_file:
+            full_output = json.load(json_file)
+        f5_conv(bigip_config_file=setup.get('config_file_name_v11'),
+                f5_config_version=setup.get('file_version_v11'),
+                controller_version=setup.get('controller_version_v17'),
+                output_file_path=setup.get('output_file_path'),
+                compact_config=True)
+        with open(file) as json_file:
+            compact_output = json.load(json_file)
+        assert sorted(vs['name'] for vs in full_output['VirtualService']) == \
+            sorted(vs['name'] for vs in compact_output['VirtualService'])
+
+    @pytest.mark.travis
+    def test_compact_config_memory_benchmark(self):
+        """
+        Memory held by the parsed config and by objects merged with their
+        defaults-from parent, with compact config on and off
+        """
+        with open(input_file_v11) as stream:
+            source_str = stream.read()
+        full_size = get_config_size(
+            f5_parser.parse_config(source_str, len(source_str))[0])
+        compact_size = get_config_size(
+            f5_parser.parse_config(source_str, len(source_str),
+                                   compact=True)[0])
+        print 'Parsed config %s bytes, compact %s bytes' % (full_size,
+                                                           compact_size)
+        assert compact_size < full_size
+        parent = {'send': 'GET /', 'timeout': '5',
+                  'recv': {'status': [str(code) for code in range(100)]}}
+        copied = []
+        for index in range(1000):
+            monitor = copy.deepcopy(parent)
+            monitor.update({'timeout': str(index)})
+            copied.append(monitor)
+        merged = [merge_with_parent(parent, {'timeout': str(index)})
+                  for index in range(1000)]
+        copied_size = get_config_size(parent, copied)
+        merged_size = get_config_size(parent, merged)
+        print 'Merged monitors %s bytes, copy on write %s bytes' % (
+            copied_size, merged_size)
+        assert merged_size * 2 < copied_size
+        assert merged == copied
+
+    @pytest.mark.travis
+    def test_cert_inventory(self, cleanup):
+        util = MigrationUtil()
+        key, cert = util.create_self_signed_cert()
+        # Dummy certificates share one key pair, so generate a distinct key
+        other_key = generate_key()
+        protected_key = crypto.dump_privatekey(
+            crypto.FILETYPE_PEM,
+            crypto.load_privatekey(crypto.FILETYPE_PEM, key), 'aes256',
+            'passphrase')
+        if not os.path.exists(output_file):
+            os.mkdir(output_file)
+        for file_name, content in [('test.key', key), ('test.crt', cert),
+                                   ('other.key', other_key),
+                                   ('protected.key', protected_key)]:
+            with open(os.path.join(output_file, file_name), 'w') as stream:
+                stream.write(content)
+        cert_inventory.scan(output_file, 2)
+        assert util.upload_file(os.path.join(output_file, 'test.crt')) == \
+            cert.decode('utf-8')
+        assert not util.is_certificate_key_protected(
+            os.path.join(output_file, 'test.key'))
+        assert util.is_certificate_key_protected(
+            os.path.join(output_file, 'protected.key'))
+        assert util.check_certificate_expiry(output_file, 'test.crt')
+        assert util.is_key_cert_matching(
+            os.path.join(output_file, 'test.key'),
+            os.path.join(output_file, 'test.crt'))
+        assert not util.is_key_cert_matching(
+            os.path.join(output_file, 'other.key'),
+            os.path.join(output_file, 'test.crt'))
+        assert cert_inventory.paths and cert_inventory.matches
+        # Converter run starts with an empty inventory
+        f5_conv(bigip_config_file=setup.get('config_file_name_v11'),
+                f5_config_version=setup.get('file_version_v11'),
+                controller_version=setup.get('controller_version_v17'),
+                output_file_path=setup.get('output_file_path'))
+        assert not [path for path in cert_inventory.paths
+                    if path.startswith(output_file)]
+
+    @pytest.mark.travis
+    def test_dummy_certs(self):
+        util = MigrationUtil()
+        dummy_certs.configure()
+        assert util.create_self_signed_cert() == \
+            util.create_self_signed_cert()
+        dummy_certs.configure(unique=True, workers=2)
+        try:
+            pairs = [util.create_self_signed_cert() for index in range(3)]
+        finally:
+            dummy_certs.close()
+        assert len(set(key for key, cert in pairs)) == 3
+        for key, cert in pairs:
+            assert crypto.load_certificate(
+                crypto.FILETYPE_PEM, cert).get_pubkey().bits() == 2048
+        dummy_certs.configure()
+
+    @pytest.mark.travis
+    def test_dummy_certs_closed_on_error(self, cleanup, monkeypatch):
+        from avi.migrationtools.f5_converter import f5_config_converter
+
+        def failing_convert(*args):
+            # Conversion fails after key generation pool is started
+            dummy_certs.get()
+            assert dummy_certs.pool is not None
+            raise ValueError('conversion failed')
+        monkeypatch.setattr(f5_config_converter, 'convert', failing_convert)
+        with pytest.raises(ValueError):
+            f5_conv(bigip_config_file=setup.get('config_file_name_v11'),
+                    f5_config_version=setup.get('file_version_v11'),
+                    controller_version=setup.get('controller_version_v17'),
+                    output_file_path=setup.get('output_file_path'),
+                    unique_dummy_certs=True, workers=2)
+        assert dummy_certs.pool is None
+        dummy_certs.configure()
+
+    @pytest.fixture
+    def scp_dirs(self, tmpdir):
+        remote_dir = str(tmpdir.mkdir('remote')) + os.sep
+        local_dir = str(tmpdir.mkdir('local')) + os.sep
+        os.makedirs(os.path.join(remote_dir, 'partition'))
+        del LocalSFTP.sent[:]
+        yield remote_dir, local_dir
+        del LocalSFTP.sent[:]
+        tmpdir.remove()
+
+    @pytest.mark.travis
+    def test_scp_download(self, scp_dirs):
+        remote_dir, local_dir = scp_dirs
+        for index in range(5):
+            with open(remote_dir + 'cert%s.crt' % index, 'w') as stream:
+                stream.write('certificate %s' % index)
+        scp = LocalSCPUtil(workers=3)
+        files = scp.list_files(remote_dir, local_dir)
+        assert len(files) == 5
+        assert scp.download(files) == []
+        assert len(LocalSFTP.sent) == 5
+        for index in range(5):
+            with open(local_dir + 'cert%s.crt' % index) as stream:
+                assert stream.read() == 'certificate %s' % index
+        # Unchanged files are not downloaded again
+        with open(remote_dir + 'cert0.crt', 'w') as stream:
+            stream.write('changed certificate')
+        os.utime(remote_dir + 'cert0.crt', (0, 0))
+        del LocalSFTP.sent[:]
+        assert scp.download(scp.list_files(remote_dir, local_dir)) == []
+        assert LocalSFTP.sent == [remote_dir + 'cert0.crt']
+        with pytest.raises(IOError):
+            scp.list_file(remote_dir + 'missing.conf',
+                          local_dir + 'missing.conf')
+
+    @pytest.mark.travis
+    def test_scp_partition_certkey_download(self, scp_dirs):
+        remote_dir, local_dir = scp_dirs
+        partition_dir = remote_dir + 'partition'
+        os.makedirs(os.path.join(partition_dir, 'p1'))
+        for name, content in [('a.crt', 'common'), ('p1/a.crt', 'p1'),
+                              ('p1/b.key', 'key'), ('z.crt', 'last')]:
+            with open(os.path.join(partition_dir, name), 'w') as stream:
+                stream.write(content)
+        scp = LocalSCPUtil(workers=3)
+        files = scp.list_partition_certkey(partition_dir,
+                                           local_dir.rstrip(os.sep))
+        # Directories are listed depth first as they are walked
+        assert [remote for remote, _, _ in files] == [
+            partition_dir + os.sep + name
+            for name in ['a.crt', 'p1/a.crt', 'p1/b.key', 'z.crt']]
+        assert scp.download(files) == []
+        # a.crt of subdirectory replaces the one listed before it and is the
+        # only download of that local file
+        assert sorted(LocalSFTP.sent) == [
+            partition_dir + os.sep + name
+            for name in ['p1/a.crt', 'p1/b.key', 'z.crt']]
+        for name, content in [('a.crt', 'p1'), ('b.key', 'key'),
+                              ('z.crt', 'last')]:
+            with open(local_dir + name) as stream:
+                assert stream.read() == content
+
+    @pytest.mark.travis
+    def test_f5_discovery_workers(self):
+        serial = get_f5_inventory_v11(FakeF5Client(20, 3), 1)
+        client = FakeF5Client(20, 3)
+        parallel = get_f5_inventory_v11(client, 4)
+        vs_objects = parallel.get_virtual_services()
+        assert vs_objects == serial.get_virtual_services()
+        # Pools shared by virtual services are loaded once
+        assert sorted(client.pool_loads) == ['pool0', 'pool1', 'pool2']
+        assert sorted(vs_objects) == sorted('vs%s' % index
+                                            for index in range(20))
+        for name, vs_object in vs_objects.iteritems():
+            index = int(name[2:])
+            assert vs_object['destination'] == '10.0.0.%s:80' % index
+            assert vs_object['pool']['members'][0]['name'] == \
+                'pool%s-member' % (index % 3)
+            assert vs_object['pool']['health_monitors'] == ['http']
+            assert vs_object['max_conn'] == {u'value': index}
+        sample = parallel.get_traffic_sample(vs_objects)
+        assert sorted(sample) == sorted(vs_objects)
+        assert all(sample[name]['traffic'] == vs_objects[name]['traffic']
+                   for name in sample)
+        # Results are in order of items, not of completion
+        delays = [0.01 * (9 - index) for index in range(10)]
+        assert parallel.run_concurrently(
+            lambda delay: time.sleep(delay) or delay, delays) == delays
+        failing = get_f5_inventory_v11(FakeF5Client(20, 3, ['vs13']), 4)
+        with pytest.raises(IOError) as error:
+            failing.get_virtual_services()
+        assert 'vs13' in str(error.value)
+
     @pytest.mark.skip_travis
     def test_reboot_clean_for_segroup_v11_17_1_1(self, cleanup):
         """""
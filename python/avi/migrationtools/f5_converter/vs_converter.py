@@ -6,7 +6,9 @@ import avi.migrationtools.f5_converter.converter_constants as final
 from avi.migrationtools.f5_converter.conversion_util import F5Util
 from avi.migrationtools.f5_converter.policy_converter import used_pools
 from avi.migrationtools.avi_migration_utils import update_count
+from avi.migrationtools.avi_config import get_objects_by_name
 from pkg_resources import parse_version
+from avi.migrationtools.progress import progress
 
 LOG = logging.getLogger(__name__)
 # Creating f5 object for util library.
@@ -64,7 +66,7 @@ class VSConfigConv(object):
         avi_config['VSDataScriptSet'] = []
         avi_config['NetworkSecurityPolicy'] = []
         avi_config['VsVip'] = []
-        print "Converting VirtualServices ..."
+        progress.message("Converting VirtualServices ...")
         # Added variable to get total object count.
         total_size = len(vs_config.keys())
         progressbar_count = 0
@@ -475,8 +477,8 @@ class VSConfigConv(object):
                 policy_name, parts[0], mask, tenant)
 
             if nw_policy:
-                old_policy = [obj for obj in avi_config['NetworkSecurityPolicy']
-                              if obj['name'] == nw_policy][0]
+                old_policy = get_objects_by_name(
+                    avi_config['NetworkSecurityPolicy'], nw_policy)[0]
                 policy['rules'][0]['index'] = 2
                 policy['rules'][0]['name'] = 'Rule 2'
                 old_policy['rules'].append(policy['rules'][0])
@@ -601,8 +603,8 @@ class VSConfigConv(object):
         :return:
         """
         for pol_name in vs_policies:
-            policy_obj = [ob for ob in avi_config['HTTPPolicySet'] if ob[
-                'name'] == pol_name]
+            policy_obj = get_objects_by_name(avi_config['HTTPPolicySet'],
+                                             pol_name)
             if policy_obj:
                 if pol_name in used_policy:
                     LOG.debug('Cloning the policy %s for vs %s',
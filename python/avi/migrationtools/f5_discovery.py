@@ -7,8 +7,9 @@ import json
 import yaml
 import xlsxwriter
 import time
+import copy
 from datetime import datetime
-from collections import defaultdict
+from multiprocessing.pool import ThreadPool
 
 try:
     from bigsuds import BIGIP               # version 10
@@ -26,6 +27,9 @@ profile_mappings = {
 
 out_dict = {}
 
+# Number of virtual services or pools sent in a single iControl call
+BATCH_SIZE = 100
+
 
 def get_name_and_entity(url):
     """
@@ -37,10 +41,23 @@ def get_name_and_entity(url):
     return parsed[1], parsed[2]
 
 
+def get_batches(items, size=BATCH_SIZE):
+    """
+    This function defines that split list of names into batches
+    :param items: list of names
+    :param size: number of names in a batch
+    :return: generator of lists of names
+    """
+    items = list(items)
+    for index in xrange(0, len(items), size):
+        yield items[index:index + size]
+
+
 class F5InventoryConv(object):
 
     @classmethod
-    def get_instance(cls, version, host, port, username, password, interval):
+    def get_instance(cls, version, host, port, username, password, interval,
+                     workers=1):
         """
 
         :param version:  version of f5 instance
@@ -48,77 +65,84 @@ class F5InventoryConv(object):
         :param port: port for f5 box
         :param username: username for f5 box
         :param password: password for f5 box
+        :param workers: number of concurrent REST calls for version 11
         :return: object of respective f5 version object.
         """
         if version == '10':
-            return F5InventoryConvV10(host, port, username, password, interval)
+            return F5InventoryConvV10(host, port, username, password,
+                                      interval, workers)
         if version in ['11', '12']:
-            return F5InventoryConvV11(host, port, username, password, interval)
-
-    def get_inventory(self):
-        pass
+            return F5InventoryConvV11(host, port, username, password,
+                                      interval, workers)
 
     def get_all_virtual_service(self):
         pass
 
-    def print_human(self, path, version, ip, interval=1):
-
-        # refactor the data for easy access
-        traffic_global_dict = {}
-        for data in self.avi_object:
-            for k, v in data.iteritems():
-                if data[k].get('traffic'):
-                    entries = data[k]['traffic']
-                    unpacked_entries = { str(k): v[u'value'] for k, v in entries.items() if v.get(u'value', '') is not '' }
-                    if k in traffic_global_dict:
-                        traffic_global_dict[k].append(unpacked_entries)
-                    else:
-                        traffic_global_dict[k] = [unpacked_entries]
-
-                if data[k].get('traffic_list'):
-                    # for types in data[k]['traffic_list']:
-                    unpacked_entries = { types['type']: types['value']['high'] for types in data[k]['traffic_list']}
-                    if k in traffic_global_dict:
-                        traffic_global_dict[k].append(unpacked_entries)
-                    else:
-                        traffic_global_dict[k] = [unpacked_entries]
-    
-        new_traffic_global_dict = {}
+    def get_inventory(self):
+        """
+        This function defines that collect virtual services with two samples
+        of their traffic taken interval minutes apart
+        :return: None
+        """
+        print "Running Sample for 1st time"
+        self.avi_object.append(self.get_virtual_services())
+        time.sleep(60 * int(self.interval))
+        print "Running Sample for 2nd time"
+        self.avi_object.append(self.get_traffic_sample(self.avi_object[0]))
+        self.compute_traffic_rates()
+
+    def get_virtual_services(self):
+        pass
 
-        for k in traffic_global_dict.keys():
-            intermediate = defaultdict(list)
+    def get_traffic_sample(self, vs_objects):
+        pass
 
-            if version == '11':
-                mean_key = ['clientside.curConns']
-                keys =  ['totRequests', 'clientside.totConns',
-                            'clientside.bitsIn', 'clientside.pktsOut']
-            else:
-                mean_key = ['STATISTIC_EPHEMERAL_CURRENT_CONNECTIONS']
-                keys = ['STATISTIC_CLIENT_SIDE_PACKETS_OUT',
-                        'STATISTIC_CLIENT_SIDE_TOTAL_CONNECTIONS',
-                        'STATISTIC_CLIENT_SIDE_BYTES_OUT',
-                        'STATISTIC_CLIENT_SIDE_PACKETS_OUT']
-
-            for subdict in traffic_global_dict[k]:
-                for key, val in subdict.items():
-                    intermediate[key].append(val)
-
-            for key in keys:
-                value = intermediate[key]
-                per_sec =  abs((value[0] - value[1]) / (2 * 60))
-                if k in new_traffic_global_dict:
-                    new_traffic_global_dict[k].update({ key: per_sec})
-                else:
-                    new_traffic_global_dict[k] = { key: per_sec}
+    def get_traffic_values(self, vs_object):
+        """
+        This function defines that return traffic counters of virtual service
+        :param vs_object: virtual service of a sample
+        :return: dict of counter name and value
+        """
+        if vs_object.get('traffic'):
+            return dict((str(k), v[u'value'])
+                        for k, v in vs_object['traffic'].iteritems()
+                        if v.get(u'value', '') is not '')
+        if vs_object.get('traffic_list'):
+            return dict((types['type'], types['value']['high'])
+                        for types in vs_object['traffic_list'])
+        return {}
+
+    def compute_traffic_rates(self):
+        """
+        This function defines that compute per second rates and mean values
+        of traffic counters between the two samples of every virtual service
+        :return: None
+        """
+        if self.version == '11':
+            rate_keys = ['totRequests', 'clientside.totConns',
+                         'clientside.bitsIn', 'clientside.pktsOut']
+            mean_keys = ['clientside.curConns']
+        else:
+            rate_keys = ['STATISTIC_CLIENT_SIDE_PACKETS_OUT',
+                         'STATISTIC_CLIENT_SIDE_TOTAL_CONNECTIONS',
+                         'STATISTIC_CLIENT_SIDE_BYTES_OUT']
+            mean_keys = ['STATISTIC_EPHEMERAL_CURRENT_CONNECTIONS']
+        seconds = 60 * int(self.interval) or 1
+        first, second = self.avi_object[0], self.avi_object[-1]
+        for vs_name, vs_object in first.iteritems():
+            before = self.get_traffic_values(vs_object)
+            after = self.get_traffic_values(second.get(vs_name, vs_object))
+            rates = {}
+            for key in rate_keys:
+                rates[key] = abs(
+                    (before.get(key, 0) - after.get(key, 0)) / seconds)
+            for key in mean_keys:
+                rates[key] = abs((before.get(key, 0) + after.get(key, 0)) / 2)
+            self.traffic_rates[vs_name] = rates
 
-            for key in mean_key:
-                value = intermediate[key]
-                mean_val =abs((value[0] + value[1]) /2)
-                if k in new_traffic_global_dict:
-                    new_traffic_global_dict[k].update({ key: mean_val})
-                else:
-                    new_traffic_global_dict[k] = { key: mean_val}
+    def print_human(self, path, version, ip, interval=1):
 
+        new_traffic_global_dict = self.traffic_rates
 
         # Print the Summary
         workbook = xlsxwriter.Workbook(path + os.sep + '{}_discovery_data.xlsx'.format(ip))
@@ -280,7 +304,7 @@ class F5InventoryConv(object):
                 worksheet.write(row, col, vs['max_conn'], bold)
             
             # write necessary details 
-            if version == '11':
+            if self.version == '11':
                 open_conn = new_traffic_global_dict[vs_name]['clientside.curConns']
                 req_psec = new_traffic_global_dict[vs_name]['totRequests']
                 conn_psec = new_traffic_global_dict[vs_name]['clientside.totConns']
@@ -421,13 +445,15 @@ class F5InventoryConv(object):
 
 class F5InventoryConvV10(F5InventoryConv):
 
-    def __init__(self, host, port, username, password, interval):
+    def __init__(self, host, port, username, password, interval, workers=1):
         self.f5_client = BIGIP(host, port, username, password)
         self.avi_object = []
         self.version = '10'
         self.avi_traffic_object = []
+        self.traffic_rates = {}
         self.interval = interval
         self.port = port
+        self.workers = workers
 
     def get_all_virtual_service(self):
         """
@@ -436,95 +462,106 @@ class F5InventoryConvV10(F5InventoryConv):
         virtual_services = self.f5_client.LocalLB.VirtualServer.get_list()
         return virtual_services
 
-    def get_inventory(self):
-
-        i = 0
-
-        while i < 2:
-            self.avi_object_temp = {}
-            i += 1
-            if i == 1:
-                print "Running Sample for 1st time"
-            else:
-                time.sleep(60 * int(self.interval))
-                print "Running Sample for 2nd time"
-
-            virtual_services = self.get_all_virtual_service()
-            for vs in virtual_services:
-                self.avi_object_temp = {}
+    def get_virtual_services(self):
+        """
+        This function defines that collect details of all virtual services,
+        iControl calls are made for a batch of virtual services at a time
+        :return: dict of virtual service name and details
+        """
+        lb_vs = self.f5_client.LocalLB.VirtualServer
+        vs_objects = {}
+        pools = {}
+        for names in get_batches(self.get_all_virtual_service()):
+            states = lb_vs.get_enabled_state(names)
+            destinations = lb_vs.get_destination(names)
+            persists = lb_vs.get_persistence_profile(names)
+            snat_types = lb_vs.get_snat_type(names)
+            pool_names = lb_vs.get_default_pool_name(names)
+            profiles = lb_vs.get_profile(names)
+            statistics = lb_vs.get_statistics(names)['statistics']
+            for index, vs in enumerate(names):
                 vs_object = {
                     'name': vs
                 }
-                state = self.f5_client.LocalLB.VirtualServer.get_enabled_state([
-                                                                            vs])
-                state = state[0].split('STATE_')[1]
+                state = states[index].split('STATE_')[1]
                 if state == 'ENABLED':
                     vs_object['enabled'] = True
                 else:
                     vs_object['enabled'] = False
-                destination = self.f5_client.LocalLB.VirtualServer.get_destination([
-                    vs])
-                if destination:
-                    vs_object['destination'] = destination
-                persist = self.f5_client.LocalLB.VirtualServer\
-                    .get_persistence_profile([vs])[0]
-                if persist:
-                    persist = [persist_profile['profile_name'] for
-                            persist_profile in persist]
-                    vs_object['persist'] = persist
-                source_address_translation = self.f5_client.LocalLB.VirtualServer\
-                    .get_snat_type([vs])
-                source_address_translation = source_address_translation[0].split(
+                vs_object['destination'] = [destinations[index]]
+                if persists[index]:
+                    vs_object['persist'] = [persist_profile['profile_name']
+                                            for persist_profile in
+                                            persists[index]]
+                source_address_translation = snat_types[index].split(
                     'SNAT_TYPE_')[1]
                 if source_address_translation != 'NONE':
                     vs_object['source_address_translation'] = \
                         source_address_translation
-                pool = self.f5_client.LocalLB.VirtualServer.get_default_pool_name([
-                    vs])[0]
-                exit
+                pool = pool_names[index]
                 if pool:
                     vs_object['pool'] = {
                         'name': pool
                     }
-                    members = self.f5_client.LocalLB.Pool.get_member([pool])[0]
-                    if members:
-                        vs_object['pool']['members'] = members
-                    health_monitors = \
-                        self.f5_client.LocalLB.Pool.get_monitor_instance([pool])[0]
-                    if health_monitors:
-                        monitors = set([monitor['instance']['template_name'] for
-                                        monitor in health_monitors])
-                        vs_object['pool']['health_monitors'] = list(monitors)
-                profiles = self.f5_client.LocalLB.VirtualServer.get_profile([vs])[
-                    0]
-                if profiles:
-                    profiles = [profile['profile_name'] for profile in profiles]
-                    vs_object['profiles'] = profiles
-
-                traffic = self.f5_client.LocalLB.VirtualServer.get_statistics([vs])
-
+                    pools.setdefault(pool, []).append(vs_object['pool'])
+                if profiles[index]:
+                    vs_object['profiles'] = [profile['profile_name'] for
+                                             profile in profiles[index]]
+                traffic = statistics[index]['statistics']
                 max_conn = 0
-
-                for t in traffic['statistics'][0]['statistics']:
-                    if t.get('type') == 'STATISTIC_CLIENT_SIDE_MAXIMUM_CONNECTIONS':
-                        max_conn =  int(t['value']['high'])
-                
+                for t in traffic:
+                    if t.get('type') == \
+                            'STATISTIC_CLIENT_SIDE_MAXIMUM_CONNECTIONS':
+                        max_conn = int(t['value']['high'])
                 vs_object['max_conn'] = max_conn
-
-                if traffic and len(traffic['statistics']):
-                    vs_object['traffic_list'] = traffic['statistics'][0]['statistics']
-                self.avi_object_temp[vs_object['name']] = vs_object
-            self.avi_object.append(self.avi_object_temp)
+                vs_object['traffic_list'] = traffic
+                vs_objects[vs] = vs_object
+        # Members and monitors are read once per pool shared by the services
+        for names in get_batches(pools.keys()):
+            members = self.f5_client.LocalLB.Pool.get_member(names)
+            health_monitors = \
+                self.f5_client.LocalLB.Pool.get_monitor_instance(names)
+            for index, pool in enumerate(names):
+                monitors = list(set(
+                    [monitor['instance']['template_name']
+                     for monitor in health_monitors[index]]))
+                for pool_object in pools[pool]:
+                    if members[index]:
+                        pool_object['members'] = list(members[index])
+                    if monitors:
+                        pool_object['health_monitors'] = list(monitors)
+        return vs_objects
+
+    def get_traffic_sample(self, vs_objects):
+        """
+        This function defines that read statistics of virtual services again,
+        for a batch of virtual services at a time
+        :param vs_objects: dict of virtual service name and details
+        :return: dict of virtual service name and details with new statistics
+        """
+        sample = {}
+        for names in get_batches(vs_objects.keys()):
+            statistics = self.f5_client.LocalLB.VirtualServer.get_statistics(
+                names)['statistics']
+            for index, vs in enumerate(names):
+                vs_object = dict(vs_objects[vs])
+                vs_object['traffic_list'] = statistics[index]['statistics']
+                sample[vs] = vs_object
+        return sample
 
 
 class F5InventoryConvV11(F5InventoryConv):
 
-    def __init__(self, host, port, username, password, interval):
+    def __init__(self, host, port, username, password, interval, workers=1):
         self.f5_client = ManagementRoot(host, username, password, port=port)
         self.avi_object = []
         self.version = '11'
         self.avi_traffic_object = []
+        self.traffic_rates = {}
         self.interval = interval
+        self.workers = workers
+        # Loaded virtual server of every virtual service, to read statistics
+        self.virtual_objs = {}
 
     def get_all_virtual_service(self):
         """
@@ -533,92 +570,138 @@ class F5InventoryConvV11(F5InventoryConv):
         virtual_services = self.f5_client.tm.ltm.virtuals.get_collection()
         return virtual_services
 
-    def get_inventory(self):
-
-        i = 0
-
-        while i < 2:
-            self.avi_object_temp = {}
-            i += 1
-            if i == 1:
-                print "Running Sample for 1st time"
-            else:
-                time.sleep(60 * int(self.interval))
-                print "Running Sample for 2nd time"
-
-            virtual_services = self.get_all_virtual_service()
-            for vs in virtual_services:
-
-                vs_object = {
-                    'name': vs.name,
-                    'partition': vs.partition
+    def run_concurrently(self, func, items):
+        """
+        This function defines that call func for every item in a pool of
+        worker threads, REST calls spend their time waiting on the host
+        :param func: function to call
+        :param items: list of items
+        :return: list of results in order of items
+        """
+        if self.workers > 1 and len(items) > 1:
+            pool = ThreadPool(min(self.workers, len(items)))
+            try:
+                return pool.map(func, items)
+            finally:
+                pool.close()
+                pool.join()
+        return [func(item) for item in items]
+
+    def get_pool(self, pool_key):
+        """
+        This function defines that read health monitors and members of pool
+        :param pool_key: tuple of pool partition and name
+        :return: dict of pool details
+        """
+        pool_partition, pool_name = pool_key
+        pool_object = {}
+        poolobj = self.f5_client.tm.ltm.pools.pool.load(
+            partition=pool_partition, name=pool_name)
+        health_monitors = [get_name_and_entity(monitors.strip())[1]
+                           for monitors in getattr(
+                               poolobj, 'monitor', '').split(' and ')
+                           if monitors]
+        if health_monitors:
+            pool_object['health_monitors'] = health_monitors
+        members = [{'name': pool_member.name,
+                    'address': pool_member.address,
+                    'state': pool_member.state} for
+                   pool_member in poolobj.members_s.get_collection()]
+        if members:
+            pool_object['members'] = members
+        return pool_object
+
+    def get_virtual_service(self, vs, pools):
+        """
+        This function defines that collect details of virtual service
+        :param vs: virtual server of collection
+        :param pools: dict of pool partition and name, and pool details
+        :return: virtual service details
+        """
+        vs_object = {
+            'name': vs.name,
+            'partition': vs.partition
+        }
+        if hasattr(vs, 'enabled'):
+            vs_object['enabled'] = True
+        else:
+            vs_object['enabled'] = False
+        if hasattr(vs, 'destination'):
+            destination_partition, destination_ip = get_name_and_entity(
+                vs.destination)
+            vs_object['destination'] = destination_ip
+        if hasattr(vs, 'persist'):
+            vs_object['persist'] = vs.attrs['persist'][0]
+        source_address_translation = vs.sourceAddressTranslation
+        if source_address_translation.get('type') != 'none':
+            vs_object['source_address_translation'] = \
+                source_address_translation
+        if hasattr(vs, 'pool'):
+            pool_partition, pool_name = get_name_and_entity(vs.pool)
+            if pool_name:
+                vs_object['pool'] = {
+                    'name': pool_name
                 }
-                if hasattr(vs, 'enabled'):
-                    vs_object['enabled'] = True
-                else:
-                    vs_object['enabled'] = False
-                if hasattr(vs, 'destination'):
-                    destination_partition, destination_ip = get_name_and_entity(
-                        vs.destination)
-                    vs_object['destination'] = destination_ip
-                if hasattr(vs, 'persist'):
-                    vs_object['persist'] = vs.attrs['persist'][0]
-                source_address_translation = vs.sourceAddressTranslation
-                if source_address_translation.get('type') != 'none':
-                    vs_object['source_address_translation'] = \
-                        source_address_translation
-                if hasattr(vs, 'pool'):
-                    pool = vs.pool
-                    pool_partition, pool_name = get_name_and_entity(pool)
-                    if pool_name:
-                        vs_object['pool'] = {
-                            'name': pool_name
-                        }
-                        if pool_partition:
-                            vs_object['pool']['partition'] = pool_partition
-                        poolobj = self.f5_client.tm.ltm.pools.pool.load(
-                            partition=pool_partition, name=pool_name)
-                        health_monitors = [get_name_and_entity(monitors.strip())[1]
-                                        for monitors in poolobj.monitor.split(
-                                        ' and ') if monitors]
-                        if health_monitors:
-                            vs_object['pool']['health_monitors'] = health_monitors
-                        members = [{'name': pool_member.name,
-                                    'address': pool_member.address,
-                                    'state': pool_member.state} for
-                                pool_member in
-                                poolobj.members_s.get_collection()]
-                        if members:
-                            vs_object['pool']['members'] = members
-                virtual_obj = self.f5_client.tm.ltm.virtuals.virtual.load(
-                    partition=vs.partition, name=vs.name)
-
-
-                profiles = [profile.name for profile in
-                            virtual_obj.profiles_s.get_collection()]
-
-                if profiles:
-                    vs_object['profiles'] = profiles
-                policies = [policy.name for policy in
-                            virtual_obj.policies_s.get_collection()]
-                if policies:
-                    vs_object['policies'] = policies
-
-                if hasattr(vs, 'rules'):
-                    vs_object['rules'] = vs.rules
-
-                vs_object['traffic'] = virtual_obj.stats.load().entries
-                max_conn = virtual_obj.stats.load().entries.get(u'clientside.maxConns', 0)
-                vs_object['max_conn'] = max_conn
-
-                # if str(vs.name) == 'miska-http':
-                #     print "========  ========"
-                #     print virtual_obj.stats.load().entries
-                #     print "================"
-                    
-                self.avi_object_temp[vs_object['name']] = vs_object
-            self.avi_object.append(self.avi_object_temp)
-        # print 'Inventory: %s' % self.avi_object
+                if pool_partition:
+                    vs_object['pool']['partition'] = pool_partition
+                vs_object['pool'].update(
+                    copy.deepcopy(pools[(pool_partition, pool_name)]))
+        virtual_obj = self.f5_client.tm.ltm.virtuals.virtual.load(
+            partition=vs.partition, name=vs.name)
+        self.virtual_objs[vs.name] = virtual_obj
+
+        profiles = [profile.name for profile in
+                    virtual_obj.profiles_s.get_collection()]
+        if profiles:
+            vs_object['profiles'] = profiles
+        policies = [policy.name for policy in
+                    virtual_obj.policies_s.get_collection()]
+        if policies:
+            vs_object['policies'] = policies
+
+        if hasattr(vs, 'rules'):
+            vs_object['rules'] = vs.rules
+
+        vs_object['traffic'] = virtual_obj.stats.load().entries
+        vs_object['max_conn'] = vs_object['traffic'].get(
+            u'clientside.maxConns', 0)
+        return vs_object
+
+    def get_virtual_services(self):
+        """
+        This function defines that collect details of all virtual services,
+        pools shared by virtual services are read once and REST calls are
+        made concurrently
+        :return: dict of virtual service name and details
+        """
+        virtual_services = self.get_all_virtual_service()
+        pool_keys = list(set(get_name_and_entity(vs.pool)
+                             for vs in virtual_services
+                             if hasattr(vs, 'pool')))
+        pool_keys = [pool_key for pool_key in pool_keys if pool_key[1]]
+        pools = dict(zip(pool_keys,
+                         self.run_concurrently(self.get_pool, pool_keys)))
+        vs_objects = self.run_concurrently(
+            lambda vs: self.get_virtual_service(vs, pools), virtual_services)
+        return dict((vs_object['name'], vs_object)
+                    for vs_object in vs_objects)
+
+    def get_traffic_sample(self, vs_objects):
+        """
+        This function defines that read statistics of virtual services again
+        concurrently, other details are taken from first sample
+        :param vs_objects: dict of virtual service name and details
+        :return: dict of virtual service name and details with new statistics
+        """
+        names = vs_objects.keys()
+        entries = self.run_concurrently(
+            lambda name: self.virtual_objs[name].stats.load().entries, names)
+        sample = {}
+        for name, traffic in zip(names, entries):
+            vs_object = dict(vs_objects[name])
+            vs_object['traffic'] = traffic
+            sample[name] = vs_object
+        return sample
 
 
 if __name__ == '__main__':
@@ -650,6 +733,12 @@ if __name__ == '__main__':
                         help='f5 host port id non default port is used ',
                         default=443)
 
+    parser.add_argument('--workers', type=int, default=1,
+                        help='Number of concurrent REST calls made to f5 '
+                             'version 11 host [default 1], version 10 '
+                             'details are read in batches of virtual '
+                             'services')
+
     args = parser.parse_args()
     if not args.f5_ip:
         print 'Please provide f5 host'
@@ -670,7 +759,8 @@ if __name__ == '__main__':
                                                      args.f5_port,
                                                      args.f5_user,
                                                      args.f5_password,
-                                                     args.interval)
+                                                     args.interval,
+                                                     args.workers)
     f5_inventory_conv.get_inventory()
 
     f5_inventory_conv.print_human(
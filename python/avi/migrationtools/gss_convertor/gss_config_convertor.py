@@ -2,9 +2,10 @@ import logging
 import os
 import copy
 import sys
-from gss_parser import parser
+from gss_parser import child_ref, iter_parsed
 from avi.migrationtools.gss_convertor.gss_utils import printProgressBar,\
     excel_dict_create, set_total_stats
+from avi.migrationtools.progress import progress
 
 file_loc = os.path.split(os.path.abspath(__file__))[0]
 sep = os.path.sep
@@ -20,12 +21,44 @@ def find_location(list_val, find_val, type_val):
     return -1
 
 
+def get_first(by_name, type_val, name):
+    """ Returns first parsed object of the type having the name, which is
+        the one marked when an object is referred by its name
+    """
+    return by_name[type_val][name][0]
+
+
 def config_converter(file_name):
     """ The conversion from parsed output goes here """
 
-    # trying to access the parser function on the fly and load the data
-    # to a local variable
-    parsed_output, excel_dict = parser(file_name)
+    # parsed objects are taken from the parser as they are read, objects
+    # of every type are indexed by name in order of the configuration
+    parsed_output = dict((key, []) for key in child_ref)
+    by_name = dict((key, dict()) for key in child_ref)
+    for ref, parsed in iter_parsed(file_name):
+        parsed_output[ref].append(parsed)
+        if ref in parsed:
+            by_name[ref].setdefault(parsed[ref], []).append(parsed)
+        if ref == 'answer vip':
+            # jut to parse the stuffs
+            try:
+                get_first(by_name, ref, parsed[ref])['hang'] = 'n'
+                try:
+                    excel_dict_create(parsed, 'vip', 'success')
+                except:
+                    pass
+            except:
+                # excel_dict_create(vip, 'vip', 'failed')
+                # print vip
+                pass
+        elif ref == 'source-address-list':
+            # passing source-address-list
+            try:
+                get_first(by_name, ref, parsed[ref])['hang'] = 'n'
+                excel_dict_create(parsed, 'source-address-list', 'success')
+            except Exception as e:
+                progress.message("Failed for %s" % (parsed,))
+                progress.message("Exception %s" % e)
 
     # top to button approach huh !!!
     # 1. Create a combined json with internal depencies
@@ -35,7 +68,7 @@ def config_converter(file_name):
     total_failed = 0
 
     LOG.info('Internal Conversion Started')
-    print "Converting the Parsed output ...."
+    progress.message("Converting the Parsed output ....")
 
     # Holding this feature for confirmation from Sumant or Gauvrav
     # failed_checks = 3
@@ -45,39 +78,6 @@ def config_converter(file_name):
 
     # sys.exit()
 
-    # jut to parse the stuffs
-    for vip in parsed_output['answer vip']:
-        try:
-            loc = find_location(parsed_output['answer vip'],
-                                vip['answer vip'],
-                                'answer vip')
-            parsed_output['answer vip'][loc]['hang'] = 'n'
-            try:
-                excel_dict_create(vip, 'vip', 'success')
-            except:
-                pass
-        except:
-            # excel_dict_create(vip, 'vip', 'failed')
-            # print vip
-            pass
-
-    future = 0
-    # passing source-address-list
-    for source in parsed_output['source-address-list']:
-        # print source
-        future += 1
-        try:
-            # print source['source-address-list']
-            loc = find_location(parsed_output['source-address-list'],
-                                source['source-address-list'],
-                                'source-address-list')
-            parsed_output['source-address-list'][loc]['hang'] = 'n'
-            # print parsed_output['source-address-list'][loc]['hang']
-            excel_dict_create(source, 'source-address-list', 'success')
-        except Exception as e:
-            print "Failed for ", source
-            print "Exception", str(e)
-
     combined_dict = {}
 
     for rule in parsed_output['dns rule']:
@@ -95,65 +95,52 @@ def config_converter(file_name):
                          prefix='Progress', suffix='')
         iteration += 1
 
-        for dns in parsed_output['dns rule']:
+        for dns in by_name['dns rule'][keys]:
             dns_rule_name = dns['dns rule']
-            loc = find_location(parsed_output['dns rule'], dns['dns rule'],
-                                'dns rule')
-            parsed_output['dns rule'][loc]['hang'] = 'n'
-
-            if keys == dns['dns rule']:
-                combined_dict[keys] = dns
-
-                # for adding domain-list
-                for domain in parsed_output['domain-list']:
-                    if domain['domain-list'] == \
-                            combined_dict[keys]['domain-list']:
-                        loc = find_location(parsed_output['domain-list'],
-                                            domain['domain-list'],
-                                            'domain-list')
-                        parsed_output['domain-list'][loc]['hang'] = 'n'
-                        combined_dict[keys].update(domain)
-                        # updating the excel sheet
-                        excel_dict_create(domain, 'domain', 'success',
+            combined_dict[keys] = dns
+
+            # for adding domain-list
+            domain_name = combined_dict[keys]['domain-list']
+            for domain in by_name['domain-list'].get(domain_name, []):
+                get_first(by_name, 'domain-list', domain_name)['hang'] = 'n'
+                combined_dict[keys].update(domain)
+                # updating the excel sheet
+                excel_dict_create(domain, 'domain', 'success',
+                                  dns_rule_name)
+
+            # for adding answer-group
+            # fix for clause erroring out in large files
+            try:
+                for index, clause in enumerate(dns['clause']):
+                    group_name = clause['vip-group']
+                    for group in by_name['answer-group'].get(group_name, []):
+                        get_first(by_name, 'answer-group',
+                                  group_name)['hang'] = 'n'
+                        combined_dict[keys]['clause'][index].update(group)
+                        # updating the excel dict
+                        excel_dict_create(group, 'answer', 'success',
                                           dns_rule_name)
-
-                # for adding answer-group
-                # fix for clause erroring out in large files
-                try:
-                    for index, clause in enumerate(dns['clause']):
-                        for group in parsed_output['answer-group']:
-                            # print group
-                            if group['answer-group'] == clause['vip-group']:
-                                loc = find_location(
-                                    parsed_output['answer-group'],
-                                    group['answer-group'],
-                                    'answer-group')
-                                parsed_output['answer-group'][loc]['hang'] \
-                                    = 'n'
-                                combined_dict[keys]['clause'][index].\
-                                    update(group)
-                                # updating the excel dict
-                                excel_dict_create(group, 'answer', 'success',
-                                                  dns_rule_name)
-                    excel_dict_create(dns, 'dns', 'success', dns_rule_name)
-                except:
-                    # updating the excel dict
-                    parsing_failed_count += 1
-                    excel_dict_create(dns, 'dns', 'skip', dns_rule_name)
-                    LOG.debug("Parsing Failed for %s" % (dns))
-
-                # for addign source address list
-                for source in parsed_output['source-address-list']:
-                    if source['source-address-list'] == \
-                            combined_dict[keys]['source-address-list']:
-                        loc = find_location(
-                            parsed_output['source-address-list'],
-                            source['source-address-list'],
-                            'source-address-list')
-                        parsed_output['source-address-list'][loc]['hang'] = 'n'
-                        excel_dict_create(source, 'source-address-list',
-                                          'success', dns_rule_name)
-                        combined_dict[keys].update(source)
+                excel_dict_create(dns, 'dns', 'success', dns_rule_name)
+            except:
+                # updating the excel dict
+                parsing_failed_count += 1
+                excel_dict_create(dns, 'dns', 'skip', dns_rule_name)
+                LOG.debug("Parsing Failed for %s" % (dns))
+
+            # for addign source address list
+            source_name = combined_dict[keys]['source-address-list']
+            for source in by_name['source-address-list'].get(source_name,
+                                                             []):
+                get_first(by_name, 'source-address-list',
+                          source_name)['hang'] = 'n'
+                excel_dict_create(source, 'source-address-list',
+                                  'success', dns_rule_name)
+                combined_dict[keys].update(source)
+
+    # rules are merged with their domain lists and source address lists,
+    # which changes their hang status
+    for rules in by_name['dns rule'].itervalues():
+        rules[0]['hang'] = 'n'
 
     combined_dict_temp = copy.deepcopy(combined_dict)
 
@@ -11,6 +11,7 @@ import avi.migrationtools
 from avi.migrationtools.gss_convertor.gss_config_convertor import \
                                                     config_converter
 from avi.migrationtools.avi_converter import AviConverter
+from avi.migrationtools.progress import progress, PROGRESS_MODES
 from avi.migrationtools.gss_convertor.gss_utils import get_excel_dict,\
                                             get_total_stats, set_total_stats
 from pkg_resources import resource_filename
@@ -185,11 +186,11 @@ class GssConvertor(AviConverter):
 
         # printing  stats
         stats = get_total_stats()
-        print "==========================="
-        print "==========Report =========="
-        print "==========================="
+        progress.message("===========================")
+        progress.message("==========Report ==========")
+        progress.message("===========================")
         for key in stats:
-            print "%s: %s" % (key, stats[key])
+            progress.message("%s: %s" % (key, stats[key]))
 
     def gss_converter(self):  # (self, in_file, out_loc, tenant):
         """ Call the main converter class """
@@ -215,6 +216,7 @@ Mandatory
 :param output_file : the output file that needs to be generated
 
 Optional:
+:param progress: (bar, quiet, json) How progress is reported
 :param tenant: Tenant for which config need to be converted
 :param version: version of the controller (optional)
             '''
@@ -229,6 +231,11 @@ Optional:
     parser.add_argument('-o', '--output_loc',
                         help='Out file location')
 
+    parser.add_argument('--progress', choices=PROGRESS_MODES, default='bar',
+                        help='Show progress and messages as bar, hide them '
+                             'or write them to stderr as json lines with '
+                             'phase timings')
+
     parser.add_argument('-t', '--tenant', default='admin',
                         help='Out file name')
 
@@ -251,8 +258,10 @@ Optional:
             os.makedirs(pargs.output_loc)
 
         # initiate logging
+        progress.configure(pargs.progress)
         gss_converter.init_logger_path()
         gss_converter.gss_converter()
+        progress.report_phase_timings()
 
         # print the totalrun time
         elapsed = time.time() - starttime
@@ -260,7 +269,7 @@ Optional:
             elapsed_time = str(elapsed)[:3] + " Seconds"
         else:
             elapsed_time = str(elapsed/60)[:4] + " Minutes"
-        print "\n(Elapsed Time: " + elapsed_time + ")"
+        progress.message("\n(Elapsed Time: " + elapsed_time + ")")
 
     elif pargs.input_file is None:
         print "Fatal: Enter a input file"
@@ -1,11 +1,13 @@
 import os
+import re
 import sys
 import logging
 from pyparsing import alphanums, alphas, nums, Group, ZeroOrMore, printables,\
     quotedString, Keyword, Word, Optional, Combine, Empty, replaceWith,\
-    Literal
+    Literal, ParseException
 from avi.migrationtools.gss_convertor.gss_utils import printProgressBar,\
-                                                set_total_stats, set_excel_dict
+                                set_total_stats, set_excel_dict, get_excel_dict
+from avi.migrationtools.progress import progress
 
 file_loc = os.path.split(os.path.abspath(__file__))[0]
 sep = os.path.sep
@@ -13,6 +15,22 @@ file_loc_sep = os.path.split(os.path.abspath(__file__))[0] + sep
 
 LOG = logging.getLogger('%slog%sconversion.log' % (file_loc_sep, sep))
 
+# Sub command of every top level command
+child_ref = {
+    'source-address-list': 'ip address',
+    'domain-list': 'domain',
+    'answer vip': 'keepalive',
+    'answer-group': 'answer-add',
+    'dns rule': 'clause'
+}
+# Line starting a top level command, the lines up to the next one are its
+# sub commands
+COMMAND_START = re.compile(
+    r'\s*(source-address-list|domain-list|answer vip|answer-group|dns rule)'
+    r'(?=\s|$)')
+# Grammers of top level commands, created on first use
+grammers = None
+
 
 def parse(val):
     ''' This function pairs the value 1st value to "key"
@@ -28,15 +46,10 @@ def parse(val):
         return config_dict
 
 
-def parser(file_name):
-    """ Parsing goes here """
-    LOG.info('Parser Started')
-
-    with open(file_name, 'r') as input_config:
-        input_data = input_config.read()
-        input_config.seek(0, 2)
-        file_size = input_config.tell()
-
+def create_grammers():
+    """ Grammers of top level commands along with their sub commands
+        :return dict of first keyword to grammer of command
+    """
     # grammer def:1 source-address-list Anywhere owner System
     key = Keyword("source-address-list")
     name = Word(printables)
@@ -198,69 +211,113 @@ def parser(file_name):
                       count_val + Optional(sticky_key + sticky_val) +
                       mr_key + mr_val + state_key)
 
-    testing = Group(
-                grammer1 + ZeroOrMore(grammer2)) | Group(
-                grammer3 + ZeroOrMore(grammer4)) | Group(
-                grammer5 + ZeroOrMore(grammer6)) | Group(
-                grammer7 + ZeroOrMore(grammer8)) | Group(
-                grammer9 + ZeroOrMore(grammer10))
-
     LOG.info('Grammar Generated')
-
-    child_ref = {
-        'source-address-list': 'ip address',
-        'domain-list': 'domain',
-        'answer vip': 'keepalive',
-        'answer-group': 'answer-add',
-        'dns rule': 'clause'
+    return {
+        'source-address-list': Group(grammer1 + ZeroOrMore(grammer2)),
+        'domain-list': Group(grammer3 + ZeroOrMore(grammer4)),
+        'answer vip': Group(grammer5 + ZeroOrMore(grammer6)),
+        'answer-group': Group(grammer7 + ZeroOrMore(grammer8)),
+        'dns rule': Group(grammer9 + ZeroOrMore(grammer10))
     }
 
+
+def get_grammers():
+    """ Grammers of top level commands, created once and shared by all
+        the parsed files
+    """
+    global grammers
+    if grammers is None:
+        grammers = create_grammers()
+    return grammers
+
+
+def read_commands(input_config):
+    """ Reads configuration one top level command at a time along with the
+        lines of its sub commands, lines before the first command are
+        skipped
+        :param input_config: configuration file object
+        :return generator of tuple of keyword, text and end offset of command
+    """
+    keyword = None
+    lines = []
+    offset = 0
+    for line in input_config:
+        match = COMMAND_START.match(line)
+        if match:
+            if keyword:
+                yield keyword, ''.join(lines), offset
+            keyword = match.group(1)
+            lines = [line]
+        elif keyword:
+            lines.append(line)
+        offset += len(line)
+    if keyword:
+        yield keyword, ''.join(lines), offset
+
+
+def iter_parsed(file_name):
+    """ Parses the file one top level command at a time, so that objects
+        are converted as they are read
+        :param file_name: configuration file
+        :return generator of tuple of command keyword and parsed object
+    """
+    LOG.info('Parser Started')
+    command_grammers = get_grammers()
+    file_size = os.path.getsize(file_name)
     excel_dict = dict()
+    set_excel_dict(excel_dict)
 
-    out_dict = {'source-address-list': [], 'domain-list': [], 'answer vip': [],
-                'answer-group': [], 'dns rule': []}
-
-    ref = ''
-
-    print "Parsing the File ..."
-
-    total_parse_count = 0
-    c = 0
-
-    for match, start, end in testing.scanString(input_data):
-
-        # incrementing total object count for reporting
-        total_parse_count += 1
-
-        matched = match.asList()
-        type = matched[0][0][0]
-        name = matched[0][0][1]
-        excel_dict[type + '-' + name] = {'type': type, 'name': name, 'status': '',
-                            'na': '', 'skipped': ''}
-        msg = 'Parsing Entity [ ' + matched[0][0][0] + '->' +\
-              matched[0][0][1] + ']'
-        printProgressBar(end, file_size, msg,
-                         prefix='Progress', suffix='')
-
-        # dictonary creation
-        start = True
-        for line in matched[0]:
-            out = 'Parsing [ ' + line[0] + '->' + line[1] + ']'
-            LOG.debug(out)
-            # print matched[0]
-            if start:
-                ref = line[0]
-                parent = parse(line)
-                start = False
-            else:
-                child = parse(line)
-                if child_ref[ref] not in parent:
-                    parent[str(child_ref[ref])] = [child]
-                else:
-                    parent[str(child_ref[ref])].append(child)
-        out_dict[ref].append(parent)
+    progress.message("Parsing the File ...")
+
+    with open(file_name, 'r') as input_config:
+        for keyword, command, end in read_commands(input_config):
+            try:
+                match = command_grammers[keyword].parseString(command)
+            except ParseException:
+                LOG.debug('Skipped unsupported command: %s' %
+                          command.split('\n', 1)[0])
+                continue
+            ref, parent = parse_match(match.asList(), excel_dict)
+            printProgressBar(end, file_size, '', prefix='Progress',
+                             suffix='')
+            yield ref, parent
 
     LOG.info('Config File Parsed')
-    set_excel_dict(excel_dict)
 
-    return out_dict, excel_dict
+
+def parse_match(matched, excel_dict):
+    """ Converts match of a command into parsed object
+        :param matched: match of grammer as list
+        :param excel_dict: excel sheet rows by type and name
+        :return tuple of command keyword and parsed object
+    """
+    type = matched[0][0][0]
+    name = matched[0][0][1]
+    excel_dict[type + '-' + name] = {'type': type, 'name': name, 'status': '',
+                        'na': '', 'skipped': ''}
+
+    # dictonary creation
+    start = True
+    for line in matched[0]:
+        out = 'Parsing [ ' + line[0] + '->' + line[1] + ']'
+        LOG.debug(out)
+        # print matched[0]
+        if start:
+            ref = line[0]
+            parent = parse(line)
+            start = False
+        else:
+            child = parse(line)
+            if child_ref[ref] not in parent:
+                parent[str(child_ref[ref])] = [child]
+            else:
+                parent[str(child_ref[ref])].append(child)
+    return ref, parent
+
+
+def parser(file_name):
+    """ Parsing goes here """
+    out_dict = dict((key, []) for key in child_ref)
+    for ref, parent in iter_parsed(file_name):
+        out_dict[ref].append(parent)
+    return out_dict, get_excel_dict()
@@ -1,6 +1,7 @@
 import unittest
 import os
 import json
+import tempfile
 
 import avi.migrationtools.gss_convertor.gss_convertor as convertor
 import avi.migrationtools.gss_convertor.gss_parser as parser
@@ -62,6 +63,38 @@ class SimpleTest(unittest.TestCase):
             output = json.load(reader)
         self.assertEqual(len(output.get('GslbService', [])), 2)
 
+    def test_parse_commands(self):
+        ''' each top level command is parsed with its sub commands '''
+        config = (
+            'gss-version 4.1\n'
+            'answer vip 10.1.1.1 name web1 location "DC1" '
+            'manual-reactivation disable activate\n'
+            '  keepalive type icmp ip-address 10.1.1.1\n'
+            'answer-group AG-WEB owner System type vip\n'
+            '  answer-add 10.1.1.1 name web1 weight 1 order 1 '
+            'load-threshold 254 activate\n'
+            'dns rule RULE-WWW owner System source-address-list Anywhere '
+            'domain-list DL-WWW activate\n'
+            '  query a\n'
+            '  clause 1 vip-group AG-WEB method ordered ttl 20 count 1 '
+            'manual-reactivation disable activate\n')
+        with tempfile.NamedTemporaryFile() as config_file:
+            config_file.write(config)
+            config_file.flush()
+            out_dict, excel_dict = parser.parser(config_file.name)
+        self.assertIs(parser.get_grammers(), parser.get_grammers())
+        self.assertEqual(out_dict['answer vip'][0]['keepalive'],
+                         [{'keepalive': 'type icmp', 'ip-address': '10.1.1.1',
+                           'hang': 'y'}])
+        self.assertEqual(out_dict['answer-group'][0]['answer-add'][0]['name'],
+                         'web1')
+        rule = out_dict['dns rule'][0]
+        self.assertEqual((rule['query'], rule['clause'][0]['vip-group']),
+                         ('a', 'AG-WEB'))
+        self.assertEqual(sorted(excel_dict),
+                         ['answer vip-10.1.1.1', 'answer-group-AG-WEB',
+                          'dns rule-RULE-WWW'])
+
 
 if __name__ == '__main__':
     # Start the unit test cases
@@ -18,6 +18,7 @@ from avi.migrationtools.netscaler_converter.profile_converter import \
     app_merge_count
 from avi.migrationtools.netscaler_converter.ns_util import NsUtil
 from avi.migrationtools.avi_migration_utils import update_count
+from avi.migrationtools.avi_config import AviObjectList, get_objects_by_name
 
 LOG = logging.getLogger(__name__)
 tmp_policy_ref = []
@@ -89,7 +90,7 @@ class CsvsConverter(object):
         ns_sg = ns_config.get('add serviceGroup', {})
         lbvs_avi_conf = avi_config['VirtualService']
         lb_vs_mapped = []
-        cs_vs_list = []
+        cs_vs_list = AviObjectList()
         # get the total size of object.
         self.progressbar_count = len(lb_vs_conf)
         self.total_size = len(lb_vs_conf) + len(cs_vs_conf)
@@ -307,9 +308,9 @@ class CsvsConverter(object):
                 elif not http_prof and (cs_vs['attrs'][1]).upper() == 'SSL':
                     # Added Custom Profile with http to https redirect enable
                     ns_migration_profile = ns_util.create_http_to_https_custom_profile()
-                    app_name = [app_p for app_p in avi_config[
-                        'ApplicationProfile'] if app_p[
-                        'name']==ns_migration_profile['name']]
+                    app_name = get_objects_by_name(
+                        avi_config['ApplicationProfile'],
+                        ns_migration_profile['name'])
                     if not app_name:
                         avi_config['ApplicationProfile'].append(ns_migration_profile)
                     vs_obj['application_profile_ref'] = ns_util.get_object_ref(
@@ -363,17 +364,16 @@ class CsvsConverter(object):
                             # Added prefix for objects
                             if self.prefix:
                                 ckname = self.prefix + '-' + ckname
-                            if [obj for obj in avi_config[
-                                'SSLKeyAndCertificate'] if obj['name'] ==
-                                ckname]:
+                            if get_objects_by_name(
+                                avi_config['SSLKeyAndCertificate'], ckname):
                                 updated_ssl_ref = \
                                     ns_util.get_object_ref(ckname,
                                         OBJECT_TYPE_SSL_KEY_AND_CERTIFICATE,
                                         self.tenant_name)
                                 vs_obj[avi_ssl_ref] = [updated_ssl_ref]
-                            elif [obj for obj in avi_config[
-                                  'SSLKeyAndCertificate'] if obj['name'] ==
-                                  ckname + '-dummy']:
+                            elif get_objects_by_name(
+                                avi_config['SSLKeyAndCertificate'],
+                                ckname + '-dummy'):
                                 updated_ssl_ref = \
                                     ns_util.get_object_ref(ckname + '-dummy',
                                         OBJECT_TYPE_SSL_KEY_AND_CERTIFICATE,
@@ -497,8 +497,8 @@ class CsvsConverter(object):
                         policy_ref = policy_attr.get('http_policy_set_ref')
                         policy_name = ns_util.get_name(policy_ref) if \
                                         policy_ref else None
-                        policy_objs = [ob for ob in avi_config['HTTPPolicySet']
-                                      if ob['name'] == policy_name]
+                        policy_objs = get_objects_by_name(
+                            avi_config['HTTPPolicySet'], policy_name)
                         policy_obj = policy_objs[0] if policy_objs else {}
                         if policy_obj:
                             ns_util.add_policy(policy_obj, updated_vs_name,
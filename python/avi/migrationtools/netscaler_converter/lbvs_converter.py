@@ -17,6 +17,8 @@ from avi.migrationtools.netscaler_converter.monitor_converter \
     import merge_object_mapping
 from avi.migrationtools.netscaler_converter.ns_util import NsUtil
 from avi.migrationtools.avi_migration_utils import update_count
+from avi.migrationtools.avi_config import get_objects_by_name
+from avi.migrationtools.progress import progress
 
 LOG = logging.getLogger(__name__)
 redirect_pools = {}
@@ -100,7 +102,7 @@ class LbvsConverter(object):
             self.lbvs_skip_attrs, self.lbvs_na_attrs, self.lbvs_ignore_vals,
             self.lbvs_user_ignore, self.prefix)
 
-        print "Converting VirtualServices..."
+        progress.message("Converting VirtualServices...")
         for key in lb_vs_conf.keys():
             try:
                 LOG.debug('LB VS conversion started for: %s' % key)
@@ -148,9 +150,8 @@ class LbvsConverter(object):
                 if self.prefix:
                     pool_group_name = self.prefix + '-' + pool_group_name
                 pool_group_name = re.sub('[:]', '-', pool_group_name)
-                pool_group = [pool_group for pool_group in
-                              avi_config.get("PoolGroup", [])
-                              if pool_group['name'] == pool_group_name]
+                pool_group = get_objects_by_name(
+                    avi_config.get("PoolGroup", []), pool_group_name)
                 pool_group_ref = None
                 if pool_group:
                     pool_group_ref = pool_group_name
@@ -259,9 +260,8 @@ class LbvsConverter(object):
                                             self.tenant_name, self.cloud_name,
                                             userprefix=self.prefix)
                     pool_group_ref = re.sub('[:]', '-', pool_group_ref)
-                    updated_pool_group = [pg for pg in
-                                          avi_config.get('PoolGroup', [])
-                                          if pg['name'] == pool_group_ref]
+                    updated_pool_group = get_objects_by_name(
+                        avi_config.get('PoolGroup', []), pool_group_ref)
                     vs_obj['pool_group_ref'] = ns_util.get_object_ref(
                                         pool_group_ref, OBJECT_TYPE_POOL_GROUP,
                                         self.tenant_name, self.cloud_name)
@@ -367,9 +367,9 @@ class LbvsConverter(object):
                 elif not http_prof and (lb_vs['attrs'][1]).upper() == 'SSL':
                     # Added Custom Profile with http to https redirect enable
                     ns_migration_profile = ns_util.create_http_to_https_custom_profile()
-                    app_name = [app_p for app_p in avi_config[
-                        'ApplicationProfile'] if app_p[
-                                    'name'] == ns_migration_profile['name']]
+                    app_name = get_objects_by_name(
+                        avi_config['ApplicationProfile'],
+                        ns_migration_profile['name'])
                     if not app_name:
                         avi_config['ApplicationProfile'].append(
                             ns_migration_profile)
@@ -448,9 +448,9 @@ class LbvsConverter(object):
                         if self.prefix:
                             backup_pool_group_ref = self.prefix + '-' + \
                                                     backup_pool_group_ref
-                        backup_pool_group = [
-                            pg for pg in avi_config.get("PoolGroup", [])
-                            if pg['name'] == backup_pool_group_ref]
+                        backup_pool_group = get_objects_by_name(
+                            avi_config.get("PoolGroup", []),
+                            backup_pool_group_ref)
 
                         backup_pool_ref = ns_util.get_name(
                             backup_pool_group[0]['members'][0]['pool_ref']
@@ -611,16 +611,15 @@ class LbvsConverter(object):
                             ckname = mapping['certkeyName']
                             if self.prefix:
                                 ckname = self.prefix + '-' + ckname
-                            if [obj for obj in
-                                avi_config['SSLKeyAndCertificate']
-                                if obj['name'] == ckname]:
+                            if get_objects_by_name(
+                                avi_config['SSLKeyAndCertificate'], ckname):
                                 updated_ssl_ref = ns_util.get_object_ref(ckname,
                                     OBJECT_TYPE_SSL_KEY_AND_CERTIFICATE,
                                     self.tenant_name)
                                 vs_obj[avi_ssl_ref] = [updated_ssl_ref]
-                            elif [obj for obj in
-                                  avi_config['SSLKeyAndCertificate']
-                                  if obj['name'] == ckname + '-dummy']:
+                            elif get_objects_by_name(
+                                avi_config['SSLKeyAndCertificate'],
+                                ckname + '-dummy'):
                                 updated_ssl_ref = ns_util.get_object_ref(
                                     ckname + '-dummy',
                                     OBJECT_TYPE_SSL_KEY_AND_CERTIFICATE,
@@ -711,8 +710,7 @@ class LbvsConverter(object):
         attached_flag = False
         for pool_ref in pool_group['members']:
             pool_ref = pool_ref['pool_ref'].split('&')[1].split('=')[1]
-            pool = [pool for pool in avi_config['Pool'] if
-                    pool['name'] == pool_ref]
+            pool = get_objects_by_name(avi_config['Pool'], pool_ref)
             if pool:
                 pool_obj = pool[0]
                 persist_ref_key = "application_persistence_profile_ref"
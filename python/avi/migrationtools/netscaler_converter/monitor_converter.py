@@ -8,6 +8,7 @@ from avi.migrationtools.netscaler_converter.ns_constants \
 from avi.migrationtools.netscaler_converter.ns_util import NsUtil
 from pkg_resources import parse_version
 from avi.migrationtools.avi_migration_utils import update_count
+from avi.migrationtools.progress import progress
 
 
 LOG = logging.getLogger(__name__)
@@ -75,7 +76,7 @@ class MonitorConverter(object):
         ns_monitors = ns_config.get('add lb monitor', {})
         total_size = len(ns_monitors.keys())
         count = 0
-        print "Converting Monitors..."
+        progress.message("Converting Monitors...")
         for name in ns_monitors.keys():
             count = count + 1
             ns_monitor = ns_monitors.get(name)
@@ -19,6 +19,8 @@ from avi.migrationtools.avi_converter import AviConverter
 from avi.migrationtools.netscaler_converter import ns_util as nsu
 from avi.migrationtools.netscaler_converter.ns_util import NsUtil
 from avi.migrationtools.avi_migration_utils import update_count
+from avi.migrationtools.avi_config import AviConfig
+from avi.migrationtools.progress import progress
 
 
 LOG = logging.getLogger(__name__)
@@ -28,7 +30,8 @@ ns_util = NsUtil()
 def convert(meta, ns_config_dict, tenant_name, cloud_name, version, output_dir,
             input_dir, skipped_cmds, vs_state, object_merge_check,report_name,
             prefix, vs_name_dict, profile_path, redirect, key_passphrase=None,
-            user_ignore={}, vs_level_status=False, vrf=None, segroup=None):
+            user_ignore={}, vs_level_status=False, vrf=None, segroup=None,
+            report_format=None):
     """
     This functions defines that it convert service/servicegroup to pool
     Convert pool group of netscalar bind lb vserver configuration
@@ -46,6 +49,7 @@ def convert(meta, ns_config_dict, tenant_name, cloud_name, version, output_dir,
     :param key_passphrase: path of passphrase yaml file
     :param user_ignore: Dict of user ignore attributes
     :param vs_level_status: Add columns of vs reference overall skipped settings
+    :param report_format: Additional formats of conversion status report
     :return: None
     """
 
@@ -58,8 +62,8 @@ def convert(meta, ns_config_dict, tenant_name, cloud_name, version, output_dir,
     cloud_ref = ns_util.get_object_ref(cloud_name, 'cloud')
     try:
         # call meta from super class
-        avi_config = dict()
-        sys_dict = dict()
+        avi_config = AviConfig()
+        sys_dict = AviConfig()
         avi_config['META'] = meta  # avi_obj.meta(tenant_name, version)
 
         merge_object_type = ['ApplicationProfile', 'NetworkProfile',
@@ -124,7 +128,8 @@ def convert(meta, ns_config_dict, tenant_name, cloud_name, version, output_dir,
         ns_util.merge_pool(avi_config)
         # Add/update CSV/report
         ns_util.add_complete_conv_status(ns_config_dict, output_dir, avi_config,
-                                         report_name, vs_level_status)
+                                         report_name, vs_level_status,
+                                         report_format)
         LOG.debug('Conversion completed successfully')
         ns_util.cleanup_config(tmp_avi_config)
         ns_util.cleanup_dupof(avi_config)
@@ -139,15 +144,16 @@ def convert(meta, ns_config_dict, tenant_name, cloud_name, version, output_dir,
                         LOG.info('Total Objects of %s : %s (%s full conversions)'
                                  % (key,len(avi_config[key]),
                                     nsu.fully_migrated))
-                        print 'Total Objects of %s : %s (%s full conversions)'\
-                              % (key, len(avi_config[key]),
-                                 nsu.fully_migrated)
+                        progress.message(
+                            'Total Objects of %s : %s (%s full conversions)'
+                            % (key, len(avi_config[key]),
+                               nsu.fully_migrated))
                     else:
                         LOG.info(
                             'Total Objects of %s : %s'
                             % (key, len(avi_config[key])))
-                        print 'Total Objects of %s : %s' \
-                              % (key, len(avi_config[key]))
+                        progress.message('Total Objects of %s : %s'
+                                         % (key, len(avi_config[key])))
 
                     continue
                 # Added code to print merged count.
@@ -159,7 +165,7 @@ def convert(meta, ns_config_dict, tenant_name, cloud_name, version, output_dir,
                          abs(profile_converter.ssl_merge_count) +
                          len(avi_config[key]))
                     LOG.info(profile_merged_message)
-                    print profile_merged_message
+                    progress.message(profile_merged_message)
                     continue
                 elif object_merge_check and key == 'ApplicationProfile':
                     profile_merged_message = \
@@ -169,7 +175,7 @@ def convert(meta, ns_config_dict, tenant_name, cloud_name, version, output_dir,
                          abs(app_merge_count['count']) +
                          len(avi_config[key]))
                     LOG.info(profile_merged_message)
-                    print profile_merged_message
+                    progress.message(profile_merged_message)
                     continue
                 elif object_merge_check and key == 'NetworkProfile':
                     profile_merged_message = \
@@ -179,7 +185,7 @@ def convert(meta, ns_config_dict, tenant_name, cloud_name, version, output_dir,
                          abs(profile_converter.network_merge_count) +
                          len(avi_config[key]))
                     LOG.info(profile_merged_message)
-                    print profile_merged_message
+                    progress.message(profile_merged_message)
                     continue
                 elif object_merge_check and key == \
                         'ApplicationPersistenceProfile':
@@ -190,7 +196,7 @@ def convert(meta, ns_config_dict, tenant_name, cloud_name, version, output_dir,
                          abs(app_per_merge_count['count']) +
                          len(avi_config[key]))
                     LOG.info(profile_merged_message)
-                    print profile_merged_message
+                    progress.message(profile_merged_message)
                     continue
                 elif object_merge_check and key == 'HealthMonitor':
                     monitor_merged_message = \
@@ -200,11 +206,12 @@ def convert(meta, ns_config_dict, tenant_name, cloud_name, version, output_dir,
                          abs(monitor_converter.monitor_merge_count) +
                          len(avi_config[key]))
                     LOG.info(monitor_merged_message)
-                    print monitor_merged_message
+                    progress.message(monitor_merged_message)
                     continue
                 LOG.info('Total Objects of %s : %s' % (key,
                                                        len(avi_config[key])))
-                print 'Total Objects of %s : %s' % (key, len(avi_config[key]))
+                progress.message('Total Objects of %s : %s'
+                                 % (key, len(avi_config[key])))
 
     except:
         update_count('warning')
@@ -9,6 +9,7 @@ import avi.migrationtools
 import avi.migrationtools.netscaler_converter.netscaler_config_converter \
     as ns_conf_converter
 import avi.migrationtools.netscaler_converter.netscaler_parser as ns_parser
+import avi.migrationtools.netscaler_converter.ns_constants as ns_constants
 import avi.migrationtools.netscaler_converter.scp_util as scp_util
 from avi.migrationtools.ansible.ansible_config_converter import AviAnsibleConverter
 from avi.migrationtools.avi_converter import AviConverter
@@ -16,6 +17,10 @@ from avi.migrationtools.avi_orphan_object import wipe_out_not_in_use
 from avi.migrationtools.ansible.ansible_config_converter import\
     AviAnsibleConverter
 from avi.migrationtools.avi_migration_utils import get_count    
+from avi.migrationtools.parse_cache import ParseCache
+from avi.migrationtools.cert_inventory import cert_inventory, dummy_certs
+from avi.migrationtools.ref_graph import clear_ref_cache
+from avi.migrationtools.progress import progress, PROGRESS_MODES
 
 LOG = logging.getLogger(__name__)
 sdk_version = getattr(avi.migrationtools, '__version__', None)
@@ -67,16 +72,31 @@ class NetscalerConverter(AviConverter):
         # Added ansible flag
         self.ansible_skip_types = args.ansible_skip_types
         self.ansible_filter_types = args.ansible_filter_types
+        self.ansible_shards = args.ansible_shards
         # Test Vip
         self.test_vip = args.test_vip
         # vrf and segroup
         self.vrf = args.vrf
         self.segroup = args.segroup
+        # Reuse parsed configuration from previous runs
+        self.use_parse_cache = args.parse_cache
+        self.parse_cache = None
+        # Number of processes parsing the input configuration
+        self.workers = args.workers
+        # Additional formats of conversion status report
+        self.report_format = args.report_format
+        # Generate a key for every dummy certificate
+        self.unique_dummy_certs = args.unique_dummy_certs
+        # Mode of progress reporting, bar, quiet or json
+        self.progress_mode = args.progress
 
     def convert(self):
         if not os.path.exists(self.output_file_path):
             os.mkdir(self.output_file_path)
+        progress.configure(self.progress_mode)
         self.init_logger_path()
+        # References parsed by earlier conversions are not kept
+        clear_ref_cache()
         input_dir = os.path.normpath(self.input_folder_location)
         output_dir = os.path.normpath(self.output_file_path)
         is_download_from_host = False
@@ -90,6 +110,8 @@ class NetscalerConverter(AviConverter):
             if not os.path.exists(output_dir):
                 os.makedirs(output_dir)
             is_download_from_host = True
+        if self.use_parse_cache:
+            self.parse_cache = ParseCache(output_dir)
 
         self.print_pip_and_controller_version()
         # print the arguments in input
@@ -97,17 +119,18 @@ class NetscalerConverter(AviConverter):
 
         if is_download_from_host:
             LOG.debug("Copying files from host")
-            print "Copying Files from Host..."
+            progress.message("Copying Files from Host...")
             scp_util.get_files_from_ns(input_dir, self.ns_host_ip,
-                                       self.ns_ssh_user, self.ns_ssh_password)
+                                       self.ns_ssh_user, self.ns_ssh_password,
+                                       workers=self.workers)
             LOG.debug("Copied input files")
             source_file = input_dir + os.path.sep + "ns.conf"
         else:
             source_file = self.ns_config_file
         if not source_file:
-            print 'Not found ns configuration file'
+            progress.message('Not found ns configuration file')
             return
-        ns_config, skipped_cmds = ns_parser.get_ns_conf_dict(source_file)
+        ns_config, skipped_cmds = self.get_ns_conf_dict(source_file)
         user_ignore = {}
         # Read the attributes for user ignore val
         if self.ignore_config:
@@ -120,13 +143,21 @@ class NetscalerConverter(AviConverter):
         vs_name_dict = dict()
         vs_name_dict['csvs'] = dict()
         vs_name_dict['lbvs'] = dict()
-        avi_config = ns_conf_converter.convert(
-            meta, ns_config, self.tenant, self.cloud_name,
-            self.controller_version, output_dir, input_dir, skipped_cmds,
-            self.vs_state, self.object_merge_check, report_name, self.prefix,
-            vs_name_dict, self.profile_path, self.redirect,
-            self.ns_passphrase_file, user_ignore, self.vs_level_status,
-            self.vrf, self.segroup)
+        # Analyse keys and certificates of input folder once before conversion
+        cert_inventory.clear()
+        cert_inventory.scan(input_dir, self.workers)
+        dummy_certs.configure(self.unique_dummy_certs, self.workers)
+        try:
+            avi_config = ns_conf_converter.convert(
+                meta, ns_config, self.tenant, self.cloud_name,
+                self.controller_version, output_dir, input_dir, skipped_cmds,
+                self.vs_state, self.object_merge_check, report_name,
+                self.prefix, vs_name_dict, self.profile_path, self.redirect,
+                self.ns_passphrase_file, user_ignore, self.vs_level_status,
+                self.vrf, self.segroup, self.report_format)
+        finally:
+            # Key generation pool is stopped even if conversion fails
+            dummy_certs.close()
 
         avi_config = self.process_for_utils(
             avi_config)
@@ -139,15 +170,36 @@ class NetscalerConverter(AviConverter):
             avi_traffic = AviAnsibleConverter(
                 avi_config, output_dir, self.prefix, self.not_in_use,
                 ns_vs_name_dict=vs_name_dict, test_vip=self.test_vip,
-                skip_types=self.ansible_skip_types)
+                skip_types=self.ansible_skip_types,
+                shard=self.ansible_shards, workers=self.workers)
             avi_traffic.write_ansible_playbook(
                 self.ns_host_ip, self.ns_ssh_user, self.ns_ssh_password,
                 'netscaler'
             )
         if self.option == 'auto-upload':
             self.upload_config_to_controller(avi_config)
+        progress.report_phase_timings()
         return avi_config
 
+    def get_ns_conf_dict(self, source_file):
+        """
+        This method parse the ns config file, using the parse cache if
+        enabled.
+        :param source_file: Netscalar Input configuration file
+        :return: netscaler_conf, skipped_cmds
+        """
+        if not self.parse_cache:
+            return ns_parser.get_ns_conf_dict(source_file, self.workers)
+        with open(source_file) as ns_file:
+            source_str = ns_file.read()
+        # Command status constants are loaded by the parser, load them here
+        # as well since parsing is skipped on cache hit.
+        ns_constants.init()
+        return self.parse_cache.get_or_parse(
+            source_str, ns_parser, None, ns_parser.get_ns_conf_dict,
+            source_file, self.workers,
+            data_files=[ns_constants.COMMAND_STATUS_FILE])
+
 
 if __name__ == "__main__":
 
@@ -212,6 +264,14 @@ if __name__ == "__main__":
           netscaler_converter.py -f ns.conf --ansible
         Usecase: To generate the ansible playbook for the avi configuration
                  which can be used for upload to controller
+
+        Example to use ansible shards option:
+          netscaler_converter.py -f ns.conf --ansible --ansible_shards
+          --workers 4
+        Usecase: To split the ansible playbook of a large configuration
+                 into task lists per tenant and virtual service, run in
+                 parallel by the playbook. Parallelism of the run is limited
+                 by the ansible forks.
           
         Example to use vs level status option:
           netscaler_converter.py -f ns.conf --vs_level_status
@@ -239,6 +299,34 @@ if __name__ == "__main__":
           netscaler_converter.py -f ns.conf --controller_version <17.2.3>
         Usecase: To provide the version of controller.
 
+        Example to use parse cache option:
+          netscaler_converter.py -f ns.conf --parse_cache
+        Usecase: To reuse the parsed configuration of an earlier run on the
+                 same input file while trying out different conversion
+                 options.
+
+        Example to use workers option:
+          netscaler_converter.py -f ns.conf --workers 8
+        Usecase: To parse the lines of a large input file in parallel
+                 processes.
+
+        Example to use unique dummy certs option:
+          netscaler_converter.py -f ns.conf --unique_dummy_certs --workers 4
+        Usecase: To generate a separate key for every dummy certificate,
+                 keys are generated ahead in worker processes. Without the
+                 option one key pair is shared by all dummy certificates.
+
+        Example to use progress option:
+          netscaler_converter.py -f ns.conf --progress json
+        Usecase: To write progress, messages and time taken by every phase
+                 as json lines to stderr in CI runs, quiet hides them.
+                 Updates are throttled in all modes.
+
+        Example to use report format option:
+          netscaler_converter.py -f ns.conf --report_format csv parquet
+        Usecase: To get the conversion status in csv and parquet files along
+                 with the excel sheet for loading large reports in other tools.
+
         Example to use segroup flag
             netscalar_converter.py -f ns.conf --segroup segroup_name
         UseCase: To add / Change segroup reference of vs
@@ -274,6 +362,12 @@ if __name__ == "__main__":
                              'VirtualService, Pool will do ansible conversion '
                              'only for Virtualservice and Pool objects',
                         default=[])
+    parser.add_argument('--ansible_shards',
+                        help='Flag to split ansible playbook into task lists '
+                             'per tenant and virtual service, written by '
+                             '--workers processes, run in parallel by the '
+                             'create and delete playbooks',
+                        action='store_true')
     # Added args for baseline profile json file
     parser.add_argument('--baseline_profile', help='absolute path for json '
                         'file containing baseline profiles')
@@ -320,15 +414,27 @@ if __name__ == "__main__":
     parser.add_argument('-p', '--password',
                         help='controller password for auto upload',
                         default='avi123')
+    parser.add_argument('--parse_cache',
+                        help='Flag to cache parsed input configuration in '
+                             'output folder and reuse it on next run',
+                        action='store_true')
     # Added command line args to execute config_patch file with related avi
     # json file location and patch location
     parser.add_argument('--patch', help='Run config_patch please provide '
                                         'location of patch.yaml')
     # Added prefix for objects
     parser.add_argument('--prefix', help='Prefix for objects')
+    parser.add_argument('--progress', choices=PROGRESS_MODES, default='bar',
+                        help='Show progress and messages as bar, hide them '
+                             'or write them to stderr as json lines with '
+                             'phase timings')
     # Added args for redirecting http vs to https vs
     parser.add_argument('--redirect', help='redirect http vs to https vs if '
                         'there is no pool assigned', action="store_true")
+    parser.add_argument('--report_format', nargs='+',
+                        choices=['csv', 'parquet'],
+                        help='Additional formats of conversion status report '
+                             'to write along with excel sheet')
     parser.add_argument('-s', '--vs_state', choices=['enable', 'disable'],
                         help='state of VS created', default='disable')
     parser.add_argument('--segroup',
@@ -343,6 +449,10 @@ if __name__ == "__main__":
                         'It will replace the original vip '
                         'Note: The actual ip will vary from input to output'
                         'use it with caution ')
+    parser.add_argument('--unique_dummy_certs',
+                        help='Flag to generate a separate key for every '
+                             'dummy certificate instead of sharing one',
+                        action='store_true')
     parser.add_argument('-u', '--user',
                         help='controller username for auto upload',
                         default='admin')
@@ -359,6 +469,10 @@ if __name__ == "__main__":
     parser.add_argument('--vs_level_status', action='store_true',
                         help='Add columns of vs reference and overall skipped '
                              'settings in status excel sheet')
+    parser.add_argument('--workers', type=int, default=1,
+                        help='Number of processes to parse input '
+                             'configuration and of files downloaded '
+                             'concurrently from host')
 
     args = parser.parse_args()
     netscaler_converter = NetscalerConverter(args)
@@ -367,5 +481,5 @@ if __name__ == "__main__":
         netscaler_converter.print_pip_and_controller_version()
         exit(0)
     netscaler_converter.convert()
-    print "Total Warning: ", get_count('warning')
-    print "Total Errors: ", get_count('error')
+    progress.message("Total Warning: %s" % get_count('warning'))
+    progress.message("Total Errors: %s" % get_count('error'))
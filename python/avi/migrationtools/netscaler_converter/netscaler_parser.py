@@ -1,4 +1,8 @@
 import logging
+import mmap
+import multiprocessing
+import os
+import re
 import time
 import avi.migrationtools.netscaler_converter.ns_constants as ns_constant
 from avi.migrationtools.avi_migration_utils import update_count
@@ -8,25 +12,27 @@ from pyparsing import (ParserElement, Suppress, Literal, LineEnd, printables,
                        SkipTo, restOfLine, quotedString, LineStart, OneOrMore,
                        Keyword)
 from avi.migrationtools.netscaler_converter.ns_util import NsUtil
+from avi.migrationtools.progress import progress
 
 ParserElement.enablePackrat()
 
 LOG = logging.getLogger(__name__)
 # Creating f5 object for util library.
 ns_util = NsUtil()
+# Lines made of printable characters only can be tokenized without grammar
+SIMPLE_LINE = re.compile(r'^[\x21-\x7e \t\r\n]*$')
+WORD = re.compile(r'[\x21-\x7e]+')
 
-def parse_config_file(filepath):
+def get_grammar():
     """
-    This function defines that to parsed the netscalar input file
-    :param filepath: path of netscalar input configuration
-    :return: return parsed dict
+    This function defines that to create the grammar for netscalar command
+    :return: pyparsing grammar for single netscalar command line
     """
 
     EOL = LineEnd().suppress()
     comment = Suppress("#") + Suppress(restOfLine) + EOL
     SOL = LineStart().suppress()
     blank_line = SOL + EOL
-    result = []
     hyphen = Literal("-")
     not_hyphen_sign = ''.join(c for c in printables if c != '-')
     text = Word(not_hyphen_sign, printables)
@@ -38,51 +44,272 @@ def parse_config_file(filepath):
     q_obj = originalTextFor(Keyword('q{')+SkipTo(Keyword("}")))
     command = Group(OneOrMore(q_obj | multi_word_names | text) + ZeroOrMore(option))
     command.ignore(comment | blank_line)
-    with open(filepath) as infile:
-        line_no = 1
-        print "Parsing Input Configuration..."
-        lines = infile.readlines()
-        total_lines = len(lines)
-        for line in lines:
-            try:
-                tmp = command.parseString(line)
-                tokens = tmp.asList()
-                if tokens:
-                    tokens[0].append(['line_no', str(line_no)])
-                result += tokens
-                line_no += 1
-            except Exception as exception:
+    return command
+
+
+def tokenize_simple_line(line):
+    """
+    This function defines that to tokenize plain command line without
+    quotes, q{} objects and comments the same way the grammar does
+    :param line: netscalar command line
+    :return: parsed tokens or None if line needs the full grammar
+    """
+
+    if 'q{' in line or not SIMPLE_LINE.match(line):
+        return None
+    # Grammar parses the line with tabs expanded
+    line = line.expandtabs()
+    tokens = []
+    option = None
+    for word in WORD.finditer(line):
+        text = word.group()
+        if text[0] in '"\'#':
+            return None
+        if text[0] == '-':
+            # key, value start and value end offsets
+            option = [text[1:], None, None]
+            tokens.append(option)
+        elif option is None:
+            tokens.append(text)
+        else:
+            if option[1] is None:
+                option[1] = word.start()
+            option[2] = word.end()
+    if not tokens or not isinstance(tokens[0], str):
+        return None
+    for index, token in enumerate(tokens):
+        if isinstance(token, list):
+            value = line[token[1]:token[2]] if token[1] is not None else ''
+            tokens[index] = [token[0], value]
+    return [tokens]
+
+
+def read_config_lines(filepath, start=0, end=None):
+    """
+    This function defines that to read the netscalar input file line by line
+    through memory map, so that the whole file is never loaded in memory
+    :param filepath: path of netscalar input configuration
+    :param start: offset of first line to read
+    :param end: offset to stop reading at, end of file if not given
+    :return: generator of line number, line, read offset and file size
+    """
+
+    with open(filepath, 'rb') as infile:
+        total_size = os.fstat(infile.fileno()).st_size
+        # mmap can not map empty file
+        if not total_size:
+            return
+        ns_map = mmap.mmap(infile.fileno(), 0, access=mmap.ACCESS_READ)
+        end = total_size if end is None else end
+        try:
+            ns_map.seek(start)
+            line_no = 0
+            while ns_map.tell() < end:
+                line = ns_map.readline()
                 line_no += 1
-                LOG.error("Parsing error: " + line)
-            msg = "Parsing started..."
-            if line_no <= total_lines:
-                ns_util.print_progress_bar(line_no, total_lines, msg, prefix='Progress',
-                                 suffix='')
-        return result
+                yield line_no, line, ns_map.tell(), total_size
+        finally:
+            ns_map.close()
+
+
+def get_shards(filepath, count):
+    """
+    This function defines that to split the netscalar input file in byte
+    ranges ending at line boundaries
+    :param filepath: path of netscalar input configuration
+    :param count: number of shards wanted
+    :return: list of file path, start offset and end offset
+    """
+
+    shards = []
+    with open(filepath, 'rb') as infile:
+        total_size = os.fstat(infile.fileno()).st_size
+        if not total_size:
+            return shards
+        ns_map = mmap.mmap(infile.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            chunk_size = max(total_size // count, 1)
+            start = 0
+            while start < total_size:
+                end = ns_map.find('\n', min(start + chunk_size, total_size) - 1)
+                end = total_size if end == -1 else end + 1
+                shards.append((filepath, start, end))
+                start = end
+        finally:
+            ns_map.close()
+    return shards
+
+
+def parse_line(command, line):
+    """
+    This function defines that to parse single netscalar command line
+    :param command: grammar of netscalar command
+    :param line: netscalar command line
+    :return: parsed tokens, None on parsing error
+    """
+
+    try:
+        tokens = tokenize_simple_line(line)
+        if tokens is None:
+            tokens = command.parseString(line).asList()
+        return tokens
+    except Exception as exception:
+        LOG.error("Parsing error: " + line)
+        return None
+
+
+def parse_config_shard(shard):
+    """
+    This function defines that to parse byte range of netscalar input file,
+    it runs in worker process of the parsing pool
+    :param shard: tuple of file path, start offset and end offset
+    :return: list of line number in shard and tokens, count of lines in shard
+    """
+
+    filepath, start, end = shard
+    command = get_grammar()
+    result = []
+    line_no = 0
+    for line_no, line, offset, total_size in read_config_lines(
+            filepath, start, end):
+        tokens = parse_line(command, line)
+        if tokens:
+            result.append((line_no, tokens))
+    return result, line_no
+
+
+def iter_config_file(filepath, workers=1):
+    """
+    This function defines that to parse the netscalar input file lazily
+    :param filepath: path of netscalar input configuration
+    :param workers: number of processes parsing the file
+    :return: generator of parsed command tokens
+    """
+
+    progress.message("Parsing Input Configuration...")
+    msg = "Parsing started..."
+    if workers > 1:
+        for token in iter_config_file_parallel(filepath, workers, msg):
+            yield token
+        return
+    command = get_grammar()
+    for line_no, line, offset, total_size in read_config_lines(filepath):
+        tokens = parse_line(command, line)
+        if tokens:
+            tokens[0].append(['line_no', str(line_no)])
+            for token in tokens:
+                yield token
+        ns_util.print_progress_bar(offset, total_size, msg,
+                                   prefix='Progress', suffix='')
+
+
+def iter_config_file_parallel(filepath, workers, msg):
+    """
+    This function defines that to parse the netscalar input file in shards
+    on a process pool, tokens are returned in file order
+    :param filepath: path of netscalar input configuration
+    :param workers: number of processes parsing the file
+    :param msg: progress bar message
+    :return: generator of parsed command tokens
+    """
+
+    # More shards than workers to keep all of them busy till the end
+    shards = get_shards(filepath, workers * 4)
+    if not shards:
+        return
+    pool = multiprocessing.Pool(workers)
+    try:
+        line_offset = 0
+        results = pool.imap(parse_config_shard, shards)
+        for index, (result, line_count) in enumerate(results):
+            for line_no, tokens in result:
+                tokens[0].append(['line_no', str(line_offset + line_no)])
+                for token in tokens:
+                    yield token
+            line_offset += line_count
+            ns_util.print_progress_bar(index + 1, len(shards), msg,
+                                       prefix='Progress', suffix='')
+        pool.close()
+        pool.join()
+    finally:
+        pool.terminate()
+
+
+def parse_config_file(filepath, workers=1):
+    """
+    This function defines that to parsed the netscalar input file
+    :param filepath: path of netscalar input configuration
+    :param workers: number of processes parsing the file
+    :return: return parsed dict
+    """
+
+    return list(iter_config_file(filepath, workers))
+
+
+class CommandIndex(object):
+    """
+    Lookup of supported commands keyed on their leading words, so a command
+    line is matched with a few dict lookups instead of comparing it against
+    every supported command.
+    """
+
+    def __init__(self, commands):
+        self.commands = dict()
+        for position, command in enumerate(commands):
+            self.commands.setdefault(tuple(command.split(' ')),
+                                     (position, command))
+        self.lengths = sorted(set(len(key) for key in self.commands))
+
+    def match(self, line):
+        """
+        This function defines that to find the supported command of line
+        :param line: netscalar command tokens
+        :return: supported command and its word count if found else None
+        """
+
+        words = []
+        for token in line[:self.lengths[-1]] if self.lengths else []:
+            if not isinstance(token, str):
+                break
+            words.append(token)
+        matched = None
+        for length in self.lengths:
+            if length > len(words):
+                break
+            found = self.commands.get(tuple(words[:length]))
+            # First command in supported list wins as in linear search
+            if found and (not matched or found[0] < matched[0]):
+                matched = found
+        if matched:
+            return matched[1], len(matched[1].split(' '))
+        return None
 
 
-def get_command(line, commands):
+def get_command(line, commands, command_index=None):
     """
     This functions defines that convert each supported command to dict
     :param line: netscalar command
     :param commands: List of supported commands
+    :param command_index: CommandIndex of supported commands
     :return: Netscalar dict after parsing
     """
 
-    for command in commands:
-        cmd_arr = command.split(' ')
-        if line[0: len(cmd_arr)] == cmd_arr:
-            return command, len(cmd_arr)
+    if not command_index:
+        command_index = CommandIndex(commands)
+    matched = command_index.match(line)
+    if matched:
+        return matched
     cmd, line_no = ns_util.get_command_from_line(line)
     LOG.debug("Command not supported : %s" % cmd)
     cmd = {'cmd': cmd, 'line_no': line_no}
     return cmd, None
 
 
-def get_ns_conf_dict(filepath):
+def get_ns_conf_dict(filepath, workers=1):
     """
     This function defines that create a dict netscalar commands
     :param filepath: Netscalar Input configuration file
+    :param workers: number of processes parsing the file
     :return: None
     """
 
@@ -91,10 +318,11 @@ def get_ns_conf_dict(filepath):
     skipped_cmds = []
     ns_constant.init()
     supported_commands = ns_constant.netscalar_command_status['SupportedCommands']
+    command_index = CommandIndex(supported_commands)
     try:
-        result = parse_config_file(filepath)
-        for line in result:
-            cmd, offset = get_command(line, supported_commands)
+        for line in iter_config_file(filepath, workers):
+            cmd, offset = get_command(line, supported_commands,
+                                      command_index)
             if offset:
                 cmd_dict = dict()
                 attr_list = []
@@ -131,7 +359,7 @@ def get_ns_conf_dict(filepath):
         LOG.debug('File parsed successfully')
     except Exception as exception:
         update_count('error')
-        print exception
+        progress.message(str(exception))
         LOG.error('Error in parsing the file', exc_info=True)
 
     return netscaler_conf, skipped_cmds
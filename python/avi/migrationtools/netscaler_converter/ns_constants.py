@@ -86,6 +86,9 @@ IPV6_Address = re.compile('^(?:(?:[0-9A-Fa-f]{1,4}:){6}'
                                       '[0-9A-Fa-f]{1,4})?::)$')
 
 netscalar_command_status = None
+# Supported and skipped commands read by the parser and converters
+COMMAND_STATUS_FILE = os.path.join(os.path.dirname(__file__),
+                                   'command_status.yaml')
 
 def init():
     """
@@ -93,7 +96,7 @@ def init():
     :return: None
     """
     global netscalar_command_status
-    with open(os.path.dirname(__file__)+ "/command_status.yaml") as stream:
+    with open(COMMAND_STATUS_FILE) as stream:
         netscalar_command_status = yaml.safe_load(stream)
 
 
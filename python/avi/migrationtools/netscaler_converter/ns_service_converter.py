@@ -13,6 +13,8 @@ from avi.migrationtools.netscaler_converter.monitor_converter \
     import merge_object_mapping
 from avi.migrationtools.netscaler_converter.ns_util import NsUtil
 from avi.migrationtools.avi_migration_utils import update_count
+from avi.migrationtools.avi_config import get_objects_by_name
+from avi.migrationtools.progress import progress
 app_per_merge_count = {'count': 0}
 
 LOG = logging.getLogger(__name__)
@@ -165,8 +167,7 @@ class ServiceConverter(object):
                     # Added prefix for objects
                     if self.prefix:
                         pool_name = self.prefix + '-' + pool_name
-                    pool = [pool for pool in avi_config['Pool']
-                            if pool['name'] == pool_name]
+                    pool = get_objects_by_name(avi_config['Pool'], pool_name)
                     if pool:
                         if pool_name in used_pool_ref:
                             # Cloning the pool if it is attached to more than
@@ -290,9 +291,8 @@ class ServiceConverter(object):
                 # Added prefix for objects
                 if self.prefix:
                     pool_group_name = self.prefix + '-' + pool_group_name
-                pool_group = [pool_group for pool_group in
-                              avi_config['PoolGroup'] if pool_group['name'] ==
-                              pool_group_name]
+                pool_group = get_objects_by_name(avi_config['PoolGroup'],
+                                                 pool_group_name)
                 # Skipped if pool group not found in AVI
                 if not pool_group:
                     skipped_status = "Skipped: Pool group %s not found" \
@@ -307,8 +307,7 @@ class ServiceConverter(object):
                 for pool_member in pool_group[0]['members']:
                     pool_name = \
                         pool_member['pool_ref'].split('&')[1].split('=')[1]
-                    pool = [pool for pool in avi_config['Pool']
-                            if pool['name'] == pool_name]
+                    pool = get_objects_by_name(avi_config['Pool'], pool_name)
                     if pool:
                         pool[0]['application_persistence_profile_ref'] = \
                             application_persistence_profile_ref
@@ -343,7 +342,7 @@ class ServiceConverter(object):
         # Get the total size of object
         self.total_size = self.total_size + len(ns_services) + \
                           len(ns_service_groups)
-        print "Converting Pools..."
+        progress.message("Converting Pools...")
         for key in ns_services:
             try:
                 # Added count to increment progress.
@@ -414,18 +413,17 @@ class ServiceConverter(object):
                             certname = self.prefix + '-' + service_conf[
                                         'certkeyName'] if self.prefix else \
                                         service_conf['certkeyName']
-                            if [key_cert for key_cert in avi_config[
-                                'SSLKeyAndCertificate'] if key_cert[
-                                'name'] == certname]:
+                            if get_objects_by_name(
+                                avi_config['SSLKeyAndCertificate'], certname):
                                 ssl_key_cert_ref = ns_util.get_object_ref(
                                             certname,
                                             OBJECT_TYPE_SSL_KEY_AND_CERTIFICATE,
                                             self.tenant_name)
                                 pool_obj['ssl_key_and_certificate_ref'] = \
                                     ssl_key_cert_ref
-                            elif [key_cert for key_cert in avi_config[
-                                'SSLKeyAndCertificate'] if key_cert[
-                                'name'] == certname + '-dummy']:
+                            elif get_objects_by_name(
+                                avi_config['SSLKeyAndCertificate'],
+                                certname + '-dummy'):
                                 ssl_key_cert_ref = ns_util.get_object_ref(
                                             certname + '-dummy',
                                             OBJECT_TYPE_SSL_KEY_AND_CERTIFICATE,
@@ -542,9 +540,8 @@ class ServiceConverter(object):
                 if use_service_port:
                     pool_obj['use_service_port'] = use_service_port
                 # Add health monitor reference to pool
-                if monitor_ref and [monitor for monitor in
-                                    avi_config['HealthMonitor']
-                                    if monitor['name'] == monitor_ref]:
+                if monitor_ref and get_objects_by_name(
+                        avi_config['HealthMonitor'], monitor_ref):
 
                     pool_obj['health_monitor_refs'].append(monitor_ref)
 
@@ -575,18 +572,17 @@ class ServiceConverter(object):
                             certname = self.prefix + '-' + \
                                        ssl_service_conf['certkeyName'] if \
                                 self.prefix else ssl_service_conf['certkeyName']
-                            if [key_cert for key_cert in avi_config[
-                                'SSLKeyAndCertificate'] if key_cert['name'] ==
-                                    certname]:
+                            if get_objects_by_name(
+                                avi_config['SSLKeyAndCertificate'], certname):
                                 ssl_key_cert_ref = ns_util.get_object_ref(
                                             certname,
                                             OBJECT_TYPE_SSL_KEY_AND_CERTIFICATE,
                                             self.tenant_name)
                                 pool_obj['ssl_key_and_certificate_ref'] = \
                                     ssl_key_cert_ref
-                            elif [key_cert for key_cert in avi_config[
-                                'SSLKeyAndCertificate'] if key_cert[
-                                      'name'] == certname + '-dummy']:
+                            elif get_objects_by_name(
+                                avi_config['SSLKeyAndCertificate'],
+                                certname + '-dummy'):
                                 ssl_key_cert_ref = ns_util.get_object_ref(
                                     certname + '-dummy',
                                     OBJECT_TYPE_SSL_KEY_AND_CERTIFICATE,
@@ -698,9 +694,8 @@ class ServiceConverter(object):
                                'name'] == monitor_name]
                     if not monitor:
                         monitor_name = '%s-%s' % (monitor_name, 'dummy')
-                        monitor = [monitor for monitor in
-                                   avi_config['HealthMonitor']
-                                   if monitor['name'] == monitor_name]
+                        monitor = get_objects_by_name(
+                            avi_config['HealthMonitor'], monitor_name)
 
                     if not monitor:
                         skipped_status = 'External Monitor : Not supported ' \
@@ -840,9 +835,8 @@ class ServiceConverter(object):
                            monitor_name]
                 if not monitor:
                     monitor_name = '%s-%s' % (monitor_name, 'dummy')
-                    monitor = [monitor for monitor in
-                               avi_config['HealthMonitor']
-                               if monitor['name'] == monitor_name]
+                    monitor = get_objects_by_name(avi_config['HealthMonitor'],
+                                                  monitor_name)
                 if monitor:
                     # Add summery of service group in CSV/report
                     ns_util.add_conv_status(
@@ -6,12 +6,9 @@ import re
 import random
 import urlparse
 import ast
-import pandas
-import pexpect
+from collections import OrderedDict, defaultdict
 import avi.migrationtools.netscaler_converter.ns_constants as ns_constants
 from pkg_resources import parse_version
-from xlsxwriter import Workbook
-from openpyxl import load_workbook
 from OpenSSL import crypto
 from socket import gethostname
 from avi.migrationtools.netscaler_converter.ns_constants \
@@ -23,10 +20,16 @@ from avi.migrationtools.netscaler_converter.ns_constants \
             COMPLEXITY_BASIC, OBJECT_TYPE_APPLICATION_PERSISTENCE_PROFILE,
             OBJECT_TYPE_APPLICATION_PROFILE)
 from avi.migrationtools.avi_migration_utils import MigrationUtil, update_count
+from avi.migrationtools.conversion_status import ConversionStatusStore
+from avi.migrationtools.avi_config import get_objects_by_name, \
+    get_fingerprint, get_objects_by_keys, get_vip_address, \
+    get_vip_first_port_keys
+from avi.migrationtools.progress import progress
 
 LOG = logging.getLogger(__name__)
 
-csv_writer_dict_list = []
+csv_writer_dict_list = ConversionStatusStore(
+    'Netscaler Command', 'Object Name', line_key='Line Number')
 skipped_setting = {
     # 'virtual_service': '',
     # 'ssl key and cert': {},
@@ -68,7 +71,8 @@ class NsUtil(MigrationUtil):
         csv_writer_dict_list.append(row)
 
     def add_complete_conv_status(self, ns_config, output_dir, avi_config,
-                                 report_name, vs_level_status):
+                                 report_name, vs_level_status,
+                                 report_format=None):
         """
         Adds as status row in conversion status csv
         :param ns_config: NS config dict
@@ -76,12 +80,13 @@ class NsUtil(MigrationUtil):
         :param avi_config: AVI config dict
         :param report_name: name of report
         :param vs_level_status: add vs level details in XL sheet
+        :param report_format: List of additional report formats
         """
 
         global csv_writer_dict_list
         global progressbar_count
         global total_count
-        print "Generating Report For Converted Configuration..."
+        progress.message("Generating Report For Converted Configuration...")
         ptotal = len(ns_config)
         ppcount = 0
         for config_key in ns_config:
@@ -96,9 +101,8 @@ class NsUtil(MigrationUtil):
                 if isinstance(element_object_list, dict):
                     element_object_list = [element_object_list]
                 for element_object in element_object_list:
-                    match = [match for match in csv_writer_dict_list
-                             if
-                             match['Line Number'] == element_object['line_no']]
+                    match = csv_writer_dict_list.get_by_line(
+                        element_object['line_no'])
                     if not match:
                         ns_complete_command = self.get_netscalar_full_command(
                             config_key, element_object)
@@ -114,8 +118,8 @@ class NsUtil(MigrationUtil):
                 unique_line_number_list.add(dict_row['Line Number'])
                 row_list.append(dict_row)
             else:
-                row = [row for row in row_list
-                       if row['Line Number'] == dict_row['Line Number']]
+                # First row of the line number is the one kept in row_list
+                row = csv_writer_dict_list.get_by_line(dict_row['Line Number'])
                 if str(dict_row['AVI Object']).startswith('Skipped'):
                     continue
                 if dict_row.get('AVI Object', None):
@@ -123,12 +127,13 @@ class NsUtil(MigrationUtil):
                     if str(row[0]['AVI Object']) != str(dict_row['AVI Object']):
                         row[0]['AVI Object'] += '__/__%s' % dict_row[
                             'AVI Object']
+        status_count = dict()
+        for row in row_list:
+            status_count[row['Status']] = status_count.get(row['Status'], 0) + 1
         for status in STATUS_LIST:
-            status_list = [row for row in row_list if
-                           row['Status'] == status]
-            print '%s: %s' % (status, len(status_list))
+            progress.message('%s: %s' % (status, status_count.get(status, 0)))
         # add skipped list of each object at vs level
-        print "Writing Excel Sheet For Converted Configuration..."
+        progress.message("Writing Excel Sheet For Converted Configuration...")
         total_count = total_count + len(row_list)
         if vs_level_status:
             self.vs_per_skipped_setting_for_references(avi_config)
@@ -138,7 +143,7 @@ class NsUtil(MigrationUtil):
             self.vs_complexity_level()
         # Write status report and pivot table in xlsx report
         self.write_status_report_and_pivot_table_in_xlsx(
-            row_list, output_dir, report_name, vs_level_status)
+            row_list, output_dir, report_name, vs_level_status, report_format)
 
     def add_status_row(self, line_no, cmd, object_type, full_command, status,
                        avi_object=None):
@@ -199,12 +204,11 @@ class NsUtil(MigrationUtil):
         return avi_algorithm
 
     def update_algo_for_pools(self, algo, pg_name, avi_config):
-            pool_group = [pg for pg in avi_config['PoolGroup'] if
-                          pg['name'] == pg_name][0]
+            pool_group = get_objects_by_name(avi_config['PoolGroup'],
+                                             pg_name)[0]
             for member in pool_group['members']:
                 pool_name = self.get_name(member['pool_ref'])
-                pool = [pool for pool in avi_config['Pool'] if
-                        pool['name'] == pool_name][0]
+                pool = get_objects_by_name(avi_config['Pool'], pool_name)[0]
                 pool['lb_algorithm'] = algo
 
     def get_avi_resp_code(self, respCode):
@@ -380,25 +384,19 @@ class NsUtil(MigrationUtil):
 
         if len(obj_list) == 1:
             return obj_list
-        for source_obj in obj_list:
-            for index, tmp_obj in enumerate(obj_list):
-                if tmp_obj["name"] == source_obj["name"]:
-                    continue
-                src_cp = copy.deepcopy(source_obj)
-                tmp_cp = copy.deepcopy(tmp_obj)
-                del src_cp["name"]
-                if "description" in src_cp:
-                    del src_cp["description"]
-
-                del tmp_cp["name"]
-                if "description" in tmp_cp:
-                    del tmp_cp["description"]
-                if cmp(src_cp, tmp_cp) == 0:
-                    LOG.warn('Remove duplicate %s object : %s' % (obj_type,
-                                                                  tmp_obj[
-                                                                      "name"]))
-                    del obj_list[index]
-                    self.remove_duplicate_objects(obj_type, obj_list)
+        # Name of first object of each fingerprint, objects with same
+        # fingerprint and different name are duplicates of it
+        first_names = dict()
+        unique_list = []
+        for obj in obj_list:
+            fingerprint = get_fingerprint(obj, ('name', 'description'))
+            first_name = first_names.setdefault(fingerprint, obj["name"])
+            if first_name != obj["name"]:
+                LOG.warn('Remove duplicate %s object : %s' % (obj_type,
+                                                              obj["name"]))
+                continue
+            unique_list.append(obj)
+        obj_list[:] = unique_list
         return obj_list
 
     def cleanup_config(self, config):
@@ -419,8 +417,7 @@ class NsUtil(MigrationUtil):
         :param userprefix: prefix for objects
         :return: None
         """
-        pools = [pool for pool in avi_config['Pool'] if
-                 pool['name'] == pool_name]
+        pools = get_objects_by_name(avi_config['Pool'], pool_name)
         if pools:
             pool_obj = copy.deepcopy(pools[0])
             pname = pool_obj['name']
@@ -441,26 +438,23 @@ class NsUtil(MigrationUtil):
         :return: None
         """
 
-        vs_list = [v for v in avi_config['VirtualService'] if
-                   'port_range_end' in
-                   v['services'][0]]
-        for vs in vs_list:
-            # Get the list of vs which shared the same vip
-            if parse_version(controller_version) >= parse_version('17.1'):
-                vs_port_list = [int(v['services'][0]['port']) for v in
-                                avi_config['VirtualService']
-                                if v['vip'][0]['ip_address']['addr'] ==
-                                vs['vip'][0]['ip_address']['addr']
-                                and 'port_range_end' not in v['services'][0]]
+        vs_list = []
+        # Ports of vs without port range grouped by vip in one pass
+        vip_ports = defaultdict(list)
+        for v in avi_config['VirtualService']:
+            if 'port_range_end' in v['services'][0]:
+                vs_list.append(v)
             else:
-                vs_port_list = [int(v['services'][0]['port']) for v in
-                                avi_config['VirtualService'] if v['ip_address'][
-                                    'addr'] == vs['ip_address']['addr'] and
-                                'port_range_end' not in v['services'][0]]
-
+                vip_ports[get_vip_address(v)].append(
+                    int(v['services'][0]['port']))
+        for vip_address in vip_ports:
+            vip_ports[vip_address].sort()
+        for vs in vs_list:
+            # Get the ports of vs which shared the same vip
+            vs_port_list = vip_ports.get(get_vip_address(vs))
             if vs_port_list:
-                min_port = min(vs_port_list)
-                max_port = max(vs_port_list)
+                min_port = vs_port_list[0]
+                max_port = vs_port_list[-1]
                 vs['services'][0]['port_range_end'] = str(min_port - 1)
                 service = {
                     'enable_ssl': False,
@@ -561,18 +555,9 @@ class NsUtil(MigrationUtil):
         :return: None
         """
 
-        if parse_version(controller_version) >= parse_version('17.1'):
-            # Get the list of vs which shared the same vip
-            shared_vip = [v for v in cs_vs_list if v['vip'][0]['ip_address'][
-                'addr'] == vs['vip'][0]['ip_address']['addr'] and
-                          v['services'][0][
-                              'port'] == vs['services'][0]['port']]
-        else:
-            shared_vip = [v for v in cs_vs_list if v['ip_address']['addr'] ==
-                          vs['ip_address']['addr'] and v['services'][0][
-                              'port'] ==
-                          vs['services'][0]['port']]
-
+        # Get the list of vs which shared the same vip and port
+        shared_vip = get_objects_by_keys(cs_vs_list, get_vip_first_port_keys,
+                                         get_vip_first_port_keys(vs))
         if shared_vip:
             return True
         elif parse_version(controller_version) >= parse_version('17.1'):
@@ -670,8 +655,7 @@ class NsUtil(MigrationUtil):
         :param userprefix: prefix for objects
         :return: None
         """
-        pool_groups = [pg for pg in avi_config['PoolGroup']
-                       if pg['name'] == pg_name]
+        pool_groups = get_objects_by_name(avi_config['PoolGroup'], pg_name)
         if pool_groups:
             pool_group = copy.deepcopy(pool_groups[0])
             pool_group_name = re.sub('[:]', '-',
@@ -838,11 +822,10 @@ class NsUtil(MigrationUtil):
         :return: None
         """
         global csv_writer_dict_list
-        row = [row for row in csv_writer_dict_list
-               if row['Object Name'] == larget_lb_vs
-               and row['Netscaler Command'] == 'add lb vserver']
+        row = csv_writer_dict_list.get_rows(obj_types=['add lb vserver'],
+                                            name=larget_lb_vs)
         if row:
-            row[0]['Status'] = STATUS_INDIRECT
+            csv_writer_dict_list.set_status(row[0], STATUS_INDIRECT)
 
     def create_http_policy_set_for_redirect_url(self, vs_obj, redirect_uri,
                             avi_config, tenant_name, tenant_ref, enable_ssl):
@@ -942,11 +925,9 @@ class NsUtil(MigrationUtil):
         :param command_list: List of netscaler commands
         :return: List of CSV rows
         """
-        csv_object = [row for row in
-                      csv_writer_dict_list
-                      if row['Status'] in [STATUS_PARTIAL, STATUS_SUCCESSFUL]
-                      and row['Netscaler Command'] in
-                      command_list]
+        csv_object = csv_writer_dict_list.get_rows(
+            obj_types=command_list,
+            statuses=[STATUS_PARTIAL, STATUS_SUCCESSFUL])
         return csv_object
 
     def get_csv_skipped_list(self, csv_object, name_of_object, vs_ref):
@@ -1080,10 +1061,8 @@ class NsUtil(MigrationUtil):
         :return: List of skipped settings
         """
 
-        pool_group_object_ref = [pool_group_object_ref for pool_group_object_ref
-                                 in avi_config['PoolGroup'] if
-                                 pool_group_object_ref[
-                                     'name'] == pool_group_name]
+        pool_group_object_ref = get_objects_by_name(avi_config['PoolGroup'],
+                                                    pool_group_name)
         for pool_group in pool_group_object_ref:
             if 'members' in pool_group:
                 for each_pool_ref in pool_group['members']:
@@ -1208,11 +1187,9 @@ class NsUtil(MigrationUtil):
         This method calculate complexity of vs.
         :return:
         """
-        vs_csv_objects = [row for row in csv_writer_dict_list
-                          if
-                          row['Status'] in [STATUS_PARTIAL, STATUS_SUCCESSFUL]
-                          and row['Netscaler Command'] in [
-                              'add cs vserver', 'add lb vserver']]
+        vs_csv_objects = csv_writer_dict_list.get_rows(
+            obj_types=['add cs vserver', 'add lb vserver'],
+            statuses=[STATUS_PARTIAL, STATUS_SUCCESSFUL])
         for vs_csv_object in vs_csv_objects:
             virtual_service = self.format_string_to_json(
                 vs_csv_object['AVI Object'])
@@ -1232,11 +1209,9 @@ class NsUtil(MigrationUtil):
         global progressbar_count
         fully_migrated = 0
         # Get the VS object list which is having status successful and partial.
-        vs_csv_objects = [row for row in csv_writer_dict_list
-                          if
-                          row['Status'] in [STATUS_PARTIAL, STATUS_SUCCESSFUL]
-                          and row['Netscaler Command'] in [
-                              'add cs vserver', 'add lb vserver']]
+        vs_csv_objects = csv_writer_dict_list.get_rows(
+            obj_types=['add cs vserver', 'add lb vserver'],
+            statuses=[STATUS_PARTIAL, STATUS_SUCCESSFUL])
         # calculate total count
         total_count = total_count + len(vs_csv_objects)
         for vs_csv_object in vs_csv_objects:
@@ -1298,22 +1273,22 @@ class NsUtil(MigrationUtil):
                         skipped_setting['Httppolicy'][
                             'skipped_list'] = skipped_list
                     # Get the http policy name
-                    for each_http_policy in avi_config['HTTPPolicySet']:
-                        if each_http_policy['name'] == http_name:
-                            for http_req in \
-                                    each_http_policy['http_request_policy'][
-                                        'rules']:
-                                if http_req.get('switching_action', None) and \
-                                        http_req['switching_action'].get(
-                                            'pool_group_ref', None):
-                                    pool_group_name = self.get_name(
-                                        http_req['switching_action']
-                                        ['pool_group_ref'])
-                                    self.get_pool_skipped_list(
-                                        avi_config, pool_group_name,
-                                        skipped_setting, csv_object,
-                                        'Httppolicy',
-                                        csv_writer_dict_list, vs_ref)
+                    for each_http_policy in get_objects_by_name(
+                            avi_config['HTTPPolicySet'], http_name):
+                        for http_req in \
+                                each_http_policy['http_request_policy'][
+                                    'rules']:
+                            if http_req.get('switching_action', None) and \
+                                    http_req['switching_action'].get(
+                                        'pool_group_ref', None):
+                                pool_group_name = self.get_name(
+                                    http_req['switching_action']
+                                    ['pool_group_ref'])
+                                self.get_pool_skipped_list(
+                                    avi_config, pool_group_name,
+                                    skipped_setting, csv_object,
+                                    'Httppolicy',
+                                    csv_writer_dict_list, vs_ref)
             # Get the skipped list for application_profile_ref.
             if 'application_profile_ref' in virtual_service and \
                             'admin:System' not in \
@@ -1349,30 +1324,28 @@ class NsUtil(MigrationUtil):
             msg = "Writing excel sheet started..."
             self.print_progress_bar(progressbar_count, total_count, msg,
                                     prefix='Progress', suffix='')
-        csv_objects = [row for row in csv_writer_dict_list
-                       if row['Status'] in [STATUS_PARTIAL, STATUS_SUCCESSFUL]
-                       and row['Netscaler Command'] not in ['add cs vserver',
-                                                            'add lb vserver']
-                       and (
-                           'VS Reference' not in row or not row[
-                               'VS Reference'])]
+        csv_objects = csv_writer_dict_list.get_rows(
+            statuses=[STATUS_PARTIAL, STATUS_SUCCESSFUL],
+            exclude_types=['add cs vserver', 'add lb vserver'])
+        csv_objects = [row for row in csv_objects
+                       if 'VS Reference' not in row or not row['VS Reference']]
         # Update the vs reference not in used if objects are not attached to
         # VS directly or indirectly
         for csv_object in csv_objects:
             csv_object['VS Reference'] = STATUS_NOT_IN_USE
 
     def write_status_report_and_pivot_table_in_xlsx(self, row_list, output_dir,
-                                                report_name, vs_level_status):
+                                                report_name, vs_level_status,
+                                                report_format=None):
         """
         This method writes the status and make pivot table in excel sheet
         :param row_list:
         :param output_dir:
         :param report_name:
         :param vs_level_status:
+        :param report_format: List of additional report formats
         :return:
         """
-        global total_count
-        global progressbar_count
         # List of fieldnames for headers
         if vs_level_status:
             fieldnames = ['Line Number', 'Netscaler Command', 'Object Name',
@@ -1387,41 +1360,16 @@ class NsUtil(MigrationUtil):
                           'Complexity Level' , 'AVI Object']
         xlsx_report = output_dir + os.path.sep + ("%s-ConversionStatus.xlsx" %
                                                   report_name)
-        # xlsx workbook
-        status_wb = Workbook(xlsx_report)
-        # xlsx worksheet
-        status_ws = status_wb.add_worksheet("Status Sheet")
-        # Lock the first row of xls report.
-        status_ws.freeze_panes(1, 0)
-        first_row = 0
-        for header in fieldnames:
-            col = fieldnames.index(header)
-            status_ws.write(first_row, col, header)
-        row = 1
-        for row_data in row_list:
+
+        def update_progress():
+            global progressbar_count
             progressbar_count += 1
-            for _key, _value in row_data.items():
-                col = fieldnames.index(_key)
-                status_ws.write(row, col, _value)
             msg = "Writing excel sheet started..."
             self.print_progress_bar(progressbar_count, total_count, msg,
-                               prefix='Progress', suffix='')
-            row += 1
-        status_wb.close()
-        # create dataframe for row list
-        df = pandas.DataFrame(row_list, columns=fieldnames)
-        # create pivot table using pandas
-        pivot_table = pandas.pivot_table(df,
-                                         index=["Status", "Netscaler Command"],
-                                         values=[], aggfunc=[len], fill_value=0)
-        # create dataframe for pivot table using pandas
-        pivot_df = pandas.DataFrame(pivot_table)
-        master_book = load_workbook(xlsx_report)
-        master_writer = pandas.ExcelWriter(xlsx_report, engine='openpyxl')
-        master_writer.book = master_book
-        # Add pivot table in Pivot sheet
-        pivot_df.to_excel(master_writer, 'Pivot Sheet')
-        master_writer.save()
+                                    prefix='Progress', suffix='')
+        self.write_status_report(
+            xlsx_report, fieldnames, row_list,
+            ['Status', 'Netscaler Command'], report_format, update_progress)
 
     def update_skip_duplicates(self, obj, obj_list, obj_type,
                                merge_object_mapping, name, ent_type, prefix,
@@ -1469,8 +1417,7 @@ class NsUtil(MigrationUtil):
         # Added prefix for objects
         if prefix:
             name = prefix + '-' + name
-        vsvip = [vip_obj for vip_obj in vsvip_config
-                 if vip_obj['name'] == name]
+        vsvip = get_objects_by_name(vsvip_config, name)
         # If VSVIP object not present then create new VSVIP object.
         if not vsvip:
             vsvip_object = {
@@ -1573,8 +1520,7 @@ class NsUtil(MigrationUtil):
                     0].get('http_policy_set_ref'):
                 polname = self.get_name(vs['http_policies'][0][
                                         'http_policy_set_ref'])
-                pol = [pl for pl in avi_config['HTTPPolicySet'] if pl['name']
-                        == polname]
+                pol = get_objects_by_name(avi_config['HTTPPolicySet'], polname)
                 if pol and pol[0].get('http_request_policy', {}).get('rules',
                         []) and pol[0]['http_request_policy']['rules'][0].get(
                         'redirect_action'):
@@ -1632,63 +1578,60 @@ class NsUtil(MigrationUtil):
                                             in vsrem.keys()]
             LOG.debug('%s VS got removed from AVI configuration' % str(len(
                         vsrem)))
-            for cl in csv_writer_dict_list:
-                if cl['Object Name'] in vsrem.keys() and cl[
-                   'Netscaler Command'] in ['add lb vserver', 'add cs vserver']:
-                    cl['Status'] = STATUS_INDIRECT
-                    cl['AVI Object'] = 'Redirected to %s' % vsrem[cl[
-                                        'Object Name']]
+            for vs_name in vsrem:
+                for cl in csv_writer_dict_list.get_rows(
+                        obj_types=['add lb vserver', 'add cs vserver'],
+                        name=vs_name):
+                    csv_writer_dict_list.set_status(cl, STATUS_INDIRECT)
+                    cl['AVI Object'] = 'Redirected to %s' % vsrem[vs_name]
 
     def merge_pool(self, avi_config):
         """
         This method merge the pools in AVI if HM is same
+        Member pools of a pool group are grouped by their sorted health
+        monitors and each group is merged in the first pool which is not
+        merged yet, so work is linear in the number of pool group members.
         :param avi_config:
         :return:
         """
-        mergelist=[]
+        mergelist = set()
+        # ip:port of servers of the pools in which other pools are merged
+        pool_servers = dict()
         for poolgrp in avi_config['PoolGroup']:
-            pool_member = poolgrp['members']
-            length = len(pool_member)
-            for count in range(length):
-                pool_name = pool_member[count]['pool_ref'].split('&')[1].split(
-                    '=')[1]
-                if pool_name in mergelist:
-                    continue
-                pool = [pl for pl in avi_config['Pool']
-                        if pl['name'] == pool_name]
+            # Group existing member pools by health monitors in member order
+            hm_groups = OrderedDict()
+            for member in poolgrp['members']:
+                pool_name = member['pool_ref'].split('&')[1].split('=')[1]
+                pool = get_objects_by_name(avi_config['Pool'], pool_name)
                 if not pool:
                     LOG.debug("'%s' not present" % pool_name)
                     continue
-                for count2 in range(count+1, length):
-                    pname = pool_member[count2]['pool_ref'].split('&')[1].split(
-                        '=')[1]
-                    nextpool = [pol for pol in avi_config['Pool']
-                        if pol['name'] == pname]
-
-                    if not nextpool:
-                        LOG.debug("'%s' not present" % pname)
-                        continue
-                    if pool[0]['health_monitor_refs'].sort() == nextpool[0][
-                      'health_monitor_refs'].sort():
-                        LOG.debug("Merging pool '%s' in '%s'" % (nextpool[0][
-                                                    'name'], pool[0]['name']))
-                        ip_port = set()
-                        for ser in pool[0]['servers']:
-                            ip_port.add(str(ser['ip']['addr']) + ':' + str(
-                                ser['port']))
-                        for server in nextpool[0]['servers']:
-                            ipport = str(server['ip']['addr']) + ':' + str(
-                                        server['port'])
-                            if ipport not in list(ip_port):
-                                pool[0]['servers'].append(server)
-                        for cl in csv_writer_dict_list:
-                            if cl['Object Name'] == (nextpool[0][
-                             'name'].replace('-pool','')) and cl[
-                             'Netscaler Command'] in ['add service',
-                             'add serviceGroup']:
-                                cl['AVI Object'] = 'Merged to %s' % pool[0][
-                                                                        'name']
-                        mergelist.append(nextpool[0]['name'])
+                hm_key = tuple(sorted(pool[0].get('health_monitor_refs', [])))
+                hm_groups.setdefault(hm_key, []).append(pool[0])
+            for hm_pools in hm_groups.values():
+                # First pool not merged yet keeps all the later pools
+                for index, pool in enumerate(hm_pools):
+                    if pool['name'] not in mergelist:
+                        break
+                else:
+                    continue
+                ip_port = pool_servers.setdefault(id(pool), set(
+                    self.get_server_ip_port(ser) for ser in pool['servers']))
+                for nextpool in hm_pools[index + 1:]:
+                    LOG.debug("Merging pool '%s' in '%s'" % (nextpool['name'],
+                                                            pool['name']))
+                    new_ip_port = set()
+                    for server in nextpool['servers']:
+                        ipport = self.get_server_ip_port(server)
+                        if ipport not in ip_port:
+                            pool['servers'].append(server)
+                            new_ip_port.add(ipport)
+                    ip_port.update(new_ip_port)
+                    for cl in csv_writer_dict_list.get_rows(
+                            obj_types=['add service', 'add serviceGroup'],
+                            name=nextpool['name'].replace('-pool', '')):
+                        cl['AVI Object'] = 'Merged to %s' % pool['name']
+                    mergelist.add(nextpool['name'])
         for plg in avi_config['PoolGroup']:
             plg['members'] = [member for member in plg['members'] if
                               member['pool_ref'].split('&')[1].split('=')[1] not
@@ -1696,6 +1639,14 @@ class NsUtil(MigrationUtil):
         avi_config['Pool'] = [pools for pools in avi_config['Pool'] if pools[
                                 'name'] not in mergelist]
 
+    def get_server_ip_port(self, server):
+        """
+        This method returns ip:port string of pool server
+        :param server: pool server dict
+        :return: ip:port string
+        """
+        return str(server['ip']['addr']) + ':' + str(server['port'])
+
     def add_policy(self, policy, updated_vs_name, avi_config, tmp_policy_ref,
                    vs_obj, tenant_name, cloud_name, prefix, used_poolgrp_ref):
         """
@@ -1854,11 +1805,9 @@ class NsUtil(MigrationUtil):
         """
         global csv_writer_dict_list
         avi_graph = self.make_graph(avi_config)
-        csv_dict_sub = [row for row in csv_writer_dict_list if row[
-            'Netscaler Command'] not in ('add lb vserver',
-                                         'add cs vserver') and row[
-                            'Status'] in (STATUS_PARTIAL,
-                                          STATUS_SUCCESSFUL)]
+        csv_dict_sub = csv_writer_dict_list.get_rows(
+            statuses=[STATUS_PARTIAL, STATUS_SUCCESSFUL],
+            exclude_types=['add lb vserver', 'add cs vserver'])
         for dict_row in csv_dict_sub:
             obj = dict_row['AVI Object']
             if isinstance(obj, str) and obj.startswith('{'):
@@ -1906,10 +1855,8 @@ class NsUtil(MigrationUtil):
                 nodelist = [node]
                 self.get_predecessor(nodelist, avi_graph, vs)
         elif len(predecessor):
-            node_obj = [nod for nod in list(avi_graph.nodes().data()) if
-                        nod[0] == predecessor[0]]
-            if node_obj and (node_obj[0][1]['type'] == 'VS' or 'VS' in node_obj[
-              0][1]['type']):
+            node_type = avi_graph.nodes[predecessor[0]]['type']
+            if node_type == 'VS' or 'VS' in node_type:
                 LOG.debug("Predecessor %s found", predecessor[0])
                 vs.extend(predecessor)
             else:
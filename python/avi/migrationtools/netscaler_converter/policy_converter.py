@@ -11,6 +11,7 @@ from avi.migrationtools.netscaler_converter.ns_constants \
             OBJECT_TYPE_POOL_GROUP, OBJECT_TYPE_STRING_GROUP)
 from avi.migrationtools.netscaler_converter.ns_util import NsUtil
 from avi.migrationtools.avi_migration_utils import update_count
+from avi.migrationtools.avi_config import get_objects_by_name
 
 
 LOG = logging.getLogger(__name__)
@@ -894,8 +895,8 @@ class PolicyConverter(object):
         else:
             pool_group_ref = targetLBVserver + '-poolgroup'
             pool_group_ref = re.sub('[:]', '-', pool_group_ref)
-            pool_group = [pg for pg in avi_config['PoolGroup']
-                          if pg['name'] == pool_group_ref]
+            pool_group = get_objects_by_name(avi_config['PoolGroup'],
+                                             pool_group_ref)
             index = int(random.random() * 10000)
             if pool_group and pool_group_ref in tmp_pool_ref:
                 pool_group_ref = ns_util.clone_pool_group(
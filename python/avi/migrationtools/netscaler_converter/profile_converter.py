@@ -12,6 +12,7 @@ from avi.migrationtools.netscaler_converter.monitor_converter \
     import merge_object_mapping
 from avi.migrationtools.netscaler_converter.ns_util import NsUtil
 from avi.migrationtools.avi_migration_utils import update_count
+from avi.migrationtools.progress import progress
 
 LOG = logging.getLogger(__name__)
 # Creating f5 object for util library.
@@ -166,7 +167,7 @@ class ProfileConverter(object):
         self.total_size = len(http_profiles.keys()) + len(tcp_profiles.keys()) \
                           + len(set_ssl_service) + len(ssl_vs_mapping) + \
                           len(set_ssl_service_group) + len(ssl_mappings)
-        print "Converting Profiles.."
+        progress.message("Converting Profiles..")
         for key in http_profiles.keys():
             ns_http_profile_command = 'add ns httpProfile'
             self.progressbar_count += 1
@@ -661,6 +662,12 @@ class ProfileConverter(object):
                     if not ns_util.check_certificate_expiry(input_dir,
                                                         cert_file_name):
                         cert, key = None, None
+                    elif not is_key_protected and \
+                            not ns_util.is_key_cert_matching(
+                                input_dir + os.path.sep + key_file_name,
+                                input_dir + os.path.sep + cert_file_name):
+                        LOG.warning('Key %s does not match certificate %s' % (
+                            key_file_name, cert_file_name))
 
                 key_passphrase = None
                 # Get the key passphrase for key_file
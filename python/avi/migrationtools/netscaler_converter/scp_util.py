@@ -5,13 +5,19 @@ from avi.migrationtools.scp_util import SCPUtil
 LOG = logging.getLogger(__name__)
 
 
-def get_files_from_ns(local_path, host, username, pw=None, key=None):
+def get_files_from_ns(local_path, host, username, pw=None, key=None,
+                      workers=1):
     local_path = local_path + os.path.sep
-    scp = SCPUtil(host, username, pw, key)
-    scp.get_all_files('/flash/nsconfig/ssl/', local_path)
-    scp.get_all_files('/flash/nsconfig/monitors/', local_path)
-    scp.get('/flash/nsconfig/ns.conf', local_path + 'ns.conf')
+    scp = SCPUtil(host, username, pw, key, workers=workers)
+    # Files are listed first and downloaded together over several channels
+    files = scp.list_files('/flash/nsconfig/ssl/', local_path)
+    files.extend(scp.list_files('/flash/nsconfig/monitors/', local_path))
+    files.extend(scp.list_file('/flash/nsconfig/ns.conf',
+                               local_path + 'ns.conf'))
+    failed = scp.download(files)
     scp.close()
+    if '/flash/nsconfig/ns.conf' in failed:
+        raise IOError('Failed to download /flash/nsconfig/ns.conf')
 
 if __name__ == "__main__":
     input_folder_location = "D:\\avi\\test"
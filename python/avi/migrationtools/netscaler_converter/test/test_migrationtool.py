@@ -9,18 +9,27 @@ import pytest
 import yaml
 import subprocess
 import json
+import csv
+from xlrd import open_workbook
 
 from avi.migrationtools.netscaler_converter.netscaler_converter \
     import NetscalerConverter
+import avi.migrationtools.netscaler_converter.netscaler_parser as ns_parser
+import avi.migrationtools.netscaler_converter.ns_constants as ns_constants
 from avi.migrationtools.netscaler_converter.netscaler_parser import \
     get_ns_conf_dict
+from avi.migrationtools.parse_cache import ParseCache
+from avi.migrationtools.avi_config import AviConfig, get_objects_by_name, \
+    get_objects_by_keys, get_vip_keys
+from avi.migrationtools.progress import progress
 from avi.migrationtools.test.common.excel_reader \
     import percentage_success, output_sanitization
 from avi.migrationtools.test.common.test_clean_reboot \
     import verify_controller_is_up, clean_reboot
 from avi.migrationtools.test.common.test_tenant_cloud \
     import create_tenant, create_cloud
-from avi.migrationtools.avi_migration_utils import get_count, set_update_count
+from avi.migrationtools.avi_migration_utils import get_count, \
+    set_update_count, MigrationUtil
 from avi.migrationtools.netscaler_converter.ns_util import NsUtil
 
 config_file = pytest.config.getoption("--config")
@@ -89,7 +98,9 @@ def netscaler_conv(
         patch=None, vs_filter=None, ignore_config=None, ansible=None,
         prefix=None, not_in_use=False, baseline_profile=None, redirect=True,
         vs_level_status=False, ansible_skip_types=None, test_vip=None,
-        ansible_filter_types=None):
+        ansible_filter_types=None, parse_cache=False, workers=1,
+        report_format=None, unique_dummy_certs=False, ansible_shards=False,
+        progress='bar'):
 
     args = Namespace(
         ns_config_file=config_file_name, tenant=tenant, cloud_name=cloud_name,
@@ -104,7 +115,10 @@ def netscaler_conv(
         not_in_use=not_in_use, baseline_profile=baseline_profile,
         redirect=redirect, ansible=ansible, vs_level_status=vs_level_status,
         ansible_skip_types=ansible_skip_types, test_vip=None,
-        ansible_filter_types=ansible_filter_types, vrf=None, segroup=None)
+        ansible_filter_types=ansible_filter_types, vrf=None, segroup=None,
+        parse_cache=parse_cache, workers=workers, report_format=report_format,
+        unique_dummy_certs=unique_dummy_certs, ansible_shards=ansible_shards,
+        progress=progress)
     netscaler_converter = NetscalerConverter(args)
     avi_config = netscaler_converter.convert()
     return avi_config
@@ -115,7 +129,7 @@ class TestNetscalerConverter:
     @pytest.fixture
     def cleanup(self):
         import avi.migrationtools.f5_converter.conversion_util as conv
-        conv.csv_writer_dict_list = list()
+        conv.csv_writer_dict_list.clear()
 
     @pytest.mark.skip_travis
     def test_download(self, cleanup):
@@ -369,7 +383,7 @@ class TestNetscalerConverter:
                        controller_version=setup.get('controller_version_v17'))
 
         assert get_count('error') == 0
-        assert get_count('warning') == 1
+        assert get_count('warning') == 0
 
     @pytest.mark.travis
     def test_lb_algorithm_match(self):
@@ -400,6 +414,294 @@ class TestNetscalerConverter:
                             pool['name'] == pool_name][0]
                     assert pool['lb_algorithm'] == algo
 
+    @pytest.mark.travis
+    def test_parse_cache(self, cleanup, tmpdir):
+        """
+        Input File on Local Filesystem, parse cache option usage
+        """
+        output_dir = str(tmpdir)
+        cache_dir = os.path.join(output_dir, 'parse_cache')
+        netscaler_conv(config_file_name=setup.get('config_file_name'),
+                       controller_version=setup.get('controller_version_v17'),
+                       output_file_path=output_dir, parse_cache=True)
+        cache_files = os.listdir(cache_dir)
+        assert len(cache_files) == 1
+        with open(setup.get('config_file_name')) as ns_file:
+            source_str = ns_file.read()
+        parse_cache = ParseCache(output_dir)
+        key = parse_cache.get_key(
+            source_str, ns_parser,
+            data_files=[ns_constants.COMMAND_STATUS_FILE])
+        assert cache_files == [key + '.pickle']
+        cached = parse_cache.load(key)
+        assert cached == get_ns_conf_dict(setup.get('config_file_name'))
+        netscaler_conv(config_file_name=setup.get('config_file_name'),
+                       controller_version=setup.get('controller_version_v17'),
+                       output_file_path=output_dir, parse_cache=True)
+        assert os.listdir(cache_dir) == cache_files
+        # Change of command status data read by the parser changes the key
+        status_file = tmpdir.join('command_status.yaml')
+        with open(ns_constants.COMMAND_STATUS_FILE) as stream:
+            status_file.write(stream.read())
+        assert parse_cache.get_key(source_str, ns_parser,
+                                   data_files=[str(status_file)]) == key
+        status_file.write('\n', mode='a')
+        assert parse_cache.get_key(source_str, ns_parser,
+                                   data_files=[str(status_file)]) != key
+
+    @pytest.mark.travis
+    def test_report_format(self, cleanup, tmpdir):
+        """
+        Input File on Local Filesystem, report format option usage
+        """
+        output_dir = str(tmpdir)
+        netscaler_conv(config_file_name=setup.get('config_file_name'),
+                       controller_version=setup.get('controller_version_v17'),
+                       output_file_path=output_dir, vs_level_status=True,
+                       report_format=['csv'])
+        report_name = os.path.splitext(
+            os.path.basename(setup.get('config_file_name')))[0]
+        status_wb = open_workbook(
+            os.path.join(output_dir, '%s-ConversionStatus.xlsx' % report_name))
+        status_sheet = status_wb.sheet_by_name('Status Sheet')
+        pivot_sheet = status_wb.sheet_by_name('Pivot Sheet')
+        with open(os.path.join(
+                output_dir, '%s-ConversionStatus.csv' % report_name)) as \
+                stream:
+            csv_rows = list(csv.reader(stream))
+        assert csv_rows[0] == status_sheet.row_values(0)
+        assert len(csv_rows) == status_sheet.nrows
+        assert pivot_sheet.row_values(0) == ['Status', 'Netscaler Command',
+                                             'len']
+        assert sum(pivot_sheet.col_values(2)[1:]) == status_sheet.nrows - 1
+
+    @pytest.mark.travis
+    def test_report_extra_columns(self, tmpdir):
+        """
+        Values of columns missing in report header should be written as
+        extra columns
+        """
+        report_path = str(tmpdir.join('ns-ConversionStatus.xlsx'))
+        row_list = [{'Status': 'SUCCESSFUL', 'Object Name': 'vs1'},
+                    {'Status': 'SKIPPED', 'Object Name': 'vs2',
+                     'VS Reference': 'vs1'}]
+        MigrationUtil().write_status_report(
+            report_path, ['Object Name', 'Status'], row_list, ['Status'],
+            ['csv'])
+        status_sheet = open_workbook(report_path).sheet_by_name(
+            'Status Sheet')
+        assert status_sheet.row_values(0) == ['Object Name', 'Status',
+                                              'VS Reference']
+        assert status_sheet.row_values(2) == ['vs2', 'SKIPPED', 'vs1']
+        with open(str(tmpdir.join('ns-ConversionStatus.csv'))) as stream:
+            assert list(csv.reader(stream)) == [
+                ['Object Name', 'Status', 'VS Reference'],
+                ['vs1', 'SUCCESSFUL', ''], ['vs2', 'SKIPPED', 'vs1']]
+
+    @pytest.mark.travis
+    def test_simple_line_tokens_match_grammar(self):
+        """
+        Every line of the bundled configs should give the same tokens with
+        and without the grammar
+        """
+        grammar = ns_parser.get_grammar()
+        test_dir = os.path.dirname(os.path.abspath(__file__))
+        config_files = sorted(os.path.join(test_dir, name)
+                              for name in os.listdir(test_dir)
+                              if name.endswith('.conf'))
+        assert len(config_files) == 3
+        line_count = 0
+        simple_lines = 0
+        for config_file in config_files:
+            for line_no, line, offset, total_size in \
+                    ns_parser.read_config_lines(config_file):
+                line_count += 1
+                try:
+                    expected = grammar.parseString(line).asList()
+                except Exception:
+                    expected = None
+                assert ns_parser.parse_line(grammar, line) == expected, \
+                    '%s:%s' % (config_file, line_no)
+                tokens = ns_parser.tokenize_simple_line(line)
+                if tokens is not None:
+                    simple_lines += 1
+                    assert tokens == expected, '%s:%s' % (config_file,
+                                                          line_no)
+        assert line_count == 644
+        # Lines with quotes, q{} objects or comments need the grammar
+        assert simple_lines == 558
+
+    @pytest.mark.travis
+    def test_parallel_parsing(self):
+        """
+        Parsing in worker processes should give the same dict as serial run
+        """
+        for config_file in (setup.get('config_file_name'),
+                            setup.get('config_file_name_passphrase')):
+            assert get_ns_conf_dict(config_file, workers=3) == \
+                get_ns_conf_dict(config_file)
+
+    @pytest.mark.travis
+    def test_command_index_match(self):
+        """
+        Command index should return the same command as linear search
+        """
+        supported_commands = ['add lb vserver', 'add lb', 'bind lb vserver',
+                              'add server']
+        command_index = ns_parser.CommandIndex(supported_commands)
+        assert command_index.match(
+            ['add', 'lb', 'vserver', 'vs1', ['line_no', '1']]) == \
+            ('add lb vserver', 3)
+        assert command_index.match(['add', 'lb', 'monitor', 'm1']) == \
+            ('add lb', 2)
+        assert command_index.match(['add', ['line_no', '2']]) is None
+        cmd, offset = ns_parser.get_command(
+            ['set', 'ns', 'param', ['line_no', '3']], supported_commands,
+            command_index)
+        assert offset is None and cmd['line_no'] == '3'
+
+    @pytest.mark.travis
+    def test_merge_duplicate_fingerprint(self):
+        """
+        Duplicate objects should be found by fingerprint and merged
+        """
+        ns_util = NsUtil()
+        avi_config = AviConfig()
+        avi_config['HealthMonitor'] = [
+            {'name': 'hm1', 'type': 'HEALTH_MONITOR_TCP', 'send_interval': 5}]
+        syslist = AviConfig(HealthMonitor=[
+            {'name': 'System-TCP', 'type': 'HEALTH_MONITOR_TCP',
+             'send_interval': 10, 'uuid': 'healthmonitor-1'}])['HealthMonitor']
+        mapping = {'health_monitor': {'no': 0}}
+        assert ns_util.update_skip_duplicates(
+            {'name': 'hm2', 'type': 'HEALTH_MONITOR_TCP', 'send_interval': 10},
+            avi_config['HealthMonitor'], 'health_monitor', mapping, 'hm2',
+            'tcp', None, syslist)
+        assert mapping['health_monitor']['hm2'] == 'System-TCP'
+        mapping['health_monitor']['hm1'] = 'hm1'
+        assert ns_util.update_skip_duplicates(
+            {'name': 'hm3', 'type': 'HEALTH_MONITOR_TCP', 'send_interval': 5,
+             'description': 'hm3'}, avi_config['HealthMonitor'],
+            'health_monitor', mapping, 'hm3', 'tcp', None, syslist)
+        merged = avi_config['HealthMonitor'][0]
+        assert merged['name'].startswith('Merged-tcp-health_monitor-')
+        assert merged['dup_of'] == ['hm1', 'hm3']
+        assert mapping['health_monitor']['hm1'] == merged['name']
+        assert avi_config.get_by_name('HealthMonitor', merged['name']) == \
+            [merged]
+        vs_list = [{'name': 'vs1', 'vip': '1.1.1.1'},
+                   {'name': 'vs1', 'vip': '1.1.1.1'},
+                   {'name': 'vs2', 'vip': '1.1.1.1', 'description': 'vs2'},
+                   {'name': 'vs3', 'vip': '2.2.2.2'}]
+        assert [vs['name'] for vs in ns_util.remove_duplicate_objects(
+            'VirtualService', vs_list)] == ['vs1', 'vs1', 'vs3']
+
+    @pytest.mark.travis
+    def test_merge_pool_benchmark(self):
+        """
+        Pool merge of 10k service groups should be linear in pool members,
+        pools are indexed by name once and every server is keyed once
+        """
+        ns_util = NsUtil()
+        avi_config = AviConfig(Pool=[], PoolGroup=[])
+        for index in range(10000):
+            members = []
+            for pool_no, hm_refs in enumerate([['tcp', 'http'],
+                                               ['http', 'tcp'], ['ping']]):
+                pool_name = 'sg%s-%s-pool' % (index, pool_no)
+                avi_config['Pool'].append({
+                    'name': pool_name, 'health_monitor_refs': list(hm_refs),
+                    'servers': [{'ip': {'addr': '10.%s.%s.%s' % (
+                        index / 256, index % 256, pool_no % 2)},
+                        'port': 80}]})
+                members.append({'pool_ref': ns_util.get_object_ref(
+                    pool_name, 'pool')})
+            avi_config['PoolGroup'].append({'name': 'sg%s-poolgroup' % index,
+                                            'members': members})
+        pools = avi_config['Pool']
+        calls = {'build_index': 0, 'get_server_ip_port': 0}
+        build_index = pools.build_index
+        get_server_ip_port = ns_util.get_server_ip_port
+
+        def counted_build_index():
+            calls['build_index'] += 1
+            return build_index()
+
+        def counted_get_server_ip_port(server):
+            calls['get_server_ip_port'] += 1
+            return get_server_ip_port(server)
+        pools.build_index = counted_build_index
+        ns_util.get_server_ip_port = counted_get_server_ip_port
+        ns_util.merge_pool(avi_config)
+        assert calls == {'build_index': 1, 'get_server_ip_port': 30000}
+        assert len(avi_config['Pool']) == 20000
+        assert all(len(pool_group['members']) == 2 and
+                   len(get_objects_by_name(avi_config['Pool'], ns_util.get_name(
+                       pool_group['members'][0]['pool_ref']))[0][
+                       'servers']) == 2
+                   for pool_group in avi_config['PoolGroup'])
+
+    @pytest.mark.travis
+    def test_shared_vip_index(self):
+        """
+        Virtual services sharing a vip should be found through the vip index
+        """
+        ns_util = NsUtil()
+        avi_config = AviConfig(VirtualService=[], VsVip=[])
+        for name, addr, port in [('vs1', '1.1.1.1', '80'),
+                                 ('vs2', '1.1.1.1', '443'),
+                                 ('vs3', '2.2.2.2', '80')]:
+            avi_config['VirtualService'].append({
+                'name': name, 'vip': [{'ip_address': {'addr': addr}}],
+                'services': [{'port': port, 'enable_ssl': False}]})
+        vs_list = avi_config['VirtualService']
+        assert get_objects_by_keys(vs_list, get_vip_keys, ['1.1.1.1']) == \
+            vs_list[:2]
+        # Vip changed in place is found by its new address
+        vs_list[2]['vip'][0]['ip_address']['addr'] = '3.3.3.3'
+        assert get_objects_by_keys(vs_list, get_vip_keys, ['3.3.3.3']) == \
+            [vs_list[2]]
+        vs_list[2]['vip'][0]['ip_address']['addr'] = '2.2.2.2'
+        new_vs = {'name': 'vs4', 'vip': [{'ip_address': {'addr': '1.1.1.1'}}],
+                  'services': [{'port': '443', 'enable_ssl': True}]}
+        assert ns_util.is_shared_same_vip(
+            new_vs, vs_list, avi_config, 'admin', 'Default-Cloud', None, None,
+            '17.2', None)
+        new_vs['services'][0]['port'] = '8080'
+        assert not ns_util.is_shared_same_vip(
+            new_vs, vs_list, avi_config, 'admin', 'Default-Cloud', None, None,
+            '17.2', None)
+        assert new_vs['vsvip_ref'].startswith('/api/vsvip/?tenant=admin&'
+                                              'name=1.1.1.1-vsvip')
+        new_vs['services'][0].update({'port': '1', 'port_range_end': '65535'})
+        vs_list.append(new_vs)
+        ns_util.get_vs_if_shared_vip(avi_config, '17.2')
+        assert new_vs['services'] == [
+            {'port': '1', 'port_range_end': '79', 'enable_ssl': True},
+            {'port': '444', 'port_range_end': '65535', 'enable_ssl': False}]
+
+    @pytest.mark.travis
+    def test_progress_json_output(self, cleanup, tmpdir, capsys):
+        """
+        In json mode every line written by a run is a json record on stderr,
+        nothing is printed on stdout
+        """
+        try:
+            netscaler_conv(
+                config_file_name=setup.get('config_file_name'),
+                controller_version=setup.get('controller_version_v17'),
+                output_file_path=str(tmpdir), progress='json')
+        finally:
+            progress.configure()
+        out, err = capsys.readouterr()
+        records = [json.loads(line) for line in err.splitlines()]
+        messages = [record['message'] for record in records
+                    if 'message' in record]
+        assert 'Parsing Input Configuration...' in messages
+        assert 'Converting VirtualServices...' in messages
+        assert any('percent' in record for record in records)
+        assert any('seconds' in record for record in records)
+        assert out == ''
 
 def teardown():
     pass
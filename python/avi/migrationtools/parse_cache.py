@@ -0,0 +1,228 @@
+import cPickle as pickle
+import hashlib
+import logging
+import os
+import avi.migrationtools
+from avi.migrationtools.progress import progress
+
+LOG = logging.getLogger(__name__)
+# Folder created under the output directory to keep the cached parse results
+PARSE_CACHE_DIR = 'parse_cache'
+
+
+def get_files_digest(src_files):
+    """
+    This function defines that return digest of the content of source and
+    data files along with the sdk version
+    :param src_files: paths of files, compiled python files are replaced by
+                      their source
+    :return: sha1 object
+    """
+    digest = hashlib.sha1(getattr(avi.migrationtools, '__version__', ''))
+    for src_file in src_files:
+        if src_file.endswith('.pyc'):
+            src_file = src_file[:-1]
+        if os.path.exists(src_file):
+            with open(src_file, 'rb') as src:
+                digest.update(src.read())
+    return digest
+
+
+class ParseCache(object):
+    """
+    Stores the parsed dict of an input configuration on disk keyed by the
+    sha1 of the input text, so repeated runs over the same configuration with
+    different conversion options skip the parsing step.
+    The key also covers the source of the parser module, the data files read
+    by the parser and the sdk version, hence any change in the parser or its
+    data invalidates the old entries.
+    """
+
+    def __init__(self, output_dir):
+        self.cache_dir = os.path.join(output_dir, PARSE_CACHE_DIR)
+        if not os.path.exists(self.cache_dir):
+            os.makedirs(self.cache_dir)
+
+    def get_parser_digest(self, parser_module, data_files=()):
+        """
+        This function defines that return digest of parser module source and
+        of the data files read by the parser
+        :param parser_module: module which parses the input configuration
+        :param data_files: paths of files read by the parser
+        :return: hex digest of parser source and data files
+        """
+        src_file = os.path.splitext(parser_module.__file__)[0] + '.py'
+        return get_files_digest([src_file] + list(data_files)).hexdigest()
+
+    def get_key(self, source_str, parser_module, options=None,
+                data_files=()):
+        """
+        This function defines that generate cache key for the input text
+        :param source_str: input configuration text
+        :param parser_module: module which parses the input configuration
+        :param options: parser options that changes the parsed output
+        :param data_files: paths of files read by the parser
+        :return: cache key
+        """
+        if isinstance(source_str, unicode):
+            source_str = source_str.encode('utf-8')
+        digest = hashlib.sha1(source_str)
+        digest.update(self.get_parser_digest(parser_module, data_files))
+        digest.update(repr(options))
+        return '%s-%s' % (parser_module.__name__.rsplit('.', 1)[-1],
+                          digest.hexdigest())
+
+    def load(self, key):
+        """
+        This function defines that load the cached parse result
+        :param key: cache key
+        :return: parse result if available else None
+        """
+        cache_file = os.path.join(self.cache_dir, key + '.pickle')
+        if not os.path.exists(cache_file):
+            return None
+        try:
+            with open(cache_file, 'rb') as stream:
+                return pickle.load(stream)
+        except Exception:
+            LOG.warning('Ignoring unreadable parse cache %s' % cache_file,
+                        exc_info=True)
+            return None
+
+    def store(self, key, result):
+        """
+        This function defines that write the parse result to the cache
+        :param key: cache key
+        :param result: parse result
+        :return: None
+        """
+        cache_file = os.path.join(self.cache_dir, key + '.pickle')
+        tmp_file = '%s.%s.tmp' % (cache_file, os.getpid())
+        try:
+            with open(tmp_file, 'wb') as stream:
+                pickle.dump(result, stream, pickle.HIGHEST_PROTOCOL)
+            os.rename(tmp_file, cache_file)
+        except Exception:
+            LOG.warning('Failed to write parse cache %s' % cache_file,
+                        exc_info=True)
+            if os.path.exists(tmp_file):
+                os.remove(tmp_file)
+
+    def get_or_parse(self, source_str, parser_module, options, parse_func,
+                     *args, **kwargs):
+        """
+        This function defines that return cached parse result of input
+        text or parse it and cache the result
+        :param source_str: input configuration text
+        :param parser_module: module which parses the input configuration
+        :param options: parser options that changes the parsed output
+        :param parse_func: function to call on cache miss
+        :param args: arguments for parse function
+        :param kwargs: data_files, paths of files read by the parser
+        :return: parse result
+        """
+        key = self.get_key(source_str, parser_module, options,
+                           kwargs.get('data_files', ()))
+        result = self.load(key)
+        if result is not None:
+            LOG.debug('Using cached parse result %s' % key)
+            progress.message("Using Cached Parse Result...")
+            return result
+        result = parse_func(*args)
+        self.store(key, result)
+        return result
+
+
+class CacheSection(object):
+    """
+    Results of one kind of work of the previous run and of the current run
+    keyed by the sha1 of the content of the unit of work.
+    """
+
+    def __init__(self, previous):
+        self.previous = previous
+        self.current = dict()
+        self.reused = 0
+
+    def get_key(self, *contents):
+        """
+        This function defines that return key of the unit of work
+        :param contents: strings making the content of unit of work
+        :return: hex digest of contents
+        """
+        digest = hashlib.sha1()
+        for content in contents:
+            if isinstance(content, unicode):
+                content = content.encode('utf-8')
+            digest.update(content)
+        return digest.hexdigest()
+
+    def __contains__(self, key):
+        return key in self.current or key in self.previous
+
+    def get(self, key):
+        """
+        This function defines that return result of unit of work and keep it
+        for the next run
+        :param key: key of unit of work
+        :return: result of previous or current run
+        """
+        if key in self.current:
+            return self.current[key]
+        self.reused += 1
+        self.current[key] = self.previous[key]
+        return self.current[key]
+
+    def put(self, key, result):
+        """
+        This function defines that add result of unit of work of current run
+        :param key: key of unit of work
+        :param result: result to be reused by next run
+        :return: None
+        """
+        self.current[key] = result
+
+
+class IncrementalCache(ParseCache):
+    """
+    Keeps results of the previous run for every unit of work, e.g. top level
+    block of the input text, keyed by the sha1 of the unit content. On rerun
+    over a changed configuration only the changed units are parsed again and
+    the results of the rest are reused.
+    Results are grouped in sections keyed by the source of the code doing
+    the work, and results not used by a run are dropped when it is saved.
+    """
+
+    def __init__(self, output_dir, name):
+        super(IncrementalCache, self).__init__(output_dir)
+        self.name = name
+        self.previous = self.load(name) or dict()
+        self.sections = dict()
+
+    def get_section(self, name, src_files, options=None):
+        """
+        This function defines that return cache section for the results of
+        code in source files
+        :param name: name of kind of work
+        :param src_files: source files of code doing the work and data files
+                          used by it
+        :param options: options that changes the results
+        :return: CacheSection
+        """
+        digest = get_files_digest(src_files)
+        digest.update(repr(options))
+        key = '%s-%s' % (name, digest.hexdigest())
+        if key not in self.sections:
+            self.sections[key] = CacheSection(self.previous.get(key, dict()))
+        return self.sections[key]
+
+    def save(self):
+        """
+        This function defines that write results of the current run
+        :return: None
+        """
+        for key, section in sorted(self.sections.iteritems()):
+            LOG.info('Reused %s of %s results of %s' % (
+                section.reused, len(section.current), key.rsplit('-', 1)[0]))
+        self.store(self.name, dict((key, section.current) for key, section
+                                   in self.sections.iteritems()))
@@ -0,0 +1,188 @@
+import json
+import logging
+import sys
+import time
+from collections import OrderedDict
+
+LOG = logging.getLogger(__name__)
+# Progress is drawn as a bar on the terminal
+MODE_BAR = 'bar'
+# Progress is not shown, only phase timings are logged
+MODE_QUIET = 'quiet'
+# Progress, messages and phase timings are written as one json object per
+# line to stderr, so they are not mixed with other output on stdout
+MODE_JSON = 'json'
+PROGRESS_MODES = (MODE_BAR, MODE_QUIET, MODE_JSON)
+# Minimum seconds between two updates of a phase
+MIN_INTERVAL = 0.1
+# Minimum change of percent complete between two updates of a phase
+MIN_PERCENT = 1.0
+
+
+class ProgressReporter(object):
+    """
+    Progress of the loops of the converters shared by all the modules.
+    Updates of a phase, identified by its message, are shown only when both
+    some time has passed and the percent complete has changed enough since
+    the last shown update, so hot loops can report every iteration. The
+    first and the completing update of every phase are always shown. The
+    time taken by every phase is recorded and can be reported at the end of
+    a run. Status messages of the converters are shown through the reporter
+    too, so they follow its mode.
+    """
+
+    def __init__(self):
+        self.mode = MODE_BAR
+        self.min_interval = MIN_INTERVAL
+        self.min_percent = MIN_PERCENT
+        self.stream = sys.stderr
+        self.timings = OrderedDict()
+        self.reset_phase()
+
+    def configure(self, mode=None, min_interval=MIN_INTERVAL,
+                  min_percent=MIN_PERCENT, stream=None):
+        """
+        This function defines that set the mode of the reporter for a run
+        :param mode: one of bar, quiet or json, bar if not given
+        :param min_interval: minimum seconds between two updates of a phase
+        :param min_percent: minimum change of percent complete between two
+                            updates of a phase
+        :param stream: stream to write json lines to, stderr if not given
+        :return: None
+        """
+        if mode and mode not in PROGRESS_MODES:
+            raise ValueError('Invalid progress mode %s, must be one of %s'
+                             % (mode, ', '.join(PROGRESS_MODES)))
+        self.mode = mode or MODE_BAR
+        self.min_interval = min_interval
+        self.min_percent = min_percent
+        self.stream = stream or sys.stderr
+        self.timings = OrderedDict()
+        self.reset_phase()
+
+    def reset_phase(self):
+        """
+        This function defines that forget the phase in progress
+        :return: None
+        """
+        self.phase = None
+        self.phase_start = None
+        self.last_iteration = None
+        self.last_time = None
+        self.last_percent = None
+        self.completed = False
+
+    def start_phase(self, phase, now):
+        """
+        This function defines that start timing of a new phase
+        :param phase: phase name
+        :param now: current time
+        :return: None
+        """
+        self.reset_phase()
+        self.phase = phase
+        self.phase_start = now
+
+    def end_phase(self, now):
+        """
+        This function defines that add time of phase in progress to the
+        timings of its name
+        :param now: current time
+        :return: None
+        """
+        name = self.phase or 'Progress'
+        self.timings[name] = self.timings.get(name, 0.0) + \
+            now - self.phase_start
+        self.completed = True
+
+    def update(self, iteration, total, msg, prefix='', suffix='',
+               decimals=1, length=50, fill='#'):
+        """
+        This function defines that report progress of a loop, the update is
+        shown only when it is first or last of the phase or when it is not
+        too close to the last shown update
+        :param iteration: current iteration
+        :param total: total iterations
+        :param msg: message naming the phase
+        :param prefix: prefix of bar
+        :param suffix: suffix of bar
+        :param decimals: number of decimals in percent complete
+        :param length: character length of bar
+        :param fill: bar fill character
+        :return: True if the progress bar was printed
+        """
+        if msg != self.phase or self.last_iteration is None or \
+                iteration < self.last_iteration:
+            self.start_phase(msg, time.time())
+        elif self.completed:
+            # Phase is reported complete once
+            self.last_iteration = iteration
+            return False
+        self.last_iteration = iteration
+        percent = 100 * (iteration / float(total)) if total else 100.0
+        done = iteration >= total
+        # Percent is checked first as it is cheaper than reading the clock
+        if not done and self.last_time is not None and \
+                percent - self.last_percent < self.min_percent:
+            return False
+        now = time.time()
+        if done:
+            self.end_phase(now)
+        elif self.last_time is not None and \
+                now - self.last_time < self.min_interval:
+            return False
+        self.last_time = now
+        self.last_percent = percent
+        if self.mode == MODE_JSON:
+            self.write_json({'phase': msg, 'iteration': iteration,
+                             'total': total,
+                             'percent': round(percent, decimals)})
+            return False
+        if self.mode == MODE_QUIET:
+            return False
+        percent = ("{0:." + str(decimals) + "f}").format(percent)
+        filled_length = int(length * iteration // total) if total else length
+        bar = fill * filled_length + '-' * (length - filled_length)
+        if done:
+            print '\r%s |%s| %s%% %s' % (prefix, bar, percent, suffix)
+        else:
+            print '\r%s |%s| %s%% %s' % (prefix, bar, percent, suffix),
+            sys.stdout.flush()
+        return True
+
+    def message(self, text):
+        """
+        This function defines that show status message of the run, printed
+        in bar mode and written as json line in json mode
+        :param text: message
+        :return: None
+        """
+        if self.mode == MODE_JSON:
+            self.write_json({'message': text})
+        elif self.mode == MODE_BAR:
+            print text
+
+    def write_json(self, record):
+        """
+        This function defines that write record as a json line
+        :param record: dict to write
+        :return: None
+        """
+        self.stream.write(json.dumps(record) + '\n')
+        self.stream.flush()
+
+    def report_phase_timings(self):
+        """
+        This function defines that log the time taken by every phase of the
+        run, and write it as json lines in json mode
+        :return: dict of phase name to seconds
+        """
+        for name, seconds in self.timings.iteritems():
+            LOG.info('Phase %s took %.3f seconds' % (name, seconds))
+            if self.mode == MODE_JSON:
+                self.write_json({'phase': name, 'seconds': round(seconds, 3)})
+        return self.timings
+
+
+# Progress reporter shared by the converters
+progress = ProgressReporter()
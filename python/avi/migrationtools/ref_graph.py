@@ -0,0 +1,265 @@
+import logging
+import urlparse
+
+LOG = logging.getLogger(__name__)
+
+PATH_KEY_MAP = {'poolgroup': 'PoolGroup', 'healthmonitor': 'HealthMonitor',
+                'sslprofile': 'SSLProfile', 'httppolicyset': 'HTTPPolicySet',
+                'sslkeyandcertificate': 'SSLKeyAndCertificate', 'pool': 'Pool',
+                'networkprofile': 'NetworkProfile', 'pkiprofile': 'PKIProfile',
+                'stringgroup': 'StringGroup', 'vrfcontext': 'VrfContext',
+                'applicationprofile': 'ApplicationProfile', 'vsdatascriptset':
+                    'VSDataScriptSet', 'networksecuritypolicy':
+                    'NetworkSecurityPolicy', 'applicationpersistenceprofile':
+                    'ApplicationPersistenceProfile', 'prioritylabels':
+                    'PriorityLabels', 'vsvip': 'VsVip', 'tenant': "Tenant",
+                'serviceenginegroup': 'ServiceEngineGroup',
+                'virtualservice': 'VirtualService'}
+
+# Reference fields not followed while looking for objects in use
+ORPHAN_SKIP_FIELDS = ('cloud_ref', 'ssl_profile_name')
+# Parsed entity and name of every reference url seen so far
+ref_cache = dict()
+
+
+def get_name_and_entity(url):
+    """
+    Parses reference string to extract object type and name, parsed
+    references are cached as the same reference is used by many objects
+    :param url: reference url to be parsed
+    :return: entity and object name
+    """
+    result = ref_cache.get(url)
+    if result is None:
+        parsed = urlparse.urlparse(url)
+        result = (parsed.path.split('/')[2],
+                  urlparse.parse_qs(parsed.query)['name'][0])
+        ref_cache[url] = result
+    return result
+
+
+def clear_ref_cache():
+    """
+    This function defines that drop the parsed references, called at start
+    of every conversion so references of earlier runs are not kept
+    :return: None
+    """
+    ref_cache.clear()
+
+
+def get_tenant_name(obj):
+    """
+    This function defines that return tenant name of object
+    :param obj: Avi object
+    :return: tenant name if object has tenant ref else None
+    """
+    if 'tenant_ref' in obj:
+        return get_name_and_entity(obj['tenant_ref'])[1]
+    return None
+
+
+def iter_nested_dicts(obj):
+    """
+    This function defines that return the dicts in object and in its nested
+    dicts and lists, walked iteratively so deeply nested objects do not hit
+    the recursion limit. A dict reached more than once is returned once.
+    :param obj: dict or list
+    :return: generator of dicts in depth first order
+    """
+    visited = set()
+    stack = [obj]
+    while stack:
+        obj = stack.pop()
+        if isinstance(obj, dict):
+            if id(obj) in visited:
+                continue
+            visited.add(id(obj))
+            yield obj
+            values = obj.values()
+        elif isinstance(obj, list):
+            values = obj
+        else:
+            continue
+        stack.extend(value for value in reversed(values)
+                     if isinstance(value, (dict, list)))
+
+
+def get_ref_fields(obj_dict):
+    """
+    This function defines that return the reference fields of object and
+    of its nested objects in the order of keys. Besides the references it
+    returns ssl_profile_name, hostname and name fields which are used as
+    references or graph nodes.
+    :param obj_dict: Avi object
+    :return: list of tuple of field name, value and dict having the field
+    """
+    fields = []
+    visited = {id(obj_dict)}
+    stack = [(obj_dict, obj_dict.iteritems())]
+    while stack:
+        obj, items = stack[-1]
+        for key, value in items:
+            if key.endswith('ref') or key == 'ssl_profile_name':
+                fields.append((key, value, obj))
+            elif key.endswith('refs'):
+                fields.extend((key, ref, obj) for ref in value)
+            elif isinstance(value, dict):
+                if id(value) not in visited:
+                    visited.add(id(value))
+                    stack.append((value, value.iteritems()))
+                    break
+            elif value and isinstance(value, list) and \
+                    isinstance(value[0], dict):
+                members = [member for member in value
+                           if id(member) not in visited]
+                visited.update(id(member) for member in members)
+                stack.extend((member, member.iteritems())
+                             for member in reversed(members))
+                break
+            elif key in ('hostname', 'name'):
+                fields.append((key, value, obj))
+        else:
+            stack.pop()
+    return fields
+
+
+class RefGraph(object):
+    """
+    Reference graph of Avi configuration. Objects are indexed by type and
+    name, and reference fields of every object are extracted and parsed
+    only once, so following a reference is a dict lookup instead of a scan
+    of the object list. VS filtering, orphan detection and VS dependency
+    closure are answered from this graph.
+    """
+
+    def __init__(self, avi_config, path_key_map=PATH_KEY_MAP):
+        self.avi_config = avi_config
+        self.path_key_map = path_key_map
+        self.objects = dict()
+        self.fields = dict()
+        for obj_type, obj_list in avi_config.iteritems():
+            if not isinstance(obj_list, list):
+                continue
+            for obj in obj_list:
+                if isinstance(obj, dict):
+                    # First object of the name is referred as in lookups
+                    self.objects.setdefault((obj_type, obj.get('name')), obj)
+
+    def get_object(self, obj_type, name):
+        """
+        This function defines that return object of type with name
+        :param obj_type: Avi config key of object type
+        :param name: name of object
+        :return: object if available else None
+        """
+        return self.objects.get((obj_type, name))
+
+    def get_ref_target(self, entity, name):
+        """
+        This function defines that return object referred by entity and name
+        :param entity: object type in reference url
+        :param name: name of object
+        :return: object if available else None
+        """
+        return self.objects.get((self.path_key_map.get(entity), name))
+
+    def get_fields(self, obj):
+        """
+        This function defines that return cached reference fields of object
+        :param obj: Avi object
+        :return: list of tuple of field name, value and dict having the field
+        """
+        fields = self.fields.get(id(obj))
+        if fields is None:
+            fields = get_ref_fields(obj)
+            self.fields[id(obj)] = fields
+        return fields
+
+    def walk(self, obj, skip_fields=('cloud_ref', 'tenant_ref'),
+             visited=None):
+        """
+        This function defines that walk the fields of object and of the
+        objects referred by it directly or indirectly, iteratively in depth
+        first order. Fields of an object are walked only once, so objects
+        shared by many referrers and reference cycles are not walked again.
+        :param obj: Avi object to start from
+        :param skip_fields: reference fields which are not walked
+        :param visited: ids of objects already walked, shared to walk many
+                        objects without walking their common objects again
+        :return: generator of tuple of depth, object walked, field name,
+                 value, dict having the field and referred object or None
+        """
+        if visited is None:
+            visited = set()
+        visited.add(id(obj))
+        stack = [(0, obj, iter(self.get_fields(obj)))]
+        while stack:
+            depth, owner, fields = stack[-1]
+            for field, value, parent in fields:
+                if field in skip_fields:
+                    continue
+                target = None
+                if field not in ('hostname', 'name') and value:
+                    target = self.get_ref_target(*get_name_and_entity(value))
+                yield depth, owner, field, value, parent, target
+                if target is not None and id(target) not in visited:
+                    visited.add(id(target))
+                    stack.append((depth + 1, target,
+                                  iter(self.get_fields(target))))
+                    break
+            else:
+                stack.pop()
+
+    def get_closure(self, obj, skip_fields=('cloud_ref', 'tenant_ref')):
+        """
+        This function defines that return all objects referred directly or
+        indirectly by the object
+        :param obj: Avi object
+        :param skip_fields: reference fields which are not followed
+        :return: list of objects in depth first order of first reference
+        """
+        closure = []
+        seen = {id(obj)}
+        for depth, owner, field, value, parent, target in self.walk(
+                obj, skip_fields):
+            if target is not None and id(target) not in seen:
+                seen.add(id(target))
+                closure.append(target)
+        return closure
+
+    def get_full_name(self, obj, obj_type):
+        """
+        This function defines that return name of object unique across
+        types and tenants
+        :param obj: Avi object
+        :param obj_type: Avi config key of object type
+        :return: name-type-tenant string
+        """
+        return '%s-%s-%s' % (obj['name'], obj_type, get_tenant_name(obj))
+
+    def get_in_use(self, vs_ref_dict=None):
+        """
+        This function defines that return names of virtual services and of
+        all objects referred by them
+        :param vs_ref_dict: dict to fill with names of virtual services
+                            referring each name$$entity$$tenant reference
+        :return: set of name-type-tenant strings
+        """
+        in_use = set()
+        for vs in self.avi_config.get('VirtualService', []):
+            in_use.add(self.get_full_name(vs, 'VirtualService'))
+            for depth, owner, field, value, parent, target in self.walk(
+                    vs, ORPHAN_SKIP_FIELDS):
+                if field in ('hostname', 'name') or not value:
+                    continue
+                entity, name = get_name_and_entity(value)
+                if vs_ref_dict is not None:
+                    ref_key = '%s$$%s$$%s' % (name, entity,
+                                              get_tenant_name(parent))
+                    vs_names = vs_ref_dict.setdefault(ref_key, [])
+                    if vs['name'] not in vs_names:
+                        vs_names.append(vs['name'])
+                if target is not None:
+                    in_use.add(self.get_full_name(
+                        target, self.path_key_map[entity]))
+        return in_use
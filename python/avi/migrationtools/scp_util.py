@@ -1,16 +1,27 @@
 import paramiko
 import logging
 import os
+import threading
+import time
+from collections import OrderedDict
+from multiprocessing.pool import ThreadPool
 from stat import S_ISDIR
 
 LOG = logging.getLogger(__name__)
 
 
 class SCPUtil(object):
-    def __init__(self, hostname, username, password=None, pkey=None, port=22):
+    def __init__(self, hostname, username, password=None, pkey=None, port=22,
+                 workers=1):
         """Initialize and setup connection"""
         self.sftp = None
         self.sftp_open = False
+        # Number of SFTP channels downloading files concurrently
+        self.workers = workers or 1
+        # SFTP channel of each download thread
+        self.local = threading.local()
+        self.channels = []
+        self.channels_lock = threading.Lock()
         # open SSH Transport stream
         self.transport = paramiko.Transport((hostname, port))
         self.transport.connect(username=username, password=password, pkey=pkey)
@@ -38,12 +49,129 @@ class SCPUtil(object):
         return self.sftp.listdir(remote_path)
 
     def get_all_files(self, remote_path, local_path=None):
-        files = self.get_all_file_names(remote_path)
-        for file in files:
+        self.download(self.list_files(remote_path, local_path))
+
+    def list_files(self, remote_path, local_path):
+        """
+        This method lists the files of remote directory with their
+        attributes in a single request
+        :param remote_path: remote directory ending with separator
+        :param local_path: local directory ending with separator
+        :return: list of tuple of remote file, local file and attributes
+        """
+        self._openSFTPConnection()
+        return [(remote_path + attr.filename, local_path + attr.filename, attr)
+                for attr in self.sftp.listdir_attr(remote_path)
+                if not S_ISDIR(attr.st_mode)]
+
+    def list_file(self, remote_file, local_file):
+        """
+        This method returns download entry of a single remote file
+        :param remote_file: remote file path
+        :param local_file: local file path
+        :return: list of tuple of remote file, local file and attributes
+        :raises IOError: if remote file does not exist
+        """
+        self._openSFTPConnection()
+        return [(remote_file, local_file, self.sftp.stat(remote_file))]
+
+    def get_channel(self):
+        """
+        This method returns the SFTP channel of the current thread, opened
+        on the shared transport
+        """
+        sftp = getattr(self.local, 'sftp', None)
+        if sftp is None:
+            sftp = self.open_channel()
+            self.local.sftp = sftp
+            with self.channels_lock:
+                self.channels.append(sftp)
+        return sftp
+
+    def open_channel(self):
+        """
+        This method opens a new SFTP channel on the transport
+        """
+        return paramiko.SFTPClient.from_transport(self.transport)
+
+    def is_local_copy_current(self, local_file, attr):
+        """
+        This method checks whether local file has same size and
+        modification time as the remote file
+        :param local_file: local file path
+        :param attr: attributes of remote file
+        :return: True if local copy need not be downloaded again
+        """
+        try:
+            stat = os.stat(local_file)
+        except OSError:
+            return False
+        return attr.st_size is not None and attr.st_mtime is not None and \
+            stat.st_size == attr.st_size and \
+            int(stat.st_mtime) == int(attr.st_mtime)
+
+    def download_file(self, entry):
+        """
+        This method downloads one file on the SFTP channel of current
+        thread and sets its modification time to the remote one
+        :param entry: tuple of remote file, local file and attributes
+        :return: tuple of remote file, bytes downloaded and error if failed
+        """
+        remote_file, local_file, attr = entry
+        try:
+            self.get_channel().get(remote_file, local_file)
+            if attr.st_mtime is not None:
+                os.utime(local_file, (attr.st_atime or attr.st_mtime,
+                                      attr.st_mtime))
+            return remote_file, os.path.getsize(local_file), None
+        except (IOError, OSError) as e:
+            return remote_file, 0, e
+
+    def download(self, entries):
+        """
+        This method downloads the files over several SFTP channels of the
+        transport, files whose local copy has same size and modification
+        time are skipped. When several remote files have the same local
+        file only the last one is downloaded, as it would overwrite others.
+        :param entries: list of tuple of remote file, local file and
+                        attributes
+        :return: list of remote files failed to download
+        """
+        unique = OrderedDict()
+        for entry in entries:
+            if entry[1] in unique:
+                LOG.warning('%s and %s have same local file %s, downloading '
+                            'only %s' % (unique[entry[1]][0], entry[0],
+                                         entry[1], entry[0]))
+                del unique[entry[1]]
+            unique[entry[1]] = entry
+        entries = unique.values()
+        pending = [entry for entry in entries
+                   if not self.is_local_copy_current(entry[1], entry[2])]
+        skipped = len(entries) - len(pending)
+        start = time.time()
+        if self.workers > 1 and len(pending) > 1:
+            pool = ThreadPool(min(self.workers, len(pending)))
             try:
-                self.get(remote_path+file, local_path+file)
-            except IOError as e:
-                LOG.error(e)
+                results = pool.map(self.download_file, pending)
+            finally:
+                pool.close()
+                pool.join()
+        else:
+            results = [self.download_file(entry) for entry in pending]
+        elapsed = max(time.time() - start, 0.001)
+        failed = []
+        total_bytes = 0
+        for remote_file, size, error in results:
+            if error:
+                LOG.error('Failed to download %s: %s' % (remote_file, error))
+                failed.append(remote_file)
+            total_bytes += size
+        LOG.info('Downloaded %s files, %s bytes in %.2f seconds (%.1f KB/s), '
+                 'skipped %s unchanged files' % (
+                     len(pending) - len(failed), total_bytes, elapsed,
+                     total_bytes / 1024.0 / elapsed, skipped))
+        return failed
 
     def rexists(self, path):
         """os.path.exists for paramiko's SCP object
@@ -58,17 +186,31 @@ class SCPUtil(object):
             return True
 
     def get_all_partition_config(self, partition_path, local_path):
+        self.download(self.list_partition_config(partition_path, local_path))
+
+    def list_partition_config(self, partition_path, local_path):
+        """
+        This method lists bigip.conf files of partition directories
+        :param partition_path: remote partitions directory
+        :param local_path: local directory ending with separator
+        :return: list of tuple of remote file, local file and attributes
+        """
+        self._openSFTPConnection()
         if not self.rexists(partition_path):
-            return
-        files = self.get_all_file_names(partition_path)
-        for file in files:
-            remote_file = partition_path+file+'/bigip.conf'
-            if self.isdir(partition_path+file) and self.rexists(remote_file):
-                try:
-                    self.get(remote_file, local_path+file+'_bigip.conf')
-                except IOError as e:
-                    LOG.error(
-                        "conf file not found in partition dir : %s" % file)
+            return []
+        entries = []
+        for attr in self.sftp.listdir_attr(partition_path):
+            if not S_ISDIR(attr.st_mode):
+                continue
+            remote_file = partition_path + attr.filename + '/bigip.conf'
+            try:
+                entries.extend(self.list_file(
+                    remote_file, local_path + attr.filename + '_bigip.conf'))
+            except IOError:
+                LOG.error(
+                    "conf file not found in partition dir : %s" %
+                    attr.filename)
+        return entries
 
     def get_all_partition_certkey(self, partition_path, local_path):
         """
@@ -78,20 +220,38 @@ class SCPUtil(object):
         :param local_path:
         :return:
         """
+        self.download(self.list_partition_certkey(partition_path, local_path))
+
+    def list_partition_certkey(self, partition_path, local_path):
+        """
+        This method lists all cert and key files of partition directories,
+        directories are walked depth first with one request per directory.
+        Files of all directories are downloaded into local path, so a file
+        listed later replaces the earlier one having the same name.
+        :param partition_path: remote partitions directory
+        :param local_path: local directory
+        :return: list of tuple of remote file, local file and attributes
+        """
+        self._openSFTPConnection()
         if not self.rexists(partition_path):
-            return
-        files = self.get_all_file_names(partition_path)
-        for filename in files:
-            if self.isdir(partition_path + os.sep + filename):
-                self.get_all_partition_certkey(partition_path + os.sep +
-                                               filename, local_path)
+            return []
+        entries = []
+        directories = [(partition_path,
+                        iter(self.sftp.listdir_attr(partition_path)))]
+        while directories:
+            directory, attrs = directories[-1]
+            attr = next(attrs, None)
+            if attr is None:
+                directories.pop()
+                continue
+            remote_file = directory + os.sep + attr.filename
+            if S_ISDIR(attr.st_mode):
+                directories.append(
+                    (remote_file, iter(self.sftp.listdir_attr(remote_file))))
             else:
-                try:
-                    self.get(partition_path + os.sep + filename, local_path +
-                             os.sep + filename)
-                except IOError as e:
-                    LOG.error("cert key file not found in partition dir : %s" %
-                              filename)
+                entries.append((remote_file,
+                                local_path + os.sep + attr.filename, attr))
+        return entries
 
     def isdir(self, path):
         self._openSFTPConnection()
@@ -108,4 +268,7 @@ class SCPUtil(object):
         if self.sftp_open:
             self.sftp.close()
             self.sftp_open = False
+        for sftp in self.channels:
+            sftp.close()
+        self.channels = []
         self.transport.close()
@@ -0,0 +1,189 @@
+"""
+This testsuite contains the test cases for the ansible playbook generation
+shared by the converters
+"""
+import copy
+import os
+import shutil
+import tempfile
+import pytest
+import yaml
+
+import avi.migrationtools.ansible.ansible_config_converter as \
+    ansible_config_converter
+from avi.migrationtools.ansible.ansible_config_converter import \
+    AviAnsibleConverter
+from avi.migrationtools.ansible.playbook_writer import PlaybookWriter
+from avi.migrationtools.avi_orphan_object import filter_for_vs
+
+
+class TestAnsible:
+
+    @pytest.mark.travis
+    def test_playbook_writer(self):
+        play = {'connection': 'local', 'hosts': 'localhost',
+                'roles': ['avinetworks.avisdk'],
+                'vars': {'controller': '{{ controller }}', 'state': 'present'}}
+        tasks = [{'avi_pool': {'name': 'pool-%s' % index,
+                               'description': 'pool ' * 30,
+                               'servers': [{'ip': {'addr': '10.0.0.%s' % index,
+                                                   'type': 'V4'}}]},
+                  'name': 'Create or Update Pool: pool-%s' % index,
+                  'tags': ['pool-%s' % index, 'create_object']}
+                 for index in range(5)]
+        out_dir = tempfile.mkdtemp()
+        path = os.path.join(out_dir, 'playbook.yml')
+        for reverse in (False, True):
+            with PlaybookWriter(path, play, '# comment\n',
+                                reverse=reverse) as writer:
+                for task in tasks:
+                    writer.add_task(task)
+            expected = dict(play)
+            expected['tasks'] = list(reversed(tasks)) if reverse else tasks
+            with open(path) as stream:
+                assert stream.read() == '# comment\n---\n' + yaml.safe_dump(
+                    [expected], default_flow_style=False, indent=2)
+        with PlaybookWriter(path, play, '# comment\n'):
+            pass
+        with open(path) as stream:
+            assert yaml.safe_load(stream) == [dict(play, tasks=[])]
+        shutil.rmtree(out_dir)
+
+    @pytest.mark.travis
+    def test_ansible_shards(self):
+        """
+        Objects referred by one virtual service are placed in its shard,
+        shared objects before and objects referring to a shard after it
+        """
+        ref = '/api/%s/?tenant=%s&name=%s'
+        admin = ref % ('tenant', 'admin', 'admin')
+        tenant = ref % ('tenant', 't1', 't1')
+        avi_config = {
+            'META': {'version': {'Version': '17.2.12'}},
+            'Tenant': [{'name': 't1'}],
+            'HealthMonitor': [{'name': 'hm', 'tenant_ref': admin}],
+            'Pool': [
+                {'name': 'shared', 'tenant_ref': admin,
+                 'health_monitor_refs': [ref % ('healthmonitor', 'admin',
+                                                'hm')]},
+                {'name': 'p1', 'tenant_ref': tenant,
+                 'health_monitor_refs': [ref % ('healthmonitor', 'admin',
+                                                'hm')]},
+                {'name': 'unused', 'tenant_ref': tenant}],
+            'PoolGroup': [{'name': 'pg', 'tenant_ref': tenant,
+                           'members': [{'pool_ref': ref % ('pool', 't1',
+                                                           'p1')}]}],
+            'VirtualService': [
+                {'name': 'vs1', 'tenant_ref': tenant,
+                 'pool_ref': ref % ('pool', 't1', 'p1')},
+                {'name': 'vs2', 'tenant_ref': admin,
+                 'pool_ref': ref % ('pool', 'admin', 'shared')},
+                {'name': 'vs3', 'tenant_ref': admin,
+                 'pool_ref': ref % ('pool', 'admin', 'shared')}]}
+        flat_dir = tempfile.mkdtemp()
+        shard_dir = tempfile.mkdtemp()
+        AviAnsibleConverter(avi_config, flat_dir, None,
+                            False).write_ansible_playbook()
+        converter = AviAnsibleConverter(avi_config, shard_dir, None, False,
+                                        shard=True, workers=2)
+        converter.write_ansible_playbook()
+        phases = converter.get_shards(
+            converter.avi_cfg_temp, filter_for_vs(avi_config))
+        assert phases == [
+            [('admin/common', [('tenant', 0), ('healthmonitor', 0),
+                               ('pool', 0)])],
+            [('t1/common', [('pool', 2)])],
+            [('admin/vs-vs2', [('virtualservice', 1)]),
+             ('admin/vs-vs3', [('virtualservice', 2)]),
+             ('t1/vs-vs1', [('pool', 1), ('virtualservice', 0)])],
+            [('t1/final', [('poolgroup', 0)])]]
+        for playbook, suffix in (('avi_config_create_object.yml', ''),
+                                 ('avi_config_delete_object.yml', '_delete')):
+            with open(os.path.join(flat_dir, playbook)) as stream:
+                flat_tasks = yaml.safe_load(stream)[0]['tasks']
+            with open(os.path.join(shard_dir, playbook)) as stream:
+                plays = yaml.safe_load(stream)
+            shard_hosts = plays[0]['tasks'][0]['with_items']
+            assert [play['hosts'] for play in plays[1:]] == \
+                ['avi_shards_%s' % number for number in range(1, 5)]
+            assert all(play['strategy'] == 'free' for play in plays[1:])
+            shard_tasks = []
+            for host in shard_hosts:
+                assert host['tasks'].endswith(suffix + '.yml')
+                with open(os.path.join(shard_dir, host['tasks'])) as stream:
+                    shard_tasks.extend(yaml.safe_load(stream))
+            assert sorted(task['name'] for task in shard_tasks) == \
+                sorted(task['name'] for task in flat_tasks)
+        # Delete playbook runs the final shards first
+        assert shard_hosts[0]['tasks'] == 'ansible_shards/t1/final_delete.yml'
+        shutil.rmtree(flat_dir)
+        shutil.rmtree(shard_dir)
+
+    @pytest.mark.travis
+    def test_ansible_ref_transform_benchmark(self):
+        """
+        Tasks of an export having 100k references should be built without
+        copying the objects first, converting every distinct reference once
+        """
+        ref = '/api/%s/?tenant=admin&name=%s'
+        pools = []
+        for index in range(20000):
+            pools.append({
+                'name': 'pool-%s' % index, 'uuid': 'pool-uuid-%s' % index,
+                'tenant_ref': ref % ('tenant', 'admin'),
+                'cloud_ref': ref % ('cloud', 'Default-Cloud'),
+                'health_monitor_refs': [ref % ('healthmonitor', 'hm-tcp'),
+                                        ref % ('healthmonitor', 'hm-%s' % (
+                                            index % 100))],
+                'servers': [{'ip': {'addr': '10.0.%s.%s' % (
+                    index / 256, index % 256), 'type': 'V4'}}],
+                'placement_networks': [{
+                    'network_ref': '/api/network/?tenant=admin&name=net1'
+                                   '&cloud=Default-Cloud'}]})
+        avi_config = {'META': {'version': {'Version': '17.2.12'}},
+                      'Pool': pools}
+        original = copy.deepcopy(pools)
+        converter = AviAnsibleConverter(avi_config, None, None, False)
+        inuse_list = filter_for_vs(avi_config)
+        calls = {'deepcopy': 0, 'convert_ref': 0, 'get_converted_ref': 0}
+        convert_ref = converter.convert_ref
+        get_converted_ref = converter.get_converted_ref
+
+        def counted_deepcopy(*args):
+            calls['deepcopy'] += 1
+            return copy.deepcopy(*args)
+
+        def counted_convert_ref(ref):
+            calls['convert_ref'] += 1
+            return convert_ref(ref)
+
+        def counted_get_converted_ref(ref):
+            calls['get_converted_ref'] += 1
+            return get_converted_ref(ref)
+        converter.convert_ref = counted_convert_ref
+        converter.get_converted_ref = counted_get_converted_ref
+        ansible_config_converter.deepcopy = counted_deepcopy
+        try:
+            tasks = list(converter.get_ansible_tasks('Pool', pools,
+                                                     inuse_list))
+        finally:
+            ansible_config_converter.deepcopy = copy.deepcopy
+        assert len(tasks) == 20000
+        assert pools == original
+        # Objects are not copied first and every distinct reference of the
+        # 100k references is converted once
+        assert calls == {'deepcopy': 0, 'convert_ref': 104,
+                         'get_converted_ref': 100000}
+        assert len(converter.ref_cache) == 104
+        for task, pool in zip(tasks[:200], original[:200]):
+            expected = copy.deepcopy(pool)
+            for skip_field in converter.skip_fields:
+                expected.pop(skip_field, None)
+            converter.transform_obj_refs(expected)
+            pool_task = task['avi_pool']
+            assert dict((k, pool_task[k]) for k in expected) == expected
+            assert pool_task['placement_networks'][0] == {
+                'network_ref': '/api/network/?name=net1',
+                'cloud_ref': '/api/cloud?name=Default-Cloud'}
+            assert pool_task['tenant'] == 'admin'
+            assert 'uuid' not in pool_task
@@ -0,0 +1,85 @@
+"""
+This testsuite contains the test cases for the indexed Avi object lists
+of avi_config shared by the converters
+"""
+import copy
+import json
+import pytest
+
+from avi.migrationtools.avi_config import AviConfig, AviObjectList
+
+
+class TestAviConfig:
+
+    @pytest.mark.travis
+    def test_avi_config_name_index(self):
+        """
+        Avi config lookups by name should follow changes to object lists
+        """
+        avi_config = AviConfig()
+        avi_config['Pool'] = [{'name': 'p1', 'tenant_ref': 't1'},
+                              {'name': 'p1', 'tenant_ref': 't2'}]
+        pools = avi_config['Pool']
+        assert len(avi_config.get_by_name('Pool', 'p1')) == 2
+        assert avi_config.get_by_name('Pool', 'p1', tenant_ref='t2') == \
+            [pools[1]]
+        pools.append({'name': 'p2', 'tenant_ref': 't1'})
+        pools.remove(pools[0])
+        assert avi_config.get_by_name('Pool', 'p1') == [pools[0]]
+        pools.rename(pools[1], 'p3')
+        assert avi_config.get_by_name('Pool', 'p2') == []
+        assert avi_config.get_by_name('Pool', 'p3') == [pools[1]]
+        copied = copy.deepcopy(avi_config)
+        assert copied.get_by_name('Pool', 'p3') == [pools[1]]
+        assert json.loads(json.dumps(avi_config)) == avi_config
+        # Object renamed in place is found by its new name
+        objects = AviObjectList([{'name': 'a'}])
+        assert objects.get_by_name('a') == [objects[0]]
+        objects[0]['name'] = 'b'
+        assert objects.get_by_name('a') == []
+        assert objects.get_by_name('b') == [objects[0]]
+
+    @pytest.mark.travis
+    def test_duplicate_after_in_place_change(self):
+        """
+        Objects changed in place after they are added should be found as
+        duplicates by their current content
+        """
+        objects = AviObjectList([{'name': 'a', 'x': 1}])
+        assert objects.get_duplicate({'name': 'b', 'x': 1})['name'] == 'a'
+        objects[0]['x'] = 2
+        assert objects.get_duplicate({'name': 'b', 'x': 1}) is None
+        assert objects.get_duplicate({'name': 'b', 'x': 2})['name'] == 'a'
+        added = {'name': 'c', 'x': 3}
+        objects.append(added)
+        added['x'] = 4
+        assert objects.get_duplicate({'name': 'd', 'x': 4})['name'] == 'c'
+        # Iteration keeps the fingerprint index, objects changed through it
+        # have to be touched
+        build_index = objects.build_fingerprint_index
+        builds = []
+
+        def counted_build_index():
+            builds.append(1)
+            return build_index()
+        objects.build_fingerprint_index = counted_build_index
+        assert [obj['name'] for obj in objects] == ['a', 'c']
+        assert copy.deepcopy(objects) == objects
+        assert objects.get_duplicate({'name': 'd', 'x': 4}) is added
+        assert builds == []
+        for obj in objects:
+            obj['y'] = 1
+            objects.touch(obj)
+        assert objects.get_duplicate({'name': 'd', 'x': 4}) is None
+        assert objects.get_duplicate({'name': 'd', 'x': 4, 'y': 1}) is added
+        objects.get_by_name('a')[0]['x'] = 4
+        assert objects.get_duplicate({'name': 'd', 'x': 4, 'y': 1}) is \
+            objects[0]
+        duplicate = objects.get_duplicate({'name': 'd', 'x': 4, 'y': 1})
+        duplicate['x'] = 5
+        assert objects.get_duplicate({'name': 'd', 'x': 4, 'y': 1}) is added
+        # Object changed through a reference kept from before it was added
+        # has to be touched
+        added['x'] = 6
+        objects.touch(added)
+        assert objects.get_duplicate({'name': 'd', 'x': 6, 'y': 1}) is added
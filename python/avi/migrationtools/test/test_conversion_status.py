@@ -0,0 +1,33 @@
+"""
+This testsuite contains the test cases for the conversion status store
+shared by the converters
+"""
+import pytest
+
+from avi.migrationtools.conversion_status import ConversionStatusStore
+
+
+class TestConversionStatusStore:
+
+    @pytest.mark.travis
+    def test_conversion_status_store_index(self):
+        """
+        Conversion status store should keep the rows indexed on status update
+        """
+        store = ConversionStatusStore(
+            'Netscaler Command', 'Object Name', line_key='Line Number')
+        store.append({'Line Number': 1, 'Netscaler Command': 'add lb vserver',
+                      'Object Name': 'vs1', 'Status': 'SUCCESSFUL'})
+        store.append({'Line Number': 2, 'Netscaler Command': 'add server',
+                      'Object Name': 's1', 'Status': 'PARTIAL'})
+        store.append({'Line Number': 1, 'Netscaler Command': 'add lb vserver',
+                      'Object Name': 'vs1', 'Status': 'SKIPPED'})
+        assert len(store.get_by_line(1)) == 2
+        vs_rows = store.get_rows(obj_types=['add lb vserver'], name='vs1',
+                                 statuses=['SUCCESSFUL'])
+        assert vs_rows == [store[0]]
+        store.set_status(vs_rows[0], 'INDIRECT')
+        assert store.count_status('SUCCESSFUL') == 0
+        assert store.get_rows(statuses=['INDIRECT', 'PARTIAL']) == store[:2]
+        assert store.get_rows(statuses=['PARTIAL', 'SKIPPED'],
+                              exclude_types=['add server']) == [store[2]]
@@ -0,0 +1,60 @@
+"""
+This testsuite contains the test cases for the progress reporter shared by
+the converters
+"""
+import json
+import pytest
+from StringIO import StringIO
+
+from avi.migrationtools.progress import ProgressReporter
+
+
+class TestProgressReporter:
+
+    @pytest.mark.travis
+    def test_progress_reporter(self, capsys):
+        """
+        Progress of every iteration of a hot loop should be shown only when
+        time and percent complete changed enough, first and last always
+        """
+        reporter = ProgressReporter()
+        reporter.configure('bar', min_interval=0, min_percent=1.0)
+        printed = [reporter.update(count, 100000, 'parsing', 'Progress')
+                   for count in range(1, 100001)]
+        assert printed[0] and printed[-1]
+        assert sum(printed) == 101
+        out, err = capsys.readouterr()
+        assert out.count('Progress |') == 101
+        assert out.endswith('100.0% \n')
+        # Repeated completion of a phase is not shown again
+        assert not reporter.update(100000, 100000, 'parsing')
+        reporter.configure('bar', min_interval=3600, min_percent=0)
+        printed = [reporter.update(count, 1000, 'converting')
+                   for count in range(1, 1001)]
+        assert [index for index, shown in enumerate(printed) if shown] == \
+            [0, 999]
+        capsys.readouterr()
+        stream = StringIO()
+        reporter.configure('json', stream=stream)
+        for phase in ('parsing', 'converting', 'parsing'):
+            for count in range(1, 11):
+                reporter.update(count, 10, phase)
+        reporter.configure('quiet', min_interval=0)
+        assert not any(reporter.update(count, 10, 'quiet')
+                       for count in range(1, 11))
+        assert capsys.readouterr()[0] == ''
+        assert reporter.timings.keys() == ['quiet']
+        reporter.configure('json', stream=stream)
+        reporter.update(1, 1, 'parsing')
+        timings = reporter.report_phase_timings()
+        records = [json.loads(line) for line in
+                   stream.getvalue().splitlines()]
+        assert [record['phase'] for record in records] == \
+            ['parsing', 'parsing', 'converting', 'converting', 'parsing',
+             'parsing', 'parsing', 'parsing']
+        assert records[1] == {'phase': 'parsing', 'iteration': 10,
+                              'total': 10, 'percent': 100.0}
+        assert timings.keys() == ['parsing']
+        assert records[-1]['seconds'] >= 0
+        with pytest.raises(ValueError):
+            reporter.configure('verbose')
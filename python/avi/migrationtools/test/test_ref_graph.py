@@ -0,0 +1,89 @@
+"""
+This testsuite contains the test cases for the reference graph used by
+VS filter, orphan detection and make_graph
+"""
+import sys
+import pytest
+
+from avi.migrationtools.ref_graph import RefGraph, clear_ref_cache, \
+    ref_cache
+
+
+class TestRefGraph:
+
+    @pytest.mark.travis
+    def test_ref_graph(self):
+        """
+        Reference graph should resolve references of shared and cyclic
+        objects only once
+        """
+        ref = '/api/%s/?tenant=admin&name=%s'
+        avi_config = {
+            'VirtualService': [
+                {'name': 'vs1', 'tenant_ref': ref % ('tenant', 'admin'),
+                 'pool_group_ref': ref % ('poolgroup', 'pg1')},
+                {'name': 'vs2', 'tenant_ref': ref % ('tenant', 'admin'),
+                 'pool_ref': ref % ('pool', 'p1')},
+                {'name': 'vs3', 'tenant_ref': ref % ('tenant', 'admin'),
+                 'pool_ref': ref % ('pool', 'p1')}],
+            'PoolGroup': [
+                {'name': 'pg1', 'tenant_ref': ref % ('tenant', 'admin'),
+                 'members': [{'pool_ref': ref % ('pool', 'p1')},
+                             {'pool_ref': ref % ('pool', 'p2')}]}],
+            'Pool': [
+                {'name': 'p1', 'tenant_ref': ref % ('tenant', 'admin'),
+                 'health_monitor_refs': [ref % ('healthmonitor', 'hm1')]},
+                {'name': 'p2', 'tenant_ref': ref % ('tenant', 'admin'),
+                 'pool_group_ref': ref % ('poolgroup', 'pg1')},
+                {'name': 'p3', 'tenant_ref': ref % ('tenant', 'admin')}],
+            'HealthMonitor': [{'name': 'hm1'}]}
+        ref_graph = RefGraph(avi_config)
+        closure = ref_graph.get_closure(avi_config['VirtualService'][0])
+        assert [obj['name'] for obj in closure] == ['pg1', 'p1', 'hm1', 'p2']
+        vs_ref_dict = dict()
+        in_use = ref_graph.get_in_use(vs_ref_dict)
+        assert 'p1-Pool-admin' in in_use
+        assert 'p3-Pool-admin' not in in_use
+        assert vs_ref_dict['p1$$pool$$admin'] == ['vs2', 'vs3']
+        assert vs_ref_dict['pg1$$poolgroup$$admin'] == ['vs1']
+        assert ref % ('pool', 'p1') in ref_cache
+        # Converter runs start with no parsed references
+        clear_ref_cache()
+        assert not ref_cache
+
+    @pytest.mark.travis
+    def test_ref_graph_walk(self):
+        """
+        Walk should visit objects shared by many referrers once and should
+        not hit recursion limit for deeply nested objects
+        """
+        ref = '/api/%s/?tenant=admin&name=%s'
+        nested = {'pool_ref': ref % ('pool', 'p1')}
+        for index in range(sys.getrecursionlimit() + 100):
+            nested = {'match': nested}
+        avi_config = {
+            'VirtualService': [
+                {'name': 'vs1', 'pool_ref': ref % ('pool', 'p1')},
+                {'name': 'vs2', 'pool_ref': ref % ('pool', 'p1')}],
+            'HTTPPolicySet': [{'name': 'ps1', 'rules': [nested]}],
+            'Pool': [
+                {'name': 'p1', 'servers': [{'hostname': 'server1'}],
+                 'health_monitor_refs': [ref % ('healthmonitor', 'hm1')]}],
+            'HealthMonitor': [{'name': 'hm1'}]}
+        ref_graph = RefGraph(avi_config)
+        visited = set()
+        walked = [(depth, owner['name'], field) for vs in
+                  avi_config['VirtualService'] for
+                  depth, owner, field, value, parent, target in
+                  ref_graph.walk(vs, visited=visited)]
+        # Order of fields within an object follows dict order
+        assert sorted(walked) == sorted([
+            (0, 'vs1', 'name'), (0, 'vs1', 'pool_ref'), (1, 'p1', 'name'),
+            (1, 'p1', 'hostname'), (1, 'p1', 'health_monitor_refs'),
+            (2, 'hm1', 'name'), (0, 'vs2', 'name'), (0, 'vs2', 'pool_ref')])
+        # Referred object is walked right after the field referring it
+        assert walked.index((1, 'p1', 'health_monitor_refs')) + 1 == \
+            walked.index((2, 'hm1', 'name'))
+        assert [entry[1] for entry in walked[-2:]] == ['vs2', 'vs2']
+        assert [obj['name'] for obj in ref_graph.get_closure(
+            avi_config['HTTPPolicySet'][0])] == ['p1', 'hm1']
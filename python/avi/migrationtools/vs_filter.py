@@ -2,29 +2,8 @@
 import argparse
 import json
 import os
-import urlparse
-
-path_key_map = {'poolgroup': 'PoolGroup', 'healthmonitor': 'HealthMonitor',
-                'sslprofile': 'SSLProfile', 'httppolicyset': 'HTTPPolicySet',
-                'sslkeyandcertificate': 'SSLKeyAndCertificate', 'pool': 'Pool',
-                'networkprofile': 'NetworkProfile', 'pkiprofile': 'PKIProfile',
-                'stringgroup': 'StringGroup', 'vrfcontext': 'VrfContext',
-                'applicationprofile': 'ApplicationProfile', 'vsdatascriptset':
-                    'VSDataScriptSet', 'networksecuritypolicy':
-                    'NetworkSecurityPolicy', 'applicationpersistenceprofile':
-                    'ApplicationPersistenceProfile', 'prioritylabels':
-                    'PriorityLabels', 'vsvip': 'VsVip'
-                }
-
-
-def get_name_and_entity(url):
-    """
-    Parses reference string to extract object type and
-    :param url: reference url to be parsed
-    :return: entity and object name
-    """
-    parsed = urlparse.urlparse(url)
-    return parsed.path.split('/')[2], urlparse.parse_qs(parsed.query)['name'][0]
+from avi.migrationtools.ref_graph import PATH_KEY_MAP, RefGraph, \
+    get_name_and_entity
 
 
 def filter_for_vs(avi_config, vs_names):
@@ -34,82 +13,66 @@ def filter_for_vs(avi_config, vs_names):
     :param vs_names: comma separated vs names to filter
     :return: Filtered config dict
     """
+    ref_graph = RefGraph(avi_config)
     new_config = dict()
     new_config['META'] = avi_config['META']
     new_config['VirtualService'] = []
+    # Type and name of objects already added to filtered config
+    added_objs = set()
     virtual_services = vs_names.split(',')
 
     for vs_name in virtual_services:
-        vs = [vs for vs in avi_config['VirtualService']
-              if vs['name'] == vs_name]
+        vs = ref_graph.get_object('VirtualService', vs_name)
         if not vs:
             print 'ERROR: VS object not found with name %s' % vs_name
             exit()
-        vs = vs[0]
         new_config['VirtualService'].append(vs)
         print '%s(VirtualService)' % vs_name
-        find_and_add_objects(vs, avi_config, new_config, depth=0)
+        find_and_add_objects(vs, ref_graph, new_config, added_objs)
     return new_config
 
 
-def search_obj(entity, name, new_config, avi_config, depth):
+def search_obj(entity, name, found_obj, new_config, added_objs, depth):
     """
-    Method to search referenced object
+    Method to add referenced object
     :param entity: object type
     :param name: object name
+    :param found_obj: referenced object from reference graph
     :param new_config: filtered config
-    :param avi_config: full config
-    :param depth: Recursion depth to determine level in the vs reference tree
+    :param added_objs: type and name of objects in filtered config
+    :param depth: Depth of the referrer in the vs reference tree
     """
 
-    avi_conf_key = path_key_map[entity]
-    found_obj_list = avi_config[avi_conf_key]
-    found_obj = [obj for obj in found_obj_list if obj['name'] == name]
     if found_obj:
-        found_obj = found_obj[0]
-        print (' | '*depth), '|- %s(%s)' % (name, path_key_map[entity])
+        avi_conf_key = PATH_KEY_MAP[entity]
+        print (' | '*depth), '|- %s(%s)' % (name, avi_conf_key)
     elif entity in ['applicationprofile', 'networkprofile', 'healthmonitor',
-                    'sslkeyandcertificate', 'sslprofile']:
-        if str.startswith(str(name), 'System-'):
-            return
+                    'sslkeyandcertificate', 'sslprofile'] and \
+            str.startswith(str(name), 'System-'):
+        return
     else:
         print 'ERROR: Reference not found for %s with name %s' % (entity, name)
         exit()
-    if avi_conf_key in new_config:
-        if not any(d['name'] == found_obj['name'] for d in
-                   new_config[avi_conf_key]):
-            new_config[avi_conf_key].append(found_obj)
-    else:
-        new_config[avi_conf_key] = [found_obj]
-    depth += 1
-    find_and_add_objects(found_obj, avi_config, new_config, depth)
+    if (avi_conf_key, found_obj['name']) not in added_objs:
+        added_objs.add((avi_conf_key, found_obj['name']))
+        new_config.setdefault(avi_conf_key, []).append(found_obj)
 
 
-def find_and_add_objects(obj_dict, avi_config, new_config, depth):
+def find_and_add_objects(obj_dict, ref_graph, new_config, added_objs):
     """
-    Method to iterate in one object find references and add those to output
+    Method to add the objects referred by one object directly or indirectly
+    to output, objects referred many times are walked only once
     :param obj_dict: Object to be iterated over
-    :param avi_config: Full config
+    :param ref_graph: reference graph of full config
     :param new_config: Filtered config
-    :param depth: Recursion depth to determine level in the vs reference tree
+    :param added_objs: type and name of objects in filtered config
     """
-    for key in obj_dict:
-        if (key.endswith('ref') and key not in ['cloud_ref', 'tenant_ref']) \
-                or key == 'ssl_profile_name':
-            if not obj_dict[key]:
-                continue
-            entity, name = get_name_and_entity(obj_dict[key])
-            search_obj(entity, name, new_config, avi_config, depth)
-        elif key.endswith('refs'):
-            for ref in obj_dict[key]:
-                entity, name = get_name_and_entity(ref)
-                search_obj(entity, name, new_config, avi_config, depth)
-        elif isinstance(obj_dict[key], dict):
-            find_and_add_objects(obj_dict[key], avi_config, new_config, depth)
-        elif obj_dict[key] and isinstance(obj_dict[key], list) \
-                and isinstance(obj_dict[key][0], dict):
-            for member in obj_dict[key]:
-                find_and_add_objects(member, avi_config, new_config, depth)
+    for depth, owner, field, value, parent, found_obj in ref_graph.walk(
+            obj_dict):
+        if field in ('hostname', 'name') or not value:
+            continue
+        entity, name = get_name_and_entity(value)
+        search_obj(entity, name, found_obj, new_config, added_objs, depth)
     return
 
 
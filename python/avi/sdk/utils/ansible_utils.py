@@ -95,41 +95,61 @@ def purge_optional_fields(obj, module):
     return obj
 
 
+def is_absent(value):
+    """
+    Returns True if the field value marks the field as state: absent
+    :param value: field value
+    :return: True if field needs to be removed
+    """
+    if type(value) == dict:
+        return 'state' in value and value['state'] == 'absent'
+    return value == "{'state': 'absent'}"
+
+
 def cleanup_absent_fields(obj):
     """
     cleans up any field that is marked as state: absent. It needs to be removed
-    from the object if it is present.
+    from the object if it is present. Nested dicts are cleaned iteratively
+    before the dict having them, so deeply nested objects do not hit the
+    recursion limit.
     :param obj:
     :return: Purged object
     """
     if type(obj) != dict:
         return obj
-    cleanup_keys = []
-    for k, v in obj.items():
-        if type(v) == dict:
-            if (('state' in v and v['state'] == 'absent') or
-                    (v == "{'state': 'absent'}")):
-                cleanup_keys.append(k)
-            else:
-                cleanup_absent_fields(v)
-                if not v:
+    visited = set()
+    # Dicts to clean after the nested dicts pushed above them are cleaned
+    stack = [(obj, False)]
+    while stack:
+        cur, nested_cleaned = stack.pop()
+        if not nested_cleaned:
+            if id(cur) in visited:
+                continue
+            visited.add(id(cur))
+            stack.append((cur, True))
+            for v in cur.values():
+                if type(v) == dict and not is_absent(v):
+                    stack.append((v, False))
+                elif type(v) == list:
+                    stack.extend((elem, False) for elem in v
+                                 if type(elem) == dict)
+            continue
+        cleanup_keys = []
+        for k, v in cur.items():
+            if type(v) == dict:
+                if is_absent(v) or not v:
                     cleanup_keys.append(k)
-        elif type(v) == list:
-            new_list = []
-            for elem in v:
-                elem = cleanup_absent_fields(elem)
-                if elem:
-                    # remove the item from list
-                    new_list.append(elem)
-            if new_list:
-                obj[k] = new_list
-            else:
-                cleanup_keys.append(k)
-        elif isinstance(v, str) or isinstance(v, str):
-            if v == "{'state': 'absent'}":
-                cleanup_keys.append(k)
-    for k in cleanup_keys:
-        del obj[k]
+            elif type(v) == list:
+                new_list = [elem for elem in v if elem]
+                if new_list:
+                    cur[k] = new_list
+                else:
+                    cleanup_keys.append(k)
+            elif isinstance(v, str):
+                if is_absent(v):
+                    cleanup_keys.append(k)
+        for k in cleanup_keys:
+            del cur[k]
     return obj
 
 